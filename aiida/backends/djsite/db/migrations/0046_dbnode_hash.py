@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Migration to add the indexed `hash` column to the `DbNode` model, used to look up nodes for caching."""
+# pylint: disable=invalid-name
+from django.db import migrations, models
+from aiida.backends.djsite.db.migrations import upgrade_schema_version
+
+REVISION = '1.0.46'
+DOWN_REVISION = '1.0.45'
+
+# Key of the extra in which the hash of the node is stored
+_HASH_EXTRA_KEY = '_aiida_hash'
+
+
+class Migration(migrations.Migration):
+    """Migrate to add the hash column to the dbnode table and populate it with the hash stored in the extras."""
+    dependencies = [
+        ('db', '0045_dbgroup_extras'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dbnode',
+            name='hash',
+            field=models.CharField(max_length=255, db_index=True, null=True),
+        ),
+        migrations.RunSQL(
+            sql=f"UPDATE db_dbnode SET hash = extras ->> '{_HASH_EXTRA_KEY}' "
+            f"WHERE extras ->> '{_HASH_EXTRA_KEY}' IS NOT NULL;",
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        upgrade_schema_version(REVISION, DOWN_REVISION),
+    ]
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Migration to add expression indexes on the node attributes that are filtered on by the engine."""
+# pylint: disable=invalid-name
+from django.db import migrations
+from aiida.backends.djsite.db.migrations import upgrade_schema_version
+
+REVISION = '1.0.47'
+DOWN_REVISION = '1.0.46'
+
+# Attributes that are filtered on by the engine, see `aiida.manage.database.indexes.ENGINE_ATTRIBUTE_INDEXES`
+_ATTRIBUTE_KEYS = ('process_state', 'exit_status', 'sealed', 'process_label')
+
+
+class Migration(migrations.Migration):
+    """Migrate to add expression indexes on the values of the process state, exit status, sealed and process label."""
+    dependencies = [
+        ('db', '0046_dbnode_hash'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f"CREATE INDEX ix_db_dbnode_attributes_{key} ON db_dbnode ((attributes #> '{{{key}}}'));"
+            f"COMMENT ON INDEX ix_db_dbnode_attributes_{key} IS 'attributes.{key}';",
+            reverse_sql=f'DROP INDEX IF EXISTS ix_db_dbnode_attributes_{key};'
+        ) for key in _ATTRIBUTE_KEYS
+    ] + [
+        upgrade_schema_version(REVISION, DOWN_REVISION),
+    ]
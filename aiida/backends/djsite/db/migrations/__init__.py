@@ -21,7 +21,7 @@ class DeserializationException(AiidaException):
     pass
 
 
-LATEST_MIGRATION = '0045_dbgroup_extras'
+LATEST_MIGRATION = '0047_dbnode_attribute_indexes'
 
 
 def _update_schema_version(version, apps, _):
@@ -127,6 +127,8 @@ class DbNode(m.Model):
     attributes = JSONField(default=dict, null=True)
     # JSON Extras
     extras = JSONField(default=dict, null=True)
+    # Hash of the node, as also stored in the extras, in a dedicated column that is indexed to look up nodes for caching
+    hash = m.CharField(max_length=255, db_index=True, null=True)
 
     objects = m.Manager()
     # Return aiida Node instances or their subclasses instead of DbNode instances
@@ -25,3 +25,29 @@ def delete_nodes_and_connections_django(pks_to_delete):  # pylint: disable=inval
         models.DbLink.objects.filter(Q(input__in=pks_to_delete) | Q(output__in=pks_to_delete)).delete()
         # now delete nodes
         models.DbNode.objects.filter(pk__in=pks_to_delete).delete()
+
+
+def update_node_hashes_django(hashes):
+    """Store the hashes of many nodes with a single query.
+
+    :param hashes: a list of tuples of the pk of a node, its hash and the version of the hash.
+    """
+    # pylint: disable=import-error,no-name-in-module
+    from django.db import connection, transaction
+    from aiida.common import json
+
+    records = [{'id': pk, 'hash': node_hash, 'version': hash_version} for pk, node_hash, hash_version in hashes]
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE db_dbnode SET
+                    hash = records.hash,
+                    extras = db_dbnode.extras || jsonb_build_object(
+                        '_aiida_hash', records.hash, '_aiida_hash_version', records.version
+                    )
+                FROM jsonb_to_recordset(%s::jsonb) AS records(id integer, hash text, version text)
+                WHERE db_dbnode.id = records.id;
+                """, [json.dumps(records)]
+            )
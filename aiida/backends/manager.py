@@ -130,7 +130,19 @@ class BackendManager:
         """Reset the backend environment."""
 
     def migrate(self):
-        """Migrate the database to the latest schema generation or version."""
+        """Migrate the database to the latest schema generation or version.
+
+        The caches of the state of the database schema are reset afterwards, even if the migration fails.
+        """
+        from aiida.manage.database.closure import reset_provenance_closure_cache
+
+        try:
+            self._migrate()
+        finally:
+            reset_provenance_closure_cache()
+
+    def _migrate(self):
+        """Migrate the database schema, see :meth:`migrate`."""
         try:
             # If the settings table does not exist, we are dealing with an empty database. We cannot perform the checks
             # because they rely on the settings table existing, so instead we do not validate but directly call method
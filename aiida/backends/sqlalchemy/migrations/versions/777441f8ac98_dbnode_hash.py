@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=no-member,invalid-name
+"""Migration to add the indexed `hash` column to the `DbNode` model, used to look up nodes for caching.
+
+Revision ID: 777441f8ac98
+Revises: 0edcdd5a30f0
+Create Date: 2021-02-08 10:12:31.278457
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# Remove when https://github.com/PyCQA/pylint/issues/1931 is fixed
+# pylint: disable=no-name-in-module,import-error
+from sqlalchemy.sql import text
+
+# revision identifiers, used by Alembic.
+revision = '777441f8ac98'
+down_revision = '0edcdd5a30f0'
+branch_labels = None
+depends_on = None
+
+# Key of the extra in which the hash of the node is stored
+_HASH_EXTRA_KEY = '_aiida_hash'
+
+
+def upgrade():
+    """Upgrade: Add the hash column to the 'db_dbnode' table and populate it with the hash stored in the extras"""
+    op.add_column('db_dbnode', sa.Column('hash', sa.String(length=255), nullable=True))
+    op.create_index('ix_db_dbnode_hash', 'db_dbnode', ['hash'], unique=False)
+
+    statement = text(
+        f"UPDATE db_dbnode SET hash = extras ->> '{_HASH_EXTRA_KEY}' WHERE extras ->> '{_HASH_EXTRA_KEY}' IS NOT NULL;"
+    )
+    op.get_bind().execute(statement)
+
+
+def downgrade():
+    """Downgrade: Drop the hash column from the 'db_dbnode' table"""
+    op.drop_index('ix_db_dbnode_hash', table_name='db_dbnode')
+    op.drop_column('db_dbnode', 'hash')
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=no-member,invalid-name
+"""Migration to add expression indexes on the node attributes that are filtered on by the engine.
+
+Revision ID: b4bd34bff762
+Revises: 777441f8ac98
+Create Date: 2021-02-15 14:31:07.502816
+
+"""
+from alembic import op
+
+# Remove when https://github.com/PyCQA/pylint/issues/1931 is fixed
+# pylint: disable=no-name-in-module,import-error
+from sqlalchemy.sql import text
+
+# revision identifiers, used by Alembic.
+revision = 'b4bd34bff762'
+down_revision = '777441f8ac98'
+branch_labels = None
+depends_on = None
+
+# Attributes that are filtered on by the engine, see `aiida.manage.database.indexes.ENGINE_ATTRIBUTE_INDEXES`
+_ATTRIBUTE_KEYS = ('process_state', 'exit_status', 'sealed', 'process_label')
+
+
+def upgrade():
+    """Upgrade: Add expression indexes on the values of the attributes to the 'db_dbnode' table"""
+    connection = op.get_bind()
+
+    for key in _ATTRIBUTE_KEYS:
+        connection.execute(
+            text(f"CREATE INDEX ix_db_dbnode_attributes_{key} ON db_dbnode ((attributes #> '{{{key}}}'));")
+        )
+        connection.execute(text(f"COMMENT ON INDEX ix_db_dbnode_attributes_{key} IS 'attributes.{key}';"))
+
+
+def downgrade():
+    """Downgrade: Drop the expression indexes on the values of the attributes from the 'db_dbnode' table"""
+    for key in _ATTRIBUTE_KEYS:
+        op.drop_index(f'ix_db_dbnode_attributes_{key}', table_name='db_dbnode')
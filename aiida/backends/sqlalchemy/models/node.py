@@ -41,6 +41,8 @@ class DbNode(Base):
     mtime = Column(DateTime(timezone=True), default=timezone.now, onupdate=timezone.now)
     attributes = Column(JSONB)
     extras = Column(JSONB)
+    # Hash of the node, as also stored in the extras, in a dedicated column that is indexed to look up nodes for caching
+    hash = Column(String(255), index=True, nullable=True)
 
     dbcomputer_id = Column(
         Integer,
@@ -39,6 +39,34 @@ def delete_nodes_and_connections_sqla(pks_to_delete):  # pylint: disable=invalid
         session.query(DbNode).filter(DbNode.id.in_(list(pks_to_delete))).delete(synchronize_session='fetch')
 
 
+def update_node_hashes_sqla(hashes):
+    """Store the hashes of many nodes with a single query.
+
+    :param hashes: a list of tuples of the pk of a node, its hash and the version of the hash.
+    """
+    from sqlalchemy.sql import text
+    from aiida.common import json
+    from aiida.manage.manager import get_manager
+
+    backend = get_manager().get_backend()
+    records = [{'id': pk, 'hash': node_hash, 'version': hash_version} for pk, node_hash, hash_version in hashes]
+
+    with backend.transaction() as session:
+        session.execute(
+            text(
+                """
+                UPDATE db_dbnode SET
+                    hash = records.hash,
+                    extras = db_dbnode.extras || jsonb_build_object(
+                        '_aiida_hash', records.hash, '_aiida_hash_version', records.version
+                    )
+                FROM jsonb_to_recordset(CAST(:records AS jsonb)) AS records(id integer, hash text, version text)
+                WHERE db_dbnode.id = records.id;
+                """
+            ), {'records': json.dumps(records)}
+        )
+
+
 def flag_modified(instance, key):
     """Wrapper around `sqlalchemy.orm.attributes.flag_modified` to correctly dereference utils.ModelWrapper
 
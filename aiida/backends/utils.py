@@ -58,3 +58,22 @@ def delete_nodes_and_connections(pks):
         raise Exception(f'unknown backend {configuration.PROFILE.database_backend}')
 
     delete_nodes_backend(pks)
+
+
+def update_node_hashes(hashes):
+    """Backend-agnostic function to store the hashes of many nodes with a single query.
+
+    The hash is stored both in the ``hash`` column and in the ``_aiida_hash`` extra, and its version in the
+    ``_aiida_hash_version`` extra, just as ``Node._set_hash`` does for a single node.
+
+    :param hashes: a list of tuples of the pk of a node, its hash and the version of the hash, where the latter two can
+        be ``None`` to clear the hash
+    """
+    if configuration.PROFILE.database_backend == BACKEND_DJANGO:
+        from aiida.backends.djsite.utils import update_node_hashes_django as update_node_hashes_backend
+    elif configuration.PROFILE.database_backend == BACKEND_SQLA:
+        from aiida.backends.sqlalchemy.utils import update_node_hashes_sqla as update_node_hashes_backend
+    else:
+        raise Exception(f'unknown backend {configuration.PROFILE.database_backend}')
+
+    update_node_hashes_backend(hashes)
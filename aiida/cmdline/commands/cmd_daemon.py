@@ -135,6 +135,46 @@ def decr(number):
     print_client_response_status(response)
 
 
+@verdi_daemon.command('worker-stats')
+@decorators.only_if_daemon_running()
+def worker_stats():
+    """Show the durations of the operations of the daemon workers.
+
+    The statistics cover the last five minutes and all values are in seconds. The event loop lag is the delay with
+    which a worker runs its scheduled callbacks: if it is large, the event loop is blocked by one of the operations.
+    """
+    from tabulate import tabulate
+
+    from aiida.cmdline.utils.common import format_local_time
+    from aiida.engine.daemon.client import get_daemon_client
+    from aiida.engine.daemon.metrics import get_worker_metrics
+
+    client = get_daemon_client()
+    reports = get_worker_metrics(client.profile.filepaths['daemon']['worker_metrics'])
+
+    if not reports:
+        echo.echo_warning('no metrics reported by the daemon workers yet, try again in a few seconds')
+        return
+
+    headers = ['Metric', 'Labels', 'Count', 'Mean', 'p50', 'p95', 'p99', 'Max']
+
+    for report in reports:
+        served = f', served at {report["url"]}' if report['url'] else ''
+        echo.echo(f'Worker {report["pid"]} at {format_local_time(report["timestamp"])}{served}', bold=True)
+
+        rows = []
+        for metric in report['metrics']:
+            labels = ','.join(f'{key}={value}' for key, value in metric['labels'].items())
+            values = [
+                '-' if metric[key] is None else f'{metric[key]:.3f}' for key in ('mean', 'p50', 'p95', 'p99', 'max')
+            ]
+            name = metric['name'][len('aiida_'):-len('_seconds')]
+            rows.append([name, labels, metric['count']] + values)
+
+        echo.echo(tabulate(rows, headers=headers))
+        echo.echo('')
+
+
 @verdi_daemon.command()
 def logshow():
     """Show the log of the daemon, press CTRL+C to quit."""
@@ -291,6 +331,24 @@ def start_circus(foreground, number):
         }]
     }  # yapf: disable
 
+    if get_config().get_option('daemon.autoscale', client.profile.name):
+        arbiter_config['watchers'].append({
+            'cmd': client.autoscaler_cmd_string,
+            'name': client.autoscaler_name,
+            'numprocesses': 1,
+            'virtualenv': client.virtualenv,
+            'copy_env': True,
+            'stdout_stream': {
+                'class': 'FileStream',
+                'filename': client.daemon_log_file,
+            },
+            'stderr_stream': {
+                'class': 'FileStream',
+                'filename': client.daemon_log_file,
+            },
+            'env': get_env_with_venv_bin(),
+        })  # yapf: disable
+
     if not foreground:
         daemonize()
 
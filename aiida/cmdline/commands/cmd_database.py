@@ -194,3 +194,153 @@ def detect_invalid_nodes():
         echo.echo_success('no integrity violations detected')
     else:
         echo.echo_critical('one or more integrity violations detected')
+
+
+@verdi_database.group('closure')
+def verdi_database_closure():
+    """Manage the materialized transitive closure of the provenance graph.
+
+    When it exists, the closure table is used by the `QueryBuilder` to answer queries for the ancestors and descendants
+    of nodes with `distinct_paths=False`, instead of recursively traversing the links. It is kept up to date
+    automatically once it is built.
+    """
+
+
+@verdi_database_closure.command('build')
+@decorators.with_dbenv()
+def closure_build():
+    """Build the provenance closure table, or rebuild it if it already exists."""
+    from aiida.manage.database.closure import build_provenance_closure
+    from aiida.manage.manager import get_manager
+
+    try:
+        count = build_provenance_closure(get_manager().get_backend())
+    except Exception as exception:  # pylint: disable=broad-except
+        echo.echo_critical(f'building the provenance closure table failed: {exception}')
+    else:
+        echo.echo_success(f'built the provenance closure table with {count} ancestor-descendant pairs')
+
+
+@verdi_database_closure.command('drop')
+@options.FORCE()
+@decorators.with_dbenv()
+def closure_drop(force):
+    """Drop the provenance closure table.
+
+    The daemon has to be stopped, since its workers would keep querying the table.
+    """
+    from aiida.engine.daemon.client import get_daemon_client
+    from aiida.manage.database.closure import drop_provenance_closure, has_provenance_closure
+    from aiida.manage.manager import get_manager
+
+    backend = get_manager().get_backend()
+
+    if not has_provenance_closure(backend):
+        echo.echo_info('the provenance closure table does not exist')
+        return
+
+    if get_daemon_client().is_daemon_running:
+        echo.echo_critical('the daemon for the profile is still running, stop it first with `verdi daemon stop`')
+
+    if not force:
+        click.confirm('Ancestor and descendant queries will traverse the links again. Continue?', abort=True)
+
+    drop_provenance_closure(backend)
+    echo.echo_success('dropped the provenance closure table')
+
+
+@verdi_database.group('index')
+def verdi_database_index():
+    """Manage the indexes on the values of node attributes and extras.
+
+    Filters of the `QueryBuilder` that compare an attribute or extra with `==`, `in`, `<`, `>`, `<=` or `>=` can use an
+    index on it. The indexes on the attributes that are filtered on by the engine are created by the migrations.
+    """
+
+
+@verdi_database_index.command('list')
+@decorators.with_dbenv()
+def index_list():
+    """List the indexes on attributes and extras, with their size and the number of times they were used."""
+    from tabulate import tabulate
+
+    from aiida.manage.database.indexes import ENGINE_ATTRIBUTE_INDEXES, get_attribute_indexes
+    from aiida.manage.manager import get_manager
+
+    indexes = get_attribute_indexes(get_manager().get_backend())
+
+    if not indexes:
+        echo.echo_info('there are no indexes on attributes or extras')
+        return
+
+    headers = ['Projection', 'Name', 'Size [kB]', 'Scans', 'Managed']
+    rows = []
+
+    for index in indexes:
+        projection = index.projection if index.valid else f'{index.projection} (invalid)'
+        managed = 'yes' if index.projection in ENGINE_ATTRIBUTE_INDEXES else 'no'
+        rows.append([projection, index.name, index.size // 1024, index.scans, managed])
+
+    echo.echo(tabulate(rows, headers=headers))
+
+
+@verdi_database_index.command('create')
+@click.argument('projections', nargs=-1, required=True, type=click.STRING)
+@click.option(
+    '--concurrently/--no-concurrently',
+    default=True,
+    show_default=True,
+    help='Create the index without locking the node table for writes, which takes longer.'
+)
+@decorators.with_dbenv()
+def index_create(projections, concurrently):
+    """Create indexes on the values of attributes or extras.
+
+    The PROJECTIONS are those of the attributes or extras, for example `attributes.energy` or `extras.tag`. The values
+    should be small, such as numbers and short strings, since a value can only be indexed if it is at most a few kB.
+    """
+    from aiida.manage.database.indexes import create_attribute_index, parse_projection
+    from aiida.manage.manager import get_manager
+
+    for projection in projections:
+        try:
+            parse_projection(projection)
+        except ValueError as exception:
+            echo.echo_critical(str(exception))
+
+    backend = get_manager().get_backend()
+
+    for projection in projections:
+        try:
+            name = create_attribute_index(backend, projection, concurrently=concurrently)
+        except Exception as exception:  # pylint: disable=broad-except
+            echo.echo_critical(f'creating the index on `{projection}` failed: {exception}')
+        else:
+            echo.echo_success(f'created the index `{name}` on `{projection}`')
+
+
+@verdi_database_index.command('drop')
+@click.argument('projections', nargs=-1, required=True, type=click.STRING)
+@options.FORCE()
+@decorators.with_dbenv()
+def index_drop(projections, force):
+    """Drop the indexes on the values of attributes or extras.
+
+    The PROJECTIONS are those of the attributes or extras, for example `attributes.energy` or `extras.tag`. The indexes
+    on the attributes that are filtered on by the engine cannot be dropped.
+    """
+    from aiida.manage.database.indexes import drop_attribute_index
+    from aiida.manage.manager import get_manager
+
+    backend = get_manager().get_backend()
+
+    if not force:
+        click.confirm('Queries that filter on these attributes or extras will scan all nodes. Continue?', abort=True)
+
+    for projection in projections:
+        try:
+            drop_attribute_index(backend, projection)
+        except (ValueError, exceptions.NotExistent) as exception:
+            echo.echo_critical(str(exception))
+        else:
+            echo.echo_success(f'dropped the index on `{projection}`')
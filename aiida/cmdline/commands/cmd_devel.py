@@ -74,6 +74,14 @@ def devel_run_daemon():
     start_daemon()
 
 
+@verdi_devel.command('run_daemon_autoscaler')
+@decorators.with_dbenv()
+def devel_run_daemon_autoscaler():
+    """Run the autoscaler of the daemon workers in the current interpreter."""
+    from aiida.engine.daemon.autoscaler import start_autoscaler
+    start_autoscaler()
+
+
 @verdi_devel.command('validate-plugins')
 @decorators.with_dbenv()
 def devel_validate_plugins():
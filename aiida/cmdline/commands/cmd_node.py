@@ -318,13 +318,17 @@ def node_delete(identifier, dry_run, verbose, force, **traversal_rules):
     DELETE_LOGGER.setLevel(verbosity)
 
     pks = []
+    identifiers = []
 
     for obj in identifier:
         # we only load the node if we need to convert from a uuid/label
         try:
             pks.append(int(obj))
         except ValueError:
-            pks.append(NodeEntityLoader.load_entity(obj).pk)
+            identifiers.append(obj)
+
+    if identifiers:
+        pks.extend(node.pk for node in NodeEntityLoader.load_entities(identifiers))
 
     def _dry_run_callback(pks):
         if not pks or force:
@@ -348,14 +352,40 @@ def node_delete(identifier, dry_run, verbose, force, **traversal_rules):
     default=None,
     help='Only include nodes that are class or sub class of the class identified by this entry point.'
 )
+@options.PAST_DAYS()
+@options.OLDER_THAN()
+@click.option(
+    '--start-pk',
+    type=click.INT,
+    default=None,
+    help='Only include nodes with a larger pk, which can be used to resume an interrupted rehash.'
+)
+@click.option(
+    '--batch-size',
+    type=click.IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help='Number of nodes whose hashes are computed and stored together.'
+)
+@click.option(
+    '--max-workers',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of processes that compute the hashes in parallel. By default, the number of CPUs.'
+)
 @options.FORCE()
 @with_dbenv()
-def rehash(nodes, entry_point, force):
+def rehash(nodes, entry_point, past_days, older_than, start_pk, batch_size, max_workers, force):
     """Recompute the hash for nodes in the database.
 
-    The set of nodes that will be rehashed can be filtered by their identifier and/or based on their class.
+    The set of nodes that will be rehashed can be filtered by their identifier and/or based on their class and creation
+    time. The nodes are rehashed in batches in order of their pk: if the command is interrupted, it prints the pk from
+    which it can be resumed with the `--start-pk` option.
     """
-    from aiida.orm import Data, ProcessNode, QueryBuilder
+    import datetime
+    import time
+    from aiida.orm import Data, ProcessNode
+    from aiida.tools.rehash import count_nodes_to_rehash, rehash_nodes
 
     if not force:
         echo.echo_warning('This command will recompute and overwrite the hashes of all nodes.')
@@ -375,23 +405,35 @@ def rehash(nodes, entry_point, force):
     if entry_point is None:
         entry_point = (Data, ProcessNode)
 
-    if nodes:
-        to_hash = [(node,) for node in nodes if isinstance(node, entry_point)]
-        num_nodes = len(to_hash)
-    else:
-        builder = QueryBuilder()
-        builder.append(entry_point, tag='node')
-        to_hash = builder.all()
-        num_nodes = builder.count()
+    filters = {
+        'node_classes': entry_point,
+        'pks': [node.pk for node in nodes] if nodes else None,
+        'ctime_after': timezone.now() - datetime.timedelta(days=past_days) if past_days is not None else None,
+        'ctime_before': timezone.now() - datetime.timedelta(days=older_than) if older_than is not None else None,
+        'start_pk': start_pk,
+    }
+    num_nodes = count_nodes_to_rehash(**filters)
 
-    if not to_hash:
+    if not num_nodes:
         echo.echo_critical('no matching nodes found')
 
-    with click.progressbar(to_hash, label='Rehashing Nodes:') as iter_hash:
-        for node, in iter_hash:
-            node.rehash()
+    num_rehashed = 0
+    last_pk = None
+    time_start = time.time()
 
-    echo.echo_success(f'{num_nodes} nodes re-hashed.')
+    try:
+        with click.progressbar(length=num_nodes, label='Rehashing Nodes:') as progress:
+            for num_batch, last_pk in rehash_nodes(**filters, batch_size=batch_size, max_workers=max_workers):
+                num_rehashed += num_batch
+                progress.update(num_batch)
+    except KeyboardInterrupt:
+        if last_pk is not None:
+            echo.echo_critical(f'interrupted after {num_rehashed} nodes: resume with `--start-pk {last_pk}`.')
+        echo.echo_critical('interrupted before any node was re-hashed.')
+
+    time_elapsed = time.time() - time_start
+    throughput = num_rehashed / time_elapsed if time_elapsed > 0 else float('inf')
+    echo.echo_success(f'{num_rehashed} nodes re-hashed in {time_elapsed:.2f} s ({throughput:.1f} nodes/s).')
 
 
 @verdi_node.group('graph')
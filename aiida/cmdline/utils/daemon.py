@@ -94,7 +94,44 @@ def get_daemon_status(client):
         'Use verdi daemon [incr | decr] [num] to increase / decrease the amount of workers'
     )
 
-    return template.format(**info)
+    status = template.format(**info)
+    autoscaler = get_autoscaler_status(client)
+
+    if autoscaler is not None:
+        status += f'\n{autoscaler}'
+
+    return status
+
+
+def get_autoscaler_status(client):
+    """
+    Return the last decision of the autoscaler of the daemon for a given profile through its DaemonClient
+
+    :param client: the DaemonClient
+    :return: the description of the decision, or None if autoscaling is disabled or no decision was taken yet
+    """
+    from aiida.cmdline.utils.common import format_local_time
+    from aiida.engine.daemon.autoscaler import get_autoscaler_decision
+    from aiida.manage.configuration import get_config
+
+    if not get_config().get_option('daemon.autoscale', client.profile.name):
+        return None
+
+    decision = get_autoscaler_decision(client.profile)
+
+    if decision is None:
+        return 'Autoscaler: no decision taken yet'
+
+    utilisation = f'{decision.utilisation:.0%}' if decision.utilisation is not None else '-'
+    loop_lag = f'{decision.loop_lag:.2f}s' if decision.loop_lag is not None else '-'
+    queue_depth = decision.queue_depth if decision.queue_depth is not None else '-'
+
+    return (
+        f'Autoscaler [{decision.min_workers}-{decision.max_workers} workers] at '
+        f'{format_local_time(decision.timestamp)}: {decision.num_workers} -> {decision.target_workers} workers, '
+        f'{decision.reason}\n'
+        f'    slot utilisation: {utilisation}, event loop lag: {loop_lag}, waiting tasks: {queue_depth}'
+    )
 
 
 def delete_stale_pid_file(client):
@@ -11,10 +11,12 @@
 import datetime
 import hashlib
 import numbers
+import os
 import random
 import time
 import uuid
 from collections import abc, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import singledispatch
 from itertools import chain
 from operator import itemgetter
@@ -39,6 +41,13 @@ HASHING_KEY = 'HashingKey'
 # The key that is used to store the hash in the node extras
 _HASH_EXTRA_KEY = '_aiida_hash'
 
+# The key that is used to store the version of the hash in the node extras, against which a stored hash is validated
+_HASH_VERSION_EXTRA_KEY = '_aiida_hash_version'
+
+# The identifier of the algorithm implemented by `make_hash`. It should be changed whenever the hash of an object would
+# change, such that stored hashes that were computed with an older version of the algorithm are no longer reused.
+_HASH_ALGORITHM = 'blake2b-1'
+
 ###################################################################
 # THE FOLLOWING WAS TAKEN FROM DJANGO BUT IT CAN BE EASILY REPLACED
 ###################################################################
@@ -80,6 +89,43 @@ BLAKE2B_OPTIONS = {
 }
 
 
+def chunked_file_hash(handle, hash_type=hashlib.sha256, chunksize=524288, **kwargs):
+    """Return the hash for the given file handle.
+
+    The file is read in chunks of ``chunksize`` bytes, such that the memory usage is independent of the file size.
+
+    :param handle: a file handle, opened in binary mode
+    :param hash_type: the hashing function constructor from :py:mod:`hashlib` to use
+    :param chunksize: the number of bytes to read from the handle at a time
+    :param kwargs: keyword arguments that are passed to the ``hash_type`` constructor
+    :return: the hexdigest of the content of the handle
+    """
+    return _update_from_handle(hash_type(**kwargs), handle, chunksize).hexdigest()
+
+
+def _update_from_handle(hasher, handle, chunksize, size=None):
+    """Update the hasher with the content of the given file handle, read in chunks.
+
+    The content is read into a buffer of fixed size, such that the memory usage is independent of the file size.
+
+    :param hasher: the hash object to update
+    :param handle: a file handle, opened in binary mode
+    :param chunksize: the maximum number of bytes to read from the handle at a time
+    :param size: optional expected size of the content, used to avoid allocating a buffer larger than needed
+    :return: the updated hash object
+    """
+    buffer = bytearray(chunksize if size is None else max(min(size, chunksize), 1))
+    view = memoryview(buffer)
+
+    while True:
+        size = handle.readinto(buffer)
+        if not size:
+            break
+        hasher.update(view[:size])
+
+    return hasher
+
+
 def make_hash(object_to_hash, **kwargs):
     """
     Makes a hash from a dictionary, list, tuple or set to any level, that contains
@@ -132,6 +178,25 @@ def _single_digest(obj_type, obj_bytes=b''):
 
 _END_DIGEST = _single_digest(')')
 
+# Size of the buffer with which the content of files is read when hashing a ``Folder``
+_FOLDER_HASH_CHUNKSIZE = 1048576
+# Maximum number of threads with which the files of a ``Folder`` are hashed. Since ``hashlib`` releases the GIL while
+# hashing large chunks, the files are effectively hashed in parallel.
+_FOLDER_HASH_MAX_WORKERS = 4
+# Minimum total size of the files of a ``Folder`` for which they are hashed in parallel
+_FOLDER_HASH_PARALLEL_THRESHOLD = 16777216
+
+
+def _single_digest_from_handle(obj_type, handle, size=None):
+    """Return the same digest as ``_single_digest`` for the content of the given file handle, read in chunks.
+
+    :param obj_type: the type of the object
+    :param handle: a file handle, opened in binary mode
+    :param size: optional expected size of the content, used to avoid allocating a buffer larger than needed
+    """
+    hasher = hashlib.blake2b(person=obj_type.encode('ascii'), node_depth=0, **BLAKE2B_OPTIONS)
+    return _update_from_handle(hasher, handle, _FOLDER_HASH_CHUNKSIZE, size).digest()
+
 
 @_make_hash.register(bytes)
 def _(bytes_obj, **kwargs):
@@ -261,6 +326,10 @@ def _(folder, **kwargs):
 
     ignored_folder_content = kwargs.get('ignored_folder_content', [])
 
+    # The files whose content digest is still to be computed, which are represented in the list of digests by their
+    # index in this list, such that they can be hashed in parallel
+    files = []
+
     def folder_digests(subfolder):
         """traverses the given folder and yields digests for the contained objects"""
         for name, isfile in sorted(subfolder.get_content_list(only_paths=False), key=itemgetter(0)):
@@ -269,15 +338,31 @@ def _(folder, **kwargs):
 
             if isfile:
                 yield _single_digest('fname', name.encode('utf-8'))
-                with subfolder.open(name, mode='rb') as fhandle:
-                    yield _single_digest('fcontent', fhandle.read())
+                yield len(files)
+                files.append((subfolder, name))
             else:
                 yield _single_digest('dir(', name.encode('utf-8'))
                 for digest in folder_digests(subfolder.get_subfolder(name)):
                     yield digest
                 yield _END_DIGEST
 
-    return [_single_digest('folder')] + list(folder_digests(folder))
+    def file_digest(file):
+        subfolder, name, size = file
+        with subfolder.open(name, mode='rb') as fhandle:
+            return _single_digest_from_handle('fcontent', fhandle, size)
+
+    digests = list(folder_digests(folder))
+    files = [(subfolder, name, os.path.getsize(subfolder.get_abs_path(name))) for subfolder, name in files]
+
+    if len(files) > 1 and sum(size for _, _, size in files) >= _FOLDER_HASH_PARALLEL_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=min(_FOLDER_HASH_MAX_WORKERS, len(files))) as executor:
+            file_digests = list(executor.map(file_digest, files))
+    else:
+        file_digests = [file_digest(file) for file in files]
+
+    digests = [file_digests[digest] if isinstance(digest, int) else digest for digest in digests]
+
+    return [_single_digest('folder')] + digests
 
 
 def float_to_text(value, sig):
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Autoscaler that adds and removes daemon workers depending on their load.
+
+Every daemon worker periodically reports its load, i.e. the number of processes that it is running and the lag of its
+event loop, to a file in the daemon directory, see :func:`report_worker_load`. The autoscaler runs in its own process
+next to the workers and, at a fixed interval, combines these reports with the number of process tasks that are waiting
+in the RabbitMQ queue to decide whether a worker should be added or removed, see :class:`DaemonAutoscaler`.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from aiida.common import json
+from aiida.manage.configuration.profile import Profile
+
+from .client import DaemonClient
+from .metrics import get_metrics
+
+__all__ = ('AutoscalerDecision', 'DaemonAutoscaler', 'WorkerLoad', 'get_autoscaler_decision', 'get_worker_loads')
+
+LOGGER = logging.getLogger(__name__)
+
+WORKER_LOAD_REPORT_INTERVAL = 10.  # Interval in seconds between two reports of the load of a daemon worker
+WORKER_LOAD_EXPIRY = 3 * WORKER_LOAD_REPORT_INTERVAL  # Age after which a report is considered to be of a dead worker
+LOOP_LAG_SAMPLE_INTERVAL = 1.  # Interval in seconds between two measurements of the lag of the event loop
+
+
+class WorkerLoad(NamedTuple):
+    """The load of a daemon worker, as reported by the worker itself."""
+
+    pid: int
+    active_processes: int
+    process_slots: int
+    loop_lag: float  # the maximum lag in seconds of the event loop since the previous report
+    timestamp: float
+
+
+class AutoscalerDecision(NamedTuple):
+    """A decision of the daemon autoscaler, with the load that it was based on."""
+
+    timestamp: float
+    num_workers: int
+    target_workers: int
+    min_workers: int
+    max_workers: int
+    utilisation: Optional[float]
+    loop_lag: Optional[float]
+    queue_depth: Optional[int]
+    reason: str
+
+
+def _write_json(filepath: str, data: dict) -> None:
+    """Write the data to the file as JSON, replacing it atomically such that readers never see a partial file."""
+    temporary = f'{filepath}.{os.getpid()}.tmp'
+
+    with open(temporary, 'wb') as handle:
+        json.dump(data, handle)
+
+    os.replace(temporary, filepath)
+
+
+async def report_worker_load(directory: str, get_active_processes: Callable[[], int], process_slots: int) -> None:
+    """Periodically report the load of the current daemon worker to a file in the given directory.
+
+    The lag of the event loop is measured as the delay with which a sleep of the loop returns. The report contains the
+    maximum lag since the previous report. The file is removed when the coroutine is cancelled.
+
+    :param directory: the directory to write the report to, in a file that is named after the pid of the worker
+    :param get_active_processes: callable that returns the number of processes that the worker is running
+    :param process_slots: the maximum number of processes that the worker runs concurrently
+    """
+    loop = asyncio.get_event_loop()
+    filepath = os.path.join(directory, f'{os.getpid()}.json')
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        while True:
+            max_lag = 0.
+            report_time = loop.time() + WORKER_LOAD_REPORT_INTERVAL
+
+            while loop.time() < report_time:
+                expected = loop.time() + LOOP_LAG_SAMPLE_INTERVAL
+                await asyncio.sleep(LOOP_LAG_SAMPLE_INTERVAL)
+                lag = max(loop.time() - expected, 0.)
+                max_lag = max(max_lag, lag)
+                get_metrics().observe('aiida_event_loop_lag_seconds', lag)
+
+            load = WorkerLoad(os.getpid(), get_active_processes(), process_slots, max_lag, time.time())
+
+            try:
+                _write_json(filepath, load._asdict())
+            except OSError as exception:
+                LOGGER.warning('failed to report the load of the daemon worker: %s', exception)
+    finally:
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+
+
+def get_worker_loads(directory: str) -> List[WorkerLoad]:
+    """Return the last load reported by each daemon worker.
+
+    Reports that are older than ``WORKER_LOAD_EXPIRY`` are of workers that are no longer running and are removed.
+
+    :param directory: the directory to which the workers report their load
+    :return: list of the loads of the workers
+    """
+    now = time.time()
+    loads = []
+
+    try:
+        filenames = os.listdir(directory)
+    except FileNotFoundError:
+        return loads
+
+    for filename in filenames:
+        if not filename.endswith('.json'):
+            continue
+
+        filepath = os.path.join(directory, filename)
+
+        try:
+            with open(filepath, 'r', encoding='utf8') as handle:
+                load = WorkerLoad(**json.load(handle))
+        except (OSError, ValueError, TypeError):
+            continue
+
+        if now - load.timestamp > WORKER_LOAD_EXPIRY:
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+            continue
+
+        loads.append(load)
+
+    return loads
+
+
+def get_autoscaler_decision(profile: Profile) -> Optional[AutoscalerDecision]:
+    """Return the last decision of the autoscaler of the daemon of the given profile.
+
+    :param profile: the profile
+    :return: the last decision, or None if the autoscaler did not make any
+    """
+    try:
+        with open(profile.filepaths['daemon']['autoscaler'], 'r', encoding='utf8') as handle:
+            return AutoscalerDecision(**json.load(handle))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+async def get_queue_depth(profile: Profile) -> int:
+    """Return the number of process tasks in the RabbitMQ queue of the profile that no worker has taken yet.
+
+    :param profile: the profile
+    :return: the number of tasks that are ready to be delivered
+    """
+    import aio_pika
+    from aiida.manage.external.rmq import get_launch_queue_name
+
+    connection = await aio_pika.connect(profile.get_rmq_url())
+
+    try:
+        channel = await connection.channel()
+        queue = await channel.declare_queue(get_launch_queue_name(profile.rmq_prefix), passive=True)
+        return queue.declaration_result.message_count
+    finally:
+        await connection.close()
+
+
+class DaemonAutoscaler:
+    """Add and remove daemon workers, within the configured bounds, depending on their load.
+
+    A worker is added when process tasks are waiting in the queue while the slots of the workers are nearly all occupied,
+    or while the event loop of a worker lags. Since a worker that is removed has to hand back its processes, which are
+    then continued by the other workers from their last checkpoint, a worker is only removed once the remaining workers
+    could have run all active processes with plenty of slots to spare, for ``SCALE_DOWN_DECISIONS`` consecutive
+    decisions, and no tasks are waiting.
+    """
+
+    SCALE_UP_UTILISATION = 0.8  # Fraction of occupied slots above which a worker is added if tasks are waiting
+    SCALE_DOWN_UTILISATION = 0.5  # Fraction of the slots of the remaining workers below which a worker is removed
+    MAX_LOOP_LAG = 1.  # Lag of the event loop in seconds above which a worker is considered overloaded
+    SCALE_DOWN_DECISIONS = 5  # Number of consecutive decisions with low load before a worker is removed
+
+    def __init__(self, client: DaemonClient, min_workers: int, max_workers: int, process_slots: int):
+        """Construct the autoscaler for the daemon of the given client.
+
+        :param client: the client of the daemon
+        :param min_workers: the minimum number of workers
+        :param max_workers: the maximum number of workers
+        :param process_slots: the maximum number of processes that each worker runs concurrently
+        """
+        if min_workers < 1 or max_workers < min_workers:
+            raise ValueError(f'invalid bounds for the number of workers: [{min_workers}, {max_workers}]')
+
+        self._client = client
+        self._min_workers = min_workers
+        self._max_workers = max_workers
+        self._process_slots = process_slots
+        self._low_load_decisions = 0
+
+    def decide(self, num_workers: int, loads: List[WorkerLoad], queue_depth: Optional[int]) -> AutoscalerDecision:
+        """Decide on the number of workers for the given load.
+
+        :param num_workers: the current number of workers
+        :param loads: the loads reported by the workers
+        :param queue_depth: the number of process tasks that are waiting in the queue, or None if unknown, in which case
+            the number of workers is only changed to respect the bounds
+        :return: the decision
+        """
+        # pylint: disable=too-many-branches
+        active_processes = sum(load.active_processes for load in loads)
+        total_slots = sum(load.process_slots for load in loads)
+        utilisation = active_processes / total_slots if total_slots else None
+        loop_lag = max((load.loop_lag for load in loads), default=None)
+        overloaded = loop_lag is not None and loop_lag >= self.MAX_LOOP_LAG
+        target = num_workers
+        low_load = False
+
+        if num_workers < self._min_workers:
+            target = self._min_workers
+            reason = 'fewer workers than the minimum'
+        elif num_workers > self._max_workers:
+            target = self._max_workers
+            reason = 'more workers than the maximum'
+        elif not loads:
+            reason = 'no load reported by the workers yet'
+        elif queue_depth is None:
+            reason = 'the number of waiting tasks is unknown'
+        elif queue_depth > 0 and (utilisation >= self.SCALE_UP_UTILISATION or overloaded):
+            if num_workers < self._max_workers:
+                target = num_workers + 1
+                reason = 'tasks are waiting while the workers are busy'
+            else:
+                reason = 'tasks are waiting while the workers are busy, but the maximum is reached'
+        elif (
+            queue_depth == 0 and num_workers > self._min_workers and not overloaded and
+            active_processes <= self.SCALE_DOWN_UTILISATION * self._process_slots * (num_workers - 1)
+        ):
+            low_load = True
+            self._low_load_decisions += 1
+
+            if self._low_load_decisions >= self.SCALE_DOWN_DECISIONS:
+                target = num_workers - 1
+                reason = 'the remaining workers can handle the load'
+            else:
+                reason = f'low load for {self._low_load_decisions} of {self.SCALE_DOWN_DECISIONS} decisions'
+        else:
+            reason = 'load within bounds'
+
+        if not low_load or target != num_workers:
+            self._low_load_decisions = 0
+
+        return AutoscalerDecision(
+            timestamp=time.time(),
+            num_workers=num_workers,
+            target_workers=target,
+            min_workers=self._min_workers,
+            max_workers=self._max_workers,
+            utilisation=utilisation,
+            loop_lag=loop_lag,
+            queue_depth=queue_depth,
+            reason=reason,
+        )
+
+    def step(self) -> Optional[AutoscalerDecision]:
+        """Collect the load of the daemon, decide on the number of workers and apply the decision.
+
+        The decision is written to the autoscaler file of the profile, from which it is shown by `verdi daemon status`.
+
+        :return: the decision, or None if the number of workers could not be retrieved from the daemon
+        """
+        profile = self._client.profile
+        response = self._client.get_numprocesses()
+
+        if 'numprocesses' not in response:
+            LOGGER.warning('autoscaler could not retrieve the number of daemon workers: %s', response)
+            return None
+
+        try:
+            queue_depth = asyncio.get_event_loop().run_until_complete(get_queue_depth(profile))
+        except Exception as exception:  # pylint: disable=broad-except
+            LOGGER.warning('autoscaler could not retrieve the number of waiting tasks: %s', exception)
+            queue_depth = None
+
+        loads = get_worker_loads(profile.filepaths['daemon']['worker_load'])
+        decision = self.decide(int(response['numprocesses']), loads, queue_depth)
+
+        if decision.target_workers > decision.num_workers:
+            LOGGER.info('autoscaler adds a daemon worker: %s', decision.reason)
+            self._client.increase_workers(decision.target_workers - decision.num_workers)
+        elif decision.target_workers < decision.num_workers:
+            LOGGER.info('autoscaler removes a daemon worker: %s', decision.reason)
+            self._client.decrease_workers(decision.num_workers - decision.target_workers)
+
+        _write_json(profile.filepaths['daemon']['autoscaler'], decision._asdict())
+
+        return decision
+
+    def run(self, interval: float) -> None:
+        """Take a decision at the given interval until the process is terminated.
+
+        :param interval: the interval in seconds between two decisions
+        """
+        while True:
+            try:
+                self.step()
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception('daemon autoscaler failed to take a decision')
+
+            time.sleep(interval)
+
+
+def start_autoscaler() -> None:
+    """Start the autoscaler of the daemon of the currently loaded profile, with the bounds of the configuration."""
+    from aiida.common.log import configure_logging
+    from aiida.manage.configuration import get_config
+    from .client import get_daemon_client
+
+    client = get_daemon_client()
+    configure_logging(daemon=True, daemon_log_file=client.daemon_log_file)
+
+    config = get_config()
+    profile_name = client.profile.name
+
+    autoscaler = DaemonAutoscaler(
+        client,
+        min_workers=config.get_option('daemon.autoscale_min_workers', profile_name),
+        max_workers=config.get_option('daemon.autoscale_max_workers', profile_name),
+        process_slots=config.get_option('daemon.worker_process_slots', profile_name),
+    )
+
+    LOGGER.info('Starting the daemon autoscaler')
+    autoscaler.run(config.get_option('daemon.autoscale_interval', profile_name))
@@ -71,6 +71,7 @@ class DaemonClient:  # pylint: disable=too-many-public-methods
     DAEMON_ERROR_TIMEOUT = 'daemon-error-timeout'
 
     _DAEMON_NAME = 'aiida-{name}'
+    _AUTOSCALER_NAME = 'aiida-{name}-autoscaler'
     _ENDPOINT_PROTOCOL = ControllerProtocol.IPC
 
     def __init__(self, profile: Profile):
@@ -108,6 +109,20 @@ class DaemonClient:  # pylint: disable=too-many-public-methods
             )
         return f'{VERDI_BIN} -p {self.profile.name} devel run_daemon'
 
+    @property
+    def autoscaler_name(self) -> str:
+        """
+        Get the name of the watcher of the daemon autoscaler which is tied to the profile name
+        """
+        return self._AUTOSCALER_NAME.format(name=self.profile.name)
+
+    @property
+    def autoscaler_cmd_string(self) -> str:
+        """
+        Return the command string to start the autoscaler of the AiiDA daemon
+        """
+        return f'{self.cmd_string}_autoscaler'
+
     @property
     def loglevel(self) -> str:
         return get_config_option('logging.circus_loglevel')
@@ -17,14 +17,18 @@ from collections.abc import Mapping
 from logging import LoggerAdapter
 import os
 import shutil
-from tempfile import NamedTemporaryFile
-from typing import Any, List, Optional, Mapping as MappingType, Tuple, Union
+import tarfile
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+from typing import Any, Callable, Dict, List, Optional, Mapping as MappingType, Set, Tuple, Union
+from uuid import uuid4
 
 from aiida.common import AIIDA_LOGGER, exceptions
 from aiida.common.datastructures import CalcInfo
+from aiida.common.escaping import escape_for_bash
 from aiida.common.folders import SandboxFolder
+from aiida.common.hashing import chunked_file_hash
 from aiida.common.links import LinkType
-from aiida.orm import load_node, CalcJobNode, Code, FolderData, Node, RemoteData
+from aiida.orm import load_node, load_nodes, CalcJobNode, Code, FolderData, Node, RemoteData
 from aiida.orm.utils.log import get_dblogger_extra
 from aiida.plugins import DataFactory
 from aiida.schedulers.datastructures import JobState
@@ -32,8 +36,14 @@ from aiida.transports import Transport
 
 REMOTE_WORK_DIRECTORY_LOST_FOUND = 'lost+found'
 
+# Maximum size in bytes up to which a member of a retrieved archive that is written to multiple destinations is kept in
+# memory, before being rolled over to a temporary file on disk
+ARCHIVE_MEMBER_MAX_MEMORY_SIZE = 8 * 1024 * 1024
+
 execlogger = AIIDA_LOGGER.getChild('execmanager')
 
+RetrieveListItem = Union[str, Tuple[str, str, int], list]  # pylint: disable=invalid-name
+
 
 def _find_data_node(inputs: MappingType[str, Any], uuid: str) -> Optional[Node]:
     """Find and return the node with the given UUID from a nested mapping of input nodes.
@@ -55,6 +65,163 @@ def _find_data_node(inputs: MappingType[str, Any], uuid: str) -> Optional[Node]:
     return data_node
 
 
+def _get_upload_cache_digests(objects: List[Tuple[Node, str, str, bool]]) -> List[str]:
+    """Compute the content hash of each repository object that is to be uploaded through the upload cache.
+
+    :param objects: list of tuples ``(node, filename, target, executable)`` of repository objects to upload
+    :return: list with the content hash of each object, in the same order
+    """
+    digests = []
+
+    for data_node, filename, _, _ in objects:
+        with data_node.open(filename, 'rb') as handle:
+            digests.append(chunked_file_hash(handle))
+
+    return digests
+
+
+def _upload_to_cache(
+    transport: Transport, cache_directory: str, digests: Dict[str, Tuple[Node, str]], logger: LoggerAdapter
+) -> None:
+    """Upload the objects that are not yet present in the remote upload cache.
+
+    The objects that already exist in the cache are determined with a single remote command. Each missing object is
+    first written to a temporary file in the cache directory and then renamed to its content hash, such that concurrent
+    uploads of the same object never leave a partially written object in the cache.
+
+    :param transport: an already opened transport
+    :param cache_directory: absolute path of the cache directory on the remote
+    :param digests: mapping of content hash onto a ``(node, filename)`` tuple of an object with that content
+    :param logger: the logger to use
+    """
+    transport.makedirs(cache_directory, ignore_existing=True)
+
+    command = 'cd {} && for digest in {}; do [ -f "$digest" ] && echo "$digest"; done; true'.format(
+        escape_for_bash(cache_directory), ' '.join(digests)
+    )
+    retval, stdout, stderr = transport.exec_command_wait(command)
+
+    if retval != 0:
+        raise IOError(f'failed to list the contents of the upload cache `{cache_directory}`: {stderr}')
+
+    existing = set(stdout.split())
+
+    for digest, (data_node, filename) in digests.items():
+        if digest in existing:
+            logger.debug(f'object `{digest}` already present in upload cache, skipping upload')
+            continue
+
+        path_object = os.path.join(cache_directory, digest)
+        path_temporary = f'{path_object}.{uuid4().hex}.tmp'
+
+        with NamedTemporaryFile(mode='wb+') as handle:
+            with data_node.open(filename, 'rb') as source:
+                shutil.copyfileobj(source, handle)
+            handle.flush()
+            transport.putfile(handle.name, path_temporary)
+
+        # Objects in the cache should never be modified, so they are made read-only before being moved in place
+        path_temporary = escape_for_bash(path_temporary)
+        retval, _, stderr = transport.exec_command_wait(
+            f'chmod 444 {path_temporary} && mv -f {path_temporary} {escape_for_bash(path_object)}'
+        )
+
+        if retval != 0:
+            raise IOError(f'failed to add object `{digest}` to the upload cache `{cache_directory}`: {stderr}')
+
+
+def _link_from_cache(
+    transport: Transport,
+    cache_directory: str,
+    cache_mode: str,
+    digests: List[str],
+    objects: List[Tuple[Node, str, str, bool]],
+    modified: Optional[Set[str]] = None,
+) -> None:
+    """Place objects of the remote upload cache in the current working directory of the transport.
+
+    All objects are placed with a single remote command. Executable objects are always copied, because changing their
+    permissions would otherwise change those of the object in the cache. The same goes for objects whose target is
+    written to afterwards, since writing through a link would modify the object in the cache.
+
+    :param transport: an already opened transport whose current working directory is the target directory
+    :param cache_directory: absolute path of the cache directory on the remote
+    :param cache_mode: one of the ``Computer.UPLOAD_CACHE_MODES``
+    :param digests: list with the content hash of each object
+    :param objects: list of tuples ``(node, filename, target, executable)`` of repository objects to place
+    :param modified: optional set of normalized relative paths of targets that will be written to afterwards
+    """
+    commands = []
+    modified = modified or set()
+
+    for digest, (_, _, target, executable) in zip(digests, objects):
+        source = escape_for_bash(os.path.join(cache_directory, digest))
+        target_escaped = escape_for_bash(target)
+        dirname = os.path.dirname(target)
+        link = not executable and os.path.normpath(target) not in modified
+
+        if dirname:
+            commands.append(f'mkdir -p {escape_for_bash(dirname)}')
+
+        if cache_mode == 'symlink' and link:
+            commands.append(f'ln -sf {source} {target_escaped}')
+        elif cache_mode == 'hardlink' and link:
+            # Hard links cannot cross file systems, in which case fall back to a copy
+            commands.append(f'{{ ln -f {source} {target_escaped} || cp -f {source} {target_escaped}; }}')
+        else:
+            commands.append(f'cp -f {source} {target_escaped} && chmod u+w {target_escaped}')
+
+    if not commands:
+        return
+
+    retval, _, stderr = transport.exec_command_wait(' && '.join(commands))
+
+    if retval != 0:
+        raise IOError(f'failed to place objects from the upload cache `{cache_directory}`: {stderr}')
+
+
+def _upload_folder_with_archive(transport: Transport, folder: SandboxFolder) -> None:
+    """Upload the content of a folder to the current working directory of the transport through a single tar stream.
+
+    The folder is packed on the fly into a compressed tar archive that is streamed to a ``tar`` command on the remote,
+    which unpacks it. Afterwards, the checksums of all the files on the remote are compared to those of the local files
+    with a single additional command.
+
+    :param transport: an already opened transport whose current working directory is the target directory
+    :param folder: the folder whose content to upload
+    :raises IOError: if the upload fails or the checksum of any of the uploaded files does not match
+    """
+    checksums = {}
+
+    for root, _, filenames in os.walk(folder.abspath, followlinks=True):
+        for filename in filenames:
+            filepath = os.path.join(root, filename)
+            with open(filepath, 'rb') as handle:
+                checksums[os.path.relpath(filepath, folder.abspath)] = chunked_file_hash(handle)
+
+    with transport.exec_command_stream('tar -xzf -') as (stdin, _):
+        with tarfile.open(fileobj=stdin, mode='w|gz', dereference=True) as archive:
+            for filename in folder.get_content_list():
+                archive.add(folder.get_abs_path(filename), arcname=filename)
+
+    if not checksums:
+        return
+
+    command = 'sha256sum -- {}'.format(' '.join(escape_for_bash(relpath) for relpath in checksums))
+    retval, stdout, stderr = transport.exec_command_wait(command)
+
+    if retval != 0:
+        raise IOError(f'failed to compute the checksums of the uploaded files: {stderr}')
+
+    # The output contains a line per file, in the order of the arguments, that starts with the checksum. Lines of files
+    # with special characters in their name are prefixed with a backslash.
+    remote_checksums = [line.lstrip('\\').split(' ', 1)[0] for line in stdout.splitlines()]
+    mismatches = [relpath for relpath, remote in zip(checksums, remote_checksums) if checksums[relpath] != remote]
+
+    if len(remote_checksums) != len(checksums) or mismatches:
+        raise IOError(f'the checksums of the uploaded files do not match the local files: {mismatches}')
+
+
 def upload_calculation(
     node: CalcJobNode,
     transport: Transport,
@@ -83,7 +250,7 @@ def upload_calculation(
     computer = node.computer
 
     codes_info = calc_info.codes_info
-    input_codes = [load_node(_.code_uuid, sub_classes=(Code,)) for _ in codes_info]
+    input_codes = load_nodes([_.code_uuid for _ in codes_info], sub_classes=(Code,))
 
     logger_extra = get_dblogger_extra(node)
     transport.set_logger_extra(logger_extra)
@@ -95,12 +262,20 @@ def upload_calculation(
             'submission, set `metadata.dry_run` to True in the inputs.'.format(node.pk)
         )
 
+    # The upload cache is opt-in per computer and not used in a dry-run, which does not have a remote to upload to
+    cache_directory = None
+    cache_mode = computer.get_upload_cache_mode()
+
     # If we are performing a dry-run, the working directory should actually be a local folder that should already exist
     if dry_run:
         workdir = transport.getcwd()
     else:
         remote_user = transport.whoami()
         remote_working_directory = computer.get_workdir().format(username=remote_user)
+
+        if computer.get_upload_cache_directory() is not None:
+            cache_directory = computer.get_upload_cache_directory().format(username=remote_user)
+
         if not remote_working_directory.strip():
             raise exceptions.ConfigurationError(
                 "[submission of calculation {}] No remote_working_directory configured for computer '{}'".format(
@@ -165,12 +340,20 @@ def upload_calculation(
         workdir = transport.getcwd()
         node.set_remote_workdir(workdir)
 
+    # Objects that are uploaded through the upload cache as tuples of ``(node, filename, target, executable)``
+    cached_code_objects = []
+    cached_local_objects = []
+
     # I first create the code files, so that the code can put
     # default files to be overwritten by the plugin itself.
     # Still, beware! The code file itself could be overwritten...
     # But I checked for this earlier.
     for code in input_codes:
-        if code.is_local():
+        if code.is_local() and cache_directory is not None:
+            for filename in code.list_object_names():
+                executable = filename == code.get_local_executable()
+                cached_code_objects.append((code, filename, filename, executable))
+        elif code.is_local():
             # Note: this will possibly overwrite files
             for filename in code.list_object_names():
                 # Note, once #2579 is implemented, use the `node.open` method instead of the named temporary file in
@@ -189,16 +372,35 @@ def upload_calculation(
     remote_symlink_list = calc_info.remote_symlink_list or []
     provenance_exclude_list = calc_info.provenance_exclude_list or []
 
+    # The nodes that are not stored, as can be the case for a dry-run, are taken from the inputs and the other nodes are
+    # loaded with a single query, unless some of them do not exist, in which case they are loaded one by one
+    local_copy_nodes = {}
+
+    for uuid, _, _ in local_copy_list:
+        input_node = _find_data_node(inputs, uuid) if inputs else None
+        if input_node is not None and not input_node.is_stored:
+            local_copy_nodes[uuid] = input_node
+
+    stored_uuids = list({uuid: None for uuid, _, _ in local_copy_list if uuid not in local_copy_nodes})
+
+    try:
+        local_copy_nodes.update(zip(stored_uuids, load_nodes(uuids=stored_uuids) if stored_uuids else []))
+    except exceptions.NotExistent:
+        for uuid in stored_uuids:
+            try:
+                local_copy_nodes[uuid] = load_node(uuid=uuid)
+            except exceptions.NotExistent:
+                pass
+
     for uuid, filename, target in local_copy_list:
         logger.debug(f'[submission of calculation {node.uuid}] copying local file/folder to {target}')
 
-        try:
-            data_node = load_node(uuid=uuid)
-        except exceptions.NotExistent:
-            data_node = _find_data_node(inputs, uuid) if inputs else None
+        data_node = local_copy_nodes.get(uuid, None)
 
         if data_node is None:
             logger.warning(f'failed to load Node<{uuid}> specified in the `local_copy_list`')
+        elif cache_directory is not None:
+            cached_local_objects.append((data_node, filename, target, False))
         else:
             dirname = os.path.dirname(target)
             if dirname:
@@ -208,11 +410,58 @@ def upload_calculation(
                     shutil.copyfileobj(source, handle)
             provenance_exclude_list.append(target)
 
+    if cached_code_objects or cached_local_objects:
+        logger.debug(f'[submission of calculation {node.pk}] uploading through upload cache `{cache_directory}`')
+        code_digests = _get_upload_cache_digests(cached_code_objects)
+        local_digests = _get_upload_cache_digests(cached_local_objects)
+
+        sources = {}
+        for digest, entry in zip(code_digests + local_digests, cached_code_objects + cached_local_objects):
+            sources.setdefault(digest, entry[:2])
+
+        _upload_to_cache(transport, cache_directory, sources, logger)
+
+        # Targets that are written to after the objects have been placed, by the copy of the sandbox folder or of the
+        # `remote_copy_list`, have to be copied instead of linked, as writing through the link would modify the cache.
+        remote_copy_targets = {os.path.normpath(target) for _, _, target in remote_copy_list}
+        sandbox_targets = {
+            os.path.normpath(target)
+            for _, _, target, _ in cached_code_objects
+            if os.path.lexists(folder.get_abs_path(target))
+        }
+
+        # Code files go first and the objects of the `local_copy_list` last, once the sandbox folder has been copied, to
+        # keep the same precedence as when all files are copied through the sandbox folder without the upload cache.
+        _link_from_cache(
+            transport, cache_directory, cache_mode, code_digests, cached_code_objects,
+            remote_copy_targets | sandbox_targets
+        )
+
+        for code in input_codes:
+            if code.is_local():
+                transport.chmod(code.get_local_executable(), 0o755)  # rwxr-xr-x
+
     # In a dry_run, the working directory is the raw input folder, which will already contain these resources
     if not dry_run:
-        for filename in folder.get_content_list():
-            logger.debug(f'[submission of calculation {node.pk}] copying file/folder {filename}...')
-            transport.put(folder.get_abs_path(filename), filename)
+        use_archive = computer.get_use_archive_upload()
+
+        if use_archive:
+            logger.debug(f'[submission of calculation {node.pk}] copying sandbox folder through archive...')
+            try:
+                _upload_folder_with_archive(transport, folder)
+            except IOError as exception:
+                logger.warning(f'uploading through archive failed, copying files one by one instead: {exception}')
+                use_archive = False
+
+        if not use_archive:
+            for filename in folder.get_content_list():
+                logger.debug(f'[submission of calculation {node.pk}] copying file/folder {filename}...')
+                transport.put(folder.get_abs_path(filename), filename)
+
+        if cached_local_objects:
+            _link_from_cache(
+                transport, cache_directory, cache_mode, local_digests, cached_local_objects, remote_copy_targets
+            )
 
         for (remote_computer_uuid, remote_abs_path, dest_rel_path) in remote_copy_list:
             if remote_computer_uuid == computer.uuid:
@@ -311,25 +560,58 @@ def submit_calculation(calculation: CalcJobNode, transport: Transport) -> str:
     :param transport: an already opened transport to use to submit the calculation.
     :return: the job id as returned by the scheduler `submit_from_script` call
     """
-    job_id = calculation.get_job_id()
+    result = submit_calculations([calculation], transport)[0]
+
+    if isinstance(result, Exception):
+        raise result
+
+    return result
+
 
-    # If the `job_id` attribute is already set, that means this function was already executed once and the scheduler
-    # submit command was successful as the job id it returned was set on the node. This scenario can happen when the
-    # daemon runner gets shutdown right after accomplishing the submission task, but before it gets the chance to
-    # finalize the state transition of the `CalcJob` to the `UPDATE` transport task. Since the job is already submitted
-    # we do not want to submit it a second time, so we simply return the existing job id here.
-    if job_id is not None:
-        return job_id
+def submit_calculations(calculations: List[CalcJobNode], transport: Transport) -> List[Union[str, Exception]]:
+    """Submit multiple previously uploaded `CalcJobs`, that share the same computer and user, to the scheduler.
+
+    The submit commands are executed as a single batch through `Transport.exec_command_batch`.
+
+    :param calculations: the instances of CalcJobNode to submit.
+    :param transport: an already opened transport to use to submit the calculations.
+    :return: list with, for each calculation, the job id as returned by the scheduler, or the exception that was raised
+        while submitting it.
+    """
+    results: List[Union[str, Exception]] = []
+    submissions = []
+
+    for calculation in calculations:
+        job_id = calculation.get_job_id()
+
+        # If the `job_id` attribute is already set, that means this function was already executed once and the
+        # scheduler submit command was successful as the job id it returned was set on the node. This scenario can
+        # happen when the daemon runner gets shutdown right after accomplishing the submission task, but before it gets
+        # the chance to finalize the state transition of the `CalcJob` to the `UPDATE` transport task. Since the job is
+        # already submitted we do not want to submit it a second time, so we simply return the existing job id here.
+        if job_id is not None:
+            results.append(job_id)
+        else:
+            results.append(None)
+            submit_script_filename = calculation.get_option('submit_script_filename')
+            submissions.append((calculation.get_remote_workdir(), submit_script_filename))
 
-    scheduler = calculation.computer.get_scheduler()
+    if not submissions:
+        return results
+
+    scheduler = calculations[0].computer.get_scheduler()
     scheduler.set_transport(transport)
 
-    submit_script_filename = calculation.get_option('submit_script_filename')
-    workdir = calculation.get_remote_workdir()
-    job_id = scheduler.submit_from_script(workdir, submit_script_filename)
-    calculation.set_job_id(job_id)
+    submitted = iter(scheduler.submit_from_script_batch(submissions))
+
+    for index, calculation in enumerate(calculations):
+        if results[index] is None:
+            job_id = next(submitted)
+            if not isinstance(job_id, Exception):
+                calculation.set_job_id(job_id)
+            results[index] = job_id
 
-    return job_id
+    return results
 
 
 def retrieve_calculation(calculation: CalcJobNode, transport: Transport, retrieved_temporary_folder: str) -> None:
@@ -370,10 +652,19 @@ def retrieve_calculation(calculation: CalcJobNode, transport: Transport, retriev
         retrieve_temporary_list = calculation.get_retrieve_temporary_list()
         retrieve_singlefile_list = calculation.get_retrieve_singlefile_list()
 
-        with SandboxFolder() as folder:
-            retrieve_files_from_list(calculation, transport, folder.abspath, retrieve_list)
-            # Here I retrieved everything; now I store them inside the calculation
-            retrieved_files.put_object_from_tree(folder.abspath)
+        use_archive = calculation.computer.get_use_archive_retrieval()
+
+        if use_archive:
+            # Retrieve both lists through a single tar stream, writing the files directly in the repository
+            retrievals = [(workdir, retrieve_list, retrieved_files)]
+            if retrieve_temporary_list:
+                retrievals.append((workdir, retrieve_temporary_list, retrieved_temporary_folder))
+            retrieve_files_from_archive(transport, retrievals)
+        else:
+            with SandboxFolder() as folder:
+                retrieve_files_from_list(calculation, transport, folder.abspath, retrieve_list)
+                # Here I retrieved everything; now I store them inside the calculation
+                retrieved_files.put_object_from_tree(folder.abspath)
 
         # Second, retrieve the singlefiles, if any files were specified in the 'retrieve_temporary_list' key
         if retrieve_singlefile_list:
@@ -383,7 +674,8 @@ def retrieve_calculation(calculation: CalcJobNode, transport: Transport, retriev
         # Retrieve the temporary files in the retrieved_temporary_folder if any files were
         # specified in the 'retrieve_temporary_list' key
         if retrieve_temporary_list:
-            retrieve_files_from_list(calculation, transport, retrieved_temporary_folder, retrieve_temporary_list)
+            if not use_archive:
+                retrieve_files_from_list(calculation, transport, retrieved_temporary_folder, retrieve_temporary_list)
 
             # Log the files that were retrieved in the temporary folder
             for filename in os.listdir(retrieved_temporary_folder):
@@ -411,28 +703,56 @@ def kill_calculation(calculation: CalcJobNode, transport: Transport) -> bool:
     :param calculation: the instance of CalcJobNode to kill.
     :param transport: an already opened transport to use to address the scheduler
     """
-    job_id = calculation.get_job_id()
+    result = kill_calculations([calculation], transport)[0]
+
+    if isinstance(result, Exception):
+        raise result
+
+    return result
+
+
+def kill_calculations(calculations: List[CalcJobNode], transport: Transport) -> List[Union[bool, Exception]]:
+    """Kill multiple calculations, that share the same computer and user, through the scheduler.
+
+    The kill commands are executed as a single batch through `Transport.exec_command_batch`, and the jobs whose kill
+    command reported a failure are checked with a single scheduler query, since they may already have completed. As
+    for a single kill, an exception that is raised while killing a job is not checked but returned as the result.
+
+    :param calculations: the instances of CalcJobNode to kill.
+    :param transport: an already opened transport to use to address the scheduler
+    :return: list with, for each calculation, True if it was killed, or the exception that was raised while killing it.
+    """
+    if not calculations:
+        return []
 
     # Get the scheduler plugin class and initialize it with the correct transport
-    scheduler = calculation.computer.get_scheduler()
+    scheduler = calculations[0].computer.get_scheduler()
     scheduler.set_transport(transport)
 
-    # Call the proper kill method for the job ID of this calculation
-    result = scheduler.kill(job_id)
+    # Call the proper kill method for the job IDs of the calculations
+    job_ids = [calculation.get_job_id() for calculation in calculations]
+    results = scheduler.kill_batch(job_ids)
+    failed = [index for index, result in enumerate(results) if result is not True and not isinstance(result, Exception)]
 
-    if result is not True:
+    if not failed:
+        return results
+
+    # Failed to kill because the job might have already been completed
+    running_jobs = scheduler.get_jobs(jobs=[job_ids[index] for index in failed], as_dict=True)
+
+    for index in failed:
+        job_id = job_ids[index]
 
-        # Failed to kill because the job might have already been completed
-        running_jobs = scheduler.get_jobs(jobs=[job_id], as_dict=True)
         job = running_jobs.get(job_id, None)
 
-        # If the job is returned it is still running and the kill really failed, so we raise
+        # If the job is returned it is still running and the kill really failed
         if job is not None and job.job_state != JobState.DONE:
-            raise exceptions.RemoteOperationError(f'scheduler.kill({job_id}) was unsuccessful')
+            results[index] = exceptions.RemoteOperationError(f'scheduler.kill({job_id}) was unsuccessful')
         else:
             execlogger.warning('scheduler.kill() failed but job<{%s}> no longer seems to be running regardless', job_id)
+            results[index] = True
 
-    return True
+    return results
 
 
 def _retrieve_singlefiles(
@@ -498,32 +818,231 @@ def retrieve_files_from_list(
     :param retrieve_list: the list of files to retrieve.
     """
     for item in retrieve_list:
-        if isinstance(item, (list, tuple)):
-            tmp_rname, tmp_lname, depth = item
-            # if there are more than one file I do something differently
-            if transport.has_magic(tmp_rname):
-                remote_names = transport.glob(tmp_rname)
-                local_names = []
-                for rem in remote_names:
-                    to_append = rem.split(os.path.sep)[-depth:] if depth > 0 else []
-                    local_names.append(os.path.sep.join([tmp_lname] + to_append))
-            else:
-                remote_names = [tmp_rname]
-                to_append = tmp_rname.split(os.path.sep)[-depth:] if depth > 0 else []
-                local_names = [os.path.sep.join([tmp_lname] + to_append)]
-            if depth > 1:  # create directories in the folder, if needed
-                for this_local_file in local_names:
-                    new_folder = os.path.join(folder, os.path.split(this_local_file)[0])
-                    if not os.path.exists(new_folder):
-                        os.makedirs(new_folder)
-        else:  # it is a string
-            if transport.has_magic(item):
-                remote_names = transport.glob(item)
-                local_names = [os.path.split(rem)[1] for rem in remote_names]
-            else:
-                remote_names = [item]
-                local_names = [os.path.split(item)[1]]
+        remote_names, local_names, depth = _expand_retrieve_item(item, transport.has_magic, transport.glob)
+
+        if depth > 1:  # create directories in the folder, if needed
+            for this_local_file in local_names:
+                new_folder = os.path.join(folder, os.path.split(this_local_file)[0])
+                if not os.path.exists(new_folder):
+                    os.makedirs(new_folder)
 
         for rem, loc in zip(remote_names, local_names):
             transport.logger.debug(f"[retrieval of calc {calculation.pk}] Trying to retrieve remote item '{rem}'")
             transport.get(rem, os.path.join(folder, loc), ignore_nonexisting=True)
+
+
+def _expand_retrieve_item(item: RetrieveListItem, has_magic: Callable[[str], bool],
+                          glob: Callable[[str], List[str]]) -> Tuple[List[str], List[str], int]:
+    """Expand an entry of a retrieve list into the remote names to retrieve and the local names to retrieve them to.
+
+    :param item: an entry of a retrieve list, see ``retrieve_files_from_list`` for the possible formats.
+    :param has_magic: callable that returns whether a remote path contains file patterns with wildcards.
+    :param glob: callable that returns the remote paths that match a remote path with wildcards.
+    :return: tuple of the list of remote names, the list of corresponding local names and the depth.
+    """
+    depth = 0
+
+    if isinstance(item, (list, tuple)):
+        tmp_rname, tmp_lname, depth = item
+        # if there are more than one file I do something differently
+        if has_magic(tmp_rname):
+            remote_names = glob(tmp_rname)
+            local_names = []
+            for rem in remote_names:
+                to_append = rem.split(os.path.sep)[-depth:] if depth > 0 else []
+                local_names.append(os.path.sep.join([tmp_lname] + to_append))
+        else:
+            remote_names = [tmp_rname]
+            to_append = tmp_rname.split(os.path.sep)[-depth:] if depth > 0 else []
+            local_names = [os.path.sep.join([tmp_lname] + to_append)]
+    else:  # it is a string
+        if has_magic(item):
+            remote_names = glob(item)
+            local_names = [os.path.split(rem)[1] for rem in remote_names]
+        else:
+            remote_names = [item]
+            local_names = [os.path.split(item)[1]]
+
+    return remote_names, local_names, depth
+
+
+def _escape_glob_for_bash(pattern: str) -> str:
+    """Escape a path containing file patterns with wildcards, such that bash only expands the wildcards.
+
+    :param pattern: the path with wildcards.
+    :return: the escaped path.
+    """
+    escaped = []
+
+    for char in pattern:
+        if char.isalnum() or char in '*?[]!^/._-':
+            escaped.append(char)
+        elif char == '\n':
+            escaped.append("'\n'")
+        else:
+            escaped.append(f'\\{char}')
+
+    return ''.join(escaped)
+
+
+def _expand_remote_paths(transport: Transport, paths: Dict[str, List[str]]) -> Dict[str, List[List[str]]]:
+    """Expand remote paths, that can contain file patterns with wildcards, with a single remote command.
+
+    :param transport: an already opened transport.
+    :param paths: mapping of remote directories onto the list of paths, relative to that directory, to expand.
+    :return: mapping of remote directories onto a list with, for each path, the list of existing paths it expands to.
+    """
+    script = ['shopt -s nullglob']
+
+    for directory, relpaths in paths.items():
+        loops = []
+        for relpath in relpaths:
+            word = _escape_glob_for_bash(relpath) if transport.has_magic(relpath) else escape_for_bash(relpath)
+            loops.append(f'for entry in {word}; do [ -e "$entry" ] && printf \'%s\\0\' "$entry"; done; printf \'\\0\'')
+        # If the directory does not exist, none of its paths exist, but the separators still have to be printed
+        separators = '\\0' * len(relpaths)
+        script.append(
+            f"( if cd {escape_for_bash(directory)}; then {'; '.join(loops)}; else printf '{separators}'; fi )"
+        )
+
+    retval, stdout, stderr = transport.exec_command_wait('; '.join(script))
+
+    if retval != 0:
+        raise IOError(f'failed to expand the paths to retrieve: {stderr}')
+
+    # The output contains the matches of each path separated by null characters, with an empty entry after each path
+    groups = [[]]
+    for entry in stdout.split('\0')[:-1]:
+        if entry:
+            groups[-1].append(entry)
+        else:
+            groups.append([])
+
+    expanded = {}
+    for directory, relpaths in paths.items():
+        expanded[directory] = [groups.pop(0) for _ in relpaths]
+
+    return expanded
+
+
+def retrieve_files_from_archive(
+    transport: Transport, retrievals: List[Tuple[str, List[RetrieveListItem], Union[str, FolderData]]]
+) -> None:
+    """Retrieve the files of one or multiple retrieve lists through a single compressed tar stream.
+
+    The retrieve lists are first expanded with a single remote command, after which all the files are archived by a
+    single ``tar`` command whose output is streamed and unpacked on the fly. Files are either written to a local folder
+    or directly into the repository of an unstored ``FolderData``, without an intermediate copy. Since each retrieve
+    list is resolved relative to its own remote directory, the retrieve lists of multiple calculations that run on the
+    same computer can be retrieved in one go.
+
+    The entries of the retrieve lists have the same format and meaning as for ``retrieve_files_from_list``. Remote
+    paths that do not exist are ignored.
+
+    :param transport: an already opened transport.
+    :param retrievals: list of tuples ``(workdir, retrieve_list, target)``, where ``workdir`` is the absolute remote
+        directory relative to which the entries of ``retrieve_list`` are resolved and ``target`` is either the absolute
+        path of a local folder or an unstored ``FolderData`` in which to write the retrieved files.
+    """
+    # pylint: disable=too-many-locals,too-many-branches
+    paths: Dict[str, List[str]] = {}
+
+    for workdir, retrieve_list, _ in retrievals:
+        for item in retrieve_list:
+            relpath = item[0] if isinstance(item, (list, tuple)) else item
+            paths.setdefault(workdir, []).append(relpath)
+
+    expanded = _expand_remote_paths(transport, paths)
+    indices = {workdir: 0 for workdir in expanded}
+
+    # Mapping of the normalized absolute remote paths onto the list of targets and local names it should be written to
+    mapping: Dict[str, List[Tuple[Union[str, FolderData], str]]] = {}
+
+    for workdir, retrieve_list, target in retrievals:
+        for item in retrieve_list:
+            existing = expanded[workdir][indices[workdir]]
+            indices[workdir] += 1
+            remote_names, local_names, _ = _expand_retrieve_item(item, transport.has_magic, lambda _: existing)
+
+            for rem, loc in zip(remote_names, local_names):
+                if rem in existing:
+                    key = os.path.normpath(os.path.join(workdir, rem)).lstrip(os.sep)
+                    loc = os.path.normpath(loc)
+                    # Retrieving into the target directory itself, places the remote path inside of it
+                    if loc == os.curdir:
+                        loc = os.path.basename(key)
+                    mapping.setdefault(key, []).append((target, loc))
+
+    if not mapping:
+        return
+
+    # The remote paths are passed as absolute paths, such that the member names are unique across the working
+    # directories. Note that `tar` strips the leading slash from the member names.
+    command = 'tar -czhf - -- {}'.format(' '.join(escape_for_bash(os.sep + key) for key in mapping))
+
+    with transport.exec_command_stream(command) as (_, stdout):
+        with tarfile.open(fileobj=stdout, mode='r|gz') as archive:
+            for member in archive:
+                destinations = _get_archive_member_destinations(os.path.normpath(member.name), mapping)
+
+                if member.isdir():
+                    for target, relpath in destinations:
+                        if isinstance(target, str):
+                            os.makedirs(os.path.join(target, relpath), exist_ok=True)
+                    continue
+
+                if not member.isfile() or not destinations:
+                    continue
+
+                # A member with a single destination is streamed straight to it. Otherwise, it is first written to a
+                # temporary file, which is only kept in memory for small members, since the stream cannot be rewound.
+                if len(destinations) == 1:
+                    _write_archive_member(archive.extractfile(member), *destinations[0])
+                    continue
+
+                with SpooledTemporaryFile(max_size=ARCHIVE_MEMBER_MAX_MEMORY_SIZE) as handle:
+                    shutil.copyfileobj(archive.extractfile(member), handle)
+
+                    for target, relpath in destinations:
+                        handle.seek(0)
+                        _write_archive_member(handle, target, relpath)
+
+
+def _write_archive_member(handle, target: Union[str, FolderData], relpath: str) -> None:
+    """Write the content of a retrieved archive member to its destination.
+
+    :param handle: a file handle with the content of the member, opened in binary mode.
+    :param target: either the absolute path of a local directory or a ``FolderData`` to write the member to.
+    :param relpath: the relative path of the member in the target.
+    """
+    if isinstance(target, str):
+        filepath = os.path.join(target, relpath)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'wb') as target_handle:
+            shutil.copyfileobj(handle, target_handle)
+    else:
+        target.put_object_from_filelike(handle, relpath, mode='wb')
+
+
+def _get_archive_member_destinations(
+    name: str, mapping: Dict[str, List[Tuple[Union[str, FolderData], str]]]
+) -> List[Tuple[Union[str, FolderData], str]]:
+    """Return the targets and local names to which a member of a retrieved archive should be written.
+
+    A member is written for each remote path of the mapping that is either the member itself or one of its parent
+    directories, in which case the relative path of the member in that directory is appended to the local name.
+
+    :param name: the normalized name of the archive member.
+    :param mapping: mapping of the normalized remote paths onto the list of targets and local names.
+    :return: list of tuples of the target and the local name.
+    """
+    destinations = []
+    parent = name
+
+    while parent:
+        for target, local_name in mapping.get(parent, []):
+            relpath = os.path.relpath(name, parent)
+            destinations.append((target, local_name if relpath == os.curdir else os.path.join(local_name, relpath)))
+        parent = os.path.dirname(parent)
+
+    return destinations
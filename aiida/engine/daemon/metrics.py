@@ -0,0 +1,435 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Instrumentation of the daemon workers, to find out what is keeping their event loop busy.
+
+The durations of the operations that are run by a daemon worker, such as the transport tasks of calculation jobs,
+the saving of checkpoints, the parsing of outputs and the database queries, are recorded in rolling histograms of the
+global :class:`MetricsRegistry`, see :func:`get_metrics`. Each worker periodically writes a summary of its histograms to
+a file in the daemon directory, which is shown by ``verdi daemon worker-stats``, and can serve the complete histograms
+over HTTP in the Prometheus text format, see :func:`start_metrics_server`.
+"""
+import asyncio
+import bisect
+import collections
+import contextlib
+import functools
+import http.server
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from aiida.common import json
+
+__all__ = ('MetricsRegistry', 'RollingHistogram', 'get_metrics', 'get_worker_metrics', 'timed')
+
+LOGGER = logging.getLogger(__name__)
+
+METRICS_REPORT_INTERVAL = 10.  # Interval in seconds between two reports of the metrics of a daemon worker
+METRICS_PORT_RANGE = 100  # Number of ports, starting from the configured one, that a worker tries to serve metrics on
+
+#: Descriptions of the metrics that are recorded, all of which are durations in seconds
+METRICS = {
+    'aiida_event_loop_lag_seconds': 'Delay with which the event loop of the worker runs a scheduled callback.',
+    'aiida_calcjob_task_seconds': 'Duration of the transport tasks of calculation jobs, including the waiting time.',
+    'aiida_checkpoint_save_seconds': 'Duration of serializing and storing the checkpoint of a process.',
+    'aiida_parser_seconds': 'Duration of parsing the retrieved outputs of a calculation job.',
+    'aiida_db_query_seconds': 'Duration of the execution of a database query.',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class RollingHistogram:
+    """Histogram of observed values, with both the totals since its creation and the values in a rolling window.
+
+    The totals are reported in the Prometheus format, which expects counters that only ever increase. The rolling window
+    is split in a number of slots, such that the values of the oldest slot can be discarded at once, and is used for the
+    summary statistics that reflect the current behaviour of the worker.
+    """
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30., 60., 300., math.inf)
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS, window: float = 300., slots: int = 10):
+        """Construct an empty histogram.
+
+        :param buckets: the sorted upper bounds of the buckets, of which the last should be infinity
+        :param window: the duration in seconds of the rolling window
+        :param slots: the number of slots in which the rolling window is split
+        """
+        self._buckets = buckets
+        self._slot_duration = window / slots
+        self._slots = collections.deque(maxlen=slots)
+        self._total_counts = [0] * len(buckets)
+        self._total_sum = 0.
+
+    def observe(self, value: float, now: Optional[float] = None) -> None:
+        """Record an observed value.
+
+        :param value: the value
+        :param now: the time of the observation, by default the current time
+        """
+        now = time.monotonic() if now is None else now
+        index = bisect.bisect_left(self._buckets, value)
+        slot_start = now - now % self._slot_duration
+
+        if not self._slots or self._slots[-1][0] != slot_start:
+            self._slots.append([slot_start, [0] * len(self._buckets), 0., value])
+
+        slot = self._slots[-1]
+        slot[1][index] += 1
+        slot[2] += value
+        slot[3] = max(slot[3], value)
+
+        self._total_counts[index] += 1
+        self._total_sum += value
+
+    def get_totals(self) -> Tuple[List[Tuple[float, int]], float, int]:
+        """Return the totals of all observed values.
+
+        :return: tuple of the list of the upper bound of each bucket with the cumulative number of values that are less
+            than or equal to it, the sum of the values and the number of values
+        """
+        counts = []
+        cumulative = 0
+
+        for bound, count in zip(self._buckets, self._total_counts):
+            cumulative += count
+            counts.append((bound, cumulative))
+
+        return counts, self._total_sum, cumulative
+
+    def get_summary(self, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """Return the summary statistics of the values that were observed in the rolling window.
+
+        The quantiles are estimated as the upper bound of the bucket that contains them, capped by the maximum value.
+
+        :param now: the current time, by default the current time
+        :return: dictionary with the ``count``, ``mean``, ``p50``, ``p95``, ``p99`` and ``max`` of the values
+        """
+        now = time.monotonic() if now is None else now
+        oldest = now - self._slot_duration * self._slots.maxlen
+        slots = [slot for slot in self._slots if slot[0] > oldest]
+
+        counts = [sum(slot[1][index] for slot in slots) for index in range(len(self._buckets))]
+        count = sum(counts)
+
+        if not count:
+            return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+
+        maximum = max(slot[3] for slot in slots)
+        summary = {'count': count, 'mean': sum(slot[2] for slot in slots) / count}
+
+        for name, quantile in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            cumulative = 0
+            for bound, bucket_count in zip(self._buckets, counts):
+                cumulative += bucket_count
+                if cumulative >= quantile * count:
+                    summary[name] = min(bound, maximum)
+                    break
+
+        summary['max'] = maximum
+
+        return summary
+
+
+class MetricsRegistry:
+    """Registry of the rolling histograms of the metrics of a process, which can be updated from any thread."""
+
+    def __init__(self, window: float = 300.):
+        """Construct an empty registry.
+
+        :param window: the duration in seconds of the rolling window of the histograms
+        """
+        self._window = window
+        self._histograms: Dict[Tuple[str, Labels], RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record an observed value of a metric.
+
+        :param name: the name of the metric
+        :param value: the value
+        :param labels: the labels that distinguish the histograms of the metric
+        """
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            try:
+                histogram = self._histograms[key]
+            except KeyError:
+                histogram = self._histograms[key] = RollingHistogram(window=self._window)
+
+            histogram.observe(value)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Context manager that records the duration of its body as an observed value of a metric.
+
+        Note that within a coroutine, the duration includes the time that the coroutine spends waiting.
+
+        :param name: the name of the metric
+        :param labels: the labels that distinguish the histograms of the metric
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def get_summary(self) -> List[dict]:
+        """Return the summary statistics of the rolling window of each histogram.
+
+        :return: list of dictionaries with the ``name`` and ``labels`` of each histogram and its summary statistics
+        """
+        with self._lock:
+            return [
+                dict(name=name, labels=dict(labels), **histogram.get_summary())
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+
+    def render_prometheus(self, **labels: str) -> str:
+        """Return the totals of all histograms in the Prometheus text exposition format.
+
+        :param labels: labels that are added to all samples, for example to identify the process
+        :return: the metrics in the Prometheus text format
+        """
+        lines = []
+
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            totals = [(name, dict(labels, **dict(key)), histogram.get_totals()) for (name, key), histogram in histograms
+                      ]
+
+        previous = None
+
+        for name, sample_labels, (buckets, total, count) in totals:
+            if name != previous:
+                previous = name
+                lines.append(f'# HELP {name} {METRICS.get(name, name)}')
+                lines.append(f'# TYPE {name} histogram')
+
+            for bound, cumulative in buckets:
+                bound = '+Inf' if bound == math.inf else repr(bound)
+                lines.append(f'{name}_bucket{_format_labels(dict(sample_labels, le=bound))} {cumulative}')
+
+            lines.append(f'{name}_sum{_format_labels(sample_labels)} {total!r}')
+            lines.append(f'{name}_count{_format_labels(sample_labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def timed(name: str, **labels: str) -> Callable:
+    """Decorator that records the duration of each call of a function or coroutine function in the global registry.
+
+    :param name: the name of the metric
+    :param labels: the labels that distinguish the histograms of the metric
+    """
+
+    def decorator(wrapped):
+        if asyncio.iscoroutinefunction(wrapped):
+
+            @functools.wraps(wrapped)
+            async def wrapper(*args, **kwargs):
+                with get_metrics().timer(name, **labels):
+                    return await wrapped(*args, **kwargs)
+        else:
+
+            @functools.wraps(wrapped)
+            def wrapper(*args, **kwargs):
+                with get_metrics().timer(name, **labels):
+                    return wrapped(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Format the labels of a sample in the Prometheus text format."""
+    if not labels:
+        return ''
+
+    escaped = {
+        key: str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for key, value in labels.items()
+    }
+    return '{' + ','.join(f'{key}="{value}"' for key, value in sorted(escaped.items())) + '}'
+
+
+METRICS_REGISTRY = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the global metrics registry of the current process."""
+    return METRICS_REGISTRY
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=unused-argument,too-many-arguments
+    """Record the start of the execution of a query through SQLAlchemy."""
+    conn.info.setdefault('aiida_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=unused-argument,too-many-arguments
+    """Record the duration of the execution of a query through SQLAlchemy."""
+    starts = conn.info.get('aiida_query_start')
+
+    if starts:
+        get_metrics().observe('aiida_db_query_seconds', time.perf_counter() - starts.pop(), orm='sqlalchemy')
+
+
+def _handle_error(context):
+    """Discard the start of the execution of a query through SQLAlchemy that failed.
+
+    The ``after_cursor_execute`` event is not emitted for a failed query, so its start would otherwise be left on the
+    connection and be popped by the next query, or accumulate on a connection that is reused from the pool. The queries
+    of a connection are executed one at a time, so any start that is left belongs to the failed query.
+    """
+    if context.connection is not None:
+        context.connection.info.pop('aiida_query_start', None)
+
+
+def _django_execute_wrapper(execute, sql, params, many, context):  # pylint: disable=too-many-arguments
+    """Record the duration of the execution of a query through the Django ORM."""
+    with get_metrics().timer('aiida_db_query_seconds', orm='django'):
+        return execute(sql, params, many, context)
+
+
+def instrument_database() -> None:
+    """Record the duration of all database queries of the current process in the ``aiida_db_query_seconds`` metric.
+
+    The queries through SQLAlchemy, which is used by the query builder of both backends and by the ORM of the
+    SQLAlchemy backend, are timed through the events of all engines. The queries of the ORM of the Django backend are
+    timed through an execute wrapper of the database connection of the current thread.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from aiida.backends import BACKEND_DJANGO
+    from aiida.manage.configuration import get_profile
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    if get_profile().database_backend == BACKEND_DJANGO:
+        from django.db import connection
+
+        if _django_execute_wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_django_execute_wrapper)
+
+
+class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Handler of the requests to the metrics server, which serves the metrics at any path."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Respond with the metrics in the Prometheus text format."""
+        body = get_metrics().render_prometheus(pid=str(os.getpid())).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Do not log the requests, since the workers write their logs to the daemon log file."""
+
+
+def start_metrics_server(port: int) -> Optional[str]:
+    """Serve the metrics of the current process over HTTP on localhost, from a separate thread.
+
+    The server runs in its own thread, such that the metrics can still be retrieved while the event loop is blocked.
+
+    :param port: the first port to try, the following ``METRICS_PORT_RANGE`` ports are tried if it is in use
+    :return: the URL of the server, or None if none of the ports was free
+    """
+    for candidate in range(port, port + METRICS_PORT_RANGE):
+        try:
+            server = http.server.HTTPServer(('127.0.0.1', candidate), _MetricsRequestHandler)
+        except OSError:
+            continue
+
+        thread = threading.Thread(target=server.serve_forever, name='aiida-metrics-server', daemon=True)
+        thread.start()
+
+        return f'http://127.0.0.1:{candidate}/metrics'
+
+    LOGGER.warning(
+        'no free port in [%d, %d) to serve the metrics of the daemon worker', port, port + METRICS_PORT_RANGE
+    )
+    return None
+
+
+async def report_worker_metrics(directory: str, url: Optional[str] = None) -> None:
+    """Periodically write the summary of the metrics of the current daemon worker to a file in the given directory.
+
+    The file is removed when the coroutine is cancelled.
+
+    :param directory: the directory to write the summary to, in a file that is named after the pid of the worker
+    :param url: the URL from which the worker serves its metrics, if any
+    """
+    filepath = os.path.join(directory, f'{os.getpid()}.json')
+    temporary = f'{filepath}.tmp'
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        while True:
+            await asyncio.sleep(METRICS_REPORT_INTERVAL)
+            report = {'pid': os.getpid(), 'timestamp': time.time(), 'url': url, 'metrics': get_metrics().get_summary()}
+
+            try:
+                with open(temporary, 'wb') as handle:
+                    json.dump(report, handle)
+                os.replace(temporary, filepath)
+            except OSError as exception:
+                LOGGER.warning('failed to report the metrics of the daemon worker: %s', exception)
+    finally:
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+
+
+def get_worker_metrics(directory: str) -> List[dict]:
+    """Return the last summary of the metrics reported by each daemon worker that is still running.
+
+    :param directory: the directory to which the workers report their metrics
+    :return: list of the reports, sorted by pid, with the ``pid``, ``timestamp``, ``url`` and ``metrics`` of each worker
+    """
+    import psutil
+
+    reports = []
+
+    try:
+        filenames = os.listdir(directory)
+    except FileNotFoundError:
+        return reports
+
+    for filename in filenames:
+        if not filename.endswith('.json'):
+            continue
+
+        filepath = os.path.join(directory, filename)
+
+        try:
+            with open(filepath, 'r', encoding='utf8') as handle:
+                report = json.load(handle)
+        except (OSError, ValueError):
+            continue
+
+        if not psutil.pid_exists(report['pid']):
+            with contextlib.suppress(OSError):
+                os.remove(filepath)
+            continue
+
+        reports.append(report)
+
+    return sorted(reports, key=lambda report: report['pid'])
@@ -13,7 +13,9 @@ import signal
 import asyncio
 
 from aiida.common.log import configure_logging
+from aiida.engine.daemon.autoscaler import report_worker_load
 from aiida.engine.daemon.client import get_daemon_client
+from aiida.engine.daemon.metrics import instrument_database, report_worker_metrics, start_metrics_server
 from aiida.engine.runners import Runner
 from aiida.manage.manager import get_manager
 
@@ -57,6 +59,24 @@ def start_daemon() -> None:
         LOGGER.exception('daemon runner failed to start')
         raise
 
+    # Report the load of the worker, such that the autoscaler can decide to add or remove workers. This also samples the
+    # lag of the event loop for the metrics of the worker.
+    profile = manager.get_profile()
+    config = manager.get_config()
+    process_launcher = manager.get_process_launcher()
+    process_slots = config.get_option('daemon.worker_process_slots', profile.name)
+    runner.loop.create_task(
+        report_worker_load(
+            profile.filepaths['daemon']['worker_load'], lambda: process_launcher.num_active_processes, process_slots
+        )
+    )
+
+    # Report the metrics of the worker, which are shown by `verdi daemon worker-stats`
+    metrics_port = config.get_option('daemon.metrics_port', profile.name)
+    metrics_url = start_metrics_server(metrics_port) if metrics_port else None
+    instrument_database()
+    runner.loop.create_task(report_worker_metrics(profile.filepaths['daemon']['worker_metrics'], metrics_url))
+
     signals = (signal.SIGTERM, signal.SIGINT)
     for s in signals:  # pylint: disable=invalid-name
         runner.loop.add_signal_handler(s, lambda s=s: asyncio.create_task(shutdown_runner(runner)))
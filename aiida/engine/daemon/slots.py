@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Allocation of the process slots of a daemon worker by priority and fair share.
+
+A daemon worker takes a few more process tasks from RabbitMQ than it has process slots. The tasks that cannot be
+started immediately wait in the worker, and whenever a slot is released, the waiting task with the highest priority is
+started. Among tasks with the same priority, the tasks of the user, and then of the share group, with the fewest running
+processes go first, such that a user that submits many processes does not starve the others.
+
+A workflow occupies its slot while it waits for the processes that it submitted. To prevent a deadlock where all slots
+are occupied by workflows that wait for processes that cannot be started, a number of slots is reserved for processes
+that are not workflows. A workflow that cannot be started is handed back to RabbitMQ, such that another worker can
+take it, if too many workflows are already waiting. Since RabbitMQ may deliver it to the same worker again, the time a
+workflow waits before it is rejected doubles with every consecutive rejection, until a workflow is allocated a slot.
+"""
+import asyncio
+import collections
+import itertools
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+__all__ = ('ProcessSlots', 'SlotRequest', 'get_slot_request')
+
+
+class SlotRequest(NamedTuple):
+    """The information of a process task that determines when it is allocated a slot of a daemon worker."""
+
+    pid: int
+    priority: int = 0
+    user: Optional[str] = None
+    share_group: Optional[str] = None
+    workflow: bool = False
+
+
+class ProcessSlots:
+    """The process slots of a daemon worker, which are allocated to process tasks by priority and fair share."""
+
+    REJECT_DELAY = 10.  # Time in seconds a workflow waits for a slot before it is rejected if too many are waiting
+    MAX_REJECT_DELAY = 300.  # Maximum time in seconds a workflow waits, after consecutive rejections
+
+    def __init__(self, num_slots: int, reserved_slots: int = 0, max_waiting_workflows: int = 0):
+        """Construct the slots.
+
+        :param num_slots: the number of slots
+        :param reserved_slots: the number of slots that is reserved for processes that are not workflows. At least one
+            slot is always available for workflows.
+        :param max_waiting_workflows: the number of workflows that can wait for a slot, beyond which a workflow that
+            cannot be started is rejected
+        """
+        self._num_slots = num_slots
+        self._workflow_slots = max(num_slots - reserved_slots, 1)
+        self._max_waiting_workflows = max_waiting_workflows
+        self._waiting: Dict[int, Tuple[SlotRequest, asyncio.Future]] = {}
+        self._running: List[SlotRequest] = []
+        self._counter = itertools.count()
+        self._num_rejected = 0
+
+    @property
+    def num_running(self) -> int:
+        """Return the number of slots that are allocated."""
+        return len(self._running)
+
+    @property
+    def num_waiting(self) -> int:
+        """Return the number of requests that wait for a slot."""
+        return len(self._waiting)
+
+    @property
+    def reject_delay(self) -> float:
+        """Return the time in seconds a workflow waits for a slot before it is rejected if too many are waiting.
+
+        The delay doubles with every consecutive rejection, up to ``MAX_REJECT_DELAY``, and is reset once a workflow is
+        allocated a slot.
+        """
+        return min(self.REJECT_DELAY * 2**self._num_rejected, self.MAX_REJECT_DELAY)
+
+    async def acquire(self, request: SlotRequest) -> bool:
+        """Wait until a slot is allocated to the request.
+
+        :param request: the request
+        :return: True if a slot was allocated, which should be released with :meth:`release`, or False if the request
+            is a workflow that should be rejected, because too many workflows are already waiting for a slot
+        """
+        sequence = next(self._counter)
+        future = asyncio.get_event_loop().create_future()
+        self._waiting[sequence] = (request, future)
+        self._dispatch()
+
+        num_waiting_workflows = sum(1 for waiting, _ in self._waiting.values() if waiting.workflow)
+
+        try:
+            if request.workflow and num_waiting_workflows > self._max_waiting_workflows:
+                await asyncio.wait_for(asyncio.shield(future), self.reject_delay)
+            else:
+                await future
+        except asyncio.TimeoutError:
+            if future.done():
+                return True
+            self._waiting.pop(sequence, None)
+            self._num_rejected += 1
+            return False
+        except asyncio.CancelledError:
+            self._waiting.pop(sequence, None)
+            if future.done() and not future.cancelled():
+                self.release(request)
+            raise
+
+        return True
+
+    def release(self, request: SlotRequest) -> None:
+        """Release the slot that was allocated to the request and allocate it to the next waiting request, if any.
+
+        :param request: the request to which the slot was allocated
+        """
+        self._running.remove(request)
+        self._dispatch()
+
+    def _can_start(self, request: SlotRequest) -> bool:
+        """Return whether a slot can be allocated to the request."""
+        if len(self._running) >= self._num_slots:
+            return False
+
+        return not request.workflow or sum(1 for running in self._running if running.workflow) < self._workflow_slots
+
+    def _dispatch(self) -> None:
+        """Allocate the free slots to the waiting requests in order of priority and fair share."""
+        while self._waiting and len(self._running) < self._num_slots:
+            per_user = collections.Counter(running.user for running in self._running)
+            per_group = collections.Counter((running.user, running.share_group) for running in self._running)
+            candidates = [
+                ((-request.priority, per_user[request.user], per_group[(request.user, request.share_group)], sequence),
+                 request) for sequence, (request, _) in self._waiting.items() if self._can_start(request)
+            ]
+
+            if not candidates:
+                return
+
+            # The sequence number is unique, so the requests themselves are never compared
+            order, request = min(candidates)
+            sequence = order[-1]
+            _, future = self._waiting.pop(sequence)
+            self._running.append(request)
+            future.set_result(True)
+
+            if request.workflow:
+                self._num_rejected = 0
+
+
+def get_slot_request(process) -> Dict[str, Any]:
+    """Return the information of a process that is about to be submitted, that determines when it is allocated a slot.
+
+    The priority and share group are taken from the ``metadata`` inputs of the process. If they are not specified and
+    the process is submitted by another process, they are inherited from the slot request of that process, which is
+    known by the process launcher of the daemon worker that runs it.
+
+    :param process: the process instance
+    :return: the keyword arguments of a :class:`SlotRequest`, except the ``pid``
+    """
+    from aiida.engine.processes.process import Process
+    from aiida.manage.manager import get_manager
+    from aiida.orm import WorkflowNode
+
+    priority = process.metadata.get('priority', None)
+    share_group = process.metadata.get('share_group', None)
+    parent = Process.current()
+
+    if parent is not None and (priority is None or share_group is None):
+        launcher = get_manager().get_process_launcher()
+        inherited = launcher.get_slot_request(parent.pid) if launcher is not None else None
+
+        if inherited is not None:
+            priority = inherited.priority if priority is None else priority
+            share_group = inherited.share_group if share_group is None else share_group
+
+    return {
+        'priority': priority or 0,
+        'user': process.node.user.email,
+        'share_group': share_group,
+        'workflow': isinstance(process.node, WorkflowNode),
+    }
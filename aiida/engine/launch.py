@@ -13,6 +13,7 @@ from typing import Any, Dict, Tuple, Type, Union
 from aiida.common import InvalidOperation
 from aiida.manage import manager
 from aiida.orm import ProcessNode
+from .daemon.slots import get_slot_request
 from .processes.functions import FunctionProcess
 from .processes.process import Process, ProcessBuilder
 from .utils import is_process_scoped, instantiate_process
@@ -113,7 +114,8 @@ def submit(process: TYPE_SUBMIT_PROCESS, **inputs: Any) -> ProcessNode:
     process_inited.close()
 
     # Do not wait for the future's result, because in the case of a single worker this would cock-block itself
-    runner.controller.continue_process(process_inited.pid, nowait=False, no_reply=True)
+    slot_request = get_slot_request(process_inited)
+    runner.controller.continue_process(process_inited.pid, nowait=False, no_reply=True, slot_request=slot_request)
 
     return process_inited.node
 
@@ -19,6 +19,7 @@ import plumpy.persistence
 import plumpy.loaders
 from plumpy.exceptions import PersistenceError
 
+from aiida.engine.daemon.metrics import timed
 from aiida.orm.utils import serialize
 
 if TYPE_CHECKING:
@@ -70,6 +71,7 @@ def get_object_loader() -> ObjectLoader:
 class AiiDAPersister(plumpy.persistence.Persister):
     """Persister to take saved process instance states and persisting them to the database."""
 
+    @timed('aiida_checkpoint_save_seconds')
     def save_checkpoint(self, process: 'Process', tag: Optional[str] = None):  # type: ignore[override] # pylint: disable=no-self-use
         """Persist a Process instance.
 
@@ -22,6 +22,7 @@ from aiida.common.datastructures import CalcInfo
 from aiida.common.folders import Folder
 from aiida.common.lang import override, classproperty
 from aiida.common.links import LinkType
+from aiida.engine.daemon.metrics import get_metrics
 
 from ..exit_code import ExitCode
 from ..ports import PortNamespace
@@ -430,7 +431,8 @@ class CalcJob(Process):
         if retrieved_temporary_folder:
             parse_kwargs['retrieved_temporary_folder'] = retrieved_temporary_folder
 
-        exit_code = parser.parse(**parse_kwargs)
+        with get_metrics().timer('aiida_parser_seconds', parser=parser_class.__name__):
+            exit_code = parser.parse(**parse_kwargs)
 
         for link_label, node in parser.outputs.items():
             try:
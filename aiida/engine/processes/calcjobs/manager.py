@@ -11,15 +11,19 @@
 import asyncio
 import contextlib
 import logging
+import sqlite3
 import time
-from typing import Any, Dict, Hashable, Iterator, List, Optional, TYPE_CHECKING
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
 from aiida.common import lang
 from aiida.orm import AuthInfo
 
 if TYPE_CHECKING:
     from aiida.engine.transports import TransportQueue
-    from aiida.schedulers.datastructures import JobInfo
+    from aiida.orm import CalcJobNode
+    from aiida.schedulers import Scheduler
+    from aiida.schedulers.datastructures import JobInfo, JobStateInfo
+    from .status_cache import JobStatusCache
 
 __all__ = ('JobsList', 'JobManager')
 
@@ -29,6 +33,8 @@ class JobsList:
 
     This container of active calculation jobs is used to update their status periodically in batches, ensuring that
     even when a lot of jobs are running, the scheduler update command is not triggered for each job individually.
+    Likewise, the submit and kill commands of all jobs that are requested by the time a transport is available, are
+    executed as a single batch through :py:meth:`~aiida.transports.transport.Transport.exec_command_batch`.
 
     In addition, the :py:class:`~aiida.orm.computers.Computer` for which the :py:class:`~aiida.orm.authinfos.AuthInfo`
     is configured, can define a minimum polling interval. This class will guarantee that the time between update calls
@@ -38,29 +44,50 @@ class JobsList:
     and the limiting of number of calls per unit time, through the minimum polling interval, is only applicable for jobs
     launched with that particular authinfo. If multiple authinfo instances with the same computer, have active jobs
     these limitations are not respected between them, since there is no communication between ``JobsList`` instances.
+    If a :py:class:`~aiida.engine.processes.calcjobs.status_cache.JobStatusCache` is passed, the status of the jobs is
+    retrieved through it, such that the guarantees also hold between the ``JobsList`` instances of different processes,
+    for example daemon workers, that share the cache.
     See the :py:class:`~aiida.engine.processes.calcjobs.manager.JobManager` for example usage.
     """
 
-    def __init__(self, authinfo: AuthInfo, transport_queue: 'TransportQueue', last_updated: Optional[float] = None):
+    # Maximum time in seconds between two queries of the status of all jobs, if the scheduler supports delta queries
+    FULL_UPDATE_INTERVAL = 600.
+
+    def __init__(
+        self,
+        authinfo: AuthInfo,
+        transport_queue: 'TransportQueue',
+        last_updated: Optional[float] = None,
+        job_status_cache: Optional['JobStatusCache'] = None
+    ):
         """Construct an instance for the given authinfo and transport queue.
 
         :param authinfo: The authinfo used to check the jobs list
         :param transport_queue: A transport queue
         :param last_updated: initialize the last updated timestamp
+        :param job_status_cache: optional cache of the status of jobs that is shared with other processes
 
         """
         lang.type_check(last_updated, float, allow_none=True)
 
         self._authinfo = authinfo
         self._transport_queue = transport_queue
+        self._job_status_cache = job_status_cache
         self._loop = transport_queue.loop
         self._logger = logging.getLogger(__name__)
 
-        self._jobs_cache: Dict[Hashable, 'JobInfo'] = {}
+        self._jobs_cache: Dict[Hashable, 'JobStateInfo'] = {}
         self._job_update_requests: Dict[Hashable, asyncio.Future] = {}  # Mapping: {job_id: Future}
+        self._reported_job_info: Dict[Hashable, Optional['JobStateInfo']] = {}  # Last job info resolved for each job
         self._last_updated = last_updated
+        self._last_full_update: Optional[float] = None
         self._update_handle: Optional[asyncio.TimerHandle] = None
 
+        # Pending submit and kill requests: they are executed in a single batch once the transport is available
+        self._submit_requests: List[Tuple['CalcJobNode', asyncio.Future]] = []
+        self._kill_requests: List[Tuple['CalcJobNode', asyncio.Future]] = []
+        self._command_handle: Optional[asyncio.Future] = None
+
     @property
     def logger(self) -> logging.Logger:
         """Return the logger configured for this instance.
@@ -86,10 +113,61 @@ class JobsList:
         """
         return self._last_updated
 
-    async def _get_jobs_from_scheduler(self) -> Dict[Hashable, 'JobInfo']:
-        """Get the current jobs list from the scheduler.
+    async def _get_jobs_from_scheduler(self) -> Dict[Hashable, 'JobStateInfo']:
+        """Get the current jobs list from the scheduler, or from the shared job status cache if one is defined.
+
+        :return: a mapping of job ids to :py:class:`~aiida.schedulers.datastructures.JobStateInfo` instances
+
+        """
+        if self._job_status_cache is None:
+            return await self._query_scheduler_locally()
+
+        try:
+            last_updated, jobs_cache = await self._job_status_cache.get_jobs(
+                self._authinfo.pk, self._get_jobs_with_scheduler(), self.get_minimum_update_interval(),
+                self._query_scheduler,
+                self._authinfo.computer.get_scheduler().parse_job_info
+            )
+        except sqlite3.Error as exception:
+            self.logger.warning(f'failed to use the job status cache `{self._job_status_cache.filepath}`: {exception}')
+            return await self._query_scheduler_locally()
+
+        self._last_updated = last_updated
+
+        return jobs_cache
 
-        :return: a mapping of job ids to :py:class:`~aiida.schedulers.datastructures.JobInfo` instances
+    async def _query_scheduler_locally(self) -> Dict[Hashable, 'JobStateInfo']:
+        """Query the scheduler for the current status of the jobs, without the shared job status cache.
+
+        :return: a mapping of job ids to :py:class:`~aiida.schedulers.datastructures.JobStateInfo` instances
+        """
+        jobs_cache, self._last_full_update = await self._query_scheduler(
+            self._get_jobs_with_scheduler(), self._jobs_cache, self._last_full_update
+        )
+        return jobs_cache
+
+    async def _query_scheduler(
+        self,
+        jobs: List[str],
+        previous: Optional[Dict[Hashable, 'JobStateInfo']] = None,
+        last_full_update: Optional[float] = None
+    ) -> Tuple[Dict[Hashable, 'JobStateInfo'], Optional[float]]:
+        """Query the scheduler for the current status of the given jobs.
+
+        If the scheduler can query by user, the status of all jobs of the user is retrieved instead.
+
+        If the scheduler supports delta queries and the previous status of all the given jobs is known, only the jobs
+        that are not queued are retrieved and merged with the previous status, see ``_merge_jobs_delta``. The status of
+        all jobs is still retrieved at least once every ``FULL_UPDATE_INTERVAL`` seconds, such that jobs that leave the
+        scheduler while queued, for example because they are cancelled, are detected. The time of the last full query
+        is passed in and returned, such that it can be shared through the job status cache between processes that use
+        each other's results as the previous status.
+
+        :param jobs: the ids of the jobs
+        :param previous: the previous status of the jobs, as returned by the last call
+        :param last_full_update: the time of the last query of the status of all jobs, as returned by the last call
+        :return: tuple of a mapping of job ids to :py:class:`~aiida.schedulers.datastructures.JobStateInfo` instances
+            and the time of the last query of the status of all jobs, including this one
 
         """
         with self._transport_queue.request_transport(self._authinfo) as request:
@@ -103,25 +181,79 @@ class JobsList:
             if scheduler.get_feature('can_query_by_user'):
                 kwargs['user'] = '$USER'
             else:
-                kwargs['jobs'] = self._get_jobs_with_scheduler()
+                kwargs['jobs'] = jobs
 
-            scheduler_response = scheduler.get_jobs(**kwargs)
+            delta = self._is_delta_update_possible(scheduler, jobs, previous, last_full_update)
+            scheduler_response = scheduler.get_jobs(delta=delta, compact=True, **kwargs)
 
             # Update the last update time and clear the jobs cache
             self._last_updated = time.time()
             jobs_cache = {}
             self.logger.info(f'AuthInfo<{self._authinfo.pk}>: successfully retrieved status of active jobs')
 
+            if delta:
+                return self._merge_jobs_delta(previous, scheduler_response), last_full_update
+
             for job_id, job_info in scheduler_response.items():
                 jobs_cache[job_id] = job_info
 
-            return jobs_cache
+            return jobs_cache, self._last_updated
+
+    def _is_delta_update_possible(
+        self, scheduler: 'Scheduler', jobs: List[str], previous: Optional[Dict[Hashable, 'JobStateInfo']],
+        last_full_update: Optional[float]
+    ) -> bool:
+        """Return whether the status of the given jobs can be updated with a delta query of the scheduler.
+
+        :param scheduler: the scheduler
+        :param jobs: the ids of the jobs
+        :param previous: the previous status of the jobs
+        :param last_full_update: the time of the last query of the status of all jobs
+        """
+        try:
+            if not scheduler.get_feature('can_query_delta'):
+                return False
+        except NotImplementedError:
+            return False
+
+        if not previous or last_full_update is None:
+            return False
+
+        if time.time() - last_full_update > self.FULL_UPDATE_INTERVAL:
+            return False
+
+        return all(job_id in previous for job_id in jobs)
+
+    @staticmethod
+    def _merge_jobs_delta(previous: Dict[Hashable, 'JobStateInfo'],
+                          delta: Dict[Hashable, 'JobStateInfo']) -> Dict[Hashable, 'JobStateInfo']:
+        """Merge the response of a delta query of the scheduler with the previous status of the jobs.
+
+        The delta contains the current status of all jobs that are not queued. The jobs that are not in the delta are
+        still queued if they were queued before, otherwise they are no longer with the scheduler.
+
+        :param previous: the previous status of the jobs
+        :param delta: the response of the delta query
+        :return: the current status of the jobs
+        """
+        from aiida.schedulers.datastructures import JobState
+
+        jobs_cache = {
+            job_id: job_info
+            for job_id, job_info in previous.items()
+            if job_info.job_state in (JobState.QUEUED, JobState.QUEUED_HELD)
+        }
+        jobs_cache.update(delta)
+
+        return jobs_cache
 
     async def _update_job_info(self) -> None:
         """Update all of the job information objects.
 
         This will set the futures for all pending update requests where the corresponding job has a new status compared
-        to the last update.
+        to the last status that was set for a request of that job. The other requests remain pending until the next
+        update. The scheduler output is parsed in compact form, such that the full job information is only parsed for
+        the jobs whose futures are set.
         """
         try:
             if not self._update_requests_outstanding():
@@ -143,11 +275,30 @@ class JobsList:
 
             raise
         else:
+            # Only keep the last reported job info of jobs that are still being requested
+            self._reported_job_info = {
+                job_id: job_info
+                for job_id, job_info in self._reported_job_info.items()
+                if job_id in self._job_update_requests
+            }
+
             for job_id, future in self._job_update_requests.items():
-                if not future.done():
-                    future.set_result(self._jobs_cache.get(job_id, None))
+                if future.done():
+                    continue
+
+                job_info = self._jobs_cache.get(job_id, None)
+
+                if job_id in self._reported_job_info:
+                    if not self._has_job_state_changed(self._reported_job_info[job_id], job_info):
+                        continue
+
+                # The full job info is only parsed for the jobs whose state changed
+                self._reported_job_info[job_id] = job_info
+                future.set_result(job_info.get_job_info() if job_info is not None else None)
         finally:
-            self._job_update_requests = {}
+            self._job_update_requests = {
+                job_id: future for job_id, future in self._job_update_requests.items() if not future.done()
+            }
 
     @contextlib.contextmanager
     def request_job_info_update(self, job_id: Hashable) -> Iterator['asyncio.Future[JobInfo]']:
@@ -191,8 +342,101 @@ class JobsList:
                 self._get_next_update_delay(), asyncio.ensure_future, updating()
             )
 
+    @contextlib.contextmanager
+    def request_job_submission(self, node: 'CalcJobNode') -> Iterator['asyncio.Future[str]']:
+        """Request the submission of a job to the scheduler.
+
+        The submit commands of all jobs requested until the transport becomes available are executed as a single batch.
+
+        :param node: the node of the calculation job, that should have been uploaded
+        :return: future that will resolve to the job id returned by the scheduler
+        """
+        request = asyncio.Future()
+        self._submit_requests.append((node, request))
+        self._ensure_executing_commands()
+
+        yield request
+
+    @contextlib.contextmanager
+    def request_job_kill(self, node: 'CalcJobNode') -> Iterator['asyncio.Future[bool]']:
+        """Request the scheduler to kill a job.
+
+        The kill commands of all jobs requested until the transport becomes available are executed as a single batch.
+
+        :param node: the node of the calculation job, that should have a job id
+        :return: future that will resolve to `True` if the job was killed
+        """
+        request = asyncio.Future()
+        self._kill_requests.append((node, request))
+        self._ensure_executing_commands()
+
+        yield request
+
+    def _ensure_executing_commands(self) -> None:
+        """Ensure that the pending submit and kill requests are going to be executed."""
+        if self._command_handle is None:
+            self._command_handle = asyncio.ensure_future(self._execute_commands())
+
+    async def _execute_commands(self) -> None:
+        """Wait for a transport and execute all pending submit and kill requests, each kind as a single batch."""
+        from aiida.engine.daemon import execmanager
+
+        try:
+            with self._transport_queue.request_transport(self._authinfo) as request:
+                self.logger.info('waiting for transport')
+                transport = await request
+
+                # Requests made from here on are part of the next batch
+                submit_requests, self._submit_requests = self._submit_requests, []
+                kill_requests, self._kill_requests = self._kill_requests, []
+
+                self._execute_command_batch(submit_requests, execmanager.submit_calculations, transport)
+                self._execute_command_batch(kill_requests, execmanager.kill_calculations, transport)
+        except Exception as exception:
+            # Failed to get the transport, so set the exception on all the pending requests
+            for _, future in self._submit_requests + self._kill_requests:
+                if not future.done():
+                    future.set_exception(exception)
+
+            self._submit_requests = []
+            self._kill_requests = []
+        finally:
+            self._command_handle = None
+
+        if self._submit_requests or self._kill_requests:
+            self._ensure_executing_commands()
+
+    def _execute_command_batch(
+        self, requests: List[Tuple['CalcJobNode', asyncio.Future]], function: Callable, transport: Any
+    ) -> None:
+        """Execute a batch of requests and set the corresponding results on their futures.
+
+        :param requests: list of tuples of the node and the future of each request
+        :param function: the `execmanager` function that executes the batch, returning a result or exception per node
+        :param transport: an already opened transport
+        """
+        requests = [(node, future) for node, future in requests if not future.done()]
+
+        if not requests:
+            return
+
+        try:
+            results = function([node for node, _ in requests], transport)
+        except Exception as exception:  # pylint: disable=broad-except
+            results = [exception] * len(requests)
+
+        self.logger.info(f'AuthInfo<{self._authinfo.pk}>: executed a batch of {len(requests)} {function.__name__}')
+
+        for (_, future), result in zip(requests, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
     @staticmethod
-    def _has_job_state_changed(old: Optional['JobInfo'], new: Optional['JobInfo']) -> bool:
+    def _has_job_state_changed(old: Optional['JobStateInfo'], new: Optional['JobStateInfo']) -> bool:
         """Return whether the states `old` and `new` are different.
 
 
@@ -251,11 +495,13 @@ class JobManager:
     As long as a :py:class:`~aiida.engine.runners.Runner` will create a single ``JobManager`` instance and use that for
     its lifetime, the guarantees made by the ``JobsList`` about respecting the minimum polling interval of the scheduler
     will be maintained. Note, however, that since each ``Runner`` will create its own job manager, these guarantees
-    only hold per runner.
+    only hold per runner, unless the runners share a
+    :py:class:`~aiida.engine.processes.calcjobs.status_cache.JobStatusCache`, as the daemon workers do.
     """
 
-    def __init__(self, transport_queue: 'TransportQueue') -> None:
+    def __init__(self, transport_queue: 'TransportQueue', job_status_cache: Optional['JobStatusCache'] = None) -> None:
         self._transport_queue = transport_queue
+        self._job_status_cache = job_status_cache
         self._job_lists: Dict[Hashable, 'JobInfo'] = {}
 
     def get_jobs_list(self, authinfo: AuthInfo) -> JobsList:
@@ -265,7 +511,8 @@ class JobManager:
         :return: a `JobsList` instance
         """
         if authinfo.id not in self._job_lists:
-            self._job_lists[authinfo.id] = JobsList(authinfo, self._transport_queue)
+            jobs_list = JobsList(authinfo, self._transport_queue, job_status_cache=self._job_status_cache)
+            self._job_lists[authinfo.id] = jobs_list
 
         return self._job_lists[authinfo.id]
 
@@ -282,3 +529,31 @@ class JobManager:
             finally:
                 if not request.done():
                     request.cancel()
+
+    @contextlib.contextmanager
+    def request_job_submission(self, authinfo: AuthInfo, node: 'CalcJobNode') -> Iterator['asyncio.Future[str]']:
+        """Get a future that will resolve to the job id once the job is submitted to the scheduler.
+
+        This is a context manager so that if the user leaves the context the request is automatically cancelled.
+
+        """
+        with self.get_jobs_list(authinfo).request_job_submission(node) as request:
+            try:
+                yield request
+            finally:
+                if not request.done():
+                    request.cancel()
+
+    @contextlib.contextmanager
+    def request_job_kill(self, authinfo: AuthInfo, node: 'CalcJobNode') -> Iterator['asyncio.Future[bool]']:
+        """Get a future that will resolve to `True` once the job is killed by the scheduler.
+
+        This is a context manager so that if the user leaves the context the request is automatically cancelled.
+
+        """
+        with self.get_jobs_list(authinfo).request_job_kill(node) as request:
+            try:
+                yield request
+            finally:
+                if not request.done():
+                    request.cancel()
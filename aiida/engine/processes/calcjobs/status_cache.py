@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Cache of the status of calculation jobs with their scheduler that is shared between processes."""
+import asyncio
+import contextlib
+import functools
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from aiida.common import json
+from aiida.schedulers.datastructures import JobInfo, JobState, JobStateInfo
+
+__all__ = ('JobStatusCache',)
+
+StatusQuery = Callable[[List[str], Optional[Dict[Hashable, JobStateInfo]], Optional[float]],
+                       Awaitable[Tuple[Dict[Hashable, JobStateInfo], Optional[float]]]]
+
+
+class JobStatusCache:
+    """Cache of the status of calculation jobs with their scheduler, shared between the processes of a machine.
+
+    Each daemon worker runs its own :py:class:`~aiida.engine.processes.calcjobs.manager.JobManager`, such that without
+    coordination every worker queries the scheduler of a given authinfo for the status of its own jobs. Instead, the
+    workers share the results of these queries through this cache, which is stored in an SQLite database:
+
+        * every worker registers the ids of the jobs whose status it is waiting for;
+        * a single worker at a time claims the right to query the scheduler for an authinfo, which it only obtains if
+          the last query is older than the minimum polling interval. It queries the status of the jobs registered by
+          all workers and stores the result in the cache;
+        * the other workers use the stored result, as long as it is younger than the minimum polling interval and it
+          includes all the jobs they are waiting for, i.e. the query was started after they registered their jobs.
+
+    Note that the result of a query only contains jobs that were registered before the query was started. A job that
+    was registered later, is not considered to be missing from the scheduler, but waits for the next query instead.
+
+    The operations on the database may have to wait for a lock held by another process, so they are executed in the
+    default executor of the event loop, such that they do not block it.
+    """
+
+    _CLAIM_TIMEOUT = 300.  # Time after which the claim of a worker that queries the scheduler is considered lost
+    _REQUEST_EXPIRY = 3600.  # Time after which a registered job id that is not refreshed is no longer queried
+    _RETRY_INTERVAL = 1.  # Minimum time between checks of the cache while waiting for another worker's query
+    _SQLITE_TIMEOUT = 10.  # Time to wait for a lock on the database
+
+    def __init__(self, filepath: str):
+        """Construct a cache stored in the given file, creating its tables if they do not yet exist.
+
+        :param filepath: path of the SQLite database
+        """
+        self._filepath = filepath
+
+        with self._transaction() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS requests '
+                '(authinfo_id INTEGER, job_id TEXT, requested REAL, PRIMARY KEY (authinfo_id, job_id))'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS status '
+                '(authinfo_id INTEGER PRIMARY KEY, last_updated REAL, polling_until REAL, jobs TEXT, response TEXT, '
+                'last_full_update REAL)'
+            )
+            # The column was added later, so it is missing from the table of a database created by an earlier version
+            columns = [row[1] for row in connection.execute('PRAGMA table_info(status)')]
+            if 'last_full_update' not in columns:
+                connection.execute('ALTER TABLE status ADD COLUMN last_full_update REAL')
+
+    @property
+    def filepath(self) -> str:
+        """Return the path of the SQLite database of the cache."""
+        return self._filepath
+
+    @contextlib.contextmanager
+    def _transaction(self, write: bool = True) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the database and start a transaction.
+
+        :param write: if True, the transaction acquires the write lock immediately and holds it until it is closed,
+            otherwise it is a deferred transaction, which only takes a shared lock when reading
+        """
+        connection = sqlite3.connect(self._filepath, timeout=self._SQLITE_TIMEOUT, isolation_level=None)
+        try:
+            connection.execute('BEGIN IMMEDIATE' if write else 'BEGIN DEFERRED')
+            try:
+                yield connection
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            else:
+                connection.execute('COMMIT')
+        finally:
+            connection.close()
+
+    async def get_jobs(
+        self, authinfo_id: int, job_ids: List[str], minimum_interval: float, query: StatusQuery,
+        parse: Callable[[Any], JobInfo]
+    ) -> Tuple[float, Dict[Hashable, JobStateInfo]]:
+        """Return the status of the given jobs, either from the cache or by querying the scheduler.
+
+        :param authinfo_id: the pk of the authinfo with which the jobs were submitted
+        :param job_ids: the ids of the jobs whose status is requested
+        :param minimum_interval: the minimum interval between queries of the scheduler of the authinfo
+        :param query: coroutine function that queries the scheduler for the status of the given job ids, which is also
+            passed the last stored status and the stored time of the last query of all jobs, if any, such that it can
+            limit the query to the jobs that may have changed. It returns the status and the new time of the last query
+            of all jobs, which is stored such that it is shared by all processes.
+        :param parse: function that parses the full `JobInfo` of a job from the raw data of its `JobStateInfo`, such as
+            `Scheduler.parse_job_info`
+        :return: tuple of the time at which the status was retrieved and a mapping of job ids onto their `JobStateInfo`
+        """
+        await self._run(self._register_requests, authinfo_id, job_ids)
+
+        while True:
+            now = time.time()
+            status = await self._run(self._get_status, authinfo_id, parse)
+
+            if status is not None:
+                last_updated, jobs, response, _ = status
+                if now - last_updated < minimum_interval and jobs.issuperset(job_ids):
+                    return last_updated, response
+
+            jobs_to_query = await self._run(self._claim, authinfo_id, minimum_interval, now)
+
+            if jobs_to_query is not None:
+                break
+
+            delay = last_updated + minimum_interval - now if status is not None else 0.
+            await asyncio.sleep(max(delay, self._RETRY_INTERVAL))
+
+        previous, last_full_update = (status[2], status[3]) if status is not None else (None, None)
+
+        try:
+            response, last_full_update = await query(jobs_to_query, previous, last_full_update)
+        except Exception:
+            await self._run(self._release, authinfo_id)
+            raise
+
+        last_updated = time.time()
+        await self._run(self._set_status, authinfo_id, last_updated, jobs_to_query, response, last_full_update)
+
+        return last_updated, response
+
+    @staticmethod
+    async def _run(function: Callable, *args):
+        """Call the function with the given arguments in the default executor of the event loop."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(function, *args))
+
+    def _register_requests(self, authinfo_id: int, job_ids: List[str]) -> None:
+        """Register the ids of the jobs whose status is requested, such that they are included in the next query."""
+        now = time.time()
+
+        with self._transaction() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO requests (authinfo_id, job_id, requested) VALUES (?, ?, ?)',
+                [(authinfo_id, job_id, now) for job_id in job_ids]
+            )
+
+    def _get_status(
+        self, authinfo_id: int, parse: Callable[[Any], JobInfo]
+    ) -> Optional[Tuple[float, Set[str], Dict[Hashable, JobStateInfo], Optional[float]]]:
+        """Return the last stored status for the given authinfo, if any.
+
+        :param parse: function that parses the full `JobInfo` of a job from its raw data
+        :return: tuple of the time of the last query, the set of queried job ids, the resulting mapping of job ids onto
+            their `JobStateInfo` and the time of the last query of all jobs, or `None` if the scheduler has not yet been
+            queried for this authinfo
+        """
+        with self._transaction(write=False) as connection:
+            row = connection.execute(
+                'SELECT last_updated, jobs, response, last_full_update FROM status WHERE authinfo_id = ?',
+                (authinfo_id,)
+            ).fetchone()
+
+        if row is None or row[0] is None:
+            return None
+
+        last_updated, jobs, response, last_full_update = row
+        response = {job_id: self._load_job(job, parse) for job_id, job in json.loads(response).items()}
+
+        return last_updated, set(json.loads(jobs)), response, last_full_update
+
+    def _claim(self, authinfo_id: int, minimum_interval: float, now: float) -> Optional[List[str]]:
+        """Claim the right to query the scheduler for the given authinfo.
+
+        The claim is only granted if no other process holds it and if the last query is older than the minimum interval.
+
+        :return: the sorted list of the registered job ids that should be queried if the claim was granted, else `None`
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                'SELECT last_updated, polling_until FROM status WHERE authinfo_id = ?', (authinfo_id,)
+            ).fetchone()
+
+            if row is not None:
+                last_updated, polling_until = row
+                if polling_until is not None and polling_until > now:
+                    return None
+                if last_updated is not None and now - last_updated < minimum_interval:
+                    return None
+
+            connection.execute('INSERT OR IGNORE INTO status (authinfo_id) VALUES (?)', (authinfo_id,))
+            connection.execute(
+                'UPDATE status SET polling_until = ? WHERE authinfo_id = ?', (now + self._CLAIM_TIMEOUT, authinfo_id)
+            )
+            connection.execute('DELETE FROM requests WHERE requested < ?', (now - self._REQUEST_EXPIRY,))
+            rows = connection.execute('SELECT job_id FROM requests WHERE authinfo_id = ?', (authinfo_id,)).fetchall()
+
+        return sorted(job_id for job_id, in rows)
+
+    def _release(self, authinfo_id: int) -> None:
+        """Release the claim to query the scheduler for the given authinfo, without storing a new status."""
+        with self._transaction() as connection:
+            connection.execute('UPDATE status SET polling_until = NULL WHERE authinfo_id = ?', (authinfo_id,))
+
+    def _set_status(
+        self, authinfo_id: int, last_updated: float, jobs: List[str], response: Dict[Hashable, JobStateInfo],
+        last_full_update: Optional[float]
+    ) -> None:
+        """Store the result of a query of the scheduler for the given authinfo and release the claim.
+
+        The queried jobs that are no longer with the scheduler are unregistered, since their status is final.
+        """
+        response = {str(job_id): self._dump_job(job) for job_id, job in response.items()}
+        finished = [(authinfo_id, job_id) for job_id in jobs if job_id not in response]
+
+        with self._transaction() as connection:
+            connection.execute(
+                'UPDATE status SET last_updated = ?, polling_until = NULL, jobs = ?, response = ?, last_full_update = ? '
+                'WHERE authinfo_id = ?',
+                (last_updated, json.dumps(jobs), json.dumps(response), last_full_update, authinfo_id)
+            )
+            connection.executemany('DELETE FROM requests WHERE authinfo_id = ? AND job_id = ?', finished)
+
+    @staticmethod
+    def _dump_job(job: JobStateInfo) -> dict:
+        """Return the serializable form of the status of a job.
+
+        Only the compact state and the raw data of the job in the output of the scheduler are stored, from which the
+        processes that read the status parse the full `JobInfo` only when it is requested. If the raw data is not set by
+        the scheduler plugin, the full `JobInfo` is stored instead.
+        """
+        if job.raw is None:
+            return job.get_job_info().get_dict()
+
+        return {
+            'job_id': job.job_id,
+            'job_state': job.job_state.value if job.job_state is not None else None,
+            'job_substate': job.job_substate,
+            'raw': job.raw,
+        }
+
+    @staticmethod
+    def _load_job(job: dict, parse: Callable[[Any], JobInfo]) -> JobStateInfo:
+        """Return the status of a job from its serialized form, as returned by `_dump_job`."""
+        if 'raw' not in job:
+            return JobStateInfo.from_job_info(JobInfo.load_from_dict(job))
+
+        job_state = JobState(job['job_state']) if job['job_state'] is not None else None
+        raw = job['raw']
+
+        return JobStateInfo(job['job_id'], job_state, job['job_substate'], parse=functools.partial(parse, raw), raw=raw)
@@ -21,6 +21,7 @@ from aiida.common.datastructures import CalcJobState
 from aiida.common.exceptions import FeatureNotAvailable, TransportTaskException
 from aiida.common.folders import SandboxFolder
 from aiida.engine.daemon import execmanager
+from aiida.engine.daemon.metrics import timed
 from aiida.engine.transports import TransportQueue
 from aiida.engine.utils import exponential_backoff_retry, interruptable_task, InterruptableFuture
 from aiida.orm.nodes.process.calculation.calcjob import CalcJobNode
@@ -48,6 +49,7 @@ class PreSubmitException(Exception):
     """Raise in the `do_upload` coroutine when an exception is raised in `CalcJob.presubmit`."""
 
 
+@timed('aiida_calcjob_task_seconds', task=UPLOAD_COMMAND)
 async def task_upload_job(process: 'CalcJob', transport_queue: TransportQueue, cancellable: InterruptableFuture):
     """Transport task that will attempt to upload the files of a job calculation to the remote.
 
@@ -108,16 +110,19 @@ async def task_upload_job(process: 'CalcJob', transport_queue: TransportQueue, c
         return skip_submit
 
 
-async def task_submit_job(node: CalcJobNode, transport_queue: TransportQueue, cancellable: InterruptableFuture):
+@timed('aiida_calcjob_task_seconds', task=SUBMIT_COMMAND)
+async def task_submit_job(node: CalcJobNode, job_manager, cancellable: InterruptableFuture):
     """Transport task that will attempt to submit a job calculation.
 
-    The task will first request a transport from the queue. Once the transport is yielded, the relevant execmanager
-    function is called, wrapped in the exponential_backoff_retry coroutine, which, in case of a caught exception, will
-    retry after an interval that increases exponentially with the number of retries, for a maximum number of retries.
+    The task will request the submission from the job manager, which submits all jobs with the same authinfo, that are
+    requested by the time the transport is available, as a single batch. The request is wrapped in the
+    exponential_backoff_retry coroutine, which, in case of a caught exception, will retry after an interval that
+    increases exponentially with the number of retries, for a maximum number of retries.
     If all retries fail, the task will raise a TransportTaskException
 
     :param node: the node that represents the job calculation
-    :param transport_queue: the TransportQueue from which to request a Transport
+    :param job_manager: The job manager
+    :type job_manager: :class:`aiida.engine.processes.calcjobs.manager.JobManager`
     :param cancellable: the cancelled flag that will be queried to determine whether the task was cancelled
 
     :raises: TransportTaskException if after the maximum number of retries the transport task still excepted
@@ -133,9 +138,8 @@ async def task_submit_job(node: CalcJobNode, transport_queue: TransportQueue, ca
     authinfo = node.computer.get_authinfo(node.user)
 
     async def do_submit():
-        with transport_queue.request_transport(authinfo) as request:
-            transport = await cancellable.with_interrupt(request)
-            return execmanager.submit_calculation(node, transport)
+        with job_manager.request_job_submission(authinfo, node) as request:
+            return await cancellable.with_interrupt(request)
 
     try:
         logger.info(f'scheduled request to submit CalcJob<{node.pk}>')
@@ -157,6 +161,7 @@ async def task_submit_job(node: CalcJobNode, transport_queue: TransportQueue, ca
         return result
 
 
+@timed('aiida_calcjob_task_seconds', task=UPDATE_COMMAND)
 async def task_update_job(node: CalcJobNode, job_manager, cancellable: InterruptableFuture):
     """Transport task that will attempt to update the scheduler status of the job calculation.
 
@@ -221,6 +226,7 @@ async def task_update_job(node: CalcJobNode, job_manager, cancellable: Interrupt
         return job_done
 
 
+@timed('aiida_calcjob_task_seconds', task=RETRIEVE_COMMAND)
 async def task_retrieve_job(
     node: CalcJobNode, transport_queue: TransportQueue, retrieved_temporary_folder: str,
     cancellable: InterruptableFuture
@@ -288,16 +294,19 @@ async def task_retrieve_job(
         return result
 
 
-async def task_kill_job(node: CalcJobNode, transport_queue: TransportQueue, cancellable: InterruptableFuture):
+@timed('aiida_calcjob_task_seconds', task=KILL_COMMAND)
+async def task_kill_job(node: CalcJobNode, job_manager, cancellable: InterruptableFuture):
     """Transport task that will attempt to kill a job calculation.
 
-    The task will first request a transport from the queue. Once the transport is yielded, the relevant execmanager
-    function is called, wrapped in the exponential_backoff_retry coroutine, which, in case of a caught exception, will
-    retry after an interval that increases exponentially with the number of retries, for a maximum number of retries.
+    The task will request the kill from the job manager, which kills all jobs with the same authinfo, that are
+    requested by the time the transport is available, as a single batch. The request is wrapped in the
+    exponential_backoff_retry coroutine, which, in case of a caught exception, will retry after an interval that
+    increases exponentially with the number of retries, for a maximum number of retries.
     If all retries fail, the task will raise a TransportTaskException
 
     :param node: the node that represents the job calculation
-    :param transport_queue: the TransportQueue from which to request a Transport
+    :param job_manager: The job manager
+    :type job_manager: :class:`aiida.engine.processes.calcjobs.manager.JobManager`
     :param cancellable: the cancelled flag that will be queried to determine whether the task was cancelled
 
     :raises: TransportTaskException if after the maximum number of retries the transport task still excepted
@@ -312,9 +321,8 @@ async def task_kill_job(node: CalcJobNode, transport_queue: TransportQueue, canc
     authinfo = node.computer.get_authinfo(node.user)
 
     async def do_kill():
-        with transport_queue.request_transport(authinfo) as request:
-            transport = await cancellable.with_interrupt(request)
-            return execmanager.kill_calculation(node, transport)
+        with job_manager.request_job_kill(authinfo, node) as request:
+            return await cancellable.with_interrupt(request)
 
     try:
         logger.info(f'scheduled request to kill CalcJob<{node.pk}>')
@@ -381,7 +389,7 @@ class Waiting(plumpy.process_states.Waiting):
 
             elif command == SUBMIT_COMMAND:
                 node.set_process_status(process_status)
-                await self._launch_task(task_submit_job, node, transport_queue)
+                await self._launch_task(task_submit_job, node, self.process.runner.job_manager)
                 result = self.update()
 
             elif self.data == UPDATE_COMMAND:
@@ -409,7 +417,7 @@ class Waiting(plumpy.process_states.Waiting):
         except TransportTaskException as exception:
             raise plumpy.process_states.PauseInterruption(f'Pausing after failed transport task: {exception}')
         except plumpy.process_states.KillInterruption:
-            await self._launch_task(task_kill_job, node, transport_queue)
+            await self._launch_task(task_kill_job, node, self.process.runner.job_manager)
             if self._killing is not None:
                 self._killing.set_result(True)
             else:
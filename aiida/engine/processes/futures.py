@@ -16,6 +16,8 @@ import kiwipy
 
 from aiida.orm import Node, load_node
 
+from ..utils import is_process_terminated
+
 __all__ = ('ProcessFuture',)
 
 
@@ -76,8 +78,12 @@ class ProcessFuture(asyncio.Future):
             self._broadcast_identifier = None
 
     async def _poll_process(self, node: Node, poll_interval: Union[int, float]) -> None:
-        """Poll whether the process node has reached a terminal state."""
-        while not self.done() and not node.is_terminated:
+        """Poll whether the process node has reached a terminal state.
+
+        The process state is queried without blocking the event loop, see
+        :func:`aiida.engine.utils.is_process_terminated`.
+        """
+        while not self.done() and not await is_process_terminated(node.pk):
             await asyncio.sleep(poll_interval)
 
         if not self.done():
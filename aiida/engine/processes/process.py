@@ -100,6 +100,20 @@ class Process(plumpy.processes.Process):
             default='CALL',
             help='The label to use for the `CALL` link if the process is called by another process.'
         )
+        spec.input(
+            f'{spec.metadata_key}.priority',
+            valid_type=int,
+            required=False,
+            help='The priority with which a daemon worker runs the process, if submitted. Processes with a higher '
+            'priority are started first. If not specified, it is inherited from the calling process, or else zero.'
+        )
+        spec.input(
+            f'{spec.metadata_key}.share_group',
+            valid_type=str,
+            required=False,
+            help='The group with which the slots of the daemon workers are shared fairly, among the processes of the '
+            'same user. If not specified, it is inherited from the calling process.'
+        )
         spec.exit_code(1, 'ERROR_UNSPECIFIED', message='The process has failed with an unspecified error.')
         spec.exit_code(2, 'ERROR_LEGACY_FAILURE', message='The process failed with legacy failure mode.')
         spec.exit_code(10, 'ERROR_INVALID_OUTPUT', message='The process returned an invalid output.')
@@ -19,16 +19,18 @@ import uuid
 
 import kiwipy
 from plumpy.persistence import Persister
-from plumpy.process_comms import RemoteProcessThreadController
 from plumpy.events import set_event_loop_policy, reset_event_loop_policy
 from plumpy.communications import wrap_communicator
 
 from aiida.common import exceptions
+from aiida.manage.external.rmq import RemoteProcessThreadController
 from aiida.orm import load_node, ProcessNode
 from aiida.plugins.utils import PluginVersionProvider
 
 from .processes import futures, Process, ProcessBuilder, ProcessState
 from .processes.calcjobs import manager
+from .processes.calcjobs.status_cache import JobStatusCache
+from .daemon.slots import get_slot_request
 from . import transports
 from . import utils
 
@@ -66,7 +68,8 @@ class Runner:  # pylint: disable=too-many-public-methods
         loop: Optional[asyncio.AbstractEventLoop] = None,
         communicator: Optional[kiwipy.Communicator] = None,
         rmq_submit: bool = False,
-        persister: Optional[Persister] = None
+        persister: Optional[Persister] = None,
+        job_status_cache: Optional[JobStatusCache] = None
     ):
         """Construct a new runner.
 
@@ -75,6 +78,7 @@ class Runner:  # pylint: disable=too-many-public-methods
         :param communicator: the communicator to use
         :param rmq_submit: if True, processes will be submitted to RabbitMQ, otherwise they will be scheduled here
         :param persister: the persister to use to persist processes
+        :param job_status_cache: cache of the status of jobs with their scheduler, shared with other runners
 
         """
         assert not (rmq_submit and persister is None), \
@@ -85,7 +89,7 @@ class Runner:  # pylint: disable=too-many-public-methods
         self._poll_interval = poll_interval
         self._rmq_submit = rmq_submit
         self._transport = transports.TransportQueue(self._loop)
-        self._job_manager = manager.JobManager(self._transport)
+        self._job_manager = manager.JobManager(self._transport, job_status_cache=job_status_cache)
         self._persister = persister
         self._plugin_version_provider = PluginVersionProvider()
 
@@ -194,7 +198,8 @@ class Runner:  # pylint: disable=too-many-public-methods
             assert self.controller is not None, 'runner does not have a controller'
             self.persister.save_checkpoint(process_inited)
             process_inited.close()
-            self.controller.continue_process(process_inited.pid, nowait=False, no_reply=True)
+            slot_request = get_slot_request(process_inited)
+            self.controller.continue_process(process_inited.pid, nowait=False, no_reply=True, slot_request=slot_request)
         else:
             self.loop.create_task(process_inited.step_until_terminated())
 
@@ -324,7 +329,7 @@ class Runner:  # pylint: disable=too-many-public-methods
 
         LOGGER.info('adding subscriber for broadcasts of %d', pk)
         self.communicator.add_broadcast_subscriber(broadcast_filter, subscriber_identifier)
-        self._poll_process(node, functools.partial(inline_callback, event))
+        self._loop.create_task(self._poll_process(node, functools.partial(inline_callback, event)))
 
     def get_process_future(self, pk: int) -> futures.ProcessFuture:
         """Return a future for a process.
@@ -335,15 +340,18 @@ class Runner:  # pylint: disable=too-many-public-methods
         """
         return futures.ProcessFuture(pk, self._loop, self._poll_interval, self._communicator)
 
-    def _poll_process(self, node, callback):
-        """Check whether the process state of the node is terminated and call the callback or reschedule it.
+    async def _poll_process(self, node, callback):
+        """Poll whether the process state of the node is terminated and call the callback once it is.
+
+        The process state is queried without blocking the event loop, see
+        :func:`aiida.engine.utils.is_process_terminated`.
 
         :param node: the process node
         :param callback: callback to be called when process is terminated
         """
-        if node.is_terminated:
-            args = [node.__class__.__name__, node.pk]
-            LOGGER.info('%s<%d> confirmed to be terminated by backup polling mechanism', *args)
-            self._loop.call_soon(callback)
-        else:
-            self._loop.call_later(self._poll_interval, self._poll_process, node, callback)
+        while not await utils.is_process_terminated(node.pk):
+            await asyncio.sleep(self._poll_interval)
+
+        args = [node.__class__.__name__, node.pk]
+        LOGGER.info('%s<%d> confirmed to be terminated by backup polling mechanism', *args)
+        callback()
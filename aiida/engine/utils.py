@@ -220,6 +220,29 @@ def is_process_function(function: Any) -> bool:
         return False
 
 
+async def is_process_terminated(pk: int) -> bool:
+    """Return whether the process with the given pk has reached a terminal state, without blocking the event loop.
+
+    The process state is queried by the database executor, see
+    :meth:`aiida.manage.manager.Manager.get_database_executor`.
+
+    :param pk: the pk of the process node
+    :returns: True if the process is terminated, False otherwise
+    :raises aiida.common.NotExistent: if there is no process node with the given pk
+    """
+    from plumpy import ProcessState
+    from aiida.common.exceptions import NotExistent
+    from aiida.orm import ProcessNode, QueryBuilder
+
+    builder = QueryBuilder().append(ProcessNode, filters={'id': pk}, project='attributes.process_state')
+    result = await builder.first_async()
+
+    if result is None:
+        raise NotExistent(f'no process node with pk<{pk}> exists')
+
+    return result[0] in [state.value for state in (ProcessState.FINISHED, ProcessState.EXCEPTED, ProcessState.KILLED)]
+
+
 def is_process_scoped() -> bool:
     """Return whether the current scope is within a process.
 
@@ -16,6 +16,9 @@ NO_DEFAULT = ()
 DEFAULT_DAEMON_WORKERS = 1
 DEFAULT_DAEMON_TIMEOUT = 20  # Default timeout in seconds for circus client calls
 DEFAULT_DAEMON_WORKER_PROCESS_SLOTS = 200
+DEFAULT_DAEMON_WORKER_RESERVED_SLOTS = 20
+DEFAULT_DAEMON_WORKER_WAITING_TASKS = 10
+DEFAULT_DAEMON_AUTOSCALE_MAX_WORKERS = 4
 VALID_LOG_LEVELS = ['CRITICAL', 'ERROR', 'WARNING', 'REPORT', 'INFO', 'DEBUG']
 
 Option = collections.namedtuple(
@@ -55,6 +58,65 @@ CONFIG_OPTIONS = {
         'description': 'The maximum number of concurrent process tasks that each daemon worker can handle',
         'global_only': False,
     },
+    'daemon.worker_reserved_slots': {
+        'key': 'daemon_worker_reserved_slots',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': DEFAULT_DAEMON_WORKER_RESERVED_SLOTS,
+        'description': 'The number of process slots of a daemon worker that cannot be taken by workflows, such that '
+        'the processes they wait for can always be run',
+        'global_only': False,
+    },
+    'daemon.worker_waiting_tasks': {
+        'key': 'daemon_worker_waiting_tasks',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': DEFAULT_DAEMON_WORKER_WAITING_TASKS,
+        'description': 'The number of process tasks that a daemon worker takes on top of its process slots, which wait '
+        'for a free slot and are then started in order of priority and fair share',
+        'global_only': False,
+    },
+    'daemon.autoscale': {
+        'key': 'daemon_autoscale',
+        'valid_type': 'bool',
+        'valid_values': None,
+        'default': False,
+        'description': 'Whether the daemon automatically adds and removes workers depending on their load',
+        'global_only': False,
+    },
+    'daemon.autoscale_min_workers': {
+        'key': 'daemon_autoscale_min_workers',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': DEFAULT_DAEMON_WORKERS,
+        'description': 'The minimum number of workers that the daemon autoscaler keeps running',
+        'global_only': False,
+    },
+    'daemon.autoscale_max_workers': {
+        'key': 'daemon_autoscale_max_workers',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': DEFAULT_DAEMON_AUTOSCALE_MAX_WORKERS,
+        'description': 'The maximum number of workers that the daemon autoscaler starts',
+        'global_only': False,
+    },
+    'daemon.autoscale_interval': {
+        'key': 'daemon_autoscale_interval',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': 60,
+        'description': 'The interval in seconds between two decisions of the daemon autoscaler',
+        'global_only': False,
+    },
+    'daemon.metrics_port': {
+        'key': 'daemon_metrics_port',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': 0,
+        'description': 'The port from which the daemon workers serve their metrics over HTTP on localhost, in the '
+        'Prometheus text format. Each worker uses the first free port from this one onwards. Set to 0 to disable',
+        'global_only': False,
+    },
     'db.batch_size': {
         'key': 'db_batch_size',
         'valid_type': 'int',
@@ -65,6 +127,15 @@ CONFIG_OPTIONS = {
         '(1GB) when creating large numbers of database records in one go.',
         'global_only': False,
     },
+    'db.async_workers': {
+        'key': 'db_async_workers',
+        'valid_type': 'int',
+        'valid_values': None,
+        'default': 4,
+        'description': 'The number of threads that perform the asynchronous database operations of a process, such '
+        'as the daemon workers, each with its own database connection.',
+        'global_only': False,
+    },
     'verdi.shell.auto_import': {
         'key': 'verdi_shell_auto_import',
         'valid_type': 'string',
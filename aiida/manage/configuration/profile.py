@@ -20,6 +20,10 @@ CIRCUS_PID_FILE_TEMPLATE = os.path.join(DAEMON_DIR, 'circus-{}.pid')
 DAEMON_PID_FILE_TEMPLATE = os.path.join(DAEMON_DIR, 'aiida-{}.pid')
 CIRCUS_LOG_FILE_TEMPLATE = os.path.join(DAEMON_LOG_DIR, 'circus-{}.log')
 DAEMON_LOG_FILE_TEMPLATE = os.path.join(DAEMON_LOG_DIR, 'aiida-{}.log')
+DAEMON_JOB_STATUS_FILE_TEMPLATE = os.path.join(DAEMON_DIR, 'job-status-{}.sqlite')
+DAEMON_WORKER_LOAD_DIR_TEMPLATE = os.path.join(DAEMON_DIR, 'worker-load-{}')
+DAEMON_AUTOSCALER_FILE_TEMPLATE = os.path.join(DAEMON_DIR, 'autoscaler-{}.json')
+DAEMON_WORKER_METRICS_DIR_TEMPLATE = os.path.join(DAEMON_DIR, 'worker-metrics-{}')
 CIRCUS_PORT_FILE_TEMPLATE = os.path.join(DAEMON_DIR, 'circus-{}.port')
 CIRCUS_SOCKET_FILE_TEMPATE = os.path.join(DAEMON_DIR, 'circus-{}.sockets')
 CIRCUS_CONTROLLER_SOCKET_TEMPLATE = 'circus.c.sock'
@@ -381,5 +385,9 @@ class Profile:  # pylint: disable=too-many-public-methods
             'daemon': {
                 'log': DAEMON_LOG_FILE_TEMPLATE.format(self.name),
                 'pid': DAEMON_PID_FILE_TEMPLATE.format(self.name),
+                'job_status': DAEMON_JOB_STATUS_FILE_TEMPLATE.format(self.name),
+                'worker_load': DAEMON_WORKER_LOAD_DIR_TEMPLATE.format(self.name),
+                'autoscaler': DAEMON_AUTOSCALER_FILE_TEMPLATE.format(self.name),
+                'worker_metrics': DAEMON_WORKER_METRICS_DIR_TEMPLATE.format(self.name),
             }
         }
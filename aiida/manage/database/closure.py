@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Materialized transitive closure of the provenance graph.
+
+The closure table stores a row ``(ancestor_id, descendant_id, depth)`` for every pair of nodes that are connected by a
+path of ``create`` and ``input_calc`` links, which are the links followed by the ``with_ancestors`` and
+``with_descendants`` relationships of the :class:`~aiida.orm.querybuilder.QueryBuilder`. The ``depth`` is the length of
+the shortest such path minus one, such that a direct link has depth zero, consistent with the recursive queries.
+
+The table is optional: it is only created by :func:`build_provenance_closure` and once it exists it is kept up to date
+by the database itself. A trigger on the link table adds the pairs created by every new link and a foreign key with
+``ON DELETE CASCADE`` removes the pairs of deleted nodes. The only operation that cannot be maintained incrementally is
+the deletion of a node through which surviving nodes are connected, for which the table is rebuilt, see
+:func:`is_provenance_closure_stale`.
+
+The trigger takes a single advisory lock for the rest of the transaction, which serializes the transactions that add
+links while the table exists. Without it, two transactions that concurrently add links that are connected by a path
+would each miss the pairs created by the other, which are only visible once committed. Scoping the lock to the nodes of
+the new link does not suffice, since the links can be connected through any of the ancestors of one and descendants of
+the other, and locking all of those would be as expensive as the insert itself and prone to deadlocks. Since a link
+is committed together with the node that it is stored with, the lock is only held briefly.
+
+Whether the table exists is cached per backend, see :func:`has_provenance_closure`. Building or dropping the table
+through this module, and migrating the database, resets the cache of the current process. The daemon workers should
+be restarted after building or dropping the table, since they would otherwise keep using their cached value.
+"""
+import weakref
+
+from sqlalchemy import Integer
+from sqlalchemy.sql import column, table, text
+
+__all__ = (
+    'PROVENANCE_CLOSURE_TABLE', 'has_provenance_closure', 'build_provenance_closure', 'drop_provenance_closure',
+    'is_provenance_closure_stale', 'reset_provenance_closure_cache'
+)
+
+PROVENANCE_CLOSURE_TABLE = 'db_dbprovenance_closure'
+
+CLOSURE_LINK_TYPES = ('create', 'input_calc')
+
+CLOSURE_LOCK_KEY = 8329104727
+
+_HAS_PROVENANCE_CLOSURE = weakref.WeakKeyDictionary()
+
+provenance_closure = table(
+    PROVENANCE_CLOSURE_TABLE,
+    column('ancestor_id', Integer),
+    column('descendant_id', Integer),
+    column('depth', Integer),
+)
+
+_LINK_TYPES_SQL = ', '.join(f"'{link_type}'" for link_type in CLOSURE_LINK_TYPES)
+
+SQL_CREATE_TABLE = f"""
+CREATE TABLE {PROVENANCE_CLOSURE_TABLE} (
+    ancestor_id integer NOT NULL REFERENCES db_dbnode (id) ON DELETE CASCADE,
+    descendant_id integer NOT NULL REFERENCES db_dbnode (id) ON DELETE CASCADE,
+    depth integer NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+);
+"""
+
+SQL_INSERT_LINKS = f"""
+INSERT INTO {PROVENANCE_CLOSURE_TABLE} (ancestor_id, descendant_id, depth)
+SELECT DISTINCT input_id, output_id, 0 FROM db_dblink WHERE type IN ({_LINK_TYPES_SQL})
+ON CONFLICT DO NOTHING;
+"""
+
+SQL_INSERT_DEPTH = f"""
+INSERT INTO {PROVENANCE_CLOSURE_TABLE} (ancestor_id, descendant_id, depth)
+SELECT DISTINCT closure.ancestor_id, link.output_id, :depth
+FROM {PROVENANCE_CLOSURE_TABLE} AS closure
+JOIN db_dblink AS link ON link.input_id = closure.descendant_id
+WHERE closure.depth = :depth - 1 AND link.type IN ({_LINK_TYPES_SQL})
+ON CONFLICT DO NOTHING;
+"""
+
+SQL_CREATE_INDEXES = f"""
+CREATE INDEX {PROVENANCE_CLOSURE_TABLE}_descendant_id ON {PROVENANCE_CLOSURE_TABLE} (descendant_id, depth);
+"""
+
+SQL_CREATE_TRIGGER = f"""
+CREATE OR REPLACE FUNCTION {PROVENANCE_CLOSURE_TABLE}_insert_link() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock({CLOSURE_LOCK_KEY});
+    INSERT INTO {PROVENANCE_CLOSURE_TABLE} (ancestor_id, descendant_id, depth)
+    SELECT ancestors.ancestor_id, descendants.descendant_id, ancestors.depth + descendants.depth + 2
+    FROM (
+        SELECT ancestor_id, depth FROM {PROVENANCE_CLOSURE_TABLE} WHERE descendant_id = NEW.input_id
+        UNION ALL SELECT NEW.input_id, -1
+    ) AS ancestors
+    CROSS JOIN (
+        SELECT descendant_id, depth FROM {PROVENANCE_CLOSURE_TABLE} WHERE ancestor_id = NEW.output_id
+        UNION ALL SELECT NEW.output_id, -1
+    ) AS descendants
+    ON CONFLICT (ancestor_id, descendant_id)
+    DO UPDATE SET depth = LEAST({PROVENANCE_CLOSURE_TABLE}.depth, EXCLUDED.depth);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {PROVENANCE_CLOSURE_TABLE}_insert_link
+AFTER INSERT ON db_dblink
+FOR EACH ROW WHEN (NEW.type IN ({_LINK_TYPES_SQL}))
+EXECUTE PROCEDURE {PROVENANCE_CLOSURE_TABLE}_insert_link();
+"""
+
+SQL_DROP = f"""
+DROP TRIGGER IF EXISTS {PROVENANCE_CLOSURE_TABLE}_insert_link ON db_dblink;
+DROP FUNCTION IF EXISTS {PROVENANCE_CLOSURE_TABLE}_insert_link();
+DROP TABLE IF EXISTS {PROVENANCE_CLOSURE_TABLE};
+"""
+
+SQL_STALE = f"""
+SELECT EXISTS (
+    SELECT 1 FROM db_dblink
+    WHERE input_id IN :pks AND output_id NOT IN :pks AND type IN ({_LINK_TYPES_SQL})
+);
+"""
+
+
+def has_provenance_closure(backend):
+    """Return whether the provenance closure table exists in the database of the given backend.
+
+    The result is cached per backend, since this is checked for every query of ancestors or descendants.
+
+    :param backend: the backend whose database to check
+    :return: boolean, True if the closure table exists
+    """
+    try:
+        return _HAS_PROVENANCE_CLOSURE[backend]
+    except KeyError:
+        pass
+
+    session = backend.get_session()
+    exists = session.execute(text(f"SELECT to_regclass('{PROVENANCE_CLOSURE_TABLE}')")).scalar() is not None
+    _HAS_PROVENANCE_CLOSURE[backend] = exists
+
+    return exists
+
+
+def reset_provenance_closure_cache():
+    """Reset the cache of whether the provenance closure table exists, for all backends.
+
+    This should be called whenever the table may have been created or dropped, such as after a migration.
+    """
+    _HAS_PROVENANCE_CLOSURE.clear()
+
+
+def build_provenance_closure(backend):
+    """Build the provenance closure table, replacing it if it already exists.
+
+    The table is filled in breadth-first order: first with the direct links and then, one depth at a time, with the
+    pairs that extend the pairs of the previous depth by one link. Since a pair is only inserted the first time that it
+    is encountered, its depth is that of the shortest path. The link table is locked for writes while building, such
+    that no link can be missed between filling the table and installing the trigger that maintains it.
+
+    :param backend: the backend whose database to build the closure table for
+    :return: the number of pairs in the closure table
+    """
+    session = backend.get_session()
+
+    try:
+        session.execute(text('LOCK TABLE db_dblink IN SHARE ROW EXCLUSIVE MODE;'))
+        session.execute(text(SQL_DROP))
+        session.execute(text(SQL_CREATE_TABLE))
+        count = session.execute(text(SQL_INSERT_LINKS)).rowcount
+
+        depth = 1
+        while True:
+            inserted = session.execute(text(SQL_INSERT_DEPTH), {'depth': depth}).rowcount
+            if not inserted:
+                break
+            count += inserted
+            depth += 1
+
+        session.execute(text(SQL_CREATE_INDEXES))
+        session.execute(text(SQL_CREATE_TRIGGER))
+    except Exception:
+        session.rollback()
+        raise
+    else:
+        session.commit()
+    finally:
+        reset_provenance_closure_cache()
+
+    return count
+
+
+def drop_provenance_closure(backend):
+    """Drop the provenance closure table and the trigger that maintains it, if they exist.
+
+    :param backend: the backend whose database to drop the closure table from
+    """
+    session = backend.get_session()
+
+    try:
+        session.execute(text(SQL_DROP))
+    except Exception:
+        session.rollback()
+        raise
+    else:
+        session.commit()
+    finally:
+        reset_provenance_closure_cache()
+
+
+def is_provenance_closure_stale(backend, pks_to_delete):
+    """Return whether deleting the given nodes would leave the provenance closure table with stale pairs.
+
+    The pairs of the deleted nodes themselves are removed by the database, but a pair of two surviving nodes may have
+    been connected only through a deleted node, or may have its shortest path running through one. This can only be the
+    case if a deleted node has a ``create`` or ``input_calc`` link to a surviving node, which is what is checked here,
+    so this has to be called before the nodes are deleted.
+
+    :param backend: the backend whose database to check
+    :param pks_to_delete: the pks of the nodes that are to be deleted
+    :return: boolean, True if the closure table exists and has to be rebuilt after the nodes are deleted
+    """
+    if not pks_to_delete or not has_provenance_closure(backend):
+        return False
+
+    session = backend.get_session()
+    return session.execute(text(SQL_STALE), {'pks': tuple(pks_to_delete)}).scalar()
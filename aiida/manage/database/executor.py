@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Execution of database operations in a pool of threads, such that they do not block an event loop.
+
+The database session of the backend is scoped to the thread, so each thread of the pool performs its operations with
+its own session and connection. The database model instances that are loaded by a session are bound to it, however,
+and must not be used in another thread. Therefore, the session of a pool thread is closed after every call, which
+detaches the instances that it loaded, and the instances that are returned by a call have to be attached to the session
+of the calling thread with :meth:`DatabaseExecutor.attach` before they are used.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+
+from sqlalchemy import inspect
+from sqlalchemy.orm.state import InstanceState
+
+__all__ = ('DatabaseExecutor',)
+
+
+class DatabaseExecutor:
+    """Pool of threads that execute database operations for coroutines running on an event loop."""
+
+    def __init__(self, backend, max_workers):
+        """Construct a new executor.
+
+        :param backend: the backend whose database to operate on
+        :param max_workers: the maximum number of threads
+        """
+        self._backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='aiida-database')
+
+    def _call(self, function, *args, **kwargs):
+        """Call the function in a thread of the pool and close the session of that thread afterwards.
+
+        Closing the session detaches the instances that were loaded and returns the connection to the pool, rolling
+        back a transaction that was not committed by the function.
+        """
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._backend.get_session().close()
+
+    async def run(self, function, *args, **kwargs):
+        """Call the function with the given arguments in a thread of the pool and return its result.
+
+        The function should only perform database operations through the session of the thread that it is called in,
+        which is the session returned by the ``get_session`` method of the backend. Database model instances in the
+        result have to be attached to the session of the calling thread with :meth:`attach` before they are used.
+
+        :param function: the function to call
+        :return: the return value of the function
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call, function, *args, **kwargs))
+
+    def attach(self, value):
+        """Attach a database model instance that was loaded in a thread of the pool to the session of this thread.
+
+        If the session already holds an instance with the same identity, that instance is updated with the loaded state
+        and returned instead. Values that are not database model instances are returned unchanged.
+
+        :param value: a value returned by a call to :meth:`run`
+        :return: the attached instance or the unchanged value
+        """
+        if not isinstance(inspect(value, raiseerr=False), InstanceState):
+            return value
+
+        return self._backend.get_session().merge(value, load=False)
+
+    def shutdown(self, wait=True):
+        """Shut down the pool, after which no new calls can be made.
+
+        :param wait: if True, wait for the pending calls to be finished
+        """
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Expression indexes on the values of node attributes and extras.
+
+Filters of the :class:`~aiida.orm.querybuilder.QueryBuilder` on attributes and extras with the ``==``, ``in`` and range
+operators compare the JSONB value at the path of the filter directly with the filter value, for example
+``(db_dbnode.attributes #> '{exit_status}') = '0'``. That expression can use a B-tree index on the JSONB value at the
+path, which is what the indexes created by this module are. The indexes of the attributes that are filtered on by the
+engine, listed in :data:`ENGINE_ATTRIBUTE_INDEXES`, are created by the schema migrations. Indexes for other attributes
+and extras can be created with :func:`create_attribute_index`, or ``verdi database index create``.
+
+An index is identified by the projection of the attribute or extra that it covers, for example
+``attributes.exit_status``, which is stored as the comment of the index. Note that a B-tree index cannot hold values
+larger than about a third of a database page, so an index should only be created for paths with small values.
+"""
+import collections
+import hashlib
+import re
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import column, text
+
+from aiida.common import exceptions
+
+__all__ = (
+    'ENGINE_ATTRIBUTE_INDEXES', 'AttributeIndex', 'get_attribute_indexes', 'create_attribute_index',
+    'drop_attribute_index', 'suggest_attribute_indexes'
+)
+
+# The projections of the attributes that the engine filters on, whose indexes are created by the schema migrations
+ENGINE_ATTRIBUTE_INDEXES = (
+    'attributes.process_state', 'attributes.exit_status', 'attributes.sealed', 'attributes.process_label'
+)
+
+INDEXABLE_COLUMNS = ('attributes', 'extras')
+
+# Operators of filters that can use an attribute index, see `BackendQueryBuilder.get_filter_expr_from_jsonb`
+INDEXABLE_OPERATORS = ('==', 'in', '>', '<', '>=', '=>', '<=', '=<')
+
+# The maximum length of an identifier in PostgreSQL
+MAX_INDEX_NAME_LENGTH = 63
+
+AttributeIndex = collections.namedtuple('AttributeIndex', ['projection', 'name', 'size', 'scans', 'valid'])
+
+SQL_LIST_INDEXES = """
+SELECT obj_description(i.indexrelid, 'pg_class') AS projection, c.relname AS name,
+    pg_relation_size(i.indexrelid) AS size, COALESCE(s.idx_scan, 0) AS scans, i.indisvalid AS valid
+FROM pg_index AS i
+JOIN pg_class AS c ON c.oid = i.indexrelid
+LEFT JOIN pg_stat_user_indexes AS s ON s.indexrelid = i.indexrelid
+WHERE i.indrelid = 'db_dbnode'::regclass AND obj_description(i.indexrelid, 'pg_class') ~ '^(attributes|extras)\\.'
+ORDER BY projection;
+"""
+
+
+def parse_projection(projection):
+    """Parse the projection of an attribute or extra into the name of the column and the path in it.
+
+    :param projection: the projection, for example ``attributes.exit_status``
+    :return: tuple of the name of the column and the path as a tuple of keys
+    :raises ValueError: if the projection is not that of an attribute or extra, or a key contains other characters
+        than letters, digits, underscores and dashes
+    """
+    column_name, _, path = projection.partition('.')
+
+    if column_name not in INDEXABLE_COLUMNS or not path:
+        raise ValueError(f'`{projection}` is not the projection of an attribute or extra, e.g. `attributes.key`')
+
+    keys = tuple(path.split('.'))
+
+    if not all(re.match(r'^[a-zA-Z0-9_-]+$', key) for key in keys):
+        raise ValueError(f'the keys in `{projection}` can only contain letters, digits, underscores and dashes')
+
+    return column_name, keys
+
+
+def get_attribute_index_name(projection):
+    """Return the name of the index for the given projection of an attribute or extra.
+
+    The name is derived from the path, with a suffix derived from the hash of the projection if the path contains
+    dashes or capitals, which would have to be quoted in an identifier, or if the name would be too long.
+
+    :param projection: the projection, for example ``attributes.exit_status``
+    :return: the name of the index
+    """
+    column_name, path = parse_projection(projection)
+    name = f"ix_db_dbnode_{column_name}_{'_'.join(path)}"
+    sanitized = re.sub(r'[^a-z0-9_]', '_', name.lower())
+
+    if sanitized == name and len(name) <= MAX_INDEX_NAME_LENGTH:
+        return name
+
+    suffix = hashlib.sha256(projection.encode('utf-8')).hexdigest()[:8]
+    return f'{sanitized[:MAX_INDEX_NAME_LENGTH - len(suffix) - 1]}_{suffix}'
+
+
+def get_attribute_index_expression(projection):
+    """Return the SQL of the expression that is indexed for the given projection of an attribute or extra.
+
+    This is exactly how the value at the path is selected in the filters of the `QueryBuilder`, since an expression
+    index can only be used by queries that contain the same expression.
+
+    :param projection: the projection, for example ``attributes.exit_status``
+    :return: the SQL of the expression
+    """
+    column_name, path = parse_projection(projection)
+    expression = column(column_name, JSONB)[path]
+
+    return str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+
+
+def get_attribute_indexes(backend):
+    """Return the indexes on attributes and extras in the database of the given backend.
+
+    :param backend: the backend whose database to check
+    :return: list of `AttributeIndex` tuples with the projection and name of each index, its size in bytes, the number
+        of scans that used it since the statistics were last reset and whether it is valid
+    """
+    session = backend.get_session()
+    return [AttributeIndex(*row) for row in session.execute(text(SQL_LIST_INDEXES))]
+
+
+def create_attribute_index(backend, projection, concurrently=True):
+    """Create an index on the values of an attribute or extra, if it does not already exist.
+
+    :param backend: the backend whose database to create the index in
+    :param projection: the projection of the attribute or extra, for example ``attributes.energy``
+    :param concurrently: if True, create the index without locking the node table for writes, which takes longer
+    :return: the name of the index
+    """
+    name = get_attribute_index_name(projection)
+    expression = get_attribute_index_expression(projection)
+
+    session = backend.get_session()
+
+    # An index whose concurrent creation failed is left behind as invalid and has to be created again
+    if any(index.name == name and not index.valid for index in get_attribute_indexes(backend)):
+        _drop_index(session, name)
+    else:
+        session.commit()
+
+    if concurrently:
+        # An index cannot be created concurrently within a transaction, so a connection in autocommit mode is used
+        with session.bind.connect() as connection:
+            connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+            connection.execute(text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON db_dbnode (({expression}));'))
+            connection.execute(text(f"COMMENT ON INDEX {name} IS '{projection}';"))
+        return name
+
+    try:
+        session.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON db_dbnode (({expression}));'))
+        session.execute(text(f"COMMENT ON INDEX {name} IS '{projection}';"))
+    except Exception:
+        session.rollback()
+        raise
+    else:
+        session.commit()
+
+    return name
+
+
+def drop_attribute_index(backend, projection):
+    """Drop the index on the values of an attribute or extra.
+
+    :param backend: the backend whose database to drop the index from
+    :param projection: the projection of the attribute or extra, for example ``attributes.energy``
+    :raises ValueError: if the index is one of the indexes used by the engine, which are managed by the migrations
+    :raises `~aiida.common.exceptions.NotExistent`: if the index does not exist
+    """
+    if projection in ENGINE_ATTRIBUTE_INDEXES:
+        raise ValueError(f'the index on `{projection}` is used by the engine and cannot be dropped')
+
+    name = get_attribute_index_name(projection)
+
+    if not any(index.name == name for index in get_attribute_indexes(backend)):
+        raise exceptions.NotExistent(f'there is no index on `{projection}`')
+
+    _drop_index(backend.get_session(), name)
+
+
+def _drop_index(session, name):
+    """Drop the index with the given name and commit.
+
+    :param session: the session to drop the index with
+    :param name: the name of the index
+    """
+    try:
+        session.execute(text(f'DROP INDEX {name};'))
+    except Exception:
+        session.rollback()
+        raise
+    else:
+        session.commit()
+
+
+def suggest_attribute_indexes(builder):
+    """Return the attributes and extras of nodes that are filtered on by the query of a `QueryBuilder` without index.
+
+    Only the filters that can use an index are considered, which are those that compare the value of an attribute or
+    extra with the ``==``, ``in`` or range operators with a boolean, number or string, and that are not negated.
+
+    :param builder: the :class:`~aiida.orm.querybuilder.QueryBuilder` instance
+    :return: sorted list of the projections of the attributes and extras for which an index could be created
+    """
+    # pylint: disable=protected-access
+    from aiida.manage.manager import get_manager
+
+    projections = set()
+
+    for tag, filters in builder._filters.items():
+        alias = builder.tag_to_alias_map.get(tag, None)
+        if alias is not None and builder._impl.get_table_name(alias) == 'db_dbnode':
+            projections.update(_get_indexable_projections(filters))
+
+    indexed = {index.projection for index in get_attribute_indexes(get_manager().get_backend()) if index.valid}
+
+    return sorted(projections - indexed)
+
+
+def _get_indexable_projections(filters):
+    """Return the projections of attributes and extras in the given filters of a tag whose filter can use an index.
+
+    :param filters: the filters of a tag, a dictionary of projections or logical operators onto filter specifications
+    :return: set of projections
+    """
+    from aiida.orm.implementation.querybuilder import is_jsonb_comparable
+
+    projections = set()
+
+    for key, specification in filters.items():
+        if key in ('and', 'or'):
+            for sub_filters in specification:
+                projections.update(_get_indexable_projections(sub_filters))
+            continue
+
+        try:
+            parse_projection(key)
+        except ValueError:
+            continue
+
+        if not isinstance(specification, dict):
+            specification = {'==': specification}
+
+        operations = list(specification.items())
+
+        while operations:
+            operator, value = operations.pop()
+            if operator in ('and', 'or'):
+                operations.extend(item for operation in value for item in operation.items())
+            elif operator in INDEXABLE_OPERATORS:
+                values = value if operator == 'in' else [value]
+                if all(is_jsonb_comparable(entry) for entry in values):
+                    projections.add(key)
+
+    return projections
@@ -18,7 +18,10 @@ import plumpy
 
 from aiida.common.extendeddicts import AttributeDict
 
-__all__ = ('RemoteException', 'CommunicationTimeout', 'DeliveryFailed', 'ProcessLauncher', 'BROKER_DEFAULTS')
+__all__ = (
+    'RemoteException', 'CommunicationTimeout', 'DeliveryFailed', 'ProcessLauncher', 'RemoteProcessThreadController',
+    'BROKER_DEFAULTS'
+)
 
 # The following statement enables support for RabbitMQ 3.5 because without it, connections established by `aiormq` will
 # fail because the interpretation of the types of integers passed in connection parameters has changed after that
@@ -130,13 +133,65 @@ def _store_inputs(inputs):
                 _store_inputs(node)
 
 
+class RemoteProcessThreadController(plumpy.RemoteProcessThreadController):
+    """A sub class of `plumpy.RemoteProcessThreadController` that can send a slot request along with a continue task.
+
+    The slot request determines the priority and fair share of the process in the daemon worker that takes the task,
+    see :py:class:`aiida.manage.external.rmq.ProcessLauncher`.
+    """
+
+    def continue_process(self, pid, tag=None, nowait=False, no_reply=False, slot_request=None):  # pylint: disable=arguments-differ,too-many-arguments
+        """Send a task to continue the process.
+
+        :param pid: the pid of the process to continue
+        :param tag: the tag of the checkpoint to continue from
+        :param nowait: if True the task is completed as soon as the process is continued, otherwise once it terminates
+        :param no_reply: if True do not wait for a reply
+        :param slot_request: the keyword arguments of the :class:`aiida.engine.daemon.slots.SlotRequest` of the process
+        """
+        message = plumpy.create_continue_body(pid=pid, tag=tag, nowait=nowait)
+
+        if slot_request is not None:
+            message[plumpy.process_comms.TASK_ARGS]['slot_request'] = slot_request
+
+        return self.task_send(message, no_reply=no_reply)
+
+
 class ProcessLauncher(plumpy.ProcessLauncher):
     """A sub class of `plumpy.ProcessLauncher` to launch a `Process`.
 
     It overrides the _continue method to make sure the node corresponding to the task can be loaded and
-    that if it is already marked as terminated, it is not continued but the future is reconstructed and returned
+    that if it is already marked as terminated, it is not continued but the future is reconstructed and returned.
+    It also keeps count of the processes that it is currently running, which is the load of a daemon worker.
+
+    If it is given process slots, a process is only continued once it has been allocated a slot, in the order of the
+    priority and fair share of the slot requests that are sent along with the tasks, see
+    :py:mod:`aiida.engine.daemon.slots`.
     """
 
+    def __init__(self, *args, slots=None, **kwargs):
+        """Construct the launcher.
+
+        :param slots: optional :class:`aiida.engine.daemon.slots.ProcessSlots` that are allocated to the processes
+        """
+        super().__init__(*args, **kwargs)
+        self._num_active_processes = 0
+        self._slots = slots
+        self._slot_requests = {}
+
+    @property
+    def num_active_processes(self):
+        """Return the number of processes that were continued by this launcher and that are still running."""
+        return self._num_active_processes
+
+    def get_slot_request(self, pid):
+        """Return the slot request of a process that was continued by this launcher and that is still running.
+
+        :param pid: the pid of the process
+        :return: the :class:`aiida.engine.daemon.slots.SlotRequest` or None if the process is not running
+        """
+        return self._slot_requests.get(pid, None)
+
     @staticmethod
     def handle_continue_exception(node, exception, message):
         """Handle exception raised in `_continue` call.
@@ -158,7 +213,7 @@ class ProcessLauncher(plumpy.ProcessLauncher):
             node.set_process_state(ProcessState.EXCEPTED)
             node.seal()
 
-    async def _continue(self, communicator, pid, nowait, tag=None):
+    async def _continue(self, communicator, pid, nowait, tag=None, slot_request=None):  # pylint: disable=arguments-differ
         """Continue the task.
 
         Note that the task may already have been completed, as indicated from the corresponding the node, in which
@@ -170,14 +225,21 @@ class ProcessLauncher(plumpy.ProcessLauncher):
         :param nowait: if True don't wait for the process to finish, just return the pid, otherwise wait and
             return the results
         :param tag: the tag of the checkpoint to continue from
+        :param slot_request: the keyword arguments of the :class:`aiida.engine.daemon.slots.SlotRequest` of the process
+        :raises `kiwipy.TaskRejected`: if the process is a workflow that could not be allocated a slot, such that the
+            task is requeued and can be taken by another worker
         """
+        from kiwipy import TaskRejected
+        from aiida.engine.daemon.slots import SlotRequest
         from aiida.common import exceptions
         from aiida.engine.exceptions import PastException
+        from aiida.engine.utils import is_process_terminated
         from aiida.orm import load_node, Data
         from aiida.orm.utils import serialize
 
         try:
-            node = load_node(pk=pid)
+            # The state is queried without blocking the event loop, since the node is only needed if it is terminated
+            is_terminated = await is_process_terminated(pid)
         except (exceptions.MultipleObjectsError, exceptions.NotExistent) as exception:
             # In this case, the process node corresponding to the process id, cannot be resolved uniquely or does not
             # exist. The latter being the most common case, where someone deleted the node, before the process was
@@ -187,8 +249,9 @@ class ProcessLauncher(plumpy.ProcessLauncher):
             LOGGER.exception('Cannot continue process<%d>', pid)
             return False
 
-        if node.is_terminated:
+        if is_terminated:
 
+            node = load_node(pk=pid)
             LOGGER.info('not continuing process<%d> which is already terminated with state %s', pid, node.process_state)
 
             future = Future()
@@ -202,16 +265,31 @@ class ProcessLauncher(plumpy.ProcessLauncher):
 
             return future.result()
 
+        request = SlotRequest(pid, **(slot_request or {}))
+
+        if self._slots is not None and not await self._slots.acquire(request):
+            LOGGER.info('rejecting task: no slot available for workflow<%d>', pid)
+            raise TaskRejected(f'no slot available for workflow<{pid}>')
+
+        self._num_active_processes += 1
+        self._slot_requests[pid] = request
+
         try:
             result = await super()._continue(communicator, pid, nowait, tag)
         except ImportError as exception:
             message = 'the class of the process could not be imported.'
-            self.handle_continue_exception(node, exception, message)
+            self.handle_continue_exception(load_node(pk=pid), exception, message)
             raise
         except Exception as exception:
             message = 'failed to recreate the process instance in order to continue it.'
-            self.handle_continue_exception(node, exception, message)
+            self.handle_continue_exception(load_node(pk=pid), exception, message)
             raise
+        finally:
+            self._num_active_processes -= 1
+            self._slot_requests.pop(pid, None)
+
+            if self._slots is not None:
+                self._slots.release(request)
 
         # Ensure that the result is serialized such that communication thread won't have to do database operations
         try:
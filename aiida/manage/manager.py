@@ -15,15 +15,16 @@ from typing import Any, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from kiwipy.rmq import RmqThreadCommunicator
-    from plumpy.process_comms import RemoteProcessThreadController
 
     from aiida.backends.manager import BackendManager
     from aiida.engine.daemon.client import DaemonClient
     from aiida.engine.runners import Runner
     from aiida.manage.configuration.config import Config
     from aiida.manage.configuration.profile import Profile
+    from aiida.manage.database.executor import DatabaseExecutor
     from aiida.orm.implementation import Backend
     from aiida.engine.persistence import AiiDAPersister
+    from aiida.manage.external.rmq import ProcessLauncher, RemoteProcessThreadController
 
 __all__ = ('get_manager', 'reset_manager')
 
@@ -54,6 +55,8 @@ class Manager:
         self._process_controller: Optional['RemoteProcessThreadController'] = None
         self._persister: Optional['AiiDAPersister'] = None
         self._runner: Optional['Runner'] = None
+        self._process_launcher: Optional['ProcessLauncher'] = None
+        self._database_executor: Optional['DatabaseExecutor'] = None
 
     def close(self) -> None:
         """Reset the global settings entirely and release any global objects."""
@@ -61,6 +64,8 @@ class Manager:
             self._communicator.close()
         if self._runner is not None:
             self._runner.stop()
+        if self._database_executor is not None:
+            self._database_executor.shutdown(wait=False)
 
         self._backend = None
         self._backend_manager = None
@@ -71,6 +76,8 @@ class Manager:
         self._process_controller = None
         self._persister = None
         self._runner = None
+        self._process_launcher = None
+        self._database_executor = None
 
     @staticmethod
     def get_config() -> 'Config':
@@ -99,6 +106,10 @@ class Manager:
         manager.reset_backend_environment()
         self._backend = None
 
+        if self._database_executor is not None:
+            self._database_executor.shutdown(wait=False)
+            self._database_executor = None
+
     def _load_backend(self, schema_check: bool = True) -> 'Backend':
         """Load the backend for the currently configured profile and return it.
 
@@ -189,6 +200,20 @@ class Manager:
 
         return self._backend
 
+    def get_database_executor(self) -> 'DatabaseExecutor':
+        """Return the executor that performs the database operations of coroutines in a pool of threads.
+
+        :return: the database executor
+
+        """
+        from aiida.manage.database.executor import DatabaseExecutor
+
+        if self._database_executor is None:
+            max_workers = self.get_config().get_option('db.async_workers', self.get_profile().name)
+            self._database_executor = DatabaseExecutor(self.get_backend(), max_workers)
+
+        return self._database_executor
+
     def get_persister(self) -> 'AiiDAPersister':
         """Return the persister
 
@@ -236,7 +261,10 @@ class Manager:
             )
 
         if task_prefetch_count is None:
-            task_prefetch_count = self.get_config().get_option('daemon.worker_process_slots', profile.name)
+            # A daemon worker takes a number of tasks on top of its slots, that wait for a slot in order of priority
+            process_slots = self.get_config().get_option('daemon.worker_process_slots', profile.name)
+            waiting_tasks = self.get_config().get_option('daemon.worker_waiting_tasks', profile.name)
+            task_prefetch_count = process_slots + waiting_tasks
 
         prefix = profile.rmq_prefix
 
@@ -284,12 +312,20 @@ class Manager:
         :return: the process controller instance
 
         """
-        from plumpy.process_comms import RemoteProcessThreadController
+        from aiida.manage.external.rmq import RemoteProcessThreadController
         if self._process_controller is None:
             self._process_controller = RemoteProcessThreadController(self.get_communicator())
 
         return self._process_controller
 
+    def get_process_launcher(self) -> Optional['ProcessLauncher']:
+        """Return the process launcher that receives the process tasks of the last created daemon runner.
+
+        :return: the process launcher instance, or None if no daemon runner was created
+
+        """
+        return self._process_launcher
+
     def get_runner(self, **kwargs) -> 'Runner':
         """Return a runner that is based on the current profile settings and can be used globally by the code.
 
@@ -355,21 +391,37 @@ class Manager:
         """
         from plumpy.persistence import LoadSaveContext
         from aiida.engine import persistence
+        from aiida.engine.daemon.slots import ProcessSlots
+        from aiida.engine.processes.calcjobs.status_cache import JobStatusCache
         from aiida.manage.external import rmq
 
-        runner = self.create_runner(rmq_submit=True, loop=loop)
+        # The daemon workers share the status of the jobs with their scheduler, such that it is polled only once
+        job_status_cache = JobStatusCache(self.get_profile().filepaths['daemon']['job_status'])
+        runner = self.create_runner(rmq_submit=True, loop=loop, job_status_cache=job_status_cache)
         runner_loop = runner.loop
 
+        # The process slots are allocated by priority and fair share, while reserving some for processes that are not
+        # workflows, such that workflows cannot occupy all slots while waiting for the processes they submitted.
+        config = self.get_config()
+        profile_name = self.get_profile().name
+        slots = ProcessSlots(
+            num_slots=config.get_option('daemon.worker_process_slots', profile_name),
+            reserved_slots=config.get_option('daemon.worker_reserved_slots', profile_name),
+            max_waiting_workflows=config.get_option('daemon.worker_waiting_tasks', profile_name),
+        )
+
         # Listen for incoming launch requests
         task_receiver = rmq.ProcessLauncher(
             loop=runner_loop,
             persister=self.get_persister(),
             load_context=LoadSaveContext(runner=runner),
-            loader=persistence.get_object_loader()
+            loader=persistence.get_object_loader(),
+            slots=slots,
         )
 
         assert runner.communicator is not None, 'communicator not set for runner'
         runner.communicator.add_task_subscriber(task_receiver)
+        self._process_launcher = task_receiver
 
         return runner
 
@@ -46,6 +46,12 @@ class Computer(entities.Entity):
     PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL__DEFAULT = 10.  # pylint: disable=invalid-name
     PROPERTY_WORKDIR = 'workdir'
     PROPERTY_SHEBANG = 'shebang'
+    PROPERTY_UPLOAD_CACHE_DIRECTORY = 'upload_cache_directory'
+    PROPERTY_UPLOAD_CACHE_MODE = 'upload_cache_mode'
+    PROPERTY_UPLOAD_CACHE_MODE__DEFAULT = 'copy'  # pylint: disable=invalid-name
+    UPLOAD_CACHE_MODES = ('copy', 'hardlink', 'symlink')
+    PROPERTY_USE_ARCHIVE_RETRIEVAL = 'use_archive_retrieval'
+    PROPERTY_USE_ARCHIVE_UPLOAD = 'use_archive_upload'
 
     class Collection(entities.Collection):
         """The collection of Computer entries."""
@@ -577,6 +583,99 @@ class Computer(entities.Entity):
         metadata['shebang'] = val
         self.metadata = metadata
 
+    def get_upload_cache_directory(self):
+        """
+        Get the directory on the remote in which the upload cache stores the objects it has already uploaded.
+
+        The directory may contain the ``{username}`` replacement field, just like the working directory.
+
+        :return: the directory of the upload cache or None if the upload cache is not enabled for this computer
+        :rtype: str
+        """
+        return self.get_property(self.PROPERTY_UPLOAD_CACHE_DIRECTORY, None)
+
+    def set_upload_cache_directory(self, val):
+        """
+        Set the directory on the remote in which the upload cache stores the objects it has already uploaded.
+
+        Setting a directory enables the upload cache for this computer. Accepts None to disable it.
+
+        :param str val: an absolute path, which may contain the ``{username}`` replacement field
+        """
+        if val is None:
+            self.delete_property(self.PROPERTY_UPLOAD_CACHE_DIRECTORY, raise_exception=False)
+            return
+
+        self._workdir_validator(val)
+        self.set_property(self.PROPERTY_UPLOAD_CACHE_DIRECTORY, val)
+
+    def get_upload_cache_mode(self):
+        """
+        Get the mode with which objects of the upload cache are placed in the working directory of a calculation.
+
+        :return: one of the values in ``UPLOAD_CACHE_MODES``
+        :rtype: str
+        """
+        return self.get_property(self.PROPERTY_UPLOAD_CACHE_MODE, self.PROPERTY_UPLOAD_CACHE_MODE__DEFAULT)
+
+    def set_upload_cache_mode(self, val):
+        """
+        Set the mode with which objects of the upload cache are placed in the working directory of a calculation.
+
+        With ``copy`` the object is copied on the remote, which is always safe. With ``hardlink`` or ``symlink`` no
+        additional disk space is used, but the cached objects are made read-only, so the codes that are run should not
+        attempt to modify their input files in place.
+
+        :param str val: one of the values in ``UPLOAD_CACHE_MODES``
+        """
+        if val not in self.UPLOAD_CACHE_MODES:
+            raise ValueError(f'{val} is invalid. The upload cache mode has to be one of {self.UPLOAD_CACHE_MODES}')
+        self.set_property(self.PROPERTY_UPLOAD_CACHE_MODE, val)
+
+    def get_use_archive_retrieval(self):
+        """
+        Return whether the output files of calculations are retrieved through a single compressed tar stream.
+
+        :return: True if the archive retrieval is enabled, False otherwise
+        :rtype: bool
+        """
+        return self.get_property(self.PROPERTY_USE_ARCHIVE_RETRIEVAL, False)
+
+    def set_use_archive_retrieval(self, val):
+        """
+        Set whether the output files of calculations are retrieved through a single compressed tar stream.
+
+        This requires ``tar`` and ``gzip`` on the remote, but replaces the many file transfers of the retrieval by a
+        single command, which is much faster for calculations that produce many small files.
+
+        :param bool val: True to enable the archive retrieval, False to disable it
+        """
+        if not isinstance(val, bool):
+            raise TypeError('the value of use_archive_retrieval must be a boolean')
+        self.set_property(self.PROPERTY_USE_ARCHIVE_RETRIEVAL, val)
+
+    def get_use_archive_upload(self):
+        """
+        Return whether the input files of calculations are uploaded through a single compressed tar stream.
+
+        :return: True if the archive upload is enabled, False otherwise
+        :rtype: bool
+        """
+        return self.get_property(self.PROPERTY_USE_ARCHIVE_UPLOAD, False)
+
+    def set_use_archive_upload(self, val):
+        """
+        Set whether the input files of calculations are uploaded through a single compressed tar stream.
+
+        This requires ``tar``, ``gzip`` and ``sha256sum`` on the remote. If the upload through the archive fails, the
+        files are uploaded one by one instead.
+
+        :param bool val: True to enable the archive upload, False to disable it
+        """
+        if not isinstance(val, bool):
+            raise TypeError('the value of use_archive_upload must be a boolean')
+        self.set_property(self.PROPERTY_USE_ARCHIVE_UPLOAD, val)
+
     def get_authinfo(self, user):
         """
         Return the aiida.orm.authinfo.AuthInfo instance for the
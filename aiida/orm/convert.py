@@ -14,6 +14,7 @@ from functools import singledispatch
 
 from aiida.orm.implementation import BackendComputer, BackendGroup, BackendUser, BackendAuthInfo, BackendComment, \
     BackendLog, BackendNode
+from aiida.orm.implementation.querybuilder import NodeRow
 
 
 @singledispatch
@@ -101,6 +102,12 @@ def _(backend_entity):
     return node_class.from_backend_entity(backend_entity)
 
 
+@get_orm_entity.register(NodeRow)
+def _(backend_entity):
+    from .nodes.view import NodeView
+    return NodeView(*backend_entity)
+
+
 class ConvertIterator(Iterator, Sized):
     """
     Iterator that converts backend entities into frontend ORM entities as needed
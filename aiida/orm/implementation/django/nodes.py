@@ -216,6 +216,18 @@ class DjangoNode(entities.DjangoModelEntity[models.DbNode], BackendNode):
 
         return self
 
+    async def store_async(self, links=None, clean=True):
+        """Store the node in the database, with the database operations performed by the database executor.
+
+        The Django model instances are not bound to the thread that created them, so the node is simply stored by
+        calling :meth:`store` in a thread of the executor, which uses a database connection of its own.
+
+        :param links: optional links to add before storing
+        :param clean: boolean, if True, will clean the attributes and extras before attempting to store
+        """
+        from aiida.manage.manager import get_manager
+        return await get_manager().get_database_executor().run(self.store, links, clean=clean)
+
 
 class DjangoNodeCollection(BackendNodeCollection):
     """The collection of Node entries."""
@@ -96,6 +96,22 @@ class BackendNode(BackendEntity, BackendEntityExtrasMixin, BackendEntityAttribut
         """
         self._dbmodel.description = value
 
+    @property
+    def hash(self):
+        """Return the hash of the node, as stored in the dedicated indexed column.
+
+        :return: the hash or None
+        """
+        return self._dbmodel.hash
+
+    @hash.setter
+    def hash(self, value):
+        """Set the hash of the node, in the dedicated indexed column.
+
+        :param value: the new value to set
+        """
+        self._dbmodel.hash = value
+
     @abc.abstractproperty
     def computer(self):
         """Return the computer of this node.
@@ -165,6 +181,16 @@ class BackendNode(BackendEntity, BackendEntityExtrasMixin, BackendEntityAttribut
         :param clean: boolean, if True, will clean the attributes and extras before attempting to store
         """
 
+    @abc.abstractmethod
+    async def store_async(self, links=None, clean=True):
+        """Store the node in the database, with the database operations performed by the database executor.
+
+        The node is stored in a transaction of its own, such that the event loop is not blocked while it is committed.
+
+        :param links: optional links to add before storing
+        :param clean: boolean, if True, will clean the attributes and extras before attempting to store
+        """
+
 
 class BackendNodeCollection(BackendCollection[BackendNode]):
     """The collection of `BackendNode` entries."""
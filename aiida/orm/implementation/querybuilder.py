@@ -16,9 +16,14 @@ not go through SqlAlchemy, this class will have to be refactored. The SqlAlchemy
 likely be moved to a `SqlAlchemyBasedQueryBuilder` class and restore this abstract class to being a pure agnostic one.
 """
 import abc
+import collections
+import math
 import uuid
 
 # pylint: disable=no-name-in-module, import-error
+from sqlalchemy import and_, func, inspect, type_coerce
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.state import InstanceState
 from sqlalchemy_utils.types.choice import Choice
 from sqlalchemy.types import Integer, Float, Boolean, DateTime
 from sqlalchemy.dialects.postgresql import JSONB
@@ -29,6 +34,39 @@ from aiida.common.exceptions import InputValidationError
 
 __all__ = ('BackendQueryBuilder',)
 
+# Filter operators that can be expressed as a comparison of JSONB values, see `get_filter_expr_from_jsonb`
+JSONB_COMPARISON_OPERATORS = ('==', 'in', '>', '<', '>=', '=>', '<=', '=<')
+
+# The values of the columns of a node, which are returned instead of a backend node by `get_aiida_res` with `proxy=True`
+NodeRow = collections.namedtuple(
+    'NodeRow',
+    ['pk', 'uuid', 'node_type', 'process_type', 'label', 'description', 'ctime', 'mtime', 'attributes', 'extras']
+)
+
+
+def get_jsonb_type(value):
+    """Return the JSON type of a value, as returned by the `jsonb_typeof` function of PostgreSQL.
+
+    :param value: a boolean, number or string
+    :returns: the name of the JSON type
+    """
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    return 'string'
+
+
+def is_jsonb_comparable(value):
+    """Return whether a filter value can be compared with the JSONB value of an attribute or extra as is.
+
+    :param value: the filter value
+    :returns: True if the value is a boolean, string, integer or finite float
+    """
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return isinstance(value, (bool, int, str))
+
 
 class BackendQueryBuilder:
     """Backend query builder interface"""
@@ -144,6 +182,44 @@ class BackendQueryBuilder:
         :returns: An instance of sqlalchemy.sql.elements.BinaryExpression
         """
 
+    @staticmethod
+    def get_filter_expr_from_jsonb(operator, value, database_entity):
+        """Return an expression that compares the JSONB value at a path directly with the given value, if possible.
+
+        Unlike the expressions that cast the value at the path to the type of the given value, this expression can use
+        an index on the value at the path, see :mod:`aiida.manage.database.indexes`. JSONB values of different types are
+        never equal, so only the range comparisons need an explicit check of the type. The expression is false instead
+        of null if the path does not exist, such that its negation matches those rows, like the expressions with casts.
+
+        :param operator: the operator, without negation
+        :param value: the value to compare with
+        :param database_entity: the expression of the JSONB value at the path
+        :returns: the filter expression, or None if the operator and value cannot be compared with JSONB values
+        """
+        values = value if operator == 'in' else [value]
+
+        if operator not in JSONB_COMPARISON_OPERATORS or not all(is_jsonb_comparable(entry) for entry in values):
+            return None
+
+        values = [type_coerce(entry, JSONB) for entry in values]
+
+        if operator == '==':
+            expr = database_entity == values[0]
+        elif operator == 'in':
+            expr = database_entity.in_(values)
+        else:
+            if operator == '>':
+                expr = database_entity > values[0]
+            elif operator == '<':
+                expr = database_entity < values[0]
+            elif operator in ('>=', '=>'):
+                expr = database_entity >= values[0]
+            else:
+                expr = database_entity <= values[0]
+            expr = and_(func.jsonb_typeof(database_entity) == get_jsonb_type(value), expr)
+
+        return and_(database_entity.isnot(None), expr)
+
     @classmethod
     def get_corresponding_properties(cls, entity_table, given_properties, mapper):
         """
@@ -247,13 +323,14 @@ class BackendQueryBuilder:
             raise InputValidationError(f'Unkown casting key {cast}')
         return entity
 
-    def get_aiida_res(self, res):
+    def get_aiida_res(self, res, proxy=False):
         """
         Some instance returned by ORM (django or SA) need to be converted
         to AiiDA instances (eg nodes). Choice (sqlalchemy_utils)
         will return their value
 
         :param res: the result returned by the query
+        :param bool proxy: if True, return a `NodeRow` with the values of the columns for a node instead of a backend node
 
         :returns: an aiida-compatible instance
         """
@@ -263,6 +340,12 @@ class BackendQueryBuilder:
         if isinstance(res, uuid.UUID):
             return str(res)
 
+        if proxy and isinstance(res, self.Node):
+            return NodeRow(
+                res.id, str(res.uuid), res.node_type, res.process_type, res.label, res.description, res.ctime,
+                res.mtime, res.attributes, res.extras
+            )
+
         try:
             return self._backend.get_backend_entity(res)
         except TypeError:
@@ -304,37 +387,92 @@ class BackendQueryBuilder:
             self.get_session().close()
             raise
 
-    def iterall(self, query, batch_size, tag_to_index_dict):
+    def stream(self, query, batch_size, attach=True):
+        """Execute the query with a server-side cursor on a connection of its own and yield the rows one by one.
+
+        The rows are fetched from a named cursor in batches of ``batch_size``, such that at most one batch of rows is
+        held in memory. Since the cursor lives in a transaction of its own, the session of this thread can be committed
+        while iterating over the rows, which would invalidate the cursor of a query that is executed by the session
+        itself. As a consequence, the rows do not reflect any changes of the session of this thread that have not been
+        committed yet, not even those that would be flushed by the autoflush of a normal query.
+
+        The database model instances in a row are loaded by a separate session and are expunged from it before the row
+        is yielded, such that the separate session does not hold any of them. Unless ``attach`` is False, they are then
+        merged into the session of this thread, such that they can be modified and stored. That session keeps them in
+        its identity map, which only holds weak references to instances without pending changes, so the instances are
+        not detached and are released only once the caller no longer references them.
+
+        :param query: the query to execute
+        :param int batch_size: number of rows to fetch from the cursor per step
+        :param bool attach: if False, the database model instances are yielded detached from any session
+        :returns: a generator of the rows, where rows of multiple projections are tuples
+        """
+        session = self.get_session()
+        connection = session.get_bind().connect()
+        stream_session = Session(bind=connection, autoflush=False)
+
+        def _attach(value):
+            if not isinstance(inspect(value, raiseerr=False), InstanceState):
+                return value
+
+            stream_session.expunge(value)
+            return session.merge(value, load=False) if attach else value
+
+        try:
+            for row in query.with_session(stream_session).yield_per(batch_size):
+                if isinstance(row, tuple):
+                    yield tuple(_attach(value) for value in row)
+                else:
+                    yield _attach(row)
+        finally:
+            stream_session.close()
+            connection.close()
+
+    def iterall(self, query, batch_size, tag_to_index_dict, stream=False, proxy=False):  # pylint: disable=too-many-arguments
         """
+        :param bool stream: if True, execute the query with :meth:`stream`
+        :param bool proxy: if True, nodes are returned as a `NodeRow` instead of a backend node
         :return: An iterator over all the results of a list of lists.
         """
         try:
             if not tag_to_index_dict:
                 raise Exception(f'Got an empty dictionary: {tag_to_index_dict}')
 
-            results = query.yield_per(batch_size)
-
-            if len(tag_to_index_dict) == 1:
-                # Sqlalchemy, for some strange reason, does not return a list of lsits
-                # if you have provided an ormclass
-
-                if list(tag_to_index_dict.values()) == ['*']:
-                    for rowitem in results:
-                        yield [self.get_aiida_res(rowitem)]
-                else:
-                    for rowitem, in results:
-                        yield [self.get_aiida_res(rowitem)]
-            elif len(tag_to_index_dict) > 1:
-                for resultrow in results:
-                    yield [self.get_aiida_res(rowitem) for colindex, rowitem in enumerate(resultrow)]
-            else:
-                raise ValueError('Got an empty dictionary')
+            results = self.stream(query, batch_size, attach=not proxy) if stream else query.yield_per(batch_size)
+            yield from self.iterall_results(results, tag_to_index_dict, proxy=proxy)
         except Exception:
             self.get_session().close()
             raise
 
-    def iterdict(self, query, batch_size, tag_to_projected_properties_dict, tag_to_alias_map):
+    def iterall_results(self, results, tag_to_index_dict, proxy=False):
+        """Convert the rows that were returned by executing a query, as is done by :meth:`iterall`.
+
+        :param results: an iterable over the rows returned by the query
+        :param bool proxy: if True, nodes are returned as a `NodeRow` instead of a backend node
+        :return: An iterator over all the results of a list of lists.
+        """
+        if len(tag_to_index_dict) == 1:
+            # Sqlalchemy, for some strange reason, does not return a list of lsits
+            # if you have provided an ormclass
+
+            if list(tag_to_index_dict.values()) == ['*']:
+                for rowitem in results:
+                    yield [self.get_aiida_res(rowitem, proxy)]
+            else:
+                for rowitem, in results:
+                    yield [self.get_aiida_res(rowitem, proxy)]
+        elif len(tag_to_index_dict) > 1:
+            for resultrow in results:
+                yield [self.get_aiida_res(rowitem, proxy) for colindex, rowitem in enumerate(resultrow)]
+        else:
+            raise ValueError('Got an empty dictionary')
+
+    def iterdict(  # pylint: disable=too-many-arguments
+        self, query, batch_size, tag_to_projected_properties_dict, tag_to_alias_map, stream=False, proxy=False
+    ):
         """
+        :param bool stream: if True, execute the query with :meth:`stream`
+        :param bool proxy: if True, nodes are returned as a `NodeRow` instead of a backend node
         :returns: An iterator over all the results of a list of dictionaries.
         """
         try:
@@ -343,46 +481,168 @@ class BackendQueryBuilder:
             if not nr_items:
                 raise ValueError('Got an empty dictionary')
 
-            results = query.yield_per(batch_size)
-            if nr_items > 1:
+            results = self.stream(query, batch_size, attach=not proxy) if stream else query.yield_per(batch_size)
+            yield from self.iterdict_results(results, tag_to_projected_properties_dict, tag_to_alias_map, proxy=proxy)
+        except Exception:
+            self.get_session().close()
+            raise
+
+    def iterdict_results(self, results, tag_to_projected_properties_dict, tag_to_alias_map, proxy=False):
+        """Convert the rows that were returned by executing a query, as is done by :meth:`iterdict`.
+
+        :param results: an iterable over the rows returned by the query
+        :param bool proxy: if True, nodes are returned as a `NodeRow` instead of a backend node
+        :returns: An iterator over all the results of a list of dictionaries.
+        """
+        nr_items = sum(len(v) for v in tag_to_projected_properties_dict.values())
+
+        if nr_items > 1:
+            for this_result in results:
+                yield {
+                    tag: {
+                        self.get_corresponding_property(
+                            self.get_table_name(tag_to_alias_map[tag]), attrkey, self.inner_to_outer_schema
+                        ): self.get_aiida_res(this_result[index_in_sql_result], proxy)
+                        for attrkey, index_in_sql_result in projected_entities_dict.items()
+                    } for tag, projected_entities_dict in tag_to_projected_properties_dict.items()
+                }
+        elif nr_items == 1:
+            # I this case, sql returns a  list, where each listitem is the result
+            # for one row. Here I am converting it to a list of lists (of length 1)
+            if [v for entityd in tag_to_projected_properties_dict.values() for v in entityd.keys()] == ['*']:
                 for this_result in results:
                     yield {
                         tag: {
                             self.get_corresponding_property(
                                 self.get_table_name(tag_to_alias_map[tag]), attrkey, self.inner_to_outer_schema
-                            ): self.get_aiida_res(this_result[index_in_sql_result])
-                            for attrkey, index_in_sql_result in projected_entities_dict.items()
+                            ): self.get_aiida_res(this_result, proxy)
+                            for attrkey, position in projected_entities_dict.items()
                         } for tag, projected_entities_dict in tag_to_projected_properties_dict.items()
                     }
-            elif nr_items == 1:
-                # I this case, sql returns a  list, where each listitem is the result
-                # for one row. Here I am converting it to a list of lists (of length 1)
-                if [v for entityd in tag_to_projected_properties_dict.values() for v in entityd.keys()] == ['*']:
-                    for this_result in results:
-                        yield {
-                            tag: {
-                                self.get_corresponding_property(
-                                    self.get_table_name(tag_to_alias_map[tag]), attrkey, self.inner_to_outer_schema
-                                ): self.get_aiida_res(this_result)
-                                for attrkey, position in projected_entities_dict.items()
-                            } for tag, projected_entities_dict in tag_to_projected_properties_dict.items()
-                        }
-                else:
-                    for this_result, in results:
-                        yield {
-                            tag: {
-                                self.get_corresponding_property(
-                                    self.get_table_name(tag_to_alias_map[tag]), attrkey, self.inner_to_outer_schema
-                                ): self.get_aiida_res(this_result)
-                                for attrkey, position in projected_entities_dict.items()
-                            } for tag, projected_entities_dict in tag_to_projected_properties_dict.items()
-                        }
             else:
-                raise ValueError('Got an empty dictionary')
+                for this_result, in results:
+                    yield {
+                        tag: {
+                            self.get_corresponding_property(
+                                self.get_table_name(tag_to_alias_map[tag]), attrkey, self.inner_to_outer_schema
+                            ): self.get_aiida_res(this_result, proxy)
+                            for attrkey, position in projected_entities_dict.items()
+                        } for tag, projected_entities_dict in tag_to_projected_properties_dict.items()
+                    }
+        else:
+            raise ValueError('Got an empty dictionary')
+
+    def get_columns(self, query, batch_size):
+        """Return the results of the query as one array per projected column.
+
+        The rows are fetched and converted in batches by :meth:`iter_columns`, whose arrays are concatenated per
+        column, such that at most one batch of rows is held in memory besides the arrays themselves.
+
+        :param query: the query, which should not project any entity instances
+        :param int batch_size: number of rows to fetch from the cursor per step, or None to fetch all at once
+        :returns: a list with a one-dimensional :class:`numpy.ndarray` for every projected column
+        """
+        import numpy
+
+        batches = list(self.iter_columns(query, batch_size))
+
+        if len(batches) == 1:
+            return batches[0]
+
+        return [numpy.concatenate(arrays) for arrays in zip(*batches)]
+
+    def iter_columns(self, query, batch_size):
+        """Execute the query and yield its results in batches of rows, as one array per projected column.
+
+        The rows are fetched directly from the database cursor and every column of a batch is converted as a whole,
+        with a conversion that is determined once per column, instead of passing each value through
+        :meth:`get_aiida_res`. Columns of integers, floats and booleans become arrays of the corresponding type, unless
+        they contain null values, where float columns use `nan` and the other columns fall back to arrays of objects.
+        Columns of other types are returned as arrays of objects. At least one batch is yielded, even if the query has
+        no results.
+
+        :param query: the query, which should not project any entity instances
+        :param int batch_size: number of rows to fetch from the cursor per step, or None to fetch all at once
+        :returns: a generator of lists with a one-dimensional :class:`numpy.ndarray` for every projected column
+        """
+        try:
+            statement = query.statement
+            column_types = [column.type for column in statement.columns]
+            result = self.get_session().execute(statement)
+
+            rows = result.fetchall() if batch_size is None else result.fetchmany(batch_size)
+            yield self._convert_columns(rows, column_types)
+
+            while batch_size is not None and rows:
+                rows = result.fetchmany(batch_size)
+                if rows:
+                    yield self._convert_columns(rows, column_types)
         except Exception:
             self.get_session().close()
             raise
 
+    def _convert_columns(self, rows, column_types):
+        """Convert a batch of rows into one array per column.
+
+        :param rows: the list of rows, as returned by the database cursor
+        :param column_types: the SqlAlchemy types of the columns
+        :returns: a list with a one-dimensional :class:`numpy.ndarray` for every column
+        """
+        import numpy
+
+        columns = []
+
+        for values, column_type in zip(zip(*rows) if rows else [()] * len(column_types), column_types):
+            values = self._convert_column(list(values))
+            dtype = self._get_column_dtype(column_type)
+
+            if dtype is None or (dtype != 'float64' and any(value is None for value in values)):
+                array = numpy.empty(len(values), dtype=object)
+                array[:] = values
+            else:
+                array = numpy.array([numpy.nan if value is None else value for value in values], dtype=dtype)
+
+            columns.append(array)
+
+        return columns
+
+    @staticmethod
+    def _convert_column(values):
+        """Convert the values of a column to AiiDA compatible values, with a conversion determined by its first value.
+
+        This applies the conversion of :meth:`get_aiida_res` for values that are not database entities to a column.
+
+        :param values: the list of values of a column
+        :returns: the list of converted values
+        """
+        first = next((value for value in values if value is not None), None)
+
+        if isinstance(first, Choice):
+            return [None if value is None else value.value for value in values]
+
+        if isinstance(first, uuid.UUID):
+            return [None if value is None else str(value) for value in values]
+
+        return values
+
+    @staticmethod
+    def _get_column_dtype(column_type):
+        """Return the numpy dtype for a column of the given SqlAlchemy type, or None if values should be kept as objects.
+
+        :param column_type: the SqlAlchemy type of the column
+        :returns: the name of the numpy dtype or None
+        """
+        if isinstance(column_type, Boolean):
+            return 'bool'
+
+        if isinstance(column_type, Integer):
+            return 'int64'
+
+        if isinstance(column_type, Float):
+            return 'float64'
+
+        return None
+
     @abc.abstractstaticmethod
     def get_table_name(aliased_class):
         """Returns the table name given an Aliased class."""
@@ -219,6 +219,69 @@ class SqlaNode(entities.SqlaModelEntity[models.DbNode], BackendNode):
 
         return self
 
+    async def store_async(self, links=None, clean=True):
+        """Store the node in the database, with the database operations performed by the database executor.
+
+        The model instance cannot be added to the session of another thread, since its user and computer are bound to
+        the session of this thread. Instead, its values and those of the links are inserted with core statements in a
+        thread of the executor, after which the instance is made persistent in the session of this thread, with the
+        values of its row as returned by the database.
+
+        :param links: optional links to add before storing
+        :param clean: boolean, if True, will clean the attributes and extras before attempting to store
+        """
+        from sqlalchemy.orm import make_transient_to_detached
+        from sqlalchemy.orm.attributes import set_committed_value
+        from aiida.backends.sqlalchemy.models.node import DbLink
+        from aiida.manage.manager import get_manager
+
+        if clean:
+            self.clean_values()
+
+        dbmodel = self.dbmodel
+        table = models.DbNode.__table__
+
+        # Columns without value are left out, such that their defaults are used, as is done when flushing the instance
+        values = {column.key: getattr(dbmodel, column.key) for column in table.columns}
+        values['user_id'] = dbmodel.user.id
+        values['dbcomputer_id'] = dbmodel.dbcomputer.id if dbmodel.dbcomputer is not None else None
+        values = {key: value for key, value in values.items() if value is not None}
+
+        links = [{
+            'input_id': source.id,
+            'label': link_label,
+            'type': link_type.value
+        } for source, link_type, link_label in links or ()]
+
+        def insert():
+            session = get_scoped_session()
+
+            try:
+                row = session.execute(table.insert().values(**values).returning(*table.columns)).first()
+
+                if links:
+                    try:
+                        session.execute(DbLink.__table__.insert(), [dict(link, output_id=row.id) for link in links])
+                    except SQLAlchemyError as exception:
+                        raise exceptions.UniquenessError(f'failed to create the link: {exception}') from exception
+
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+            return dict(row)
+
+        row = await get_manager().get_database_executor().run(insert)
+
+        for key, value in row.items():
+            set_committed_value(dbmodel, key, value)
+
+        make_transient_to_detached(dbmodel)
+        get_scoped_session().add(dbmodel)
+
+        return self
+
 
 class SqlaNodeCollection(BackendNodeCollection):
     """The collection of Node entries."""
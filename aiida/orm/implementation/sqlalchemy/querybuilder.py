@@ -302,6 +302,12 @@ class SqlaQueryBuilder(BackendQueryBuilder):
             column = self.get_column(column_name, alias)
 
         database_entity = column[tuple(attr_key)]
+
+        # Compare the JSONB values directly where possible, since that is the expression covered by attribute indexes
+        expr = self.get_filter_expr_from_jsonb(operator, value, database_entity)
+        if expr is not None:
+            return expr
+
         if operator == '==':
             type_filter, casted_entity = cast_according_to_type(database_entity, value)
             expr = case([(type_filter, casted_entity == value)], else_=False)
@@ -13,5 +13,6 @@
 from .data import *
 from .process import *
 from .node import *
+from .view import *
 
-__all__ = (data.__all__ + process.__all__ + node.__all__)
+__all__ = (data.__all__ + process.__all__ + node.__all__ + view.__all__)
@@ -97,7 +97,8 @@ class Code(Data):
 
     def __str__(self):
         local_str = 'Local' if self.is_local() else 'Remote'
-        computer_str = self.computer.label
+        # A local code is not associated with a computer, its files are in the repository
+        computer_str = 'repository' if self.computer is None else self.computer.label
         return f"{local_str} code '{self.label}' on {computer_str}, pk: {self.pk}, uuid: {self.uuid}"
 
     def get_computer_name(self):
@@ -15,7 +15,7 @@ import traceback
 
 from aiida.common import exceptions
 from aiida.common.escaping import sql_string_match
-from aiida.common.hashing import make_hash, _HASH_EXTRA_KEY
+from aiida.common.hashing import make_hash, _HASH_ALGORITHM, _HASH_EXTRA_KEY, _HASH_VERSION_EXTRA_KEY
 from aiida.common.lang import classproperty, type_check
 from aiida.common.links import LinkType
 from aiida.common.warnings import AiidaDeprecationWarning
@@ -983,6 +983,48 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
 
         return self
 
+    async def store_async(self):
+        """Store the node in the database without blocking the event loop, while saving its repository directory.
+
+        This is the asynchronous version of :meth:`store`, where the node and its cached incoming links are inserted
+        by the database executor, see :meth:`aiida.manage.manager.Manager.get_database_executor`, in a transaction of
+        their own. Since the hash of the node is inserted together with the node, it is computed before storing.
+
+        Nodes whose class overrides :meth:`store`, as well as nodes that are stored from the cache or are added to an
+        autogroup, which both involve other entities, are stored by calling :meth:`store` instead.
+
+        :return: the stored node
+        """
+        from aiida.manage.caching import get_use_cache
+
+        if self.is_stored:
+            return self
+
+        if (
+            type(self).store is not Node.store or get_use_cache(identifier=self.process_type) or
+            autogroup.CURRENT_AUTOGROUP is not None
+        ):
+            return self.store()
+
+        self.validate_storability()
+        self._validate()
+        self.verify_are_parents_stored()
+
+        self._backend_entity.clean_values()
+        self._set_hash(self._get_hash())
+        self._repository.store()
+
+        try:
+            await self._backend_entity.store_async(self._incoming_cache, clean=False)
+        except Exception:
+            # Put back the files in the sandbox folder since the transaction did not succeed
+            self._repository.restore()
+            raise
+
+        self._incoming_cache = list()
+
+        return self
+
     def _store(self, with_transaction=True, clean=True):
         """Store the node in the database while saving its attributes and repository directory.
 
@@ -1003,7 +1045,7 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             raise
 
         self._incoming_cache = list()
-        self._backend_entity.set_extra(_HASH_EXTRA_KEY, self.get_hash())
+        self._set_hash(self.get_hash())
 
         return self
 
@@ -1087,11 +1129,47 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
 
     def rehash(self):
         """Regenerate the stored hash of the Node."""
-        self.set_extra(_HASH_EXTRA_KEY, self.get_hash())
+        self._set_hash(self.get_hash())
 
     def clear_hash(self):
         """Sets the stored hash of the Node to None."""
-        self.set_extra(_HASH_EXTRA_KEY, None)
+        self._set_hash(None)
+
+    def _set_hash(self, node_hash):
+        """Store the hash of the node.
+
+        The hash is stored both in the `_aiida_hash` extra and in the dedicated `hash` column, which is indexed such
+        that nodes with a given hash can be looked up efficiently for caching. The version of the hash, as returned by
+        `_get_hash_version`, is stored in the `_aiida_hash_version` extra.
+
+        :param node_hash: the hash or None
+        """
+        hash_version = self._get_hash_version() if node_hash is not None else None
+        self._backend_entity.set_extra_many({_HASH_EXTRA_KEY: node_hash, _HASH_VERSION_EXTRA_KEY: hash_version})
+        self._backend_entity.hash = node_hash
+
+    @classmethod
+    def _get_hash_version(cls):
+        """Return the version of the hash of nodes of this class.
+
+        The hash of a node depends on the version of the package that defines its class and on the hashing algorithm.
+        A stored hash can only be reused instead of being recomputed if its version matches the current one.
+
+        :return: the version of the hash as a string, or None if the version of the package cannot be determined, in
+            which case stored hashes of nodes of this class are never reused
+        """
+        package_name = cls.__module__.split('.', 1)[0]
+
+        # Classes defined in a script or notebook are not part of a package, so they are not versioned
+        if package_name == '__main__':
+            return None
+
+        try:
+            package_version = importlib.import_module(package_name).__version__
+        except (ImportError, AttributeError):
+            return None
+
+        return f'{package_version}:{_HASH_ALGORITHM}'
 
     def get_cache_source(self):
         """Return the UUID of the node that was used in creating this node from the cache, or None if it was not cached.
@@ -1150,8 +1228,10 @@ class Node(Entity, EntityAttributesMixin, EntityExtrasMixin, metaclass=AbstractN
             return iter(())
 
         builder = QueryBuilder()
-        builder.append(self.__class__, filters={'extras._aiida_hash': node_hash}, project='*', subclassing=False)
-        nodes_identical = (n[0] for n in builder.iterall())
+        builder.append(self.__class__, filters={'hash': node_hash}, project='*', subclassing=False)
+        # The results are fetched at once, since `is_valid_cache` may write to the database, for example when logging a
+        # warning, which would invalidate the cursor of a server-side iteration
+        nodes_identical = (n[0] for n in builder.all())
 
         return (node for node in nodes_identical if node.is_valid_cache)
 
@@ -14,7 +14,6 @@ import warnings
 from aiida.common import exceptions
 from aiida.common.datastructures import CalcJobState
 from aiida.common.lang import classproperty
-from aiida.common.links import LinkType
 from aiida.common.warnings import AiidaDeprecationWarning
 
 from .calculation import CalculationNode
@@ -119,11 +118,7 @@ class CalcJobNode(CalculationNode):
                 if key not in self._hash_ignored_attributes and key not in self._updatable_attributes  # pylint: disable=unsupported-membership-test
             },
             self.computer.uuid if self.computer is not None else None,  # pylint: disable=no-member
-            {
-                entry.link_label: entry.node.get_hash()
-                for entry in self.get_incoming(link_type=(LinkType.INPUT_CALC, LinkType.INPUT_WORK))
-                if entry.link_label not in self._hash_ignored_inputs
-            }
+            self._get_input_hashes()
         ]
         return objects
 
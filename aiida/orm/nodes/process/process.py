@@ -13,10 +13,13 @@ import enum
 
 from plumpy import ProcessState
 
+from aiida.common.hashing import _HASH_EXTRA_KEY, _HASH_VERSION_EXTRA_KEY
 from aiida.common.links import LinkType
 from aiida.common.lang import classproperty
 from aiida.orm.utils.mixins import Sealable
 
+from ...querybuilder import QueryBuilder
+from ..data import Data
 from ..node import Node
 
 __all__ = ('ProcessNode',)
@@ -495,9 +498,39 @@ class ProcessNode(Sealable, Node):
         Return a list of objects which should be included in the hash.
         """
         res = super()._get_objects_to_hash()
-        res.append({
-            entry.link_label: entry.node.get_hash()
-            for entry in self.get_incoming(link_type=(LinkType.INPUT_CALC, LinkType.INPUT_WORK))
-            if entry.link_label not in self._hash_ignored_inputs
-        })
+        res.append(self._get_input_hashes())
         return res
+
+    def _get_input_hashes(self):
+        """Return the hashes of the inputs that should be included in the hash, keyed on their link label.
+
+        Stored `Data` nodes are immutable, so instead of recomputing their hash, the stored hash is used as long as its
+        version is known and matches the current one, as returned by `Node._get_hash_version`. The stored hashes of all
+        inputs are retrieved with a single query and only the hashes of the remaining inputs are computed.
+
+        :return: dictionary of link labels onto the hash of the corresponding input node
+        """
+        inputs = [
+            entry for entry in self.get_incoming(link_type=(LinkType.INPUT_CALC, LinkType.INPUT_WORK))
+            if entry.link_label not in self._hash_ignored_inputs
+        ]
+        hash_versions = {
+            entry.node.pk: entry.node._get_hash_version()  # pylint: disable=protected-access
+            for entry in inputs
+            if isinstance(entry.node, Data) and entry.node.is_stored
+        }
+        hash_versions = {pk: hash_version for pk, hash_version in hash_versions.items() if hash_version is not None}
+        stored_hashes = {}
+
+        if hash_versions:
+            filters = {'id': {'in': list(hash_versions)}}
+            builder = QueryBuilder().append(
+                Data, filters=filters, project=['id', f'extras.{_HASH_EXTRA_KEY}', f'extras.{_HASH_VERSION_EXTRA_KEY}']
+            )
+            stored_hashes = {
+                pk: node_hash
+                for pk, node_hash, hash_version in builder.iterall()
+                if node_hash is not None and hash_version == hash_versions[pk]
+            }
+
+        return {entry.link_label: stored_hashes.get(entry.node.pk) or entry.node.get_hash() for entry in inputs}
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Read-only views of stored nodes, for reading many nodes returned by a query."""
+import copy
+import types
+
+__all__ = ('NodeView',)
+
+_NO_DEFAULT = tuple()
+
+
+class NodeView:
+    """Immutable view of the values of a stored node as they were returned by a query.
+
+    Constructing a view is much cheaper than constructing a :class:`~aiida.orm.nodes.node.Node`, which also creates a
+    backend entity, a repository and caches for its links, so views should be used when reading the properties,
+    attributes and extras of many nodes, for example through ``QueryBuilder.iterall(proxy=True)``. The values are not
+    refreshed from the database. The node itself is only loaded when it is requested with :meth:`get_node`.
+    """
+
+    __slots__ = (
+        '_pk', '_uuid', '_node_type', '_process_type', '_label', '_description', '_ctime', '_mtime', '_attributes',
+        '_extras', '_node'
+    )
+
+    def __init__(self, pk, uuid, node_type, process_type, label, description, ctime, mtime, attributes, extras):  # pylint: disable=too-many-arguments
+        """Construct a new view from the values of the columns of a node.
+
+        :param pk: the primary key
+        :param uuid: the UUID as a string
+        :param node_type: the node type string
+        :param process_type: the process type string
+        :param label: the label
+        :param description: the description
+        :param ctime: the creation time
+        :param mtime: the last modification time
+        :param attributes: the attributes dictionary, which is not copied and should not be modified afterwards
+        :param extras: the extras dictionary, which is not copied and should not be modified afterwards
+        """
+        values = (pk, uuid, node_type, process_type, label, description, ctime, mtime, attributes, extras, None)
+
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'`{self.__class__.__name__}` is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'`{self.__class__.__name__}` is immutable')
+
+    def __eq__(self, other):
+        if isinstance(other, NodeView):
+            return self._uuid == other._uuid  # pylint: disable=protected-access
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._uuid)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self._node_type} uuid: {self._uuid} (pk: {self._pk})>'
+
+    @property
+    def pk(self):
+        """Return the primary key of the node.
+
+        :return: the primary key
+        """
+        return self._pk
+
+    @property
+    def uuid(self):
+        """Return the UUID of the node.
+
+        :return: the UUID as a string
+        """
+        return self._uuid
+
+    @property
+    def node_type(self):
+        """Return the node type string of the node.
+
+        :return: the node type string
+        """
+        return self._node_type
+
+    @property
+    def process_type(self):
+        """Return the process type string of the node.
+
+        :return: the process type string
+        """
+        return self._process_type
+
+    @property
+    def label(self):
+        """Return the label of the node.
+
+        :return: the label
+        """
+        return self._label
+
+    @property
+    def description(self):
+        """Return the description of the node.
+
+        :return: the description
+        """
+        return self._description
+
+    @property
+    def ctime(self):
+        """Return the creation time of the node.
+
+        :return: the creation time
+        """
+        return self._ctime
+
+    @property
+    def mtime(self):
+        """Return the last modification time of the node.
+
+        :return: the last modification time
+        """
+        return self._mtime
+
+    @property
+    def attributes(self):
+        """Return a read-only mapping of the attributes.
+
+        :return: the attributes as a read-only mapping, whose values must not be modified
+        """
+        return types.MappingProxyType(self._attributes)
+
+    @property
+    def extras(self):
+        """Return a read-only mapping of the extras.
+
+        :return: the extras as a read-only mapping, whose values must not be modified
+        """
+        return types.MappingProxyType(self._extras)
+
+    def get_attribute(self, key, default=_NO_DEFAULT):
+        """Return the value of an attribute.
+
+        :param key: name of the attribute
+        :param default: return this value instead of raising if the attribute does not exist
+        :return: the value of the attribute, where lists and dictionaries are deep copies
+        :raises AttributeError: if the attribute does not exist and no default is specified
+        """
+        return self._get_value(self._attributes, key, default, 'attribute')
+
+    def get_extra(self, key, default=_NO_DEFAULT):
+        """Return the value of an extra.
+
+        :param key: name of the extra
+        :param default: return this value instead of raising if the extra does not exist
+        :return: the value of the extra, where lists and dictionaries are deep copies
+        :raises AttributeError: if the extra does not exist and no default is specified
+        """
+        return self._get_value(self._extras, key, default, 'extra')
+
+    @staticmethod
+    def _get_value(values, key, default, kind):
+        """Return a value of the attributes or extras, which is copied if it is mutable."""
+        try:
+            value = values[key]
+        except KeyError as exception:
+            if default is _NO_DEFAULT:
+                raise AttributeError(f'{kind} `{key}` does not exist') from exception
+            return default
+
+        if isinstance(value, (dict, list)):
+            value = copy.deepcopy(value)
+
+        return value
+
+    def get_node(self):
+        """Return the node of this view, which is loaded from the database the first time that it is requested.
+
+        :return: the node
+        :rtype: :class:`~aiida.orm.nodes.node.Node`
+        """
+        if self._node is None:
+            from aiida.orm.utils import load_node
+            object.__setattr__(self, '_node', load_node(pk=self._pk))
+
+        return self._node
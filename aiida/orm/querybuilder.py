@@ -25,7 +25,7 @@ import logging
 import warnings
 
 from sqlalchemy import and_, or_, not_, func as sa_func, select, join
-from sqlalchemy.types import Integer
+from sqlalchemy.types import Float, Integer
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql.expression import cast as type_cast
 from sqlalchemy.dialects.postgresql import array
@@ -33,6 +33,10 @@ from sqlalchemy.dialects.postgresql import array
 from aiida.common.exceptions import InputValidationError
 from aiida.common.links import LinkType
 from aiida.manage.manager import get_manager
+from aiida.manage.database.closure import has_provenance_closure, provenance_closure
+from aiida.orm.utils.querycache import (
+    CacheEntry, CachedQuery, get_query_cache, get_probe_values, is_key_value, match_parameters, parametrize_filters
+)
 from aiida.common.exceptions import ConfigurationError
 from aiida.common.warnings import AiidaDeprecationWarning
 
@@ -333,6 +337,8 @@ class QueryBuilder:
     # namely tag of first entity + _EDGE_TAG_DELIM + tag of second entity
     _EDGE_TAG_DELIM = '--'
     _VALID_PROJECTION_KEYS = ('func', 'cast')
+    _RECURSIVE_JOINING_KEYWORDS = ('with_ancestors', 'with_descendants', 'ancestor_of', 'descendant_of')
+    _TRAVERSAL_KEYS = ('max_depth', 'distinct_paths', 'link_types')
 
     def __init__(self, backend=None, **kwargs):
         """
@@ -363,9 +369,14 @@ class QueryBuilder:
         :param order_by:
             How to order the results. As the 2 above, can be set also at later stage,
             check :func:`QueryBuilder.order_by` for more information.
+        :param group_by:
+            The entities to group the results by. Check :func:`QueryBuilder.group_by` for more information.
+        :param having:
+            The filters on the groups of the results. Check :func:`QueryBuilder.having` for more information.
 
         """
         backend = backend or get_manager().get_backend()
+        self._backend = backend
         self._impl = backend.query()
 
         # A list storing the path being traversed by the query
@@ -414,6 +425,9 @@ class QueryBuilder:
         # Check QueryBuilder.inject_query
         self._injected = False
 
+        # Whether the query may be taken from the query cache, which is disabled once the aliases are handed out
+        self._use_query_cache = True
+
         # Setting debug levels:
         self.set_debug(kwargs.pop('debug', False))
 
@@ -460,10 +474,22 @@ class QueryBuilder:
         if order_spec:
             self.order_by(order_spec)
 
+        # The results can be grouped, such that projections with aggregate functions are computed per group
+        self._group_by = {}
+        group_spec = kwargs.pop('group_by', None)
+        if group_spec:
+            self.group_by(group_spec)
+
+        # The groups can be filtered on the aggregated values
+        self._having = {}
+        having_spec = kwargs.pop('having', None)
+        if having_spec:
+            self.having(having_spec)
+
         # I've gone through all the keywords, popping each item
         # If kwargs is not empty, there is a problem:
         if kwargs:
-            valid_keys = ('path', 'filters', 'project', 'limit', 'offset', 'order_by')
+            valid_keys = ('path', 'filters', 'project', 'limit', 'offset', 'order_by', 'group_by', 'having')
             raise InputValidationError(
                 'Received additional keywords: {}'
                 '\nwhich I cannot process'
@@ -592,6 +618,9 @@ class QueryBuilder:
         edge_filters=None,
         edge_project=None,
         outerjoin=False,
+        max_depth=None,
+        distinct_paths=True,
+        link_types=None,
         **kwargs
     ):
         """
@@ -636,6 +665,18 @@ class QueryBuilder:
             The filters to apply on the edge. Also here, details in :meth:`.add_filter`.
         :param str edge_project:
             The project from the edges. API-details in :meth:`.add_projection`.
+        :param int max_depth:
+            The maximum ``depth`` of the edge for the ``with_ancestors`` and ``with_descendants`` relationships,
+            where a direct link has depth 0. Unlike a filter on the depth of the edge, the traversal of the graph
+            stops at this depth.
+        :param bool distinct_paths:
+            Whether the ``with_ancestors`` and ``with_descendants`` relationships return a row for each path between
+            two nodes (default **True**). If False, a single row is returned for each pair of nodes, with the
+            shortest depth, which is much cheaper on graphs with many paths between the same nodes. The ``path`` of
+            the edge cannot be filtered or projected in that case.
+        :param link_types:
+            The link types, or their values, that are followed by the ``with_ancestors`` and ``with_descendants``
+            relationships. By default only ``create`` and ``input_calc`` links are followed.
 
         A small usage example how this can be invoked::
 
@@ -833,6 +874,8 @@ class QueryBuilder:
                 joining_keyword = 'with_incoming'
                 joining_value = self._path[-1]['tag']
 
+            traversal = self._get_traversal_spec(joining_keyword, max_depth, distinct_paths, link_types)
+
         except Exception as exception:
             if self._debug:
                 print('DEBUG: Exception caught in append (part joining), cleaning up')
@@ -907,12 +950,50 @@ class QueryBuilder:
                 joining_keyword=joining_keyword,
                 joining_value=joining_value,
                 outerjoin=outerjoin,
-                edge_tag=edge_tag
+                edge_tag=edge_tag,
+                **traversal
             )
         )
 
         return self
 
+    def _get_traversal_spec(self, joining_keyword, max_depth, distinct_paths, link_types):
+        """
+        Validate the options of the traversal of a recursive relationship and return those that are not the default.
+
+        :param joining_keyword: the joining keyword of the appended vertice
+        :param max_depth: the maximum depth of the traversal, see :meth:`.append`
+        :param distinct_paths: whether to return a row for each path, see :meth:`.append`
+        :param link_types: the link types to follow, see :meth:`.append`
+        :return: a dictionary with the non-default traversal options, to be stored in the path
+        """
+        traversal = {}
+
+        if max_depth is not None:
+            if not isinstance(max_depth, int) or isinstance(max_depth, bool) or max_depth < 0:
+                raise InputValidationError(f'max_depth should be a non-negative integer, got: {max_depth}')
+            traversal['max_depth'] = max_depth
+
+        if not distinct_paths:
+            traversal['distinct_paths'] = False
+
+        if link_types is not None:
+            if isinstance(link_types, (str, LinkType)):
+                link_types = [link_types]
+            try:
+                traversal['link_types'] = [LinkType(link_type).value for link_type in link_types]
+            except (TypeError, ValueError) as exception:
+                raise InputValidationError(f'invalid link_types {link_types}: {exception}')
+
+        if traversal and joining_keyword not in self._RECURSIVE_JOINING_KEYWORDS:
+            raise InputValidationError(
+                'the traversal options {} can only be used with the relationships {}'.format(
+                    list(traversal), self._RECURSIVE_JOINING_KEYWORDS
+                )
+            )
+
+        return traversal
+
     def order_by(self, order_by):
         """
         Set the entity to order by
@@ -1015,6 +1096,110 @@ class QueryBuilder:
             self._order_by.append(_order_spec)
         return self
 
+    def group_by(self, group_by):
+        """
+        Set the entities to group the results by, such that aggregate functions are computed per group
+
+        :param group_by:
+            A dictionary where keys are valid tags of entities (tables) and values are lists of columns or attributes.
+            Attributes can be cast with the keyword `cast`, in which case the same cast should be used to project them.
+
+        The projections that are not grouped by have to be aggregated with the `func` keyword, which can be one of
+        `count`, `sum`, `min`, `max`, `avg` or `array_agg`.
+
+        Usage::
+
+            # Number of calculation jobs per computer and exit status
+            qb = QueryBuilder()
+            qb.append(Computer, tag='computer', project='name')
+            qb.append(CalcJobNode, with_computer='computer', tag='calcjob', project=[
+                {'attributes.exit_status': {'cast': 'i'}}, {'id': {'func': 'count'}}
+            ])
+            qb.group_by({'computer': 'name', 'calcjob': [{'attributes.exit_status': {'cast': 'i'}}]})
+
+            # Total wallclock time per process label
+            qb = QueryBuilder()
+            qb.append(CalcJobNode, tag='calcjob', project=[
+                'attributes.process_label', {'attributes.wallclock': {'cast': 'f', 'func': 'sum'}}
+            ])
+            qb.group_by({'calcjob': 'attributes.process_label'})
+        """
+        self._group_by = {}
+        allowed_keys = ('cast',)
+
+        if not isinstance(group_by, dict):
+            raise InputValidationError(
+                'Invalid input for group_by statement: {}\n'
+                'I am expecting a dictionary ORMClass,'
+                '[columns to group by]'
+                ''.format(group_by)
+            )
+
+        for tagspec, items_to_group_by in group_by.items():
+            if not isinstance(items_to_group_by, (tuple, list)):
+                items_to_group_by = [items_to_group_by]
+            tag = self._get_tag_from_specification(tagspec)
+            self._group_by[tag] = []
+            for item_to_group_by in items_to_group_by:
+                if isinstance(item_to_group_by, str):
+                    item_to_group_by = {item_to_group_by: {}}
+                elif not isinstance(item_to_group_by, dict):
+                    raise InputValidationError(
+                        f'Cannot deal with input to group_by {item_to_group_by}\nof type{type(item_to_group_by)}\n'
+                    )
+                for groupspec in item_to_group_by.values():
+                    if not isinstance(groupspec, dict):
+                        raise InputValidationError(f'I was expecting a dictionary\nYou provided {groupspec}\n')
+                    for key in groupspec:
+                        if key not in allowed_keys:
+                            raise InputValidationError(
+                                'The allowed keys for a group_by specification\n'
+                                'are {}\n'
+                                '{} is not valid\n'
+                                ''.format(', '.join(allowed_keys), key)
+                            )
+                self._group_by[tag].append(item_to_group_by)
+
+        return self
+
+    def having(self, having):
+        """
+        Set the filters on the groups of the results, which are applied after the aggregation
+
+        :param having:
+            A dictionary where keys are valid tags of entities (tables) and values are dictionaries of columns or
+            attributes to filter on. Each specification can contain the keywords `func` and `cast` to aggregate and
+            cast the entity, as for a projection, and pairs of an operator and a value as for a filter. The valid
+            operators are `==`, `>`, `<`, `>=`, `<=`, `like`, `ilike` and `in`.
+
+        Usage::
+
+            # Process labels of which more than 100 calculation jobs have been run
+            qb = QueryBuilder()
+            qb.append(CalcJobNode, tag='calcjob', project=['attributes.process_label', {'id': {'func': 'count'}}])
+            qb.group_by({'calcjob': 'attributes.process_label'})
+            qb.having({'calcjob': {'id': {'func': 'count', '>': 100}}})
+        """
+        self._having = {}
+
+        if not isinstance(having, dict):
+            raise InputValidationError('Having filters have to be passed as dictionaries')
+
+        for tagspec, having_spec in having.items():
+            if not isinstance(having_spec, dict):
+                raise InputValidationError(f'I was expecting a dictionary\nYou provided {having_spec}\n')
+            tag = self._get_tag_from_specification(tagspec)
+            self._having[tag] = {}
+            for entityname, spec in having_spec.items():
+                if not isinstance(spec, dict):
+                    spec = {'==': spec}
+                for key in self._VALID_PROJECTION_KEYS:
+                    if key in spec and not isinstance(spec[key], str):
+                        raise InputValidationError(f'{spec[key]} has to be a string')
+                self._having[tag][entityname] = spec
+
+        return self
+
     def add_filter(self, tagspec, filter_spec):
         """
         Adding a filter to my filters.
@@ -1225,18 +1410,35 @@ class QueryBuilder:
             self._query = self._query.add_entity(alias)
         else:
             entity_to_project = self._get_projectable_entity(alias, column_name, attr_key, cast=cast)
-            if func is None:
-                pass
-            elif func == 'max':
-                entity_to_project = sa_func.max(entity_to_project)
-            elif func == 'min':
-                entity_to_project = sa_func.max(entity_to_project)
-            elif func == 'count':
-                entity_to_project = sa_func.count(entity_to_project)
-            else:
-                raise InputValidationError(f'\nInvalid function specification {func}')
+            if func is not None:
+                entity_to_project = self._get_aggregated_entity(entity_to_project, func)
             self._query = self._query.add_columns(entity_to_project)
 
+    @staticmethod
+    def _get_aggregated_entity(entity, func):
+        """Return the entity with an aggregate function applied to it.
+
+        :param entity: the projectable entity, a column or attribute of an alias
+        :param str func: the name of the aggregate function, one of `count`, `sum`, `min`, `max`, `avg` or `array_agg`
+        :returns: the aggregated entity
+        :raises InputValidationError: if the function is not a valid aggregate function
+        """
+        if func == 'count':
+            return sa_func.count(entity)
+        if func == 'sum':
+            return sa_func.sum(entity)
+        if func == 'min':
+            return sa_func.min(entity)
+        if func == 'max':
+            return sa_func.max(entity)
+        if func == 'avg':
+            # The average of integers is a numeric, which would be returned as a `Decimal`
+            return type_cast(sa_func.avg(entity), Float)
+        if func == 'array_agg':
+            return sa_func.array_agg(entity)
+
+        raise InputValidationError(f'\nInvalid function specification {func}')
+
     def _build_projections(self, tag, items_to_project=None):
         """Build the projections for a given tag."""
         if items_to_project is None:
@@ -1382,6 +1584,31 @@ class QueryBuilder:
                     )
         return and_(*expressions)
 
+    def _build_having(self, alias, having_spec):
+        """
+        Build the filter operations on the (aggregated) entities of the groups of the results.
+
+        :param alias: The alias of the ORM class the filter will be applied on
+        :param having_spec: the specification as given by the queryhelp
+
+        :returns: an instance of *sqlalchemy.sql.elements.BinaryExpression*.
+        """
+        expressions = []
+        for path_spec, having_operation_dict in having_spec.items():
+            path_spec = self._impl.modify_expansions(alias, [path_spec])[0]
+            column_name = path_spec.split('.')[0]
+            attr_key = path_spec.split('.')[1:]
+            entity = self._get_projectable_entity(alias, column_name, attr_key, cast=having_operation_dict.get('cast'))
+            func = having_operation_dict.get('func')
+            if func is not None:
+                entity = self._get_aggregated_entity(entity, func)
+            # The label is only required to make the expression acceptable as a column and is not rendered
+            entity = entity.label(None)
+            for operator, value in having_operation_dict.items():
+                if operator not in self._VALID_PROJECTION_KEYS:
+                    expressions.append(self._impl.get_filter_expr_from_column(operator, value, entity))
+        return and_(*expressions)
+
     @staticmethod
     def _check_dbentities(entities_cls_joined, entities_cls_to_join, relationship):
         """
@@ -1456,14 +1683,69 @@ class QueryBuilder:
         ).join(entity_to_join, aliased_edge.input_id == entity_to_join.id, isouter=isouterjoin)
         return aliased_edge
 
-    def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    def _join_provenance_closure(self, joined_entity, entity_to_join, isouterjoin, descendants, max_depth=None):
         """
-        joining descendants using the recursive functionality
-        :TODO: Move the filters to be done inside the recursive query (for example on depth)
-        :TODO: Pass an option to also show the path, if this is wanted.
+        :param joined_entity: The (aliased) ORMclass that is a node in the database
+        :param entity_to_join: The (aliased) ORMClass that is a descendant or ancestor of **joined_entity**
+        :param descendants: boolean, True to join the descendants of **joined_entity**, False to join its ancestors
+        :param max_depth: optional maximum depth of the pairs to join
+
+        **joined_entity** and **entity_to_join** are joined through the materialized provenance closure table, see
+        :mod:`aiida.manage.database.closure`, which has a single row, with the shortest depth, for each pair of nodes.
         """
+        closure = provenance_closure.alias()
+        if descendants:
+            joined_column, to_join_column = closure.c.ancestor_id, closure.c.descendant_id
+        else:
+            joined_column, to_join_column = closure.c.descendant_id, closure.c.ancestor_id
 
-        self._check_dbentities((joined_entity, self._impl.Node), (entity_to_join, self._impl.Node), 'with_ancestors')
+        join_condition = joined_column == joined_entity.id
+        if max_depth is not None:
+            join_condition = and_(join_condition, closure.c.depth <= max_depth)
+
+        self._query = self._query.join(closure, join_condition
+                                       ).join(entity_to_join, to_join_column == entity_to_join.id, isouter=isouterjoin)
+        return closure.c
+
+    def _join_recursive(
+        self,
+        joined_entity,
+        entity_to_join,
+        isouterjoin,
+        filter_dict,
+        descendants,
+        expand_path=False,
+        max_depth=None,
+        distinct_paths=True,
+        link_types=None
+    ):
+        """
+        :param joined_entity: The (aliased) ORMclass that is a node in the database
+        :param entity_to_join: The (aliased) ORMClass that is a descendant or ancestor of **joined_entity**
+        :param isouterjoin: boolean, whether to do an outer join
+        :param filter_dict: the filters of **joined_entity**, applied to the first step of the walk
+        :param descendants: boolean, True to join the descendants of **joined_entity**, False to join its ancestors
+        :param expand_path: boolean, whether to build the ``path`` of each pair
+        :param max_depth: optional maximum depth of the pairs, applied inside the recursion
+        :param distinct_paths: boolean, if False, the pairs are deduplicated while recursing and only a single row, with
+            the shortest depth, is returned for each pair instead of one row for each path
+        :param link_types: optional list of the values of the link types to follow, by default only the ``create`` and
+            ``input_calc`` links are followed
+
+        **joined_entity** and **entity_to_join** are joined with a recursive query that walks the links from
+        **joined_entity** forward, if **descendants** is True, or backward otherwise. If the provenance closure table
+        exists, the default link types are followed and **distinct_paths** is False, the pairs are taken from that table
+        instead, since it contains the same single row with the shortest depth for each pair.
+        """
+        # pylint: disable=too-many-arguments,too-many-locals
+        default_link_types = (LinkType.CREATE.value, LinkType.INPUT_CALC.value)
+        link_types = default_link_types if link_types is None else tuple(link_types)
+
+        if expand_path and not distinct_paths:
+            raise InputValidationError('the path of the edge cannot be used when `distinct_paths` is False')
+
+        if not distinct_paths and set(link_types) == set(default_link_types) and has_provenance_closure(self._backend):
+            return self._join_provenance_closure(joined_entity, entity_to_join, isouterjoin, descendants, max_depth)
 
         link1 = aliased(self._impl.Link)
         link2 = aliased(self._impl.Link)
@@ -1475,103 +1757,84 @@ class QueryBuilder:
             link1.output_id.label('descendant_id'),
             type_cast(0, Integer).label('depth'),
         ]
+
+        if descendants:
+            start_column, walk_path = link1.input_id, (link1.input_id, link1.output_id)
+        else:
+            start_column, walk_path = link1.output_id, (link1.output_id, link1.input_id)
+
         if expand_path:
-            selection_walk_list.append(array((link1.input_id, link1.output_id)).label('path'))
+            selection_walk_list.append(array(walk_path).label('path'))
 
-        walk = select(selection_walk_list).select_from(join(node1, link1, link1.input_id == node1.id)).where(
+        walk = select(selection_walk_list).select_from(join(node1, link1, start_column == node1.id)).where(
             and_(
                 in_recursive_filters,  # I apply filters for speed here
-                link1.type.in_((LinkType.CREATE.value, LinkType.INPUT_CALC.value))  # I follow input and create links
+                link1.type.in_(link_types)
             )
         ).cte(recursive=True)
 
         aliased_walk = aliased(walk)
 
+        if descendants:
+            next_column = link2.output_id
+            step_condition = link2.input_id == aliased_walk.c.descendant_id
+            ancestor_column, descendant_column = aliased_walk.c.ancestor_id, next_column
+        else:
+            next_column = link2.input_id
+            step_condition = link2.output_id == aliased_walk.c.ancestor_id
+            ancestor_column, descendant_column = next_column, aliased_walk.c.descendant_id
+
         selection_union_list = [
-            aliased_walk.c.ancestor_id.label('ancestor_id'),
-            link2.output_id.label('descendant_id'),
+            ancestor_column.label('ancestor_id'),
+            descendant_column.label('descendant_id'),
             (aliased_walk.c.depth + type_cast(1, Integer)).label('current_depth')
         ]
         if expand_path:
-            selection_union_list.append((aliased_walk.c.path + array((link2.output_id,))).label('path'))
-
-        descendants_recursive = aliased(
-            aliased_walk.union_all(
-                select(selection_union_list).select_from(
-                    join(
-                        aliased_walk,
-                        link2,
-                        link2.input_id == aliased_walk.c.descendant_id,
-                    )
-                ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT_CALC.value)))
-            )
-        )  # .alias()
+            selection_union_list.append((aliased_walk.c.path + array((next_column,))).label('path'))
 
-        self._query = self._query.join(descendants_recursive,
-                                       descendants_recursive.c.ancestor_id == joined_entity.id).join(
-                                           entity_to_join,
-                                           descendants_recursive.c.descendant_id == entity_to_join.id,
-                                           isouter=isouterjoin
-                                       )
-        return descendants_recursive.c
+        step_filters = [link2.type.in_(link_types)]
+        if max_depth is not None:
+            step_filters.append(aliased_walk.c.depth < max_depth)
 
-    def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
-        """
-        joining ancestors using the recursive functionality
-        :TODO: Move the filters to be done inside the recursive query (for example on depth)
-        :TODO: Pass an option to also show the path, if this is wanted.
+        step_join = join(aliased_walk, link2, step_condition)
+        step = select(selection_union_list).select_from(step_join).where(and_(*step_filters))
 
-        """
-        self._check_dbentities((joined_entity, self._impl.Node), (entity_to_join, self._impl.Node), 'with_ancestors')
+        # With `UNION`, a pair that is reached again at the same depth is not followed again, which bounds the size of
+        # the walk by the number of pairs times the number of depths, instead of the number of paths.
+        recursive = aliased(aliased_walk.union_all(step) if distinct_paths else aliased_walk.union(step))
 
-        link1 = aliased(self._impl.Link)
-        link2 = aliased(self._impl.Link)
-        node1 = aliased(self._impl.Node)
-        in_recursive_filters = self._build_filters(node1, filter_dict)
+        if not distinct_paths:
+            recursive = select([
+                recursive.c.ancestor_id,
+                recursive.c.descendant_id,
+                sa_func.min(recursive.c.depth).label('depth'),
+            ]).group_by(recursive.c.ancestor_id, recursive.c.descendant_id).alias()
 
-        selection_walk_list = [
-            link1.input_id.label('ancestor_id'),
-            link1.output_id.label('descendant_id'),
-            type_cast(0, Integer).label('depth'),
-        ]
-        if expand_path:
-            selection_walk_list.append(array((link1.output_id, link1.input_id)).label('path'))
+        if descendants:
+            joined_column, to_join_column = recursive.c.ancestor_id, recursive.c.descendant_id
+        else:
+            joined_column, to_join_column = recursive.c.descendant_id, recursive.c.ancestor_id
 
-        walk = select(selection_walk_list).select_from(join(node1, link1, link1.output_id == node1.id)).where(
-            and_(in_recursive_filters, link1.type.in_((LinkType.CREATE.value, LinkType.INPUT_CALC.value)))
-        ).cte(recursive=True)
+        self._query = self._query.join(recursive, joined_column == joined_entity.id)
+        self._query = self._query.join(entity_to_join, to_join_column == entity_to_join.id, isouter=isouterjoin)
+        return recursive.c
 
-        aliased_walk = aliased(walk)
+    def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, **kwargs):
+        """
+        joining descendants using the recursive functionality, see :meth:`._join_recursive` for the keyword arguments
+        """
+        self._check_dbentities((joined_entity, self._impl.Node), (entity_to_join, self._impl.Node), 'with_ancestors')
+        return self._join_recursive(joined_entity, entity_to_join, isouterjoin, filter_dict, descendants=True, **kwargs)
 
-        selection_union_list = [
-            link2.input_id.label('ancestor_id'),
-            aliased_walk.c.descendant_id.label('descendant_id'),
-            (aliased_walk.c.depth + type_cast(1, Integer)).label('current_depth'),
-        ]
-        if expand_path:
-            selection_union_list.append((aliased_walk.c.path + array((link2.input_id,))).label('path'))
-
-        ancestors_recursive = aliased(
-            aliased_walk.union_all(
-                select(selection_union_list).select_from(
-                    join(
-                        aliased_walk,
-                        link2,
-                        link2.output_id == aliased_walk.c.ancestor_id,
-                    )
-                ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT_CALC.value)))
-                # I can't follow RETURN or CALL links
-            )
+    def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, **kwargs):
+        """
+        joining ancestors using the recursive functionality, see :meth:`._join_recursive` for the keyword arguments
+        """
+        self._check_dbentities((joined_entity, self._impl.Node), (entity_to_join, self._impl.Node), 'with_ancestors')
+        return self._join_recursive(
+            joined_entity, entity_to_join, isouterjoin, filter_dict, descendants=False, **kwargs
         )
 
-        self._query = self._query.join(ancestors_recursive,
-                                       ancestors_recursive.c.descendant_id == joined_entity.id).join(
-                                           entity_to_join,
-                                           ancestors_recursive.c.ancestor_id == entity_to_join.id,
-                                           isouter=isouterjoin
-                                       )
-        return ancestors_recursive.c
-
     def _join_group_members(self, joined_entity, entity_to_join, isouterjoin):
         """
         :param joined_entity:
@@ -1859,6 +2122,8 @@ class QueryBuilder:
             'filters': self._filters,
             'project': self._projections,
             'order_by': self._order_by,
+            'group_by': self._group_by,
+            'having': self._having,
             'limit': self._limit,
             'offset': self._offset,
         })
@@ -1907,7 +2172,7 @@ class QueryBuilder:
             isouterjoin = verticespec.get('outerjoin')
             edge_tag = verticespec['edge_tag']
 
-            if verticespec['joining_keyword'] in ('with_ancestors', 'with_descendants', 'ancestor_of', 'descendant_of'):
+            if verticespec['joining_keyword'] in self._RECURSIVE_JOINING_KEYWORDS:
                 # I treat those two cases in a special way.
                 # I give them a filter_dict, to help the recursive function find a good
                 # starting point. TODO: document this!
@@ -1917,8 +2182,14 @@ class QueryBuilder:
                 # The default is False, cause it's super expensive
                 expand_path = ((self._filters[edge_tag].get('path', None) is not None) or
                                any(['path' in d.keys() for d in self._projections[edge_tag]]))
+                traversal = {key: verticespec[key] for key in self._TRAVERSAL_KEYS if key in verticespec}
                 aliased_edge = connection_func(
-                    toconnectwith, alias, isouterjoin=isouterjoin, filter_dict=filter_dict, expand_path=expand_path
+                    toconnectwith,
+                    alias,
+                    isouterjoin=isouterjoin,
+                    filter_dict=filter_dict,
+                    expand_path=expand_path,
+                    **traversal
                 )
             else:
                 aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin)
@@ -1937,6 +2208,25 @@ class QueryBuilder:
                 )
             self._query = self._query.filter(self._build_filters(alias, filter_specs))
 
+        ######################### GROUP BY #############################
+
+        for tag, entity_list in self._group_by.items():
+            alias = self.tag_to_alias_map[tag]
+            for entitydict in entity_list:
+                for entitytag, entityspec in entitydict.items():
+                    entitytag = self._impl.modify_expansions(alias, [entitytag])[0]
+                    column_name = entitytag.split('.')[0]
+                    attrpath = entitytag.split('.')[1:]
+                    self._query = self._query.group_by(
+                        self._get_projectable_entity(alias, column_name, attrpath, **entityspec)
+                    )
+
+        ######################### HAVING ###############################
+
+        for tag, having_spec in self._having.items():
+            alias = self.tag_to_alias_map[tag]
+            self._query = self._query.having(self._build_having(alias, having_spec))
+
         ######################### PROJECTIONS ##########################
         # first clear the entities in the case the first item in the
         # path was not meant to be projected
@@ -2033,6 +2323,8 @@ class QueryBuilder:
         :param tag: The tag for a vertice in the path
         :returns: the alias given for that vertice
         """
+        # The query should be built with this alias, so it can no longer be taken from the query cache
+        self._use_query_cache = False
         tag = self._get_tag_from_specification(tag)
         return self.tag_to_alias_map[tag]
 
@@ -2057,8 +2349,10 @@ class QueryBuilder:
     def get_query(self):
         """
         Instantiates and manipulates a sqlalchemy.orm.Query instance if this is needed.
-        First,  I check if the query instance is still valid by hashing the queryhelp.
+        First,  I check if the query instance is still valid by comparing the key of the queryhelp.
         In this way, if a user asks for the same query twice, I am not recreating an instance.
+        If the query does need to be built, a query of the same shape is taken from the query cache if possible,
+        see :mod:`aiida.orm.utils.querycache`.
 
         :returns: an instance of sqlalchemy.orm.Query that is specific to the backend used.
         """
@@ -2068,9 +2362,11 @@ class QueryBuilder:
         # It describes whether the current query
         # which is an attribute _query of this instance is still valid
         # The queryhelp_hash is used to determine
-        # whether the query is still valid
+        # whether the query is still valid. The key of the query serves as the hash, since it is much cheaper to
+        # compute, unless the queryhelp contains values that cannot be part of the key.
 
-        queryhelp_hash = make_hash(self.queryhelp)
+        query_key = self._get_query_key()
+        queryhelp_hash = make_hash(self.queryhelp) if query_key is None else query_key
         # if self._hash (which is None if this function has not been invoked
         # and is a string (hash) if it has) is the same as the queryhelp
         # I can use the query again:
@@ -2085,17 +2381,117 @@ class QueryBuilder:
             need_to_build = True
 
         if need_to_build:
-            query = self._build()
+            query = self._build_cached(query_key)
             self._hash = queryhelp_hash
         else:
             try:
                 query = self._query
             except AttributeError:
                 _LOGGER.warning('AttributeError thrown even though I should have _query as an attribute')
-                query = self._build()
+                query = self._build_cached(query_key)
                 self._hash = queryhelp_hash
         return query
 
+    def _get_query_key(self):
+        """Return the key that identifies the shape of the query in the query cache and the values of its filters.
+
+        The key includes the name of the current profile, since the query cache is shared by all profiles that are
+        loaded in the same interpreter.
+
+        :returns: tuple of the key and a tuple of the filter values that are bind parameters of the query, or None if
+            the queryhelp contains values that cannot be part of a key
+        """
+        from aiida.manage.configuration import get_profile
+
+        profile = get_profile()
+        values = []
+        filters = {tag: parametrize_filters(filter_spec, values) for tag, filter_spec in self._filters.items()}
+        structure = [
+            profile.name if profile is not None else None,
+            type(self._impl).__name__, self._path, filters, self._projections, self._order_by, self._group_by,
+            self._having, self._limit, self._offset
+        ]
+
+        if not is_key_value(structure):
+            return None
+
+        return repr(structure), tuple(values)
+
+    def _build_cached(self, query_key):
+        """Build the query, or take the query of the same shape from the query cache and bind the filter values.
+
+        :param query_key: the key of the query and its filter values as returned by `_get_query_key`, or None
+        :returns: an instance of sqlalchemy.orm.Query
+        """
+        if query_key is None or self._debug or not self._use_query_cache:
+            return self._build()
+
+        cache = get_query_cache()
+        key, values = query_key
+
+        # Whether the recursive joins use the provenance closure table depends on the database and not the queryhelp
+        if any(vertex['joining_keyword'] in self._RECURSIVE_JOINING_KEYWORDS for vertex in self._path):
+            key = (key, has_provenance_closure(self._backend))
+
+        entry = cache.get(key)
+
+        if entry:
+            parameters = {bind_key: values[index] for bind_key, index in entry.parameters}
+            self._query = entry.query.with_session(self._impl.get_session()).params(parameters)
+            self.tag_to_alias_map = dict(entry.tag_to_alias_map)
+            self.tag_to_projected_property_dict = copy.deepcopy(entry.tag_to_projected_property_dict)
+            self.nr_of_projections = entry.nr_of_projections
+            self._attrkeys_as_in_sql_result = dict(entry.attrkeys_as_in_sql_result)
+            return self._query
+
+        query = self._build()
+
+        if entry is None:
+            cache.add(key, lambda: self._get_cache_entry(query, values))
+
+        return query
+
+    def _get_cache_entry(self, query, values):
+        """Return the entry of the query cache for the query that was just built.
+
+        The query is built a second time with probe values instead of the filter values, to match the bind parameters
+        of the query to the filter values. The probe query is the one that is cached, such that the given query, which
+        is the query of this builder, is not modified.
+
+        :param query: the query built by `_build`
+        :param values: the filter values that are bind parameters of the query
+        :returns: a `CacheEntry`, or None if the bind parameters cannot be matched to the filter values
+        """
+        # pylint: disable=protected-access
+        probes = get_probe_values(values)
+
+        if probes is None:
+            return None
+
+        # A shallow copy suffices, since building only reassigns the attributes, except for the edges that are added
+        # to the `tag_to_alias_map`. Note that a deep copy would not work for queries of entities other than nodes.
+        substitutes = iter(probes)
+        probe_builder = copy.copy(self)
+        probe_builder.tag_to_alias_map = dict(self.tag_to_alias_map)
+        probe_builder._filters = {
+            tag: parametrize_filters(filter_spec, [], lambda value: next(substitutes))
+            for tag, filter_spec in self._filters.items()
+        }
+        probe_query = probe_builder._build()
+        parameters = match_parameters(query, probe_query, values, probes)
+
+        if parameters is None:
+            return None
+
+        return CacheEntry(
+            query=CachedQuery.from_query(probe_query),
+            parameters=parameters,
+            tag_to_alias_map=dict(probe_builder.tag_to_alias_map),
+            tag_to_projected_property_dict=copy.deepcopy(probe_builder.tag_to_projected_property_dict),
+            nr_of_projections=probe_builder.nr_of_projections,
+            attrkeys_as_in_sql_result=dict(probe_builder._attrkeys_as_in_sql_result),
+        )
+
     @staticmethod
     def get_aiida_entity_res(value):
         """Convert a projected query result to front end class if it is an instance of a `BackendEntity`.
@@ -2157,6 +2553,14 @@ class QueryBuilder:
         query = self.get_query()
         result = self._impl.first(query)
 
+        return self._convert_first(result)
+
+    def _convert_first(self, result):
+        """Convert the first row of the results of the query, as returned by :meth:`.first`.
+
+        :param result: the row as returned by the backend or None if there are no results
+        :returns: One row of results as a list
+        """
         if result is None:
             return None
 
@@ -2192,46 +2596,70 @@ class QueryBuilder:
         query = self.get_query()
         return self._impl.count(query)
 
-    def iterall(self, batch_size=100):
+    def iterall(self, batch_size=100, stream=False, proxy=False):
         """
         Same as :meth:`.all`, but returns a generator.
         Be aware that this is only safe if no commit will take place during this
-        transaction. You might also want to read the SQLAlchemy documentation on
+        transaction, unless ``stream`` is True. You might also want to read the SQLAlchemy documentation on
         http://docs.sqlalchemy.org/en/latest/orm/query.html#sqlalchemy.orm.query.Query.yield_per
 
 
         :param int batch_size:
             The size of the batches to ask the backend to batch results in subcollections.
             You can optimize the speed of the query by tuning this parameter.
+        :param bool stream:
+            If True, the query is executed with a server-side cursor on a separate database connection, such that
+            changes to entities can be stored while iterating, and only one batch of rows is fetched at a time.
+            This is slightly slower per result, so it is recommended for long iterations over many entities.
+            Note that the separate connection does not see the changes of the current transaction that have not
+            been committed yet. Moreover, the entities are attached to the session of the current thread, so that
+            they can be modified, which means they are only released once they are no longer referenced and have no
+            pending changes. Combine it with ``proxy`` to get detached views that are never held by the session.
+        :param bool proxy:
+            If True, nodes are returned as an immutable :class:`~aiida.orm.nodes.view.NodeView` of their
+            properties, attributes and extras, which is much cheaper to construct than the node itself.
 
         :returns: a generator of lists
         """
         query = self.get_query()
 
-        for item in self._impl.iterall(query, batch_size, self._attrkeys_as_in_sql_result):
+        for item in self._impl.iterall(query, batch_size, self._attrkeys_as_in_sql_result, stream=stream, proxy=proxy):
             # Convert to AiiDA frontend entities (if they are such)
             for i, item_entry in enumerate(item):
                 item[i] = self.get_aiida_entity_res(item_entry)
 
             yield item
 
-    def iterdict(self, batch_size=100):
+    def iterdict(self, batch_size=100, stream=False, proxy=False):
         """
         Same as :meth:`.dict`, but returns a generator.
         Be aware that this is only safe if no commit will take place during this
-        transaction. You might also want to read the SQLAlchemy documentation on
+        transaction, unless ``stream`` is True. You might also want to read the SQLAlchemy documentation on
         http://docs.sqlalchemy.org/en/latest/orm/query.html#sqlalchemy.orm.query.Query.yield_per
 
 
         :param int batch_size:
             The size of the batches to ask the backend to batch results in subcollections.
             You can optimize the speed of the query by tuning this parameter.
+        :param bool stream:
+            If True, the query is executed with a server-side cursor on a separate database connection, such that
+            changes to entities can be stored while iterating, and only one batch of rows is fetched at a time.
+            This is slightly slower per result, so it is recommended for long iterations over many entities.
+            Note that the separate connection does not see the changes of the current transaction that have not
+            been committed yet. Moreover, the entities are attached to the session of the current thread, so that
+            they can be modified, which means they are only released once they are no longer referenced and have no
+            pending changes. Combine it with ``proxy`` to get detached views that are never held by the session.
+        :param bool proxy:
+            If True, nodes are returned as an immutable :class:`~aiida.orm.nodes.view.NodeView` of their
+            properties, attributes and extras, which is much cheaper to construct than the node itself.
 
         :returns: a generator of dictionaries
         """
         query = self.get_query()
 
-        for item in self._impl.iterdict(query, batch_size, self.tag_to_projected_property_dict, self.tag_to_alias_map):
+        for item in self._impl.iterdict(
+            query, batch_size, self.tag_to_projected_property_dict, self.tag_to_alias_map, stream=stream, proxy=proxy
+        ):
             for key, value in item.items():
                 item[key] = self.get_aiida_entity_res(value)
 
@@ -2310,6 +2738,178 @@ class QueryBuilder:
         """
         return list(self.iterdict(batch_size=batch_size))
 
+    async def _execute_async(self, function, query):
+        """Execute the query in a thread of the database executor, such that the event loop is not blocked.
+
+        The query is executed with the session of that thread, after which the database model instances in the result
+        are attached to the session of this thread, see :class:`aiida.manage.database.executor.DatabaseExecutor`.
+
+        :param function: the function that executes the query, called with the query as its only argument
+        :param query: the query
+        :returns: the result of the function, which is a list of rows if it is a list
+        """
+        executor = get_manager().get_database_executor()
+        result = await executor.run(lambda: function(query.with_session(self._impl.get_session())))
+
+        if not isinstance(result, list):
+            return result
+
+        return [
+            tuple(executor.attach(value)
+                  for value in row) if isinstance(row, tuple) else executor.attach(row)
+            for row in result
+        ]
+
+    async def first_async(self):
+        """Asynchronous version of :meth:`.first`, that executes the query without blocking the event loop.
+
+        :returns: One row of results as a list
+        """
+        results = await self._execute_async(lambda query: query.limit(1).all(), self.get_query())
+
+        return self._convert_first(results[0] if results else None)
+
+    async def one_async(self):
+        """Asynchronous version of :meth:`.one`, that executes the query without blocking the event loop.
+
+        :raises: MultipleObjectsError if more then one row can be returned
+        :raises: NotExistent if no result was found
+        """
+        from aiida.common.exceptions import MultipleObjectsError, NotExistent
+        self.limit(2)
+        res = await self.all_async()
+        if len(res) > 1:
+            raise MultipleObjectsError('More than one result was found')
+        elif len(res) == 0:
+            raise NotExistent('No result was found')
+        return res[0]
+
+    async def count_async(self):
+        """Asynchronous version of :meth:`.count`, that executes the query without blocking the event loop.
+
+        :returns: the number of rows as an integer
+        """
+        return await self._execute_async(self._impl.count, self.get_query())
+
+    async def all_async(self, flat=False):
+        """Asynchronous version of :meth:`.all`, that executes the query without blocking the event loop.
+
+        The query is executed by the database executor, see :meth:`aiida.manage.manager.Manager.get_database_executor`,
+        such that coroutines running on the event loop, for example the processes of a daemon worker, can continue
+        while the database executes the query. All rows are fetched at once.
+
+        :param bool flat: return the result as a flat list of projected entities without sub lists.
+        :returns: a list of lists of all projected entities.
+        """
+        results = await self._execute_async(lambda query: query.all(), self.get_query())
+        matches = []
+
+        for item in self._impl.iterall_results(results, self._attrkeys_as_in_sql_result):
+            matches.append([self.get_aiida_entity_res(item_entry) for item_entry in item])
+
+        if not flat:
+            return matches
+
+        return [projection for entry in matches for projection in entry]
+
+    async def dict_async(self):
+        """Asynchronous version of :meth:`.dict`, that executes the query without blocking the event loop.
+
+        :returns: a list of dictionaries of all projected entities.
+        """
+        results = await self._execute_async(lambda query: query.all(), self.get_query())
+        matches = []
+
+        for item in self._impl.iterdict_results(results, self.tag_to_projected_property_dict, self.tag_to_alias_map):
+            matches.append({key: self.get_aiida_entity_res(value) for key, value in item.items()})
+
+        return matches
+
+    def to_arrays(self, batch_size=None):
+        """Executes the full query and returns the results as one array per projection.
+
+        This is much faster than :meth:`.dict` or :meth:`.all` for queries that project a few columns or attributes of
+        many rows, since the values are converted per column instead of per value. Integer, float and boolean columns,
+        including attributes that are projected with the corresponding ``cast``, are returned as arrays of that type.
+        Only columns and attributes can be projected, not the entities themselves with ``'*'``.
+
+        :param int batch_size: the number of rows to fetch from the database per step. Leave the default `None` to fetch
+            all rows at once.
+        :returns: a dictionary with the same structure as a single result of :meth:`.dict`, where each value is a
+            :class:`numpy.ndarray` with the values of that projection for all rows.
+        :raises ~aiida.common.exceptions.InputValidationError: if an entity is projected.
+
+        Usage::
+
+            qb = QueryBuilder()
+            qb.append(Int, tag='integer', project=['id', {'attributes.value': {'cast': 'i'}}])
+            arrays = qb.to_arrays()
+            arrays['integer']['attributes.value'].sum()
+        """
+        return self._columns_to_dict(self._impl.get_columns(self._get_query_for_arrays(), batch_size))
+
+    def iterarrays(self, batch_size=100000):
+        """Same as :meth:`.to_arrays`, but returns a generator of the results of one batch of rows at a time.
+
+        Only one batch of rows is held in memory, such that this can be used to process results that would not fit in
+        memory as a whole. Note that, like :meth:`.iterall`, the query runs in the transaction of the session, which
+        should therefore not be committed while iterating.
+
+        :param int batch_size: the number of rows of a batch, or `None` to return all rows as a single batch.
+        :returns: a generator of dictionaries like the one returned by :meth:`.to_arrays`, one per batch.
+        :raises ~aiida.common.exceptions.InputValidationError: if an entity is projected.
+        """
+        for columns in self._impl.iter_columns(self._get_query_for_arrays(), batch_size):
+            yield self._columns_to_dict(columns)
+
+    def _get_query_for_arrays(self):
+        """Return the query to get the results as arrays, after checking that no entities are projected.
+
+        :raises ~aiida.common.exceptions.InputValidationError: if an entity is projected.
+        """
+        query = self.get_query()
+
+        for tag, projected_entities_dict in self.tag_to_projected_property_dict.items():
+            if '*' in projected_entities_dict:
+                raise InputValidationError(
+                    f'cannot return the entities of `{tag}` as arrays, project columns or attributes instead of `*`'
+                )
+
+        return query
+
+    def _columns_to_dict(self, columns):
+        """Return the arrays of the projected columns as a dictionary with the structure of a result of :meth:`.dict`.
+
+        :param columns: the list of arrays, in the order of the projections in the query
+        """
+        return {
+            tag: {
+                self._impl.get_corresponding_property(
+                    self._impl.get_table_name(self.tag_to_alias_map[tag]), attrkey, self._impl.inner_to_outer_schema
+                ): columns[index_in_sql_result] for attrkey, index_in_sql_result in projected_entities_dict.items()
+            } for tag, projected_entities_dict in self.tag_to_projected_property_dict.items()
+        }
+
+    def to_dataframe(self, batch_size=None):
+        """Executes the full query and returns the results as a :class:`pandas.DataFrame`.
+
+        The columns of the data frame are built with :meth:`.to_arrays` and are labeled by a tuple of the tag and the
+        projection, e.g. ``('integer', 'attributes.value')``. This requires the `pandas` package to be installed.
+
+        :param int batch_size: the number of rows to fetch from the database per step. Leave the default `None` to fetch
+            all rows at once.
+        :returns: a data frame with one row per result and one column per projection.
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError('Unable to import the pandas package, please install it to return a query as data frame')
+
+        arrays = self.to_arrays(batch_size=batch_size)
+
+        return pandas.DataFrame({(tag, key): array for tag, columns in arrays.items()
+                                 for key, array in columns.items()})
+
     def inputs(self, **kwargs):
         """
         Join to inputs of previous vertice in path.
@@ -9,7 +9,7 @@
 ###########################################################################
 """Utilities related to the ORM."""
 
-__all__ = ('load_code', 'load_computer', 'load_group', 'load_node')
+__all__ = ('load_code', 'load_computer', 'load_group', 'load_node', 'load_nodes')
 
 
 def load_entity(
@@ -79,6 +79,74 @@ def load_entity(
     )
 
 
+def load_entities(
+    entity_loader=None, identifiers=None, pks=None, uuids=None, labels=None, sub_classes=None, query_with_dashes=True
+):
+    # pylint: disable=too-many-arguments
+    """
+    Load the entity instances for a list of identifiers of one type: pks, uuids or labels
+
+    The identifiers are resolved with a single query, see :meth:`aiida.orm.utils.loaders.OrmEntityLoader.load_entities`.
+    If the type of the identifiers is unknown simply pass them without a keyword and the loader will attempt to
+    automatically infer the type of each identifier, such that a list of mixed identifiers can be passed.
+
+    :param identifiers: list of pks (integer), uuids (string) or labels (string)
+    :param pks: list of pks
+    :param uuids: list of uuids, or the beginnings of the uuids
+    :param labels: list of labels
+    :param sub_classes: an optional tuple of orm classes to narrow the queryset. Each class should be a strict sub class
+        of the ORM class of the given entity loader.
+    :param bool query_with_dashes: allow to query for a uuid with dashes
+    :returns: the list of instances in the order of the identifiers
+    :raise ValueError: if none or more than one of the lists of identifiers are supplied
+    :raise TypeError: if a provided identifier has the wrong type
+    :raise aiida.common.NotExistent: if no matching entity is found for any of the identifiers
+    :raise aiida.common.MultipleObjectsError: if more than one entity was found for any of the identifiers
+    """
+    from aiida.orm.utils.loaders import OrmEntityLoader, IdentifierType
+
+    if entity_loader is None or not issubclass(entity_loader, OrmEntityLoader):
+        raise TypeError(f'entity_loader should be a sub class of {type(OrmEntityLoader)}')
+
+    inputs_provided = [value is not None for value in (identifiers, pks, uuids, labels)].count(True)
+
+    if inputs_provided == 0:
+        raise ValueError("one of the parameters 'identifiers', pks', 'uuids' or 'labels' has to be specified")
+    elif inputs_provided > 1:
+        raise ValueError("only one of parameters 'identifiers', pks', 'uuids' or 'labels' has to be specified")
+
+    if pks is not None:
+
+        if not all(isinstance(pk, int) for pk in pks):
+            raise TypeError('a pk has to be an integer')
+
+        identifiers = pks
+        identifier_type = IdentifierType.ID
+
+    elif uuids is not None:
+
+        if not all(isinstance(uuid, str) for uuid in uuids):
+            raise TypeError('uuid has to be a string type')
+
+        identifiers = uuids
+        identifier_type = IdentifierType.UUID
+
+    elif labels is not None:
+
+        if not all(isinstance(label, str) for label in labels):
+            raise TypeError('label has to be a string type')
+
+        identifiers = labels
+        identifier_type = IdentifierType.LABEL
+    else:
+        identifiers = [str(identifier) for identifier in identifiers]
+        identifier_type = None
+
+    return entity_loader.load_entities(
+        identifiers, identifier_type, sub_classes=sub_classes, query_with_dashes=query_with_dashes
+    )
+
+
 def load_code(identifier=None, pk=None, uuid=None, label=None, sub_classes=None, query_with_dashes=True):
     """
     Load a Code instance by one of its identifiers: pk, uuid or label
@@ -203,3 +271,36 @@ def load_node(identifier=None, pk=None, uuid=None, label=None, sub_classes=None,
         sub_classes=sub_classes,
         query_with_dashes=query_with_dashes
     )
+
+
+def load_nodes(identifiers=None, pks=None, uuids=None, labels=None, sub_classes=None, query_with_dashes=True):
+    """
+    Load the nodes for a list of identifiers of one type: pks, uuids or labels, with a single query
+
+    If the type of the identifiers is unknown simply pass them without a keyword and the loader will attempt to
+    automatically infer the type of each identifier. Nodes that were already loaded in the current session by this
+    function, and are still in use, are not loaded again but the same instance is returned.
+
+    :param identifiers: list of pks (integer), uuids (string) or labels (string)
+    :param pks: list of pks of nodes
+    :param uuids: list of uuids of nodes, or the beginnings of the uuids
+    :param labels: list of labels of nodes
+    :param sub_classes: an optional tuple of orm classes to narrow the queryset. Each class should be a strict sub class
+        of the ORM class of the given entity loader.
+    :param bool query_with_dashes: allow to query for a uuid with dashes
+    :returns: the list of node instances in the order of the identifiers
+    :raise ValueError: if none or more than one of the lists of identifiers are supplied
+    :raise TypeError: if a provided identifier has the wrong type
+    :raise aiida.common.NotExistent: if no matching Node is found for any of the identifiers
+    :raise aiida.common.MultipleObjectsError: if more than one Node was found for any of the identifiers
+    """
+    from aiida.orm.utils.loaders import NodeEntityLoader
+    return load_entities(
+        NodeEntityLoader,
+        identifiers=identifiers,
+        pks=pks,
+        uuids=uuids,
+        labels=labels,
+        sub_classes=sub_classes,
+        query_with_dashes=query_with_dashes
+    )
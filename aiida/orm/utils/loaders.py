@@ -10,16 +10,22 @@
 """Module with `OrmEntityLoader` and its sub classes that simplify loading entities through their identifiers."""
 from abc import abstractclassmethod
 from enum import Enum
+import weakref
+
+from sqlalchemy import inspect
 
 from aiida.common.exceptions import MultipleObjectsError, NotExistent
 from aiida.common.lang import classproperty
 from aiida.orm.querybuilder import QueryBuilder
 
 __all__ = (
-    'get_loader', 'OrmEntityLoader', 'CalculationEntityLoader', 'CodeEntityLoader', 'ComputerEntityLoader',
-    'GroupEntityLoader', 'NodeEntityLoader'
+    'get_loader', 'get_identity_map', 'OrmEntityLoader', 'CalculationEntityLoader', 'CodeEntityLoader',
+    'ComputerEntityLoader', 'GroupEntityLoader', 'NodeEntityLoader'
 )
 
+# The identity maps of the entities loaded by `OrmEntityLoader.load_entities` for each database session
+IDENTITY_MAPS = weakref.WeakKeyDictionary()
+
 
 def get_loader(orm_class):
     """Return the correct OrmEntityLoader for the given orm class.
@@ -45,6 +51,71 @@ def get_loader(orm_class):
     raise ValueError(f'no OrmEntityLoader available for {orm_class}')
 
 
+def get_identity_map():
+    """Return the identity map of the entities loaded by :meth:`OrmEntityLoader.load_entities` in the current session.
+
+    The map has a key for the base entity class, e.g. `Node`, and the pk of every entity and only holds weak references,
+    such that an entity is dropped from the map as soon as it is no longer used elsewhere. Since the database session is
+    scoped to the thread, so is the map.
+
+    :return: a :class:`weakref.WeakValueDictionary` of the loaded entities
+    """
+    from aiida.manage.manager import get_manager
+
+    session = get_manager().get_backend().get_session()
+
+    try:
+        return IDENTITY_MAPS[session]
+    except KeyError:
+        return IDENTITY_MAPS.setdefault(session, weakref.WeakValueDictionary())
+
+
+def is_attached(entity, session):
+    """Return whether the database model instance of an entity can still be used with the given session.
+
+    An instance of a SqlAlchemy model has to be persistent in the session, which it no longer is after the session has
+    been closed or the entity has been deleted. A Django model instance is not bound to a session.
+
+    :param entity: the entity
+    :param session: the database session
+    :return: boolean, True if the entity can be used with the session
+    """
+    state = inspect(entity.backend_entity.dbmodel, raiseerr=False)
+    return state is None or (state.session is session and state.persistent)
+
+
+def get_filter_matcher(key, specification):
+    """Return a function that returns whether a value matches the filter specification of an identifier.
+
+    Only equality and the `like` operator with a pattern of a prefix, as used for partial UUIDs, are supported. Like in
+    the database, UUIDs are compared case insensitively for equality.
+
+    :param key: the filtered property
+    :param specification: the filter specification, either a value or a dictionary with a single operator
+    :return: a function that takes the value of the property of an entity, or None if the specification is not supported
+    """
+    if not isinstance(specification, dict):
+        specification = {'==': specification}
+
+    if len(specification) != 1:
+        return None
+
+    [(operator, operand)] = specification.items()
+
+    if operator == '==' and key == 'uuid':
+        return lambda value: value.lower() == operand.lower()
+
+    if operator == '==':
+        return lambda value: value == operand
+
+    if operator == 'like' and isinstance(operand, str) and operand.endswith('%'):
+        prefix = operand[:-1]
+        if not any(character in prefix for character in ('%', '_', '\\')):
+            return lambda value: str(value).startswith(prefix)
+
+    return None
+
+
 class IdentifierType(Enum):
     """
     The enumeration that defines the three types of identifier that can be used to identify an orm entity.
@@ -220,6 +291,103 @@ class OrmEntityLoader:
 
         return entity
 
+    @classmethod
+    def load_entities(cls, identifiers, identifier_type=None, sub_classes=None, query_with_dashes=True):
+        """
+        Load the entities that uniquely correspond to each of the provided identifiers of the identifier type.
+
+        All identifiers are resolved with a single query. The entities that are not already in the identity map of the
+        current session, see :func:`get_identity_map`, are then loaded with a second query and added to it. Identifiers
+        that cannot be resolved as part of a single query, such as the label of a code with the label of its computer,
+        are resolved with a query of their own.
+
+        :param identifiers: a list of identifiers
+        :param identifier_type: the type of the identifiers, if None it is inferred for each identifier separately
+        :param sub_classes: an optional tuple of orm classes, that should each be strict sub classes of the
+            base orm class of the loader, that will narrow the queryset
+        :returns: a list of the loaded entities in the order of the identifiers
+        :raises aiida.common.MultipleObjectsError: if any of the identifiers maps onto multiple entities
+        :raises aiida.common.NotExistent: if any of the identifiers maps onto not a single entity
+        """
+        # pylint: disable=protected-access,too-many-locals
+        from aiida.manage.manager import get_manager
+        from aiida.orm.entities import Entity
+
+        classes = cls.get_query_classes(sub_classes)
+        class_filters = QueryBuilder().append(cls=classes, tag='entity')._filters['entity']
+        base_class = next(klass for klass in cls.orm_base_class.__mro__ if Entity in klass.__bases__)
+
+        entities = {}
+        matches = {}
+        matchers = {}
+        identifier_filters = []
+        parameters = []
+
+        for index, identifier in enumerate(identifiers):
+            builder, query_parameters = cls.get_query_builder(
+                identifier, identifier_type, sub_classes, query_with_dashes
+            )
+            parameters.append(query_parameters)
+
+            tag = builder._path[0]['tag']
+            filters = {key: value for key, value in builder._filters[tag].items() if key not in class_filters}
+            filter_matchers = {key: get_filter_matcher(key, value) for key, value in filters.items()}
+
+            if len(builder._path) == 1 and None not in filter_matchers.values():
+                identifier_filters.append(filters)
+                matchers[index] = filter_matchers
+            else:
+                results = builder.limit(2).all(flat=True)
+                matches[index] = [entity.pk for entity in results]
+                entities.update((entity.pk, entity) for entity in results)
+
+        if identifier_filters:
+            keys = sorted({'id'}.union(*matchers.values()))
+            builder = QueryBuilder().append(cls=classes, tag='entity', project=keys, filters={'or': identifier_filters})
+            rows = [dict(zip(keys, values)) for values in builder.iterall()]
+
+            for index, filter_matchers in matchers.items():
+                matches[index] = [
+                    row['id'] for row in rows if all(match(row[key]) for key, match in filter_matchers.items())
+                ]
+
+        classes_string = ' or '.join([sub_class.__name__ for sub_class in classes])
+        errors = {}
+
+        for index, query_parameters in enumerate(parameters):
+            description = f"{query_parameters['identifier_type'].value}<{query_parameters['identifier']}>"
+            if len(matches[index]) > 1:
+                errors.setdefault(MultipleObjectsError, []).append(description)
+            elif not matches[index]:
+                errors.setdefault(NotExistent, []).append(description)
+
+        if MultipleObjectsError in errors:
+            error = ', '.join(errors[MultipleObjectsError])
+            raise MultipleObjectsError(f'multiple {classes_string} entries found with {error}')
+
+        if NotExistent in errors:
+            raise NotExistent(f"no {classes_string} found with {', '.join(errors[NotExistent])}")
+
+        identity_map = get_identity_map()
+        session = get_manager().get_backend().get_session()
+        pks = {pk for [pk] in matches.values()}
+
+        for pk in pks - set(entities):
+            entity = identity_map.get((base_class, pk), None)
+            if entity is not None and is_attached(entity, session):
+                entities[pk] = entity
+
+        missing = list(pks - set(entities))
+
+        if missing:
+            builder = QueryBuilder().append(cls=classes, filters={'id': {'in': missing}}, project='*')
+            entities.update((entity.pk, entity) for entity in builder.all(flat=True))
+
+        for pk, entity in entities.items():
+            identity_map[(base_class, pk)] = entity
+
+        return [entities[matches[index][0]] for index in range(len(identifiers))]
+
     @classmethod
     def get_query_classes(cls, sub_classes=None):
         """
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Cache of the SQLAlchemy queries built by the :class:`~aiida.orm.querybuilder.QueryBuilder`.
+
+Many parts of AiiDA build queries of the same shape over and over again, that only differ in the values they filter
+on, for example the pk of a node. Building the SQLAlchemy query for a queryhelp is relatively expensive, so the built
+queries are cached, keyed on the structure of the queryhelp in which the filter values that end up as bind parameters
+of the query are replaced by a placeholder of their type. A query of the same shape then simply reuses the cached
+query with the values of its own filters for the bind parameters.
+
+To find out which bind parameters of a built query correspond to which filter value, the query is built a second time
+with a unique probe value for each of the filter values. The bind parameters whose value changed are those of the
+filters, the others are constants of the query. If the probe does not match up exactly, for example because a filter
+value was transformed before ending up in a bind parameter, the shape is marked as not cacheable and is simply built
+each time. Since probing doubles the cost of building, a shape is only probed the second time it is encountered.
+
+The cached queries are the probe queries, such that the query that is returned to the builder that was probed is not
+modified. They are instances of :class:`CachedQuery`, which also keep the compiled SQL statement, such that
+executing a cached query with new values for its bind parameters requires neither building nor compiling it.
+"""
+import collections
+import contextlib
+import copy
+import datetime
+import threading
+import uuid
+
+from sqlalchemy.orm import Query, loading
+from sqlalchemy.sql import visitors
+
+__all__ = ('QueryCache', 'get_query_cache', 'disable_query_cache')
+
+QUERY_CACHE_SIZE = 256
+
+LOGICAL_OPERATORS = ('and', 'or', '~and', '~or', '!and', '!or')
+
+# Operators whose value ends up unaltered as a bind parameter of the query. For `in` that is true for each element.
+PARAMETER_OPERATORS = ('==', '>', '<', '>=', '<=', '=>', '=<', 'like', 'ilike', 'in')
+
+# The types of filter values that are replaced by a bind parameter. Note that `bool` is not a parameter since the
+# comparison with a boolean can be rendered as a constant, and it is excluded by the exact type check.
+PARAMETER_TYPES = (int, float, str, datetime.datetime)
+
+# The types of the other values that can be part of the key, whose representation fully determines their value.
+KEY_TYPES = PARAMETER_TYPES + (type(None), bool, datetime.date, uuid.UUID)
+
+CacheEntry = collections.namedtuple(
+    'CacheEntry', [
+        'query', 'parameters', 'tag_to_alias_map', 'tag_to_projected_property_dict', 'nr_of_projections',
+        'attrkeys_as_in_sql_result'
+    ]
+)
+
+
+class Parameter:
+    """Placeholder for a filter value in the key of a query, which only retains the type of the value."""
+
+    __slots__ = ('type',)
+
+    def __init__(self, value):
+        self.type = type(value)
+
+    def __repr__(self):
+        return f'<parameter {self.type.__name__}>'
+
+
+class CachedQuery(Query):
+    """Query that executes the statement that was compiled once, as long as the query is not modified.
+
+    Any generative method, such as `limit` or `from_self`, returns a normal query that is compiled when executed, except
+    for the methods that do not change the statement and are used to execute the query: `params`, `with_session` and
+    `yield_per`.
+    """
+
+    _cached_context = None
+    _compiled_statements = None
+
+    @classmethod
+    def from_query(cls, query):
+        """Return a copy of the given query without session, whose context and statement are compiled only once.
+
+        :param query: an instance of `sqlalchemy.orm.Query`
+        :return: a `CachedQuery` instance
+        """
+        # pylint: disable=protected-access
+        context = query._compile_context()
+        context.statement.use_labels = True
+        context.query = None
+        context.session = None
+
+        cached = cls.__new__(cls)
+        cached.__dict__ = query.__dict__.copy()
+        cached.session = None
+        cached._cached_context = context
+        cached._compiled_statements = {}
+
+        return cached
+
+    def _clone(self):
+        query = super()._clone()
+        query._cached_context = None
+        return query
+
+    def _keep_context(self, query):
+        """Return the given clone of this query with the compiled context of this query."""
+        query._cached_context = self._cached_context  # pylint: disable=protected-access
+        return query
+
+    def params(self, *args, **kwargs):
+        return self._keep_context(super().params(*args, **kwargs))
+
+    def with_session(self, session):
+        return self._keep_context(super().with_session(session))
+
+    def yield_per(self, count):
+        return self._keep_context(super().yield_per(count))
+
+    def __iter__(self):
+        if self._cached_context is None:
+            return super().__iter__()
+
+        # The context is copied, since it also holds the state of a single execution, as is done for baked queries
+        context = copy.copy(self._cached_context)
+        context.query = self
+        context.session = self.session
+        context.attributes = context.attributes.copy()
+
+        if self._autoflush and not self._populate_existing:
+            self.session._autoflush()  # pylint: disable=protected-access
+
+        connection = self._get_bind_args(context, self._connection_from_session, close_with_result=True)
+
+        try:
+            compiled = self._compiled_statements[connection.dialect]
+        except KeyError:
+            compiled = context.statement.compile(dialect=connection.dialect)
+            self._compiled_statements[connection.dialect] = compiled
+
+        result = connection.execute(compiled, self._params)
+        return loading.instances(self, result, context)
+
+
+class QueryCache:
+    """Least recently used cache of built queries.
+
+    A key that is seen for the first time is only recorded, such that one-off queries do not pay for the probing of
+    their parameters. A key whose query turned out not to be cacheable is stored with an entry of ``False``.
+    """
+
+    def __init__(self, maxsize=QUERY_CACHE_SIZE):
+        """Construct a new cache.
+
+        :param maxsize: the maximum number of keys to keep, a value of zero disables the cache
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the entry for the given key and mark it as the most recently used.
+
+        :param key: the key of the query
+        :return: the `CacheEntry`, `None` if the key is not in the cache or has only been seen once, or `False` if the
+            query is not cacheable
+        """
+        if self.maxsize <= 0:
+            return None
+
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            entry = self._entries[key]
+            if entry:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def add(self, key, create_entry):
+        """Add the entry for the given key if the key has been seen before, otherwise record that it has been seen.
+
+        The least recently used key is evicted if the cache is full.
+
+        :param key: the key of the query
+        :param create_entry: callable that returns the `CacheEntry` for the key, or None if it is not cacheable
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            seen = key in self._entries
+
+        if seen:
+            entry = create_entry() or False
+        else:
+            entry = None
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries from the cache and reset its statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+QUERY_CACHE = QueryCache()
+
+
+def get_query_cache():
+    """Return the cache of built queries that is used by the `QueryBuilder`.
+
+    :return: the `QueryCache` instance
+    """
+    return QUERY_CACHE
+
+
+@contextlib.contextmanager
+def disable_query_cache():
+    """Context manager that disables the cache of built queries, such that every query is built from scratch."""
+    maxsize = QUERY_CACHE.maxsize
+    QUERY_CACHE.maxsize = 0
+    try:
+        yield
+    finally:
+        QUERY_CACHE.maxsize = maxsize
+
+
+def is_parameter(value):
+    """Return whether the given filter value is replaced by a bind parameter.
+
+    :param value: a filter value
+    :return: boolean, True if the value is of one of the `PARAMETER_TYPES`
+    """
+    return type(value) in PARAMETER_TYPES  # pylint: disable=unidiomatic-typecheck
+
+
+def is_key_value(value):
+    """Return whether the given value can be part of the key of a query.
+
+    Only builtin types are allowed, such that two values with the same representation are guaranteed to result in
+    the same query.
+
+    :param value: a value of the queryhelp
+    :return: boolean, True if the value and all its items are of one of the `KEY_TYPES` or a `Parameter`
+    """
+    if isinstance(value, (list, tuple)):
+        return all(is_key_value(item) for item in value)
+
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and is_key_value(item) for key, item in value.items())
+
+    return type(value) in KEY_TYPES or isinstance(value, Parameter)  # pylint: disable=unidiomatic-typecheck
+
+
+def parametrize_filters(filter_spec, values, substitute=Parameter):
+    """Return a copy of the filter specification in which the values that become bind parameters are substituted.
+
+    The specification is traversed in the same way as by `QueryBuilder._build_filters` and the values are appended to
+    the given list in the order in which they are encountered.
+
+    :param filter_spec: the filter specification of a single tag
+    :param values: list to which the substituted values are appended
+    :param substitute: callable that returns the substitute for a value
+    :return: the substituted filter specification
+    """
+    if not isinstance(filter_spec, dict):
+        return filter_spec
+
+    parametrized = {}
+
+    for path_spec, filter_operation_dict in filter_spec.items():
+        if path_spec in LOGICAL_OPERATORS and isinstance(filter_operation_dict, (list, tuple)):
+            parametrized[path_spec] = [
+                parametrize_filters(sub_filter_spec, values, substitute) for sub_filter_spec in filter_operation_dict
+            ]
+        else:
+            if not isinstance(filter_operation_dict, dict):
+                filter_operation_dict = {'==': filter_operation_dict}
+            parametrized[path_spec] = parametrize_operations(filter_operation_dict, values, substitute)
+
+    return parametrized
+
+
+def parametrize_operations(filter_operation_dict, values, substitute):
+    """Return a copy of the operations on a single column in which the parameter values are substituted.
+
+    :param filter_operation_dict: dictionary of operator to value
+    :param values: list to which the substituted values are appended
+    :param substitute: callable that returns the substitute for a value
+    :return: the substituted dictionary of operations
+    """
+    if not isinstance(filter_operation_dict, dict):
+        return filter_operation_dict
+
+    parametrized = {}
+
+    for operator, value in filter_operation_dict.items():
+        bare_operator = operator.lstrip('~!') if isinstance(operator, str) else operator
+
+        if bare_operator in ('and', 'or') and isinstance(value, (list, tuple)):
+            value = [parametrize_operations(operations, values, substitute) for operations in value]
+        elif bare_operator == 'in' and isinstance(value, (list, tuple)) and all(is_parameter(item) for item in value):
+            value = [substitute_value(item, values, substitute) for item in value]
+        elif bare_operator in PARAMETER_OPERATORS and is_parameter(value):
+            value = substitute_value(value, values, substitute)
+
+        parametrized[operator] = value
+
+    return parametrized
+
+
+def substitute_value(value, values, substitute):
+    """Append the value to the list of values and return its substitute."""
+    values.append(value)
+    return substitute(value)
+
+
+def get_probe_values(values):
+    """Return a unique probe value of the same type for each of the given values.
+
+    :param values: the list of filter values
+    :return: list of probe values, or None if a probe value coincides with a filter value
+    """
+    probes = []
+
+    for index, value in enumerate(values):
+        if isinstance(value, int):
+            probe = -987654321987 - index
+        elif isinstance(value, float):
+            probe = -987654321987.5 - index
+        elif isinstance(value, str):
+            probe = f'\x00aiida-query-cache-probe-{index}'
+        else:
+            probe = datetime.datetime(1, 1, 1, tzinfo=value.tzinfo) + datetime.timedelta(seconds=index)
+
+        if probe in values:
+            return None
+
+        probes.append(probe)
+
+    return probes
+
+
+def get_bind_parameters(query):
+    """Return the bind parameters of the statement of the given query in a deterministic order.
+
+    :param query: an instance of `sqlalchemy.orm.Query`
+    :return: list of `sqlalchemy.sql.expression.BindParameter`
+    """
+    bind_parameters = []
+    visitors.traverse(query.with_labels().statement, {}, {'bindparam': bind_parameters.append})
+    return bind_parameters
+
+
+def is_same_value(left, right):
+    """Return whether the two values are equal and of the same type."""
+    return type(left) is type(right) and left == right  # pylint: disable=unidiomatic-typecheck
+
+
+def match_parameters(query, probe_query, values, probes):
+    """Match the bind parameters of the probe query to the filter values, by comparing them to those of the query.
+
+    :param query: the query built with the filter values
+    :param probe_query: the same query built with the probe values instead of the filter values
+    :param values: the list of filter values
+    :param probes: the list of probe values
+    :return: list of tuples of the key of a bind parameter of the probe query and the index of its filter value, or
+        None if the bind parameters cannot be matched unambiguously to the filter values
+
+    The matched bind parameters of the probe query are made non-unique. Otherwise they would get a new key when the
+    query is adapted, for example by `Query.count`, and their value could no longer be set through `Query.params`. It is
+    therefore the probe query that should be cached, while the query built with the filter values is left untouched,
+    since it may already be in use.
+    """
+    bind_parameters = get_bind_parameters(query)
+    probe_parameters = get_bind_parameters(probe_query)
+
+    if len(bind_parameters) != len(probe_parameters):
+        return None
+
+    indices = {(type(probe), probe): index for index, probe in enumerate(probes)}
+    parameters = []
+    matched = []
+
+    for bind_parameter, probe_parameter in zip(bind_parameters, probe_parameters):
+        value = bind_parameter.value
+        probe = probe_parameter.value
+
+        if is_same_value(value, probe):
+            continue
+
+        try:
+            index = indices[(type(probe), probe)]
+        except (KeyError, TypeError):
+            return None
+
+        if not is_same_value(value, values[index]):
+            return None
+
+        parameters.append((probe_parameter.key, index))
+        matched.append(probe_parameter)
+
+    if {index for _, index in parameters} != set(range(len(values))):
+        return None
+
+    for bind_parameter in matched:
+        bind_parameter.unique = False
+
+    return parameters
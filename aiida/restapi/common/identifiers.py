@@ -374,10 +374,21 @@ def get_node_namespace(user_pk=None, count_nodes=False):
     if user_pk is not None:
         filters['user_id'] = user_pk
 
-    builder = orm.QueryBuilder().append(orm.Node, filters=filters, project=['node_type', 'process_type']).distinct()
-
-    # All None instances of process_type are turned into ''
-    unique_types = {(node_type, process_type if process_type else '') for node_type, process_type in builder.all()}
+    builder = orm.QueryBuilder().append(
+        orm.Node, tag='node', filters=filters, project=['node_type', 'process_type', {
+            'id': {
+                'func': 'count'
+            }
+        }]
+    ).group_by({'node': ['node_type', 'process_type']})
+
+    # All None instances of process_type are turned into '', such that their counts are added to those of ''
+    counts = {}
+    for node_type, process_type, count in builder.all():
+        unique_type = (node_type, process_type if process_type else '')
+        counts[unique_type] = counts.get(unique_type, 0) + count
+
+    unique_types = set(counts)
 
     # First we create a flat list of all "leaf" node types.
     namespaces = []
@@ -409,24 +420,7 @@ def get_node_namespace(user_pk=None, count_nodes=False):
                 continue
 
         if count_nodes:
-            builder = orm.QueryBuilder()
-            concat_filters = [{'node_type': {'==': node_type}}]
-
-            if node_type.startswith('process.'):
-                if process_type:
-                    concat_filters.append({'process_type': {'==': process_type}})
-                else:
-                    concat_filters.append({'process_type': {'or': [{'==': ''}, {'==': None}]}})
-
-            if user_pk:
-                concat_filters.append({'user_id': {'==': user_pk}})
-
-            if len(concat_filters) == 1:
-                builder.append(orm.Node, filters=concat_filters[0])
-            else:
-                builder.append(orm.Node, filters={'and': concat_filters})
-
-            counter = builder.count()
+            counter = counts[(node_type, process_type)]
 
         full_type = construct_full_type(node_type, process_type)
         namespaces.append((namespace, label, full_type, counter))
@@ -12,7 +12,8 @@
 In particular, there is the definition of possible job states (job_states),
 the data structure to be filled for job submission (JobTemplate), and
 the data structure that is returned when querying for jobs in the scheduler
-(JobInfo).
+(JobInfo), and its compact counterpart that only contains the state of a job
+(JobStateInfo).
 """
 import abc
 import enum
@@ -23,7 +24,8 @@ from aiida.common.extendeddicts import AttributeDict, DefaultFieldsAttributeDict
 SCHEDULER_LOGGER = AIIDA_LOGGER.getChild('scheduler')
 
 __all__ = (
-    'JobState', 'JobResource', 'JobTemplate', 'JobInfo', 'NodeNumberJobResource', 'ParEnvJobResource', 'MachineInfo'
+    'JobState', 'JobResource', 'JobTemplate', 'JobInfo', 'JobStateInfo', 'NodeNumberJobResource', 'ParEnvJobResource',
+    'MachineInfo'
 )
 
 
@@ -569,3 +571,60 @@ class JobInfo(DefaultFieldsAttributeDict):  # pylint: disable=too-many-instance-
         from aiida.common import json
 
         return cls.load_from_dict(json.loads(data))
+
+
+class JobStateInfo:
+    """Compact description of the state of a job in the queue, from which the full `JobInfo` is built on demand.
+
+    Parsing all the fields of the job list of a scheduler into `JobInfo` instances is expensive for long job lists,
+    while usually only the state of most jobs is needed to detect which of them changed state. Instances of this class
+    only contain the ``job_id``, ``job_state`` and ``job_substate`` fields, as defined for `JobInfo`, and a callable
+    that parses the remaining fields, which is only called when the full `JobInfo` is requested.
+
+    The ``raw`` data of the job in the output of the scheduler, if set, can be stored instead of the full `JobInfo`,
+    from which the latter can be parsed with `Scheduler.parse_job_info`.
+    """
+
+    __slots__ = ('job_id', 'job_state', 'job_substate', 'raw', '_parse', '_job_info')
+
+    def __init__(self, job_id, job_state, job_substate=None, parse=None, job_info=None, raw=None):  # pylint: disable=too-many-arguments
+        """Construct the compact state of a job.
+
+        :param job_id: the job ID on the scheduler
+        :param job_state: the job state, one of those defined in `JobState`
+        :param job_substate: the implementation-specific sub-state
+        :param parse: callable without arguments that returns the full `JobInfo` of the job
+        :param job_info: the full `JobInfo` of the job, if it was already parsed
+        :param raw: optional JSON-serializable raw data of the job in the output of the scheduler
+        """
+        if parse is None and job_info is None:
+            raise ValueError('either `parse` or `job_info` has to be specified')
+
+        self.job_id = job_id
+        self.job_state = job_state
+        self.raw = raw
+        self.job_substate = job_substate
+        self._parse = parse
+        self._job_info = job_info
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.job_id!r}, {self.job_state}, {self.job_substate!r})'
+
+    @classmethod
+    def from_job_info(cls, job_info):
+        """Return the compact state of a job from its full `JobInfo`.
+
+        :param job_info: the `JobInfo` of the job
+        """
+        return cls(job_info.job_id, job_info.job_state, job_info.job_substate, job_info=job_info)
+
+    def get_job_info(self):
+        """Return the full `JobInfo` of the job, which is parsed the first time that this method is called.
+
+        :return: a `JobInfo` instance
+        """
+        if self._job_info is None:
+            self._job_info = self._parse()
+            self._parse = None
+
+        return self._job_info
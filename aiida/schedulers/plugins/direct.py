@@ -76,6 +76,7 @@ class DirectScheduler(aiida.schedulers.Scheduler):
     # Query only by list of jobs and not by user
     _features = {
         'can_query_by_user': True,
+        'can_batch_commands': True,
     }
 
     # The class to be used for the job resource.
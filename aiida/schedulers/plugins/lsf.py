@@ -12,10 +12,12 @@ Plugin for LSF.
 This has been tested on the CERN lxplus cluster (LSF 9.1.3)
 """
 
+import functools
+
 import aiida.schedulers
 from aiida.common.escaping import escape_for_bash
 from aiida.schedulers import SchedulerError, SchedulerParsingError
-from aiida.schedulers.datastructures import (JobInfo, JobState, JobResource)
+from aiida.schedulers.datastructures import (JobInfo, JobState, JobStateInfo, JobResource)
 
 # This maps LSF status codes to our own state list
 #
@@ -163,6 +165,7 @@ class LsfScheduler(aiida.schedulers.Scheduler):
     # Query only by list of jobs and not by user
     _features = {
         'can_query_by_user': False,
+        'can_batch_commands': True,
     }
 
     # The class to be used for the job resource.
@@ -501,15 +504,14 @@ fi
             in the qstat output; missing jobs (for whatever reason) simply
             will not appear here.
         """
-        # pylint: disable=too-many-locals,too-many-statements,too-many-branches
-        num_fields = len(self._joblist_fields)
-
         if retval != 0:
             self.logger.warning(f'Error in _parse_joblist_output: retval={retval}; stdout={stdout}; stderr={stderr}')
             raise SchedulerError(
                 f'Error during parsing joblist output, retval={retval}\nstdout={stdout}\nstderr={stderr}'
             )
 
+        num_fields = len(self._joblist_fields)
+
         # will contain raw data parsed from output: only lines with the
         # separator, and already split in fields
         # I put num_fields, because in this way
@@ -519,135 +521,173 @@ fi
         # appears in any previous field.
         jobdata_raw = [l.split(_FIELD_SEPARATOR, num_fields) for l in stdout.splitlines() if _FIELD_SEPARATOR in l]
 
-        # Create dictionary and parse specific fields
         job_list = []
         for job in jobdata_raw:
+            this_job = self._parse_joblist_fields(job)
+            if this_job is not None:
+                job_list.append(this_job)
+
+        return job_list
+
+    def _parse_joblist_states(self, retval, stdout, stderr):
+        """Parse only the ids and states of the jobs from the bjobs output, see `_parse_joblist_output`.
+
+        The other fields are only parsed when the full `JobInfo` of a job is requested from its `JobStateInfo`.
+        """
+        if retval != 0:
+            self.logger.warning(f'Error in _parse_joblist_states: retval={retval}; stdout={stdout}; stderr={stderr}')
+            raise SchedulerError(
+                f'Error during parsing joblist output, retval={retval}\nstdout={stdout}\nstderr={stderr}'
+            )
+
+        num_fields = len(self._joblist_fields)
+
+        job_list = []
+        for line in stdout.splitlines():
+            if _FIELD_SEPARATOR not in line:
+                continue
+
+            job = line.split(_FIELD_SEPARATOR, num_fields)
 
-            # Each job should have all fields.
             if len(job) != num_fields:
-                # I skip this calculation
-                # (I don't append anything to job_list before continuing)
                 self.logger.error(f"Wrong line length in squeue output! '{job}'")
                 continue
 
-            this_job = JobInfo()
-            this_job.job_id = job[0]
-            this_job.annotation = job[2]
-            job_state_raw = job[1]
+            job_state = self._get_job_state(job[0], job[1])
+            parse = functools.partial(self._parse_joblist_fields, job)
+            job_list.append(JobStateInfo(job[0], job_state, parse=parse, raw=job))
 
-            try:
-                job_state_string = _MAP_STATUS_LSF[job_state_raw]
-            except KeyError:
-                self.logger.warning(
-                    "Unrecognized job_state '{}' for job "
-                    'id {}'.format(job_state_raw, this_job.job_id)
-                )
-                job_state_string = JobState.UNDETERMINED
-
-            this_job.job_state = job_state_string
-
-            # I get the remaining fields
-            # The first three were already obtained
-            # I know that the length is exactly num_fields because
-            # I used split(_field_separator, num_fields) before
-            # when creting 'job'
-            #            (_, _, _, executing_host, username, number_nodes,
-            #             number_cpus, allocated_machines, partition,
-            #             time_limit, time_used, dispatch_time, job_name) = job
-            (
-                _, _, _, _, username, number_nodes, number_cpus, allocated_machines, partition, finish_time, start_time,
-                percent_complete, submission_time, job_name
-            ) = job
-
-            this_job.job_owner = username
-            try:
-                this_job.num_machines = int(number_nodes)
-            except ValueError:
-                self.logger.warning(
-                    f'The number of allocated nodes is not an integer ({number_nodes}) for job id {this_job.job_id}!'
-                )
+        return job_list
 
-            try:
-                this_job.num_mpiprocs = int(number_cpus)
-            except ValueError:
-                self.logger.warning(
-                    f'The number of allocated cores is not an integer ({number_cpus}) for job id {this_job.job_id}!'
-                )
+    def parse_job_info(self, raw):
+        """Parse the full `JobInfo` of a job from the ``raw`` data of its `JobStateInfo`."""
+        return self._parse_joblist_fields(raw)
+
+    def _parse_joblist_fields(self, job):
+        """Parse the fields of a single job in the bjobs output into a `JobInfo`.
+
+        :param job: list of the fields of the job, in the order of `_joblist_fields`
+        :return: a `JobInfo`, or None if the job does not have all fields
+        """
+        # pylint: disable=too-many-locals,too-many-statements,too-many-branches
+        num_fields = len(self._joblist_fields)
+
+        # Each job should have all fields.
+        if len(job) != num_fields:
+            # I skip this calculation
+            self.logger.error(f"Wrong line length in squeue output! '{job}'")
+            return None
+
+        this_job = JobInfo()
+        this_job.job_id = job[0]
+        this_job.annotation = job[2]
+        this_job.job_state = self._get_job_state(this_job.job_id, job[1])
+
+        # I get the remaining fields
+        # The first three were already obtained
+        # I know that the length is exactly num_fields because
+        # I used split(_field_separator, num_fields) before
+        # when creting 'job'
+        #            (_, _, _, executing_host, username, number_nodes,
+        #             number_cpus, allocated_machines, partition,
+        #             time_limit, time_used, dispatch_time, job_name) = job
+        (
+            _, _, _, _, username, number_nodes, number_cpus, allocated_machines, partition, finish_time, start_time,
+            percent_complete, submission_time, job_name
+        ) = job
+
+        this_job.job_owner = username
+        try:
+            this_job.num_machines = int(number_nodes)
+        except ValueError:
+            self.logger.warning(
+                f'The number of allocated nodes is not an integer ({number_nodes}) for job id {this_job.job_id}!'
+            )
 
-            # ALLOCATED NODES HERE
-            # string may be in the format
-            # nid00[684-685,722-723,748-749,958-959]
-            # therefore it requires some parsing, that is unnecessary now.
-            # I just store is as a raw string for the moment, and I leave
-            # this_job.allocated_machines undefined
-            if this_job.job_state == JobState.RUNNING:
-                this_job.allocated_machines_raw = allocated_machines
-
-            this_job.queue_name = partition
-
-            psd_finish_time = self._parse_time_string(finish_time, fmt='%b %d %H:%M')
-            psd_start_time = self._parse_time_string(start_time, fmt='%b %d %H:%M')
-            psd_submission_time = self._parse_time_string(submission_time, fmt='%b %d %H:%M')
-
-            # Now get the time in seconds which has been used
-            # Only if it is RUNNING; otherwise it is not meaningful,
-            # and may be not set (in my test, it is set to zero)
-            if this_job.job_state == JobState.RUNNING:
-                try:
+        try:
+            this_job.num_mpiprocs = int(number_cpus)
+        except ValueError:
+            self.logger.warning(
+                f'The number of allocated cores is not an integer ({number_cpus}) for job id {this_job.job_id}!'
+            )
+
+        # ALLOCATED NODES HERE
+        # string may be in the format
+        # nid00[684-685,722-723,748-749,958-959]
+        # therefore it requires some parsing, that is unnecessary now.
+        # I just store is as a raw string for the moment, and I leave
+        # this_job.allocated_machines undefined
+        if this_job.job_state == JobState.RUNNING:
+            this_job.allocated_machines_raw = allocated_machines
+
+        this_job.queue_name = partition
+
+        psd_finish_time = self._parse_time_string(finish_time, fmt='%b %d %H:%M')
+        psd_start_time = self._parse_time_string(start_time, fmt='%b %d %H:%M')
+        psd_submission_time = self._parse_time_string(submission_time, fmt='%b %d %H:%M')
+
+        # Now get the time in seconds which has been used
+        # Only if it is RUNNING; otherwise it is not meaningful,
+        # and may be not set (in my test, it is set to zero)
+        if this_job.job_state == JobState.RUNNING:
+            try:
+                requested_walltime = psd_finish_time - psd_start_time
+                # fix of a weird bug. Since the year is not parsed, it is assumed
+                # to always be 1900. Therefore, job submitted
+                # in december and finishing in january would produce negative time differences
+                if requested_walltime.total_seconds() < 0:
+                    import datetime
+                    old_month = psd_finish_time.month
+                    old_day = psd_finish_time.day
+                    old_hour = psd_finish_time.hour
+                    old_minute = psd_finish_time.minute
+                    new_year = psd_start_time.year + 1
+                    # note: we assume that no job will last more than 1 year...
+                    psd_finish_time = datetime.datetime(
+                        year=new_year, month=old_month, day=old_day, hour=old_hour, minute=old_minute
+                    )
                     requested_walltime = psd_finish_time - psd_start_time
-                    # fix of a weird bug. Since the year is not parsed, it is assumed
-                    # to always be 1900. Therefore, job submitted
-                    # in december and finishing in january would produce negative time differences
-                    if requested_walltime.total_seconds() < 0:
-                        import datetime
-                        old_month = psd_finish_time.month
-                        old_day = psd_finish_time.day
-                        old_hour = psd_finish_time.hour
-                        old_minute = psd_finish_time.minute
-                        new_year = psd_start_time.year + 1
-                        # note: we assume that no job will last more than 1 year...
-                        psd_finish_time = datetime.datetime(
-                            year=new_year, month=old_month, day=old_day, hour=old_hour, minute=old_minute
-                        )
-                        requested_walltime = psd_finish_time - psd_start_time
-
-                    this_job.requested_wallclock_time_seconds = requested_walltime.total_seconds()  # pylint: disable=invalid-name
-                except (TypeError, ValueError):
-                    self.logger.warning(f'Error parsing the time limit for job id {this_job.job_id}')
-
-                try:
-                    psd_percent_complete = float(percent_complete.strip(' L').strip('%'))
-                    this_job.wallclock_time_seconds = requested_walltime.total_seconds() * psd_percent_complete / 100.
-                except ValueError:
-                    self.logger.warning(f'Error parsing the time used for job id {this_job.job_id}')
+
+                this_job.requested_wallclock_time_seconds = requested_walltime.total_seconds()  # pylint: disable=invalid-name
+            except (TypeError, ValueError):
+                self.logger.warning(f'Error parsing the time limit for job id {this_job.job_id}')
 
             try:
-                this_job.submission_time = psd_submission_time
+                psd_percent_complete = float(percent_complete.strip(' L').strip('%'))
+                this_job.wallclock_time_seconds = requested_walltime.total_seconds() * psd_percent_complete / 100.
             except ValueError:
-                self.logger.warning(f'Error parsing submission time for job id {this_job.job_id}')
-
-            this_job.title = job_name
-
-            # Everything goes here anyway for debugging purposes
-            this_job.raw_data = job
-
-            # Double check of redundant info
-            # Not really useful now, allocated_machines in this
-            # version of the plugin is never set
-            if (this_job.allocated_machines is not None and this_job.num_machines is not None):
-                if len(this_job.allocated_machines) != this_job.num_machines:
-                    self.logger.error(
-                        'The length of the list of allocated '
-                        'nodes ({}) is different from the '
-                        'expected number of nodes ({})!'.format(
-                            len(this_job.allocated_machines), this_job.num_machines
-                        )
-                    )
+                self.logger.warning(f'Error parsing the time used for job id {this_job.job_id}')
+
+        try:
+            this_job.submission_time = psd_submission_time
+        except ValueError:
+            self.logger.warning(f'Error parsing submission time for job id {this_job.job_id}')
+
+        this_job.title = job_name
+
+        # Everything goes here anyway for debugging purposes
+        this_job.raw_data = job
+
+        # Double check of redundant info
+        # Not really useful now, allocated_machines in this
+        # version of the plugin is never set
+        if (this_job.allocated_machines is not None and this_job.num_machines is not None):
+            if len(this_job.allocated_machines) != this_job.num_machines:
+                self.logger.error(
+                    'The length of the list of allocated '
+                    'nodes ({}) is different from the '
+                    'expected number of nodes ({})!'.format(len(this_job.allocated_machines), this_job.num_machines)
+                )
 
-            # I append to the list of jobs to return
-            job_list.append(this_job)
+        return this_job
 
-        return job_list
+    def _get_job_state(self, job_id, job_state_raw):
+        """Return the `JobState` corresponding to the raw state of a job in the bjobs output."""
+        try:
+            return _MAP_STATUS_LSF[job_state_raw]
+        except KeyError:
+            self.logger.warning(f"Unrecognized job_state '{job_state_raw}' for job id {job_id}")
+            return JobState.UNDETERMINED
 
     def _parse_submit_output(self, retval, stdout, stderr):
         """
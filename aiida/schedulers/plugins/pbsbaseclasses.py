@@ -10,11 +10,12 @@
 """
 Base classes for PBSPro and PBS/Torque plugins.
 """
+import functools
 import logging
 
 from aiida.common.escaping import escape_for_bash
 from aiida.schedulers import Scheduler, SchedulerError, SchedulerParsingError
-from aiida.schedulers.datastructures import (JobInfo, JobState, MachineInfo, NodeNumberJobResource)
+from aiida.schedulers.datastructures import (JobInfo, JobState, JobStateInfo, MachineInfo, NodeNumberJobResource)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -110,6 +111,7 @@ class PbsBaseClass(Scheduler):
     # Query only by list of jobs and not by user
     _features = {
         'can_query_by_user': False,
+        'can_batch_commands': True,
     }
 
     # The class to be used for the job resource.
@@ -349,7 +351,46 @@ class PbsBaseClass(Scheduler):
             in the qstat output; missing jobs (for whatever reason) simply
             will not appear here.
         """
-        # pylint: disable=too-many-locals,too-many-statements,too-many-branches
+        self._check_joblist_output(retval, stdout, stderr)
+
+        return [self._parse_joblist_stanza(job) for job in self._split_joblist_output(stdout)]
+
+    def _parse_joblist_states(self, retval, stdout, stderr):
+        """Parse only the ids and states of the jobs from the qstat output, see `_parse_joblist_output`.
+
+        The output is still split in the stanzas of the jobs, but only the lines with the state and substate of each job
+        are parsed. The other fields are only parsed when the full `JobInfo` of a job is requested from its
+        `JobStateInfo`.
+        """
+        self._check_joblist_output(retval, stdout, stderr)
+
+        job_list = []
+        for job in self._split_joblist_output(stdout):
+            job_state_raw = None
+            job_substate = None
+
+            for line in job['lines']:
+                key, separator, value = line.partition('=')
+                if not separator:
+                    raise SchedulerParsingError('There are lines without equals sign.')
+                key = key.strip().lower()
+                if key == 'job_state':
+                    job_state_raw = value.lstrip()
+                elif key == 'substate':
+                    job_substate = value.lstrip()
+
+            job_state = self._get_job_state(job['id'], job_state_raw)
+            parse = functools.partial(self._parse_joblist_stanza, job)
+            job_list.append(JobStateInfo(job['id'], job_state, job_substate, parse=parse, raw=job))
+
+        return job_list
+
+    @staticmethod
+    def _check_joblist_output(retval, stdout, stderr):
+        """Check the stderr of the qstat command.
+
+        :raises SchedulerError: if the exit code is non-zero and the stderr contains unexpected errors
+        """
         # I don't raise because if I pass a list of jobs, I get a non-zero status
         # if one of the job is not in the list anymore
 
@@ -373,6 +414,14 @@ class PbsBaseClass(Scheduler):
             if retval != 0:
                 raise SchedulerError(f'Error during qstat parsing, retval={retval}\nstdout={stdout}\nstderr={stderr}')
 
+    @staticmethod
+    def _split_joblist_output(stdout):
+        """Split the qstat output into the stanzas of the jobs.
+
+        :return: list of dictionaries, one for each job, with its ``id``, the ``lines`` of its stanza, where continued
+            lines are already joined, and the ``warning_lines_idx``, the indices of the lines with unexpected newlines
+        :raises SchedulerParsingError: if the output is malformed
+        """
         jobdata_raw = []  # will contain raw data parsed from qstat output
         # Get raw data and split in lines
         for line_num, line in enumerate(stdout.split('\n'), start=1):  # pylint: disable=too-many-nested-blocks
@@ -418,222 +467,235 @@ class PbsBaseClass(Scheduler):
                             jobdata_raw[-1]['lines'][-1] += f'\n{line}'
                             jobdata_raw[-1]['warning_lines_idx'].append(len(jobdata_raw[-1]['lines']) - 1)
 
-        # Create dictionary and parse specific fields
-        job_list = []
-        for job in jobdata_raw:
-            this_job = JobInfo()
-            this_job.job_id = job['id']
-
-            lines_without_equals_sign = [i for i in job['lines'] if '=' not in i]
-
-            # There are lines without equals sign: this is bad
-            if lines_without_equals_sign:
-                # Should I only warn?
-                _LOGGER.error(f'There are lines without equals sign! {lines_without_equals_sign}')
-                raise SchedulerParsingError('There are lines without equals sign.')
-
-            raw_data = {
-                i.split('=', 1)[0].strip().lower(): i.split('=', 1)[1].lstrip() for i in job['lines'] if '=' in i
-            }
-
-            ## I ignore the errors for the time being - this seems to be
-            ## a problem if there are \n in the content of some variables?
-            ## I consider this a workaround...
-            # for line_with_warning in set(job['warning_lines_idx']):
-            #    if job['lines'][line_with_warning].split(
-            #        '=',1)[0].strip().lower() != "comment":
-            #        raise SchedulerParsingError(
-            #            "Wrong starting character in one of the lines "
-            #            "of job {}, and it's not a comment! ({})"
-            #            "".format(this_job.job_id,
-            #                      job['lines'][line_with_warning]))
-
-            problematic_fields = []
-            for line_with_warning in set(job['warning_lines_idx']):
-                problematic_fields.append(job['lines'][line_with_warning].split('=', 1)[0].strip().lower())
-            if problematic_fields:
-                # These are the fields that contain unexpected newlines
-                raw_data['warning_fields_with_newlines'] = problematic_fields
-
-            # I believe that exit_status and terminating_signal cannot be
-            # retrieved from the qstat -f output.
-
-            # I wrap calls in try-except clauses to avoid errors if a field
-            # is missing
-            try:
-                this_job.title = raw_data['job_name']
-            except KeyError:
-                _LOGGER.debug(f"No 'job_name' field for job id {this_job.job_id}")
+        return jobdata_raw
 
-            try:
-                this_job.annotation = raw_data['comment']
-            except KeyError:
-                # Many jobs do not have a comment; I do not complain about it.
-                pass
-                # _LOGGER.debug("No 'comment' field for job id {}".format(
-                #    this_job.job_id))
+    def parse_job_info(self, raw):
+        """Parse the full `JobInfo` of a job from the ``raw`` data of its `JobStateInfo`."""
+        return self._parse_joblist_stanza(raw)
 
-            try:
-                job_state_string = raw_data['job_state']
-                try:
-                    this_job.job_state = self._map_status[job_state_string]
-                except KeyError:
-                    _LOGGER.warning(f"Unrecognized job_state '{job_state_string}' for job id {this_job.job_id}")
-                    this_job.job_state = JobState.UNDETERMINED
-            except KeyError:
-                _LOGGER.debug(f"No 'job_state' field for job id {this_job.job_id}")
-                this_job.job_state = JobState.UNDETERMINED
+    def _parse_joblist_stanza(self, job):
+        """Parse the stanza of a single job in the qstat output into a `JobInfo`.
 
-            try:
-                this_job.job_substate = raw_data['substate']
-            except KeyError:
-                _LOGGER.debug(f"No 'substate' field for job id {this_job.job_id}")
+        :param job: dictionary with the stanza of the job, as returned by `_split_joblist_output`
+        :return: a `JobInfo`
+        :raises SchedulerParsingError: if the stanza contains lines without an equals sign
+        """
+        # pylint: disable=too-many-locals,too-many-statements,too-many-branches
+        this_job = JobInfo()
+        this_job.job_id = job['id']
+
+        lines_without_equals_sign = [i for i in job['lines'] if '=' not in i]
+
+        # There are lines without equals sign: this is bad
+        if lines_without_equals_sign:
+            # Should I only warn?
+            _LOGGER.error(f'There are lines without equals sign! {lines_without_equals_sign}')
+            raise SchedulerParsingError('There are lines without equals sign.')
+
+        raw_data = {i.split('=', 1)[0].strip().lower(): i.split('=', 1)[1].lstrip() for i in job['lines'] if '=' in i}
+
+        ## I ignore the errors for the time being - this seems to be
+        ## a problem if there are \n in the content of some variables?
+        ## I consider this a workaround...
+        # for line_with_warning in set(job['warning_lines_idx']):
+        #    if job['lines'][line_with_warning].split(
+        #        '=',1)[0].strip().lower() != "comment":
+        #        raise SchedulerParsingError(
+        #            "Wrong starting character in one of the lines "
+        #            "of job {}, and it's not a comment! ({})"
+        #            "".format(this_job.job_id,
+        #                      job['lines'][line_with_warning]))
+
+        problematic_fields = []
+        for line_with_warning in set(job['warning_lines_idx']):
+            problematic_fields.append(job['lines'][line_with_warning].split('=', 1)[0].strip().lower())
+        if problematic_fields:
+            # These are the fields that contain unexpected newlines
+            raw_data['warning_fields_with_newlines'] = problematic_fields
+
+        # I believe that exit_status and terminating_signal cannot be
+        # retrieved from the qstat -f output.
+
+        # I wrap calls in try-except clauses to avoid errors if a field
+        # is missing
+        try:
+            this_job.title = raw_data['job_name']
+        except KeyError:
+            _LOGGER.debug(f"No 'job_name' field for job id {this_job.job_id}")
 
-            try:
-                exec_hosts = raw_data['exec_host'].split('+')
-            except KeyError:
-                # No exec_host information found (it may be ok, if the job
-                # is not running)
-                pass
-            else:
-                # parse each host; syntax, from the man page:
-                # hosta/J1+hostb/J2*P+...
-                # where  J1 and J2 are an index of the job
-                # on the named host and P is the number of
-                # processors allocated from that host to this job.
-                # P does not appear if it is 1.
-                try:
+        try:
+            this_job.annotation = raw_data['comment']
+        except KeyError:
+            # Many jobs do not have a comment; I do not complain about it.
+            pass
+            # _LOGGER.debug("No 'comment' field for job id {}".format(
+            #    this_job.job_id))
 
-                    exec_host_list = []
-                    for exec_host in exec_hosts:
-                        node = MachineInfo()
-                        node.name, data = exec_host.split('/')
-                        data = data.split('*')
-                        if len(data) == 1:
-                            node.job_index = int(data[0])
-                            node.num_cpus = 1
-                        elif len(data) == 2:
-                            node.job_index = int(data[0])
-                            node.num_cpus = int(data[1])
-                        else:
-                            raise ValueError(
-                                f'Wrong number of pieces: {len(data)} instead of 1 or 2 in exec_hosts: {exec_hosts}'
-                            )
-                        exec_host_list.append(node)
-                    this_job.allocated_machines = exec_host_list
-                except Exception as exc:  # pylint: disable=broad-except
-                    _LOGGER.debug(
-                        f'Problem parsing the node names, I got Exception {str(type(exc))} with message {exc}; '
-                        f'exec_hosts was {exec_hosts}'
-                    )
+        this_job.job_state = self._get_job_state(this_job.job_id, raw_data.get('job_state', None))
 
-            try:
-                # I strip the part after the @: is this always ok?
-                this_job.job_owner = raw_data['job_owner'].split('@')[0]
-            except KeyError:
-                _LOGGER.debug(f"No 'job_owner' field for job id {this_job.job_id}")
+        try:
+            this_job.job_substate = raw_data['substate']
+        except KeyError:
+            _LOGGER.debug(f"No 'substate' field for job id {this_job.job_id}")
 
+        try:
+            exec_hosts = raw_data['exec_host'].split('+')
+        except KeyError:
+            # No exec_host information found (it may be ok, if the job
+            # is not running)
+            pass
+        else:
+            # parse each host; syntax, from the man page:
+            # hosta/J1+hostb/J2*P+...
+            # where  J1 and J2 are an index of the job
+            # on the named host and P is the number of
+            # processors allocated from that host to this job.
+            # P does not appear if it is 1.
             try:
-                this_job.num_cpus = int(raw_data['resource_list.ncpus'])
-                # TODO: understand if this is the correct field also for multithreaded (OpenMP) jobs.  # pylint: disable=fixme
-            except KeyError:
-                _LOGGER.debug(f"No 'resource_list.ncpus' field for job id {this_job.job_id}")
-            except ValueError:
-                _LOGGER.warning(
-                    f"'resource_list.ncpus' is not an integer "
-                    f"({raw_data['resource_list.ncpus']}) for job id {this_job.job_id}!"
-                )
 
-            try:
-                this_job.num_mpiprocs = int(raw_data['resource_list.mpiprocs'])
-                # TODO: understand if this is the correct field also for multithreaded (OpenMP) jobs.  # pylint: disable=fixme
-            except KeyError:
-                _LOGGER.debug(f"No 'resource_list.mpiprocs' field for job id {this_job.job_id}")
-            except ValueError:
-                _LOGGER.warning(
-                    f"'resource_list.mpiprocs' is not an integer "
-                    f"({raw_data['resource_list.mpiprocs']}) for job id {this_job.job_id}!"
+                exec_host_list = []
+                for exec_host in exec_hosts:
+                    node = MachineInfo()
+                    node.name, data = exec_host.split('/')
+                    data = data.split('*')
+                    if len(data) == 1:
+                        node.job_index = int(data[0])
+                        node.num_cpus = 1
+                    elif len(data) == 2:
+                        node.job_index = int(data[0])
+                        node.num_cpus = int(data[1])
+                    else:
+                        raise ValueError(
+                            f'Wrong number of pieces: {len(data)} instead of 1 or 2 in exec_hosts: {exec_hosts}'
+                        )
+                    exec_host_list.append(node)
+                this_job.allocated_machines = exec_host_list
+            except Exception as exc:  # pylint: disable=broad-except
+                _LOGGER.debug(
+                    f'Problem parsing the node names, I got Exception {str(type(exc))} with message {exc}; '
+                    f'exec_hosts was {exec_hosts}'
                 )
 
-            try:
-                this_job.num_machines = int(raw_data['resource_list.nodect'])
-            except KeyError:
-                _LOGGER.debug(f"No 'resource_list.nodect' field for job id {this_job.job_id}")
-            except ValueError:
-                _LOGGER.warning(
-                    f"'resource_list.nodect' is not an integer "
-                    f"{raw_data['resource_list.nodect']}) for job id {this_job.job_id}!"
+        try:
+            # I strip the part after the @: is this always ok?
+            this_job.job_owner = raw_data['job_owner'].split('@')[0]
+        except KeyError:
+            _LOGGER.debug(f"No 'job_owner' field for job id {this_job.job_id}")
+
+        try:
+            this_job.num_cpus = int(raw_data['resource_list.ncpus'])
+            # TODO: understand if this is the correct field also for multithreaded (OpenMP) jobs.  # pylint: disable=fixme
+        except KeyError:
+            _LOGGER.debug(f"No 'resource_list.ncpus' field for job id {this_job.job_id}")
+        except ValueError:
+            _LOGGER.warning(
+                f"'resource_list.ncpus' is not an integer "
+                f"({raw_data['resource_list.ncpus']}) for job id {this_job.job_id}!"
+            )
+
+        try:
+            this_job.num_mpiprocs = int(raw_data['resource_list.mpiprocs'])
+            # TODO: understand if this is the correct field also for multithreaded (OpenMP) jobs.  # pylint: disable=fixme
+        except KeyError:
+            _LOGGER.debug(f"No 'resource_list.mpiprocs' field for job id {this_job.job_id}")
+        except ValueError:
+            _LOGGER.warning(
+                f"'resource_list.mpiprocs' is not an integer "
+                f"({raw_data['resource_list.mpiprocs']}) for job id {this_job.job_id}!"
+            )
+
+        try:
+            this_job.num_machines = int(raw_data['resource_list.nodect'])
+        except KeyError:
+            _LOGGER.debug(f"No 'resource_list.nodect' field for job id {this_job.job_id}")
+        except ValueError:
+            _LOGGER.warning(
+                f"'resource_list.nodect' is not an integer "
+                f"{raw_data['resource_list.nodect']}) for job id {this_job.job_id}!"
+            )
+
+        # Double check of redundant info
+        if (this_job.allocated_machines is not None and this_job.num_machines is not None):
+            if len(set(machine.name for machine in this_job.allocated_machines)) != this_job.num_machines:
+                _LOGGER.error(
+                    f'The length of the list of allocated nodes ({len(this_job.allocated_machines)}) is different '
+                    f'from the expected number of nodes ({this_job.num_machines})!'
                 )
 
-            # Double check of redundant info
-            if (this_job.allocated_machines is not None and this_job.num_machines is not None):
-                if len(set(machine.name for machine in this_job.allocated_machines)) != this_job.num_machines:
-                    _LOGGER.error(
-                        f'The length of the list of allocated nodes ({len(this_job.allocated_machines)}) is different '
-                        f'from the expected number of nodes ({this_job.num_machines})!'
-                    )
+        try:
+            this_job.queue_name = raw_data['queue']
+        except KeyError:
+            _LOGGER.debug(f"No 'queue' field for job id {this_job.job_id}")
 
-            try:
-                this_job.queue_name = raw_data['queue']
-            except KeyError:
-                _LOGGER.debug(f"No 'queue' field for job id {this_job.job_id}")
+        try:
+            this_job.requested_wallclock_time = (self._convert_time(raw_data['resource_list.walltime']))  # pylint: disable=invalid-name
+        except KeyError:
+            _LOGGER.debug(f"No 'resource_list.walltime' field for job id {this_job.job_id}")
+        except ValueError:
+            _LOGGER.warning(f"Error parsing 'resource_list.walltime' for job id {this_job.job_id}")
 
-            try:
-                this_job.requested_wallclock_time = (self._convert_time(raw_data['resource_list.walltime']))  # pylint: disable=invalid-name
-            except KeyError:
-                _LOGGER.debug(f"No 'resource_list.walltime' field for job id {this_job.job_id}")
-            except ValueError:
-                _LOGGER.warning(f"Error parsing 'resource_list.walltime' for job id {this_job.job_id}")
+        try:
+            this_job.wallclock_time_seconds = (self._convert_time(raw_data['resources_used.walltime']))
+        except KeyError:
+            # May not have started yet
+            pass
+        except ValueError:
+            _LOGGER.warning(f"Error parsing 'resources_used.walltime' for job id {this_job.job_id}")
 
-            try:
-                this_job.wallclock_time_seconds = (self._convert_time(raw_data['resources_used.walltime']))
-            except KeyError:
-                # May not have started yet
-                pass
-            except ValueError:
-                _LOGGER.warning(f"Error parsing 'resources_used.walltime' for job id {this_job.job_id}")
+        try:
+            this_job.cpu_time = (self._convert_time(raw_data['resources_used.cput']))
+        except KeyError:
+            # May not have started yet
+            pass
+        except ValueError:
+            _LOGGER.warning(f"Error parsing 'resources_used.cput' for job id {this_job.job_id}")
 
-            try:
-                this_job.cpu_time = (self._convert_time(raw_data['resources_used.cput']))
-            except KeyError:
-                # May not have started yet
-                pass
-            except ValueError:
-                _LOGGER.warning(f"Error parsing 'resources_used.cput' for job id {this_job.job_id}")
+        #
+        # ctime: The time that the job was created
+        # mtime: The time that the job was last modified, changed state,
+        #        or changed locations.
+        # qtime: The time that the job entered the current queue
+        # stime: The time when the job started execution.
+        # etime: The time that the job became eligible to run, i.e. in a
+        #        queued state while residing in an execution queue.
 
-            #
-            # ctime: The time that the job was created
-            # mtime: The time that the job was last modified, changed state,
-            #        or changed locations.
-            # qtime: The time that the job entered the current queue
-            # stime: The time when the job started execution.
-            # etime: The time that the job became eligible to run, i.e. in a
-            #        queued state while residing in an execution queue.
+        try:
+            this_job.submission_time = self._parse_time_string(raw_data['ctime'])
+        except KeyError:
+            _LOGGER.debug(f"No 'ctime' field for job id {this_job.job_id}")
+        except ValueError:
+            _LOGGER.warning(f"Error parsing 'ctime' for job id {this_job.job_id}")
 
-            try:
-                this_job.submission_time = self._parse_time_string(raw_data['ctime'])
-            except KeyError:
-                _LOGGER.debug(f"No 'ctime' field for job id {this_job.job_id}")
-            except ValueError:
-                _LOGGER.warning(f"Error parsing 'ctime' for job id {this_job.job_id}")
+        try:
+            this_job.dispatch_time = self._parse_time_string(raw_data['stime'])
+        except KeyError:
+            # The job may not have been started yet
+            pass
+        except ValueError:
+            _LOGGER.warning(f"Error parsing 'stime' for job id {this_job.job_id}")
 
-            try:
-                this_job.dispatch_time = self._parse_time_string(raw_data['stime'])
-            except KeyError:
-                # The job may not have been started yet
-                pass
-            except ValueError:
-                _LOGGER.warning(f"Error parsing 'stime' for job id {this_job.job_id}")
+        # TODO: see if we want to set also finish_time for finished jobs, if there are any  # pylint: disable=fixme
 
-            # TODO: see if we want to set also finish_time for finished jobs, if there are any  # pylint: disable=fixme
+        # Everything goes here anyway for debugging purposes
+        this_job.raw_data = raw_data
 
-            # Everything goes here anyway for debugging purposes
-            this_job.raw_data = raw_data
+        return this_job
 
-            # I append to the list of jobs to return
-            job_list.append(this_job)
+    def _get_job_state(self, job_id, job_state_raw):
+        """Return the `JobState` corresponding to the raw state of a job in the qstat output.
 
-        return job_list
+        :param job_id: the job id, used in the log messages
+        :param job_state_raw: the value of the ``job_state`` field, or None if the field is missing
+        """
+        if job_state_raw is None:
+            _LOGGER.debug(f"No 'job_state' field for job id {job_id}")
+            return JobState.UNDETERMINED
+
+        try:
+            return self._map_status[job_state_raw]
+        except KeyError:
+            _LOGGER.warning(f"Unrecognized job_state '{job_state_raw}' for job id {job_id}")
+            return JobState.UNDETERMINED
 
     @staticmethod
     def _convert_time(string):
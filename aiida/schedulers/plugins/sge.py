@@ -99,6 +99,7 @@ class SgeScheduler(aiida.schedulers.Scheduler):
     # user, but not by job id
     _features = {
         'can_query_by_user': True,
+        'can_batch_commands': True,
     }
 
     # The class to be used for the job resource.
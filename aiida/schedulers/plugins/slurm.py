@@ -11,12 +11,13 @@
 Plugin for SLURM.
 This has been tested on SLURM 14.03.7 on the CSCS.ch machines.
 """
+import functools
 import re
 
 from aiida.common.escaping import escape_for_bash
 from aiida.common.lang import type_check
 from aiida.schedulers import Scheduler, SchedulerError
-from aiida.schedulers.datastructures import (JobInfo, JobState, NodeNumberJobResource)
+from aiida.schedulers.datastructures import (JobInfo, JobState, JobStateInfo, NodeNumberJobResource)
 
 # This maps SLURM state codes to our own status list
 
@@ -54,6 +55,9 @@ _MAP_STATUS_SLURM = {
     'TO': JobState.DONE,
 }
 
+# The states of the jobs that are included in a delta query, i.e. all states that do not correspond to a queued job
+_DELTA_STATES_SLURM = [state for state, job_state in _MAP_STATUS_SLURM.items() if job_state != JobState.QUEUED]
+
 # From the manual,
 # possible lines are:
 # salloc: Granted job allocation 65537
@@ -151,6 +155,8 @@ class SlurmScheduler(Scheduler):
     # Query only by list of jobs and not by user
     _features = {
         'can_query_by_user': False,
+        'can_query_delta': True,
+        'can_batch_commands': True,
     }
 
     _detailed_job_info_fields = [
@@ -238,6 +244,15 @@ class SlurmScheduler(Scheduler):
         self.logger.debug(f'squeue command: {comm}')
         return comm
 
+    def _get_joblist_delta_command(self, jobs=None, user=None):
+        """The command to report full information on existing jobs that are not pending.
+
+        The output is in the same format as that of the command returned by `_get_joblist_command`.
+        """
+        comm = f"{self._get_joblist_command(jobs=jobs, user=user)} --states={','.join(_DELTA_STATES_SLURM)}"
+        self.logger.debug(f'squeue delta command: {comm}')
+        return comm
+
     def _get_detailed_job_info_command(self, job_id):
         """
         Return the command to run to get the detailed information on a job,
@@ -485,21 +500,9 @@ class SlurmScheduler(Scheduler):
             in the qstat output; missing jobs (for whatever reason) simply
             will not appear here.
         """
-        # pylint: disable=too-many-branches,too-many-statements
+        self._check_joblist_output(retval, stdout, stderr)
         num_fields = len(self.fields)
 
-        # See discussion in _get_joblist_command on how we ensure that AiiDA can expect exit code 0 here.
-        if retval != 0:
-            raise SchedulerError(
-                f"""squeue returned exit code {retval} (_parse_joblist_output function)
-stdout='{stdout.strip()}'
-stderr='{stderr.strip()}'"""
-            )
-        if stderr.strip():
-            self.logger.warning(
-                f"squeue returned exit code 0 (_parse_joblist_output function) but non-empty stderr='{stderr.strip()}'"
-            )
-
         # will contain raw data parsed from output: only lines with the
         # separator, and already split in fields
         # I put num_fields, because in this way
@@ -509,149 +512,201 @@ stderr='{stderr.strip()}'"""
         # appears in any previous field.
         jobdata_raw = [l.split(_FIELD_SEPARATOR, num_fields) for l in stdout.splitlines() if _FIELD_SEPARATOR in l]
 
-        # Create dictionary and parse specific fields
         job_list = []
         for job in jobdata_raw:
+            this_job = self._parse_joblist_fields(job)
+            if this_job is not None:
+                job_list.append(this_job)
 
-            thisjob_dict = {k[1]: v for k, v in zip(self.fields, job)}
+        return job_list
 
-            this_job = JobInfo()
-            try:
-                this_job.job_id = thisjob_dict['job_id']
+    def _parse_joblist_states(self, retval, stdout, stderr):
+        """Parse only the ids and states of the jobs from the squeue output, see `_parse_joblist_output`.
 
-                this_job.annotation = thisjob_dict['annotation']
-                job_state_raw = thisjob_dict['state_raw']
-            except KeyError:
-                # I skip this calculation if I couldn't find this basic info
-                # (I don't append anything to job_list before continuing)
-                self.logger.error(f"Wrong line length in squeue output! '{job}'")
+        Only the fields that define the state of each job are used, the other fields are only parsed when the full
+        `JobInfo` of a job is requested from its `JobStateInfo`.
+        """
+        self._check_joblist_output(retval, stdout, stderr)
+        num_fields = len(self.fields)
+
+        field_names = [name for _, name in self.fields]
+        index_id, index_state, index_annotation = [
+            field_names.index(name) for name in ('job_id', 'state_raw', 'annotation')
+        ]
+
+        job_list = []
+        for line in stdout.splitlines():
+            if _FIELD_SEPARATOR not in line:
                 continue
 
+            job = line.split(_FIELD_SEPARATOR, num_fields)
+
             try:
-                job_state_string = _MAP_STATUS_SLURM[job_state_raw]
-            except KeyError:
-                self.logger.warning(
-                    "Unrecognized job_state '{}' for job "
-                    'id {}'.format(job_state_raw, this_job.job_id)
-                )
-                job_state_string = JobState.UNDETERMINED
-            # QUEUED_HELD states are not specific states in SLURM;
-            # they are instead set with state QUEUED, and then the
-            # annotation tells if the job is held.
-            # I check for 'Dependency', 'JobHeldUser',
-            # 'JobHeldAdmin', 'BeginTime'.
-            # Other states should not bring the job in QUEUED_HELD, I believe
-            # (the man page of slurm seems to be incomplete, for instance
-            # JobHeld* are not reported there; I also checked at the source code
-            # of slurm 2.6 on github (https://github.com/SchedMD/slurm),
-            # file slurm/src/common/slurm_protocol_defs.c,
-            # and these seem all the states to be taken into account for the
-            # QUEUED_HELD status).
-            # There are actually a few others, like possible
-            # failures, or partition-related reasons, but for the moment I
-            # leave them in the QUEUED state.
-            if (
-                job_state_string == JobState.QUEUED and
-                this_job.annotation in ['Dependency', 'JobHeldUser', 'JobHeldAdmin', 'BeginTime']
-            ):
-                job_state_string = JobState.QUEUED_HELD
-
-            this_job.job_state = job_state_string
-
-            ####
-            # Up to here, I just made sure that there were at least three
-            # fields, to set the most important fields for a job.
-            # I now check if the length is equal to the number of fields
-            if len(job) < num_fields:
-                # I store this job only with the information
-                # gathered up to now, and continue to the next job
-                # Also print a warning
-                self.logger.warning(
-                    'Wrong line length in squeue output!'
-                    "Skipping optional fields. Line: '{}'"
-                    ''.format(jobdata_raw)
-                )
-                # I append this job before continuing
-                job_list.append(this_job)
+                job_id, job_state_raw, annotation = job[index_id], job[index_state], job[index_annotation]
+            except IndexError:
+                self.logger.error(f"Wrong line length in squeue output! '{job}'")
                 continue
 
-            # TODO: store executing_host?  # pylint: disable=fixme
+            job_state = self._get_job_state(job_id, job_state_raw, annotation)
+            parse = functools.partial(self._parse_joblist_fields, job)
+            job_list.append(JobStateInfo(job_id, job_state, parse=parse, raw=job))
 
-            this_job.job_owner = thisjob_dict['username']
+        return job_list
 
-            try:
-                this_job.num_machines = int(thisjob_dict['number_nodes'])
-            except ValueError:
-                self.logger.warning(
-                    'The number of allocated nodes is not '
-                    'an integer ({}) for job id {}!'.format(thisjob_dict['number_nodes'], this_job.job_id)
-                )
+    def _check_joblist_output(self, retval, stdout, stderr):
+        """Check the exit code and stderr of the squeue command.
 
-            try:
-                this_job.num_mpiprocs = int(thisjob_dict['number_cpus'])
-            except ValueError:
-                self.logger.warning(
-                    'The number of allocated cores is not '
-                    'an integer ({}) for job id {}!'.format(thisjob_dict['number_cpus'], this_job.job_id)
-                )
+        :raises SchedulerError: if the exit code is non-zero
+        """
+        # See discussion in _get_joblist_command on how we ensure that AiiDA can expect exit code 0 here.
+        if retval != 0:
+            raise SchedulerError(
+                f"""squeue returned exit code {retval} (_parse_joblist_output function)
+stdout='{stdout.strip()}'
+stderr='{stderr.strip()}'"""
+            )
+        if stderr.strip():
+            self.logger.warning(
+                f"squeue returned exit code 0 (_parse_joblist_output function) but non-empty stderr='{stderr.strip()}'"
+            )
 
-            # ALLOCATED NODES HERE
-            # string may be in the format
-            # nid00[684-685,722-723,748-749,958-959]
-            # therefore it requires some parsing, that is unnecessary now.
-            # I just store is as a raw string for the moment, and I leave
-            # this_job.allocated_machines undefined
-            if this_job.job_state == JobState.RUNNING:
-                this_job.allocated_machines_raw = thisjob_dict['allocated_machines']
+    def parse_job_info(self, raw):
+        """Parse the full `JobInfo` of a job from the ``raw`` data of its `JobStateInfo`."""
+        return self._parse_joblist_fields(raw)
 
-            this_job.queue_name = thisjob_dict['partition']
+    def _parse_joblist_fields(self, job):
+        """Parse the fields of a single job in the squeue output into a `JobInfo`.
 
-            try:
-                walltime = (self._convert_time(thisjob_dict['time_limit']))
-                this_job.requested_wallclock_time_seconds = walltime  # pylint: disable=invalid-name
-            except ValueError:
-                self.logger.warning(f'Error parsing the time limit for job id {this_job.job_id}')
+        :param job: list of the fields of the job, in the order of `fields`
+        :return: a `JobInfo`, or None if the basic information of the job is missing
+        """
+        # pylint: disable=too-many-branches,too-many-statements
+        num_fields = len(self.fields)
+        thisjob_dict = {k[1]: v for k, v in zip(self.fields, job)}
+
+        this_job = JobInfo()
+        try:
+            this_job.job_id = thisjob_dict['job_id']
+
+            this_job.annotation = thisjob_dict['annotation']
+            job_state_raw = thisjob_dict['state_raw']
+        except KeyError:
+            # I skip this calculation if I couldn't find this basic info
+            self.logger.error(f"Wrong line length in squeue output! '{job}'")
+            return None
+
+        this_job.job_state = self._get_job_state(this_job.job_id, job_state_raw, this_job.annotation)
 
-            # Only if it is RUNNING; otherwise it is not meaningful,
-            # and may be not set (in my test, it is set to zero)
-            if this_job.job_state == JobState.RUNNING:
-                try:
-                    this_job.wallclock_time_seconds = (self._convert_time(thisjob_dict['time_used']))
-                except ValueError:
-                    self.logger.warning(f'Error parsing time_used for job id {this_job.job_id}')
+        ####
+        # Up to here, I just made sure that there were at least three
+        # fields, to set the most important fields for a job.
+        # I now check if the length is equal to the number of fields
+        if len(job) < num_fields:
+            # I store this job only with the information
+            # gathered up to now, and return it
+            # Also print a warning
+            self.logger.warning(f"Wrong line length in squeue output! Skipping optional fields. Line: '{job}'")
+            return this_job
 
-                try:
-                    this_job.dispatch_time = self._parse_time_string(thisjob_dict['dispatch_time'])
-                except ValueError:
-                    self.logger.warning(f'Error parsing dispatch_time for job id {this_job.job_id}')
+        # TODO: store executing_host?  # pylint: disable=fixme
 
+        this_job.job_owner = thisjob_dict['username']
+
+        try:
+            this_job.num_machines = int(thisjob_dict['number_nodes'])
+        except ValueError:
+            self.logger.warning(
+                'The number of allocated nodes is not '
+                'an integer ({}) for job id {}!'.format(thisjob_dict['number_nodes'], this_job.job_id)
+            )
+
+        try:
+            this_job.num_mpiprocs = int(thisjob_dict['number_cpus'])
+        except ValueError:
+            self.logger.warning(
+                'The number of allocated cores is not '
+                'an integer ({}) for job id {}!'.format(thisjob_dict['number_cpus'], this_job.job_id)
+            )
+
+        # ALLOCATED NODES HERE
+        # string may be in the format
+        # nid00[684-685,722-723,748-749,958-959]
+        # therefore it requires some parsing, that is unnecessary now.
+        # I just store is as a raw string for the moment, and I leave
+        # this_job.allocated_machines undefined
+        if this_job.job_state == JobState.RUNNING:
+            this_job.allocated_machines_raw = thisjob_dict['allocated_machines']
+
+        this_job.queue_name = thisjob_dict['partition']
+
+        try:
+            walltime = (self._convert_time(thisjob_dict['time_limit']))
+            this_job.requested_wallclock_time_seconds = walltime  # pylint: disable=invalid-name
+        except ValueError:
+            self.logger.warning(f'Error parsing the time limit for job id {this_job.job_id}')
+
+        # Only if it is RUNNING; otherwise it is not meaningful,
+        # and may be not set (in my test, it is set to zero)
+        if this_job.job_state == JobState.RUNNING:
             try:
-                this_job.submission_time = self._parse_time_string(thisjob_dict['submission_time'])
+                this_job.wallclock_time_seconds = (self._convert_time(thisjob_dict['time_used']))
             except ValueError:
-                self.logger.warning(f'Error parsing submission_time for job id {this_job.job_id}')
-
-            this_job.title = thisjob_dict['job_name']
+                self.logger.warning(f'Error parsing time_used for job id {this_job.job_id}')
 
-            # Everything goes here anyway for debugging purposes
-            this_job.raw_data = job
+            try:
+                this_job.dispatch_time = self._parse_time_string(thisjob_dict['dispatch_time'])
+            except ValueError:
+                self.logger.warning(f'Error parsing dispatch_time for job id {this_job.job_id}')
 
-            # Double check of redundant info
-            # Not really useful now, allocated_machines in this
-            # version of the plugin is never set
-            if (this_job.allocated_machines is not None and this_job.num_machines is not None):
-                if len(this_job.allocated_machines) != this_job.num_machines:
-                    self.logger.error(
-                        'The length of the list of allocated '
-                        'nodes ({}) is different from the '
-                        'expected number of nodes ({})!'.format(
-                            len(this_job.allocated_machines), this_job.num_machines
-                        )
-                    )
+        try:
+            this_job.submission_time = self._parse_time_string(thisjob_dict['submission_time'])
+        except ValueError:
+            self.logger.warning(f'Error parsing submission_time for job id {this_job.job_id}')
+
+        this_job.title = thisjob_dict['job_name']
+
+        # Everything goes here anyway for debugging purposes
+        this_job.raw_data = job
+
+        # Double check of redundant info
+        # Not really useful now, allocated_machines in this
+        # version of the plugin is never set
+        if (this_job.allocated_machines is not None and this_job.num_machines is not None):
+            if len(this_job.allocated_machines) != this_job.num_machines:
+                self.logger.error(
+                    'The length of the list of allocated '
+                    'nodes ({}) is different from the '
+                    'expected number of nodes ({})!'.format(len(this_job.allocated_machines), this_job.num_machines)
+                )
 
-            # I append to the list of jobs to return
-            job_list.append(this_job)
+        return this_job
 
-        return job_list
+    def _get_job_state(self, job_id, job_state_raw, annotation):
+        """Return the `JobState` corresponding to the raw state and the annotation of a job in the squeue output."""
+        try:
+            job_state = _MAP_STATUS_SLURM[job_state_raw]
+        except KeyError:
+            self.logger.warning(f"Unrecognized job_state '{job_state_raw}' for job id {job_id}")
+            job_state = JobState.UNDETERMINED
+        # QUEUED_HELD states are not specific states in SLURM;
+        # they are instead set with state QUEUED, and then the
+        # annotation tells if the job is held.
+        # I check for 'Dependency', 'JobHeldUser',
+        # 'JobHeldAdmin', 'BeginTime'.
+        # Other states should not bring the job in QUEUED_HELD, I believe
+        # (the man page of slurm seems to be incomplete, for instance
+        # JobHeld* are not reported there; I also checked at the source code
+        # of slurm 2.6 on github (https://github.com/SchedMD/slurm),
+        # file slurm/src/common/slurm_protocol_defs.c,
+        # and these seem all the states to be taken into account for the
+        # QUEUED_HELD status).
+        # There are actually a few others, like possible
+        # failures, or partition-related reasons, but for the moment I
+        # leave them in the QUEUED state.
+        if job_state == JobState.QUEUED and annotation in ['Dependency', 'JobHeldUser', 'JobHeldAdmin', 'BeginTime']:
+            job_state = JobState.QUEUED_HELD
+
+        return job_state
 
     def _convert_time(self, string):
         """
@@ -13,7 +13,7 @@ import abc
 from aiida.common import exceptions, log
 from aiida.common.escaping import escape_for_bash
 from aiida.common.lang import classproperty
-from aiida.schedulers.datastructures import JobResource, JobTemplate
+from aiida.schedulers.datastructures import JobResource, JobStateInfo, JobTemplate
 
 __all__ = ('Scheduler', 'SchedulerError', 'SchedulerParsingError')
 
@@ -36,6 +36,12 @@ class Scheduler(metaclass=abc.ABCMeta):
     # 'can_query_by_user': True if I can pass the 'user' argument to
     # get_joblist_command (and in this case, no 'jobs' should be given).
     # Otherwise, if False, a list of jobs is passed, and no 'user' is given.
+    # 'can_query_delta': optional, True if `_get_joblist_delta_command` is
+    # implemented, such that `get_jobs` can be called with `delta=True`.
+    # 'can_batch_commands': optional, True if the commands returned by
+    # `_get_submit_command` and `_get_kill_command` can be executed in a
+    # batch by `submit_from_script_batch` and `kill_batch`. Plugins that
+    # override `submit_from_script` or `kill` should not set it.
     _features = {}
 
     # The class to be used for the job resource.
@@ -257,6 +263,21 @@ class Scheduler(metaclass=abc.ABCMeta):
         :param user: either None, or a string with the username (to show only jobs of the specific user).
         """
 
+    def _get_joblist_delta_command(self, jobs=None, user=None):
+        """Return the command to get the description of the currently active jobs that are not queued.
+
+        The output of the command should be in the same format as that of the command returned by
+        `_get_joblist_command`, but it may omit the jobs that are queued, i.e. whose state is `JobState.QUEUED` or
+        `JobState.QUEUED_HELD`. Since typically most jobs are queued, this is cheaper to execute and to parse, and it
+        is sufficient to detect which jobs changed state, if the jobs that were queued at the last complete query are
+        known. Plugins that implement this method should set the `can_query_delta` feature.
+
+        :param jobs: either None to get a list of all jobs in the machine, or a list of jobs.
+        :param user: either None, or a string with the username (to show only jobs of the specific user).
+        :raises: :class:`aiida.common.exceptions.FeatureNotAvailable`
+        """
+        raise exceptions.FeatureNotAvailable('Cannot query only the jobs that are not queued')
+
     def _get_detailed_job_info_command(self, job_id):
         """Return the command to run to get detailed information for a given job.
 
@@ -326,7 +347,30 @@ stderr:
         :return: list of `JobInfo` objects, one of each job each with at least its default params implemented.
         """
 
-    def get_jobs(self, jobs=None, user=None, as_dict=False):
+    def _parse_joblist_states(self, retval, stdout, stderr):
+        """Parse only the ids and states of the jobs from the joblist output, see `_parse_joblist_output`.
+
+        The full `JobInfo` of each job is only parsed when it is requested from the returned `JobStateInfo`. Plugins for
+        which parsing the full joblist output is expensive should override this method, the default implementation
+        parses the full output and wraps each `JobInfo`.
+
+        :return: list of `JobStateInfo` objects, one for each job.
+        """
+        return [JobStateInfo.from_job_info(job_info) for job_info in self._parse_joblist_output(retval, stdout, stderr)]
+
+    def parse_job_info(self, raw):
+        """Parse the full `JobInfo` of a job from the ``raw`` data of its `JobStateInfo`.
+
+        This allows to store only the compact state and the raw data of jobs, for example to share them between
+        processes, and to only parse their full `JobInfo` when it is requested. Plugins that set the ``raw`` data in
+        `_parse_joblist_states` should implement this method.
+
+        :param raw: the raw data of the job, as set by `_parse_joblist_states`
+        :return: a `JobInfo` instance
+        """
+        raise NotImplementedError
+
+    def get_jobs(self, jobs=None, user=None, as_dict=False, delta=False, compact=False):
         """Return the list of currently active jobs.
 
         .. note:: typically, only either jobs or user can be specified. See also comments in `_get_joblist_command`.
@@ -335,12 +379,25 @@ stderr:
         :param str user: a string with a user: only jobs of this user are checked
         :param list as_dict: if False (default), a list of JobInfo objects is returned. If True, a dictionary is
             returned, having as key the job_id and as value the JobInfo object.
+        :param delta: if True, jobs that are queued may be omitted, see `_get_joblist_delta_command`. This requires the
+            `can_query_delta` feature.
+        :param compact: if True, `JobStateInfo` objects are returned instead of `JobInfo` objects, which only parse the
+            full job information when it is requested, see `_parse_joblist_states`.
         :return: list of active jobs
         """
+        if delta:
+            command = self._get_joblist_delta_command(jobs=jobs, user=user)
+        else:
+            command = self._get_joblist_command(jobs=jobs, user=user)
+
         with self.transport:
-            retval, stdout, stderr = self.transport.exec_command_wait(self._get_joblist_command(jobs=jobs, user=user))
+            retval, stdout, stderr = self.transport.exec_command_wait(command)
+
+        if compact:
+            joblist = self._parse_joblist_states(retval, stdout, stderr)
+        else:
+            joblist = self._parse_joblist_output(retval, stdout, stderr)
 
-        joblist = self._parse_joblist_output(retval, stdout, stderr)
         if as_dict:
             jobdict = {job.job_id: job for job in joblist}
             if None in jobdict:
@@ -404,6 +461,67 @@ stderr:
         retval, stdout, stderr = self.transport.exec_command_wait(self._get_kill_command(jobid))
         return self._parse_kill_output(retval, stdout, stderr)
 
+    def submit_from_script_batch(self, submissions):
+        """Submit multiple submission scripts to the scheduler, executing the submit commands as a single batch.
+
+        The commands are only batched if the scheduler has the `can_batch_commands` feature, otherwise each script is
+        submitted through `submit_from_script`.
+
+        :param submissions: list of tuples `(working_directory, submit_script)`, as for `submit_from_script`.
+        :return: list with, for each submission, either the job ID, or the exception that was raised while submitting
+            it or parsing the output of its submit command.
+        """
+        if not self._can_batch_commands():
+            return [self._call_safely(self.submit_from_script, *submission) for submission in submissions]
+
+        commands = []
+
+        for working_directory, submit_script in submissions:
+            submit_command = self._get_submit_command(escape_for_bash(submit_script))
+            # The braces ensure the submit command is only executed if changing directory succeeded, even if it is a
+            # list of commands, e.g. one that runs the script in the background
+            commands.append(f'cd {escape_for_bash(working_directory)} && {{\n{submit_command}\n}}')
+
+        return [
+            self._call_safely(self._parse_submit_output, *result)
+            for result in self.transport.exec_command_batch(commands)
+        ]
+
+    def kill_batch(self, jobids):
+        """Kill multiple remote jobs, executing the kill commands as a single batch.
+
+        The commands are only batched if the scheduler has the `can_batch_commands` feature, otherwise each job is
+        killed through `kill`.
+
+        :param jobids: list of the job IDs to be killed
+        :return: list with, for each job, True if everything seems ok, False otherwise, or the exception that was
+            raised while killing it or parsing the output of its kill command.
+        """
+        if not self._can_batch_commands():
+            return [self._call_safely(self.kill, jobid) for jobid in jobids]
+
+        commands = [self._get_kill_command(jobid) for jobid in jobids]
+
+        return [
+            self._call_safely(self._parse_kill_output, *result)
+            for result in self.transport.exec_command_batch(commands)
+        ]
+
+    def _can_batch_commands(self):
+        """Return whether the submit and kill commands of this scheduler can be executed as a batch."""
+        try:
+            return bool(self.get_feature('can_batch_commands'))
+        except NotImplementedError:
+            return False
+
+    @staticmethod
+    def _call_safely(function, *args):
+        """Call the function with the given arguments, returning rather than raising any exception."""
+        try:
+            return function(*args)
+        except Exception as exception:  # pylint: disable=broad-except
+            return exception
+
     @abc.abstractmethod
     def _get_kill_command(self, jobid):
         """Return the command to kill the job with specified jobid."""
@@ -26,7 +26,9 @@ from .data.array.kpoints import *
 from .data.structure import *
 from .dbimporters import *
 from .graph import *
+from .rehash import *
 
 __all__ = (
-    calculations.__all__ + data.array.kpoints.__all__ + data.structure.__all__ + dbimporters.__all__ + graph.__all__
+    calculations.__all__ + data.array.kpoints.__all__ + data.structure.__all__ + dbimporters.__all__ + graph.__all__ +
+    rehash.__all__
 )
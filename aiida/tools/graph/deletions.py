@@ -15,6 +15,8 @@ import warnings
 from aiida.backends.utils import delete_nodes_and_connections
 from aiida.common.log import AIIDA_LOGGER
 from aiida.common.warnings import AiidaDeprecationWarning
+from aiida.manage.database.closure import build_provenance_closure, is_provenance_closure_stale
+from aiida.manage.manager import get_manager
 from aiida.orm import Group, Node, QueryBuilder, load_node
 from aiida.tools.graph.graph_traversers import get_nodes_delete
 
@@ -127,9 +129,18 @@ def delete_nodes(
     # so that if there is a problem during the deletion of the nodes in the DB, I don't delete the folders
     repositories = [load_node(pk)._repository for pk in pks_set_to_delete]  # pylint: disable=protected-access
 
+    # The provenance closure table, if it exists, can only be updated incrementally if no surviving node descends from the
+    # deleted nodes, otherwise it needs to be rebuilt once the nodes are deleted.
+    backend = get_manager().get_backend()
+    rebuild_closure = is_provenance_closure_stale(backend, pks_set_to_delete)
+
     DELETE_LOGGER.info('Starting node deletion...')
     delete_nodes_and_connections(pks_set_to_delete)
 
+    if rebuild_closure:
+        DELETE_LOGGER.info('Rebuilding the provenance closure table...')
+        build_provenance_closure(backend)
+
     DELETE_LOGGER.info('Nodes deleted from database, deleting files from the repository now...')
 
     # If we are here, we managed to delete the entries from the DB.
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Functions to recompute the hashes of many nodes in the database."""
+import collections
+import datetime
+import itertools
+import multiprocessing
+import os
+from typing import Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from aiida.backends.utils import update_node_hashes
+from aiida.manage.configuration import get_profile
+from aiida.orm import Data, Node, ProcessNode, QueryBuilder
+
+__all__ = ('count_nodes_to_rehash', 'rehash_nodes')
+
+NodeClasses = Union[Type[Node], Tuple[Type[Node], ...]]
+
+
+def count_nodes_to_rehash(
+    node_classes: NodeClasses = (Data, ProcessNode),
+    pks: Optional[Iterable[int]] = None,
+    ctime_after: Optional[datetime.datetime] = None,
+    ctime_before: Optional[datetime.datetime] = None,
+    start_pk: Optional[int] = None
+) -> int:
+    """Return the number of nodes that would be rehashed by `rehash_nodes` for the given filters.
+
+    :param node_classes: only include nodes that are an instance of (one of) these classes
+    :param pks: only include nodes with these pks
+    :param ctime_after: only include nodes that were created after this time
+    :param ctime_before: only include nodes that were created before this time
+    :param start_pk: only include nodes whose pk is larger than this one
+    :return: the number of nodes
+    """
+    filters = _get_filters(pks, ctime_after, ctime_before, start_pk)
+    return QueryBuilder().append(node_classes, filters=filters).count()
+
+
+def rehash_nodes(
+    node_classes: NodeClasses = (Data, ProcessNode),
+    pks: Optional[Iterable[int]] = None,
+    ctime_after: Optional[datetime.datetime] = None,
+    ctime_before: Optional[datetime.datetime] = None,
+    start_pk: Optional[int] = None,
+    batch_size: int = 1000,
+    max_workers: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """Recompute and store the hashes of the nodes that match the given filters.
+
+    The pks of the matching nodes are streamed from the database in batches, in ascending order. The hashes of each
+    batch are computed by a pool of worker processes and are then written to the database with a single query. Since
+    the batches are written in order, the pk of the last node of a batch that has been written can be passed as the
+    ``start_pk`` to resume the rehashing after an interruption.
+
+    :param node_classes: only include nodes that are an instance of (one of) these classes
+    :param pks: only include nodes with these pks
+    :param ctime_after: only include nodes that were created after this time
+    :param ctime_before: only include nodes that were created before this time
+    :param start_pk: only include nodes whose pk is larger than this one
+    :param batch_size: the number of nodes whose hashes are computed and stored together
+    :param max_workers: the number of worker processes, by default the number of CPUs. If there is only a single batch
+        or if set to one, the hashes are computed in the current process.
+    :return: generator that yields, for each batch once its hashes have been stored, the number of nodes in the batch
+        and the pk of its last node
+    """
+    if batch_size < 1:
+        raise ValueError(f'batch_size should be a positive integer, got: {batch_size}')
+
+    # The pks are filtered on in the query of every batch, so an iterator would be exhausted after the first one
+    if pks is not None:
+        pks = list(pks)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    batches = _iter_batches(node_classes, pks, ctime_after, ctime_before, start_pk, batch_size)
+    first_batch = next(batches, None)
+
+    if first_batch is None:
+        return
+
+    if max_workers == 1 or len(first_batch) < batch_size:
+        yield from _store_hashes(_compute_hashes(batch) for batch in itertools.chain([first_batch], batches))
+        return
+
+    # The worker processes are started with `spawn`, because forking would share the database connections of this
+    # process. Each worker loads the profile itself, which is why the profile has to be loaded from its name.
+    context = multiprocessing.get_context('spawn')
+
+    with context.Pool(max_workers, initializer=_initialize_worker, initargs=(get_profile().name,)) as pool:
+        # The number of batches that are submitted but not yet stored is bounded, such that the memory usage does not
+        # depend on the number of nodes, and the results are stored in order, such that the rehashing can be resumed.
+        pending = collections.deque([pool.apply_async(_compute_hashes, (first_batch,))])
+
+        for batch in batches:
+            pending.append(pool.apply_async(_compute_hashes, (batch,)))
+            if len(pending) > 2 * max_workers:
+                yield from _store_hashes([pending.popleft().get()])
+
+        yield from _store_hashes(result.get() for result in pending)
+
+
+def _get_filters(pks, ctime_after, ctime_before, start_pk):
+    """Return the filters on the nodes for the given parameters of `rehash_nodes`."""
+    filters = {'id': {'and': []}}
+
+    if pks is not None:
+        filters['id']['and'].append({'in': list(pks)})
+
+    if start_pk is not None:
+        filters['id']['and'].append({'>': start_pk})
+
+    if ctime_after is not None or ctime_before is not None:
+        filters['ctime'] = {'and': []}
+
+    if ctime_after is not None:
+        filters['ctime']['and'].append({'>': ctime_after})
+
+    if ctime_before is not None:
+        filters['ctime']['and'].append({'<': ctime_before})
+
+    if not filters['id']['and']:
+        filters.pop('id')
+
+    return filters
+
+
+def _iter_batches(node_classes, pks, ctime_after, ctime_before, start_pk, batch_size) -> Iterator[List[int]]:
+    """Yield the pks of the matching nodes in batches, in ascending order.
+
+    Each batch is retrieved with a separate query, starting after the last pk of the previous batch, such that no
+    cursor has to be kept open while the hashes are being stored.
+    """
+    while True:
+        filters = _get_filters(pks, ctime_after, ctime_before, start_pk)
+        builder = QueryBuilder().append(node_classes, filters=filters, project='id', tag='node')
+        builder.order_by({'node': {'id': 'asc'}})
+        batch = [pk for pk, in builder.limit(batch_size).iterall()]
+
+        if not batch:
+            return
+
+        yield batch
+
+        if len(batch) < batch_size:
+            return
+
+        start_pk = batch[-1]
+
+
+def _store_hashes(results) -> Iterator[Tuple[int, int]]:
+    """Store the computed hashes of each batch and yield the number of nodes and the last pk of the batch."""
+    for last_pk, hashes in results:
+        if hashes:
+            update_node_hashes(hashes)
+        yield len(hashes), last_pk
+
+
+def _initialize_worker(profile_name):
+    """Load the profile in a worker process."""
+    from aiida.manage.configuration import load_profile
+    load_profile(profile_name)
+
+
+def _compute_hashes(pks: List[int]) -> Tuple[int, List[Tuple[int, Optional[str], Optional[str]]]]:
+    """Compute the hashes of the nodes with the given pks.
+
+    :param pks: the pks of the nodes
+    :return: the last pk of ``pks`` and a list of tuples of the pk, the hash and the version of the hash of each node,
+        where nodes that have been deleted in the meantime are skipped
+    """
+    builder = QueryBuilder().append(Node, filters={'id': {'in': pks}})
+    hashes = []
+
+    for node, in builder.iterall():
+        node_hash = node.get_hash()
+        hash_version = node._get_hash_version() if node_hash is not None else None  # pylint: disable=protected-access
+        hashes.append((node.pk, node_hash, hash_version))
+
+    return pks[-1], hashes
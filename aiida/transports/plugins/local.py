@@ -19,6 +19,7 @@ Local transport
 ### we should instead keep track internally of the 'current working directory'
 ### in the exact same way as paramiko does already.
 
+import contextlib
 import errno
 import io
 import os
@@ -792,6 +793,43 @@ class LocalTransport(Transport):
 
         return retval, output_text.decode('utf-8'), stderr_text.decode('utf-8')
 
+    @contextlib.contextmanager
+    def exec_command_stream(self, command):
+        """
+        Executes the specified command and yields its stdin and stdout as binary streams.
+
+        :param command: the command to execute
+
+        :return: a tuple with (stdin, stdout), that are binary file-like objects.
+        :raise IOError: if the command finishes with a non-zero exit status
+        """
+        from aiida.transports.util import StreamDrainer
+
+        local_stdin, local_stdout, local_stderr, local_proc = self._exec_command_internal(command)
+
+        # The standard error is consumed concurrently, otherwise the process may block on writing to a full pipe
+        stderr = StreamDrainer(local_stderr)
+        stderr.start()
+
+        try:
+            yield local_stdin, local_stdout
+        except Exception:
+            local_proc.kill()
+            local_proc.wait()
+            raise
+
+        local_stdin.close()
+
+        # Discard whatever output was not consumed, before waiting for the return code
+        while local_stdout.read(65536):
+            pass
+
+        local_proc.wait()
+        stderr_text = stderr.get_content().decode('utf-8', errors='replace')
+
+        if local_proc.returncode != 0:
+            raise IOError(f'command `{command}` failed with exit status {local_proc.returncode}: {stderr_text}')
+
     def gotocomputer_command(self, remotedir):
         """
         Return a string to be run using os.system in order to connect
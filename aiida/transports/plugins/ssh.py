@@ -9,10 +9,13 @@
 ###########################################################################
 """Plugin for transport over SSH (and SFTP for file transfer)."""
 # pylint: disable=too-many-lines
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
 import glob
 import io
 import os
-from stat import S_ISDIR, S_ISREG
+from stat import S_ISDIR, S_ISLNK, S_ISREG
+import threading
 
 import click
 
@@ -209,6 +212,10 @@ class SshTransport(Transport):  # pylint: disable=too-many-public-methods
     # if too large commands are sent, clogging the outputs or logs
     _MAX_EXEC_COMMAND_LOG_SIZE = None
 
+    # Maximum number of files that `puttree` and `gettree` transfer concurrently, each over its own SFTP channel. This
+    # overlaps the round-trips of opening, closing and confirming the files, which dominate for small files.
+    _MAX_CONCURRENT_TRANSFERS = 4
+
     @classmethod
     def _get_username_suggestion_string(cls, computer):
         """
@@ -832,7 +839,7 @@ class SshTransport(Transport):  # pylint: disable=too-many-public-methods
         if not os.path.isabs(localpath):
             raise ValueError('The localpath must be an absolute path')
 
-        if self.isfile(remotepath) and not overwrite:
+        if not overwrite and self.isfile(remotepath):
             raise OSError('Destination already exists: not overwriting it')
 
         return self.sftp.put(localpath, remotepath, callback=callback)
@@ -883,23 +890,22 @@ class SshTransport(Transport):  # pylint: disable=too-many-public-methods
             remotepath = os.path.join(remotepath, os.path.split(localpath)[1])
             self.mkdir(remotepath)  # create a nested folder
 
+        transfers = []
+
         for this_source in os.walk(localpath):
             # Get the relative path
             this_basename = os.path.relpath(path=this_source[0], start=localpath)
 
-            try:
-                self.stat(os.path.join(remotepath, this_basename))
-            except IOError as exc:
-                import errno
-                if exc.errno == errno.ENOENT:  # Missing file
-                    self.mkdir(os.path.join(remotepath, this_basename))
-                else:
-                    raise
+            # The remotepath was just created, so none of its subfolders can exist yet
+            if this_basename != os.curdir:
+                self.mkdir(os.path.join(remotepath, this_basename))
 
             for this_file in this_source[2]:
                 this_local_file = os.path.join(localpath, this_basename, this_file)
                 this_remote_file = os.path.join(remotepath, this_basename, this_file)
-                self.putfile(this_local_file, this_remote_file)
+                transfers.append((this_local_file, this_remote_file))
+
+        self._transfer_files(transfers, put=True)
 
     def get(self, remotepath, localpath, callback=None, dereference=True, overwrite=True, ignore_nonexisting=False):  # pylint: disable=too-many-branches,arguments-differ,too-many-arguments
         """
@@ -987,9 +993,20 @@ class SshTransport(Transport):  # pylint: disable=too-many-public-methods
         if not dereference:
             raise NotImplementedError
 
+        return self._getfile(self.sftp, remotepath, localpath, callback)
+
+    @staticmethod
+    def _getfile(sftp, remotepath, localpath, callback=None):
+        """
+        Get a file from remote to local through the given SFTP client.
+
+        :param sftp: the paramiko SFTP client to use
+        :param remotepath: a remote path
+        :param localpath: an (absolute) local path
+        """
         # Workaround for bug #724 in paramiko -- remove localpath on IOError
         try:
-            return self.sftp.get(remotepath, localpath, callback)
+            return sftp.get(remotepath, localpath, callback)
         except IOError:
             try:
                 os.remove(localpath)
@@ -997,6 +1014,53 @@ class SshTransport(Transport):  # pylint: disable=too-many-public-methods
                 pass
             raise
 
+    def _transfer_files(self, transfers, put):
+        """
+        Transfer multiple files between local and remote, overlapping the transfers of different files.
+
+        Each file is transferred by paramiko with pipelined write or prefetched read requests. Up to
+        `_MAX_CONCURRENT_TRANSFERS` files are transferred at the same time, each by a thread with its own SFTP channel,
+        since a single paramiko SFTP client should not be shared between threads.
+
+        :param transfers: list of tuples (source, destination) of the files to transfer
+        :param put: if True, the sources are local paths and the destinations remote paths, otherwise the reverse
+        """
+
+        def transfer(sftp, source, destination):
+            if put:
+                sftp.put(source, destination)
+            else:
+                self._getfile(sftp, source, destination)
+
+        if len(transfers) <= 1 or self._MAX_CONCURRENT_TRANSFERS <= 1:
+            for source, destination in transfers:
+                transfer(self.sftp, source, destination)
+            return
+
+        cwd = self.getcwd()
+        clients = []
+        lock = threading.Lock()
+        local = threading.local()
+
+        def transfer_in_thread(source, destination):
+            sftp = getattr(local, 'sftp', None)
+            if sftp is None:
+                with lock:
+                    sftp = self.sshclient.open_sftp()
+                    clients.append(sftp)
+                sftp.chdir(cwd)
+                local.sftp = sftp
+            transfer(sftp, source, destination)
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self._MAX_CONCURRENT_TRANSFERS, len(transfers))) as executor:
+                futures = [executor.submit(transfer_in_thread, *item) for item in transfers]
+                for future in futures:
+                    future.result()
+        finally:
+            for sftp in clients:
+                sftp.close()
+
     def gettree(self, remotepath, localpath, callback=None, dereference=True, overwrite=True):  # pylint: disable=arguments-differ,unused-argument
         """
         Get a folder recursively from remote to local.
@@ -1038,16 +1102,36 @@ class SshTransport(Transport):  # pylint: disable=too-many-public-methods
             localpath = os.path.join(localpath, os.path.split(remotepath)[1])
             os.mkdir(localpath)  # create a nested folder
 
-        item_list = self.listdir(remotepath)
-        dest = str(localpath)
+        transfers = []
+        self._collect_tree_transfers(remotepath, str(localpath), transfers)
+        self._transfer_files(transfers, put=False)
+
+    def _collect_tree_transfers(self, remotepath, localpath, transfers):
+        """
+        Create the local folders of a remote folder recursively and collect the files to transfer.
 
-        for item in item_list:
-            item = str(item)
+        The attributes of all entries of each folder are fetched with a single request, instead of a request per entry.
 
-            if self.isdir(os.path.join(remotepath, item)):
-                self.gettree(os.path.join(remotepath, item), os.path.join(dest, item))
+        :param remotepath: a remote folder
+        :param localpath: an (absolute) local path, which is created if it does not exist
+        :param transfers: list to which tuples (remotepath, localpath) of the files to transfer are appended
+        """
+        os.makedirs(localpath, exist_ok=True)
+
+        for entry in self.sftp.listdir_attr(remotepath):
+            remote_item = os.path.join(remotepath, entry.filename)
+            local_item = os.path.join(localpath, entry.filename)
+
+            # The attributes do not follow symbolic links, so these have to be resolved separately
+            if S_ISLNK(entry.st_mode):
+                isdir = self.isdir(remote_item)
             else:
-                self.getfile(os.path.join(remotepath, item), os.path.join(dest, item))
+                isdir = S_ISDIR(entry.st_mode)
+
+            if isdir:
+                self._collect_tree_transfers(remote_item, local_item, transfers)
+            else:
+                transfers.append((remote_item, local_item))
 
     def get_attribute(self, path):
         """
@@ -1064,6 +1148,39 @@ class SshTransport(Transport):  # pylint: disable=too-many-public-methods
             aiida_attr[key] = getattr(paramiko_attr, key)
         return aiida_attr
 
+    def listdir_withattributes(self, path='.', pattern=None):
+        """
+        Return a list of the names of the entries in the given path, with their attributes.
+
+        The attributes of all entries are fetched with a single request. See the base class for the format of the list.
+
+        :param str path: path to list (default to '.')
+        :param str pattern: if used, listdir returns a list of files matching
+                            filters in Unix style. Unix only.
+        :return: a list of dictionaries, one per entry.
+        """
+        from aiida.transports.util import FileAttribute
+
+        names = set(self.listdir(path, pattern)) if pattern else None
+        retlist = []
+
+        for entry in self.sftp.listdir_attr(path):
+            if names is not None and entry.filename not in names:
+                continue
+
+            attributes = FileAttribute()
+            for key in attributes._valid_fields:  # pylint: disable=protected-access
+                attributes[key] = getattr(entry, key)
+
+            if S_ISLNK(entry.st_mode):
+                isdir = self.isdir(os.path.join(path, entry.filename))
+            else:
+                isdir = S_ISDIR(entry.st_mode)
+
+            retlist.append({'name': entry.filename, 'attributes': attributes, 'isdir': isdir})
+
+        return retlist
+
     def copyfile(self, remotesource, remotedestination, dereference=False):
         return self.copy(remotesource, remotedestination, dereference)
 
@@ -1324,6 +1441,42 @@ class SshTransport(Transport):  # pylint: disable=too-many-public-methods
 
         return retval, output_text, stderr_text
 
+    @contextlib.contextmanager
+    def exec_command_stream(self, command):
+        """
+        Executes the specified command and yields its stdin and stdout as binary streams.
+
+        :param command: the command to execute
+
+        :return: a tuple with (stdin, stdout), that are binary file-like objects.
+        :raise IOError: if the command finishes with a non-zero exit status
+        """
+        from aiida.transports.util import StreamDrainer
+
+        ssh_stdin, stdout, stderr, channel = self._exec_command_internal(command)
+
+        # The standard error is consumed concurrently, since the remote blocks once the window of the channel is full
+        stderr = StreamDrainer(stderr)
+        stderr.start()
+
+        try:
+            yield ssh_stdin, stdout
+
+            ssh_stdin.flush()
+            ssh_stdin.channel.shutdown_write()
+
+            # Discard whatever output was not consumed, before waiting for the return code
+            while stdout.read(65536):
+                pass
+
+            retval = channel.recv_exit_status()
+            stderr_text = stderr.get_content().decode('utf-8', errors='replace')
+        finally:
+            channel.close()
+
+        if retval != 0:
+            raise IOError(f'command `{command}` failed with exit status {retval}: {stderr_text}')
+
     def gotocomputer_command(self, remotedir):
         """
         Specific gotocomputer string to connect to a given remote computer via
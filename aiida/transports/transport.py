@@ -9,10 +9,12 @@
 ###########################################################################
 """Transport interface."""
 import abc
+import contextlib
 import os
 import re
 import fnmatch
 import sys
+import uuid
 from collections import OrderedDict
 
 from aiida.common.exceptions import InternalError
@@ -426,6 +428,77 @@ class Transport(abc.ABC):
         """
         raise NotImplementedError
 
+    def exec_command_batch(self, commands):
+        """
+        Execute multiple commands in a single shell session, wait for them to finish, and return for each command
+        the retcode, the stdout and the stderr.
+
+        Compared to calling `exec_command_wait` for each command, the cost of starting a new shell, which for a login
+        shell includes sourcing the profile files, and for the `SshTransport` of opening a new channel, is paid only
+        once. Each command runs in its own subshell, with the standard input redirected from `/dev/null`, so that it
+        cannot affect the following ones, e.g. by changing directory or exiting. The output of the commands is
+        separated by a random marker printed after each command, together with its exit status. A command that is
+        empty or only a comment does nothing and succeeds, as it would when executed on its own.
+
+        Enforce the execution to be run from the pwd (as given by
+        self.getcwd), if this is not None.
+
+        :param commands: list of commands to execute, as strings
+        :return: a list with, for each command, a tuple of the retcode (int), stdout (str) and stderr (str).
+        :raises IOError: if the output of the batch cannot be split into that of the individual commands, e.g. because
+            the shell session failed to start
+        """
+        if not commands:
+            return []
+
+        marker = uuid.uuid4().hex
+        lines = ['{']
+
+        for command in commands:
+            # The newline before the closing parenthesis ensures a trailing comment does not swallow it, and the `:`
+            # that the subshell is not empty if the command is empty or only a comment, which is a syntax error
+            lines.append(f'( :\n{command}\n) < /dev/null')
+            lines.append(f"printf '\\n{marker} %d\\n' $?")
+            lines.append(f"printf '\\n{marker}\\n' >&2")
+
+        lines.append('}')
+
+        retval, stdout, stderr = self.exec_command_wait('\n'.join(lines))
+
+        stdout_chunks = stdout.split(f'\n{marker} ')
+        stderr_chunks = stderr.split(f'\n{marker}\n')
+
+        if len(stdout_chunks) != len(commands) + 1 or len(stderr_chunks) != len(commands) + 1:
+            raise IOError(f'failed to execute the batch of commands (retval={retval}): stderr={stderr}')
+
+        results = []
+        output = stdout_chunks[0]
+
+        for chunk, error in zip(stdout_chunks[1:], stderr_chunks):
+            command_retval, _, next_output = chunk.partition('\n')
+            results.append((int(command_retval), output, error))
+            output = next_output
+
+        return results
+
+    @contextlib.contextmanager
+    def exec_command_stream(self, command):
+        """
+        Execute the command on the shell and yield its standard input and output as binary streams.
+
+        This allows to stream large amounts of data to or from the command, for example a tar archive, without holding
+        it in memory. When the context is exited, the standard input is closed, any remaining output is discarded and
+        the command is waited for.
+
+        Enforce the execution to be run from the cwd (as given by
+        self.getcwd), if this is not None.
+
+        :param str command: execute the command given as a string
+        :return: a tuple with the stdin and stdout of the command, as writable and readable binary file-like objects
+        :raises IOError: if the command finishes with a non-zero exit status
+        """
+        raise NotImplementedError
+
     def get(self, remotepath, localpath, *args, **kwargs):
         """
         Retrieve a file or folder from remote source to local destination
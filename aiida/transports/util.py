@@ -9,6 +9,7 @@
 ###########################################################################
 """General utilities for Transport classes."""
 
+import threading
 import time
 
 from paramiko import ProxyCommand
@@ -66,6 +67,41 @@ class _DetachedProxyCommand(ProxyCommand):
                 time.sleep(0.2)
 
 
+class StreamDrainer(threading.Thread):
+    """Thread that reads a binary stream until it is exhausted, keeping only the tail of its content.
+
+    This is used to consume the standard error of a command whose standard output is streamed, since a command that
+    writes more to its standard error than fits in the pipe would otherwise block forever.
+    """
+
+    def __init__(self, handle, max_size=65536):
+        """Construct a new drainer, which still has to be started.
+
+        :param handle: a binary file-like object to read from
+        :param max_size: the maximum number of bytes of the end of the content that are kept
+        """
+        super().__init__(daemon=True)
+        self._handle = handle
+        self._max_size = max_size
+        self._content = bytearray()
+
+    def run(self):
+        while True:
+            chunk = self._handle.read(self._max_size)
+            if not chunk:
+                break
+            self._content += chunk
+            del self._content[:-self._max_size]
+
+    def get_content(self):
+        """Wait for the stream to be exhausted and return the tail of its content.
+
+        :return: the last ``max_size`` bytes of the content of the stream
+        """
+        self.join()
+        return bytes(self._content)
+
+
 def copy_from_remote_to_remote(transportsource, transportdestination, remotesource, remotedestination, **kwargs):
     """
     Copy files or folders from a remote computer to another remote computer.
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=import-error,no-name-in-module,invalid-name
+"""Test migration to add the indexed `hash` column to the `DbNode` model."""
+
+from .test_migrations_common import TestMigrations
+
+
+class TestNodeHashMigration(TestMigrations):
+    """Test migration to add the indexed `hash` column to the `DbNode` model."""
+
+    migrate_from = '0045_dbgroup_extras'
+    migrate_to = '0046_dbnode_hash'
+
+    def setUpBeforeMigration(self):
+        node_hashed = self.DbNode(
+            node_type='data.dict.Dict.', user_id=self.default_user.id, extras={'_aiida_hash': 'abcdef'}
+        )
+        node_hashed.save()
+        self.node_hashed_pk = node_hashed.pk
+
+        node_cleared = self.DbNode(
+            node_type='data.dict.Dict.', user_id=self.default_user.id, extras={'_aiida_hash': None}
+        )
+        node_cleared.save()
+        self.node_cleared_pk = node_cleared.pk
+
+        node_unhashed = self.DbNode(node_type='data.dict.Dict.', user_id=self.default_user.id, extras={})
+        node_unhashed.save()
+        self.node_unhashed_pk = node_unhashed.pk
+
+    def test_hash(self):
+        """Test that the hash column is populated with the hash stored in the extras."""
+        DbNode = self.apps.get_model('db', 'DbNode')
+
+        self.assertEqual(DbNode.objects.get(pk=self.node_hashed_pk).hash, 'abcdef')
+        self.assertIsNone(DbNode.objects.get(pk=self.node_cleared_pk).hash)
+        self.assertIsNone(DbNode.objects.get(pk=self.node_unhashed_pk).hash)
+
+        # The hash is still stored in the extras as well
+        self.assertEqual(DbNode.objects.get(pk=self.node_hashed_pk).extras, {'_aiida_hash': 'abcdef'})
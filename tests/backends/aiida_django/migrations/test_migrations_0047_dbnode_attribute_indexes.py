@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=import-error,no-name-in-module,invalid-name
+"""Test migration to add expression indexes on the node attributes that are filtered on by the engine."""
+from django.db import connection
+
+from .test_migrations_common import TestMigrations
+
+
+class TestNodeAttributeIndexesMigration(TestMigrations):
+    """Test migration to add expression indexes on the node attributes that are filtered on by the engine."""
+
+    migrate_from = '0046_dbnode_hash'
+    migrate_to = '0047_dbnode_attribute_indexes'
+
+    def setUpBeforeMigration(self):
+        pass
+
+    def test_indexes(self):
+        """Test that the indexes are created with the projection of the attribute as their comment."""
+        from aiida.manage.database.indexes import ENGINE_ATTRIBUTE_INDEXES, get_attribute_index_expression
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT obj_description(indexrelid, 'pg_class'), pg_get_indexdef(indexrelid) FROM pg_index "
+                "WHERE indrelid = 'db_dbnode'::regclass;"
+            )
+            indexes = dict(cursor.fetchall())
+
+        for projection in ENGINE_ATTRIBUTE_INDEXES:
+            self.assertIn(get_attribute_index_expression(projection), indexes[projection])
@@ -1747,3 +1747,83 @@ class TestGroupExtrasMigration(TestMigrationsSQLA):
                 self.assertEqual(group.extras, {})
             finally:
                 session.close()
+
+
+class TestNodeHashMigration(TestMigrationsSQLA):
+    """Test migration to add the indexed `hash` column to the `DbNode` model."""
+
+    migrate_from = '0edcdd5a30f0'  # 0edcdd5a30f0_dbgroup_extras.py
+    migrate_to = '777441f8ac98'  # 777441f8ac98_dbnode_hash.py
+
+    def setUpBeforeMigration(self):
+        """Create nodes with and without a hash in their extras."""
+        DbNode = self.get_current_table('db_dbnode')  # pylint: disable=invalid-name
+        DbUser = self.get_current_table('db_dbuser')  # pylint: disable=invalid-name
+
+        with self.get_session() as session:
+            try:
+                default_user = DbUser(email=f'{self.id()}@aiida.net')
+                session.add(default_user)
+                session.commit()
+
+                node_hashed = DbNode(node_type='data.dict.Dict.', user_id=default_user.id, extras={'_aiida_hash': 'ab'})
+                node_cleared = DbNode(node_type='data.dict.Dict.', user_id=default_user.id, extras={'_aiida_hash': None})
+                node_unhashed = DbNode(node_type='data.dict.Dict.', user_id=default_user.id, extras={})
+                session.add_all([node_hashed, node_cleared, node_unhashed])
+                session.commit()
+
+                # Store values for later tests
+                self.node_hashed_pk = node_hashed.id
+                self.node_cleared_pk = node_cleared.id
+                self.node_unhashed_pk = node_unhashed.id
+
+            finally:
+                session.close()
+
+    def test_hash(self):
+        """Test that the hash column is populated with the hash stored in the extras."""
+        DbNode = self.get_current_table('db_dbnode')  # pylint: disable=invalid-name
+
+        with self.get_session() as session:
+            try:
+                node_hashed = session.query(DbNode).filter(DbNode.id == self.node_hashed_pk).one()
+                self.assertEqual(node_hashed.hash, 'ab')
+                self.assertEqual(node_hashed.extras, {'_aiida_hash': 'ab'})
+
+                node_cleared = session.query(DbNode).filter(DbNode.id == self.node_cleared_pk).one()
+                self.assertIsNone(node_cleared.hash)
+
+                node_unhashed = session.query(DbNode).filter(DbNode.id == self.node_unhashed_pk).one()
+                self.assertIsNone(node_unhashed.hash)
+            finally:
+                session.close()
+
+
+class TestNodeAttributeIndexesMigration(TestMigrationsSQLA):
+    """Test migration to add expression indexes on the node attributes that are filtered on by the engine."""
+
+    migrate_from = '777441f8ac98'  # 777441f8ac98_dbnode_hash.py
+    migrate_to = 'b4bd34bff762'  # b4bd34bff762_dbnode_attribute_indexes.py
+
+    def setUpBeforeMigration(self):
+        pass
+
+    def test_indexes(self):
+        """Test that the indexes are created with the projection of the attribute as their comment."""
+        from sqlalchemy.sql import text  # pylint: disable=import-error,no-name-in-module
+        from aiida.manage.database.indexes import ENGINE_ATTRIBUTE_INDEXES, get_attribute_index_expression
+
+        with self.get_session() as session:
+            try:
+                result = session.execute(
+                    text(
+                        "SELECT obj_description(indexrelid, 'pg_class'), pg_get_indexdef(indexrelid) FROM pg_index "
+                        "WHERE indrelid = 'db_dbnode'::regclass;"
+                    )
+                )
+                indexes = dict(result.fetchall())
+            finally:
+                session.close()
+
+        for projection in ENGINE_ATTRIBUTE_INDEXES:
+            self.assertIn(get_attribute_index_expression(projection), indexes[projection])
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=protected-access
+"""Performance benchmark tests for caching.
+
+The purpose of these tests is to benchmark the lookup of identical nodes,
+which is performed for every process launched with caching enabled,
+and to compare it for different numbers of nodes in the database.
+"""
+import pytest
+from plumpy import ProcessState
+
+from aiida.orm import CalculationNode
+
+GROUP_NAME = 'caching'
+
+
+def create_calculation(index):
+    """Create a stored calculation node with the given index attribute that is a valid cache source."""
+    node = CalculationNode(process_type='aiida.calculations:arithmetic.add')
+    node.set_attribute('index', index)
+    node.set_process_state(ProcessState.FINISHED)
+    node.set_exit_status(0)
+    return node.store()
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.parametrize('num_nodes', (10, 1000))
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=100)
+def test_get_same_node(benchmark, num_nodes):
+    """Benchmark for looking up an identical node to use as cache source, for a given number of nodes."""
+    for index in range(num_nodes):
+        create_calculation(index)
+
+    target = create_calculation(num_nodes // 2)
+
+    same_node = benchmark(target._get_same_node)
+    assert same_node is not None
+    assert same_node.get_attribute('index') == num_nodes // 2
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=unused-argument,redefined-outer-name
+"""Performance benchmark tests for the QueryBuilder.
+
+The purpose of these tests is to benchmark and compare the different ways
+of retrieving the projected columns of many rows from the database,
+and the overhead of building small queries with and without the query cache.
+"""
+import pytest
+
+from aiida.orm import Int, QueryBuilder
+from aiida.orm.utils.querycache import disable_query_cache
+
+GROUP_NAME = 'querybuilder'
+
+GROUP_NAME_CACHE = 'querybuilder-cache'
+
+NUM_NODES = 2000
+
+NUM_QUERIES = 100
+
+PROJECTIONS = ['id', 'uuid', 'ctime', {'attributes.value': {'cast': 'i'}}]
+
+
+@pytest.fixture
+def query_builder(clear_database_before_test):
+    """Return a query builder that projects a few columns and an attribute of a number of `Int` nodes."""
+    for value in range(NUM_NODES):
+        Int(value).store()
+
+    return QueryBuilder().append(Int, tag='integer', project=PROJECTIONS)
+
+
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=10)
+def test_all(benchmark, query_builder):
+    """Benchmark for retrieving the projections as a list of rows."""
+    result = benchmark(query_builder.all)
+    assert len(result) == NUM_NODES
+
+
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=10)
+def test_dict(benchmark, query_builder):
+    """Benchmark for retrieving the projections as a list of dictionaries."""
+    result = benchmark(query_builder.dict)
+    assert len(result) == NUM_NODES
+
+
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=10)
+def test_to_arrays(benchmark, query_builder):
+    """Benchmark for retrieving the projections as one array per column."""
+    result = benchmark(query_builder.to_arrays)
+    assert result['integer']['attributes.value'].sum() == NUM_NODES * (NUM_NODES - 1) // 2
+
+
+@pytest.fixture
+def small_queries(clear_database_before_test):
+    """Return a function that runs a number of small queries of the same shape, that each retrieve a single node."""
+    pks = [Int(value).store().pk for value in range(NUM_QUERIES)]
+
+    def run_queries():
+        return [QueryBuilder().append(Int, filters={'id': pk}, project=['id', 'uuid']).one()[0] for pk in pks]
+
+    return run_queries
+
+
+@pytest.mark.benchmark(group=GROUP_NAME_CACHE, min_rounds=10)
+def test_small_queries_cached(benchmark, small_queries):
+    """Benchmark for running many small queries of the same shape, which are taken from the query cache."""
+    result = benchmark(small_queries)
+    assert len(result) == NUM_QUERIES
+
+
+@pytest.mark.benchmark(group=GROUP_NAME_CACHE, min_rounds=10)
+def test_small_queries_uncached(benchmark, small_queries):
+    """Benchmark for running many small queries of the same shape, which are each built from scratch."""
+    with disable_query_cache():
+        result = benchmark(small_queries)
+    assert len(result) == NUM_QUERIES
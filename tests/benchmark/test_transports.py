@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=redefined-outer-name,protected-access
+"""Performance benchmark tests for transports.
+
+The purpose of these tests is to benchmark and compare the transfer of folders
+with many small files, which is dominated by the round-trips per file,
+through the `SshTransport` on localhost.
+"""
+import os
+
+import pytest
+
+from aiida.transports.plugins.ssh import SshTransport
+
+GROUP_NAME = 'transport'
+
+
+@pytest.fixture
+def local_tree(tmp_path):
+    """Create a local folder with many small files, distributed over a few subfolders."""
+    source = tmp_path / 'source'
+    for index_folder in range(5):
+        folder = source / f'folder_{index_folder}'
+        folder.mkdir(parents=True)
+        for index_file in range(20):
+            (folder / f'file_{index_file}').write_bytes(os.urandom(1024))
+    return source
+
+
+@pytest.fixture
+def transport():
+    """Return an open `SshTransport` to localhost, skipping the test if localhost does not accept SSH connections."""
+    ssh = SshTransport(machine='localhost', timeout=30, load_system_host_keys=True, key_policy='AutoAddPolicy')
+
+    try:
+        ssh.open()
+    except Exception as exception:  # pylint: disable=broad-except
+        pytest.skip(f'cannot connect to localhost through SSH: {exception}')
+
+    try:
+        yield ssh
+    finally:
+        ssh.close()
+
+
+@pytest.mark.parametrize('max_concurrent_transfers', (1, 4))
+@pytest.mark.benchmark(group=GROUP_NAME, min_rounds=5)
+def test_puttree_gettree(benchmark, transport, local_tree, tmp_path, monkeypatch, max_concurrent_transfers):
+    """Benchmark for putting and getting back a folder with many small files."""
+    monkeypatch.setattr(transport, '_MAX_CONCURRENT_TRANSFERS', max_concurrent_transfers)
+    # The transport connects to localhost, so the remote folders can be placed in the local temporary folder
+    counter = {'round': 0}
+
+    def _run():
+        counter['round'] += 1
+        remote = tmp_path / f"remote_{counter['round']}"
+        local = tmp_path / f"local_{counter['round']}"
+        transport.puttree(str(local_tree), str(remote))
+        transport.gettree(str(remote), str(local))
+        return local
+
+    local = benchmark(_run)
+
+    assert sorted(path.relative_to(local) for path in local.rglob('*')
+                  ) == sorted(path.relative_to(local_tree) for path in local_tree.rglob('*'))
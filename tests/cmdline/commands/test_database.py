@@ -180,3 +180,48 @@ def tests_database_version(run_cli_command, manager):
     result = run_cli_command(cmd_database.database_version)
     assert result.output_lines[0].endswith(backend_manager.get_schema_generation_database())
     assert result.output_lines[1].endswith(backend_manager.get_schema_version_database())
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def tests_database_closure(run_cli_command, manager):
+    """Test the ``verdi database closure`` commands."""
+    from aiida.manage.database.closure import has_provenance_closure
+
+    backend = manager.get_backend()
+    calculation = CalculationNode()
+    calculation.add_incoming(Data().store(), link_label='input', link_type=LinkType.INPUT_CALC)
+    calculation.store()
+
+    result = run_cli_command(cmd_database.closure_build)
+    assert 'with 1 ancestor-descendant pairs' in result.output
+    assert has_provenance_closure(backend)
+
+    run_cli_command(cmd_database.closure_drop, ['--force'])
+    assert not has_provenance_closure(backend)
+
+    result = run_cli_command(cmd_database.closure_drop, ['--force'])
+    assert 'does not exist' in result.output
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def tests_database_index(run_cli_command, manager):
+    """Test the ``verdi database index`` commands."""
+    from aiida.manage.database.indexes import get_attribute_indexes
+
+    backend = manager.get_backend()
+
+    result = run_cli_command(cmd_database.index_list)
+    assert 'attributes.process_state' in result.output
+
+    result = run_cli_command(cmd_database.index_create, ['extras.tag', '--no-concurrently'])
+    assert 'ix_db_dbnode_extras_tag' in result.output
+    assert 'extras.tag' in [index.projection for index in get_attribute_indexes(backend)]
+
+    result = run_cli_command(cmd_database.index_create, ['label'], raises=True)
+    assert 'not the projection of an attribute or extra' in result.output
+
+    result = run_cli_command(cmd_database.index_drop, ['attributes.sealed', '--force'], raises=True)
+    assert 'used by the engine' in result.output
+
+    run_cli_command(cmd_database.index_drop, ['extras.tag', '--force'])
+    assert 'extras.tag' not in [index.projection for index in get_attribute_indexes(backend)]
@@ -579,6 +579,14 @@ class TestVerdiRehash(AiidaTestCase):
         self.assertClickResultNoException(result)
         self.assertTrue(f'{expected_node_count} nodes' in result.output)
 
+    def test_rehash_start_pk(self):
+        """Limiting the queryset by defining a start pk, should only include nodes with a larger pk."""
+        expected_node_count = 2
+        options = ['-f', '--start-pk', str(self.node_float.pk - 1), '--batch-size', '1', '--max-workers', '1']
+        result = self.cli_runner.invoke(cmd_node.rehash, options)
+        self.assertClickResultNoException(result)
+        self.assertTrue(f'{expected_node_count} nodes' in result.output)
+
     def test_rehash_entry_point_no_matches(self):
         """Limiting the queryset by defining explicit entry point, with no nodes should exit with non-zero status."""
         options = ['-f', '-e', 'aiida.data:structure']
@@ -15,6 +15,7 @@ import itertools
 import collections
 from datetime import datetime
 import uuid
+from unittest import mock
 
 import numpy as np
 import pytz
@@ -24,6 +25,7 @@ try:
 except ImportError:
     import unittest
 
+from aiida.common import hashing
 from aiida.common.hashing import make_hash, float_to_text
 from aiida.common.folders import SandboxFolder
 from aiida.backends.testbase import AiidaTestCase
@@ -211,6 +213,27 @@ class MakeHashTest(unittest.TestCase):
             self.assertNotEqual(make_hash(folder), folder_hash)
             self.assertEqual(make_hash(folder, ignored_folder_content=['file3.npy', 'some_subdir']), folder_hash)
 
+    def test_folder_large_files(self):
+        """Test that hashing the files of a folder in chunks and in parallel does not change the hash."""
+
+        with SandboxFolder(sandbox_in_repo=False) as folder:
+            for index in range(3):
+                with folder.open(f'file{index}', 'wb') as fhandle:
+                    fhandle.write(bytes(range(256)) * 10000 * (index + 1))
+
+            subfolder = folder.get_subfolder('some_subdir', create=True)
+            with subfolder.open('file', 'w') as fhandle:
+                fhandle.write('hello there!\n')
+
+            folder_hash = 'c8a6d8c671b4848f7bcb70637aadbb8ef5a2cde2721dc5863b7bae4f86253abc'
+            self.assertEqual(make_hash(folder), folder_hash)
+
+            with mock.patch.object(hashing, '_FOLDER_HASH_PARALLEL_THRESHOLD', 0):
+                self.assertEqual(make_hash(folder), folder_hash)
+
+            with mock.patch.object(hashing, '_FOLDER_HASH_CHUNKSIZE', 7):
+                self.assertEqual(make_hash(folder), folder_hash)
+
 
 class CheckDBRoundTrip(AiidaTestCase):
     """
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the `aiida.engine.daemon.autoscaler` module."""
+import asyncio
+import os
+import time
+
+import pytest
+
+from aiida.common import json
+from aiida.engine.daemon import autoscaler
+from aiida.engine.daemon.autoscaler import DaemonAutoscaler, WorkerLoad, get_worker_loads
+
+
+def get_loads(*active_processes, process_slots=10, loop_lag=0.):
+    """Return a `WorkerLoad` for each given number of active processes."""
+    return [
+        WorkerLoad(pid, active, process_slots, loop_lag, time.time()) for pid, active in enumerate(active_processes)
+    ]
+
+
+def test_bounds():
+    """Test that the number of workers is brought within the bounds, irrespective of the load."""
+    scaler = DaemonAutoscaler(None, min_workers=2, max_workers=4, process_slots=10)
+    assert scaler.decide(1, [], None).target_workers == 2
+    assert scaler.decide(5, get_loads(10, 10, 10, 10, 10), 100).target_workers == 4
+
+    with pytest.raises(ValueError):
+        DaemonAutoscaler(None, min_workers=3, max_workers=2, process_slots=10)
+
+
+def test_scale_up():
+    """Test that a worker is added when tasks are waiting and the workers are busy or their event loop lags."""
+    scaler = DaemonAutoscaler(None, min_workers=1, max_workers=3, process_slots=10)
+
+    decision = scaler.decide(2, get_loads(9, 8), 5)
+    assert decision.target_workers == 3
+    assert decision.utilisation == 0.85
+
+    assert scaler.decide(2, get_loads(2, 2, loop_lag=5.), 5).target_workers == 3
+    assert scaler.decide(2, get_loads(9, 8), 0).target_workers == 2
+    assert scaler.decide(2, get_loads(5, 5), 5).target_workers == 2
+    assert scaler.decide(3, get_loads(10, 10, 10), 5).target_workers == 3
+
+    # Workers are not added if the number of waiting tasks is unknown
+    decision = scaler.decide(2, get_loads(10, 10, loop_lag=5.), None)
+    assert decision.target_workers == 2
+    assert decision.reason == 'the number of waiting tasks is unknown'
+
+
+def test_scale_down():
+    """Test that a worker is only removed after consecutive decisions with a low load and no waiting tasks."""
+    scaler = DaemonAutoscaler(None, min_workers=1, max_workers=3, process_slots=10)
+
+    for _ in range(DaemonAutoscaler.SCALE_DOWN_DECISIONS - 1):
+        assert scaler.decide(2, get_loads(1, 1), 0).target_workers == 2
+
+    # A decision with a high load resets the count
+    assert scaler.decide(2, get_loads(8, 8), 0).target_workers == 2
+
+    for _ in range(DaemonAutoscaler.SCALE_DOWN_DECISIONS - 1):
+        assert scaler.decide(2, get_loads(1, 1), 0).target_workers == 2
+
+    assert scaler.decide(2, get_loads(1, 1), 0).target_workers == 1
+    assert scaler.decide(1, get_loads(0), 0).target_workers == 1
+
+    # Workers are not removed if the number of waiting tasks is unknown
+    for _ in range(DaemonAutoscaler.SCALE_DOWN_DECISIONS):
+        assert scaler.decide(2, get_loads(0, 0), None).target_workers == 2
+
+
+def test_get_worker_loads(tmp_path, monkeypatch):
+    """Test that the reported loads are read and that the reports of workers that are no longer running are removed."""
+    monkeypatch.setattr(autoscaler, 'WORKER_LOAD_EXPIRY', 60.)
+    now = time.time()
+
+    for load in [WorkerLoad(1, 2, 10, 0.1, now), WorkerLoad(2, 0, 10, 0., now - 100)]:
+        with open(tmp_path / f'{load.pid}.json', 'wb') as handle:
+            json.dump(load._asdict(), handle)
+
+    (tmp_path / '3.json').write_text('{"pid": ')
+
+    assert get_worker_loads(str(tmp_path)) == [WorkerLoad(1, 2, 10, 0.1, now)]
+    assert sorted(os.listdir(tmp_path)) == ['1.json', '3.json']
+    assert get_worker_loads(str(tmp_path / 'missing')) == []
+
+
+def test_report_worker_load(tmp_path, monkeypatch):
+    """Test that a worker reports its load and removes the report when it stops."""
+    monkeypatch.setattr(autoscaler, 'WORKER_LOAD_REPORT_INTERVAL', 0.05)
+    monkeypatch.setattr(autoscaler, 'LOOP_LAG_SAMPLE_INTERVAL', 0.01)
+    directory = str(tmp_path / 'worker-load')
+
+    async def run():
+        task = asyncio.ensure_future(autoscaler.report_worker_load(directory, lambda: 3, 10))
+        await asyncio.sleep(0.2)
+        loads = get_worker_loads(directory)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return loads
+
+    loads = asyncio.get_event_loop().run_until_complete(run())
+
+    assert [(load.pid, load.active_processes, load.process_slots) for load in loads] == [(os.getpid(), 3, 10)]
+    assert os.listdir(directory) == []
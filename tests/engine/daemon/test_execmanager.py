@@ -130,6 +130,49 @@ def test_retrieve_files_from_list(
     assert serialize_file_hierarchy(target) == expected_hierarchy
 
 
+# yapf: disable
+@pytest.mark.parametrize('retrieve_list, expected_hierarchy', (
+    (['file_a.txt'], {'file_a.txt': 'file_a'}),
+    (['path/sub/file_c.txt'], {'file_c.txt': 'file_c'}),
+    (['path'], {'path': {'file_b.txt': 'file_b', 'sub': {'file_c.txt': 'file_c', 'file_d.txt': 'file_d'}}}),
+    ([('path/sub/file_c.txt', '.', 3)], {'path': {'sub': {'file_c.txt': 'file_c'}}}),
+    ([('path/sub/file_c.txt', '.', 0)], {'file_c.txt': 'file_c'}),
+    ([('path/sub', '.', 2)], {'path': {'sub': {'file_c.txt': 'file_c', 'file_d.txt': 'file_d'}}}),
+    ([('path/*', '.', 0)], {'file_b.txt': 'file_b', 'sub': {'file_c.txt': 'file_c', 'file_d.txt': 'file_d'}}),
+    ([('path/sub/*c.txt', 'target', 2)], {'target': {'sub': {'file_c.txt': 'file_c'}}}),
+    (['file_a.txt', 'file_u.txt', 'path/file_u.txt', ('path/sub/file_u.txt', '.', 3)], {'file_a.txt': 'file_a'}),
+))
+# yapf: enable
+def test_retrieve_files_from_archive(tmp_path_factory, file_hierarchy, retrieve_list, expected_hierarchy):
+    """Test the `retrieve_files_from_archive` function yields the same result as `retrieve_files_from_list`."""
+    source = tmp_path_factory.mktemp('source')
+    target = tmp_path_factory.mktemp('target')
+
+    create_file_hierarchy(file_hierarchy, source)
+
+    with LocalTransport() as transport:
+        execmanager.retrieve_files_from_archive(transport, [(str(source), retrieve_list, str(target))])
+
+    assert serialize_file_hierarchy(target) == expected_hierarchy
+
+
+def test_retrieve_files_from_archive_multiple(tmp_path_factory, file_hierarchy):
+    """Test the `retrieve_files_from_archive` function for multiple working directories in a single stream."""
+    sources = [tmp_path_factory.mktemp('source') for _ in range(2)]
+    targets = [tmp_path_factory.mktemp('target') for _ in range(2)]
+
+    create_file_hierarchy(file_hierarchy, sources[0])
+    create_file_hierarchy({'file_a.txt': 'other'}, sources[1])
+
+    with LocalTransport() as transport:
+        execmanager.retrieve_files_from_archive(
+            transport, [(str(source), ['file_a.txt'], str(target)) for source, target in zip(sources, targets)]
+        )
+
+    assert serialize_file_hierarchy(targets[0]) == {'file_a.txt': 'file_a'}
+    assert serialize_file_hierarchy(targets[1]) == {'file_a.txt': 'other'}
+
+
 @pytest.mark.usefixtures('clear_database_before_test')
 def test_upload_local_copy_list(fixture_sandbox, aiida_localhost, aiida_local_code_factory):
     """Test the ``local_copy_list`` functionality in ``upload_calculation``.
@@ -163,3 +206,218 @@ def test_upload_local_copy_list(fixture_sandbox, aiida_localhost, aiida_local_co
         execmanager.upload_calculation(node, transport, calc_info, fixture_sandbox)
 
     assert node.list_object_names() == []
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_upload_local_copy_list_unstored(fixture_sandbox, aiida_localhost, aiida_local_code_factory):
+    """Test that the unstored nodes of a dry-run in the ``local_copy_list`` are taken from the inputs."""
+    from aiida.common.datastructures import CalcInfo, CodeInfo
+    from aiida.orm import CalcJobNode, SinglefileData
+
+    inputs = {
+        'file_a': SinglefileData(io.BytesIO(b'content_a')).store(),
+        'nested': {
+            'file_b': SinglefileData(io.BytesIO(b'content_b')),
+        },
+    }
+    file_b = inputs['nested']['file_b']
+
+    node = CalcJobNode(computer=aiida_localhost)
+    node.store()
+
+    code = aiida_local_code_factory('arithmetic.add', '/bin/bash').store()
+    code_info = CodeInfo()
+    code_info.code_uuid = code.uuid
+
+    calc_info = CalcInfo()
+    calc_info.uuid = node.uuid
+    calc_info.codes_info = [code_info]
+    calc_info.local_copy_list = [
+        (inputs['file_a'].uuid, inputs['file_a'].filename, 'file_a'),
+        (file_b.uuid, file_b.filename, 'file_b'),
+    ]
+
+    with LocalTransport() as transport:
+        execmanager.upload_calculation(node, transport, calc_info, fixture_sandbox, inputs=inputs, dry_run=True)
+
+    assert serialize_file_hierarchy(fixture_sandbox.abspath) == {'file_a': 'content_a', 'file_b': 'content_b'}
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.parametrize('cache_mode', ('copy', 'hardlink', 'symlink'))
+def test_upload_local_copy_list_upload_cache(
+    fixture_sandbox, aiida_localhost, aiida_local_code_factory, tmp_path, cache_mode
+):
+    """Test the ``local_copy_list`` functionality in ``upload_calculation`` with the upload cache enabled.
+
+    Verify that each object is uploaded to the cache only once and is placed in the working directory of each
+    calculation, without ending up in the repository of the node.
+    """
+    from aiida.common.datastructures import CalcInfo, CodeInfo
+    from aiida.common.hashing import chunked_file_hash
+    from aiida.orm import CalcJobNode, SinglefileData
+
+    cache_directory = tmp_path / 'cache'
+    single_file = SinglefileData(io.BytesIO(b'content_a')).store()
+    code = aiida_local_code_factory('arithmetic.add', '/bin/bash').store()
+
+    with single_file.open(mode='rb') as handle:
+        digest = chunked_file_hash(handle)
+
+    aiida_localhost.set_upload_cache_directory(str(cache_directory))
+    aiida_localhost.set_upload_cache_mode(cache_mode)
+
+    try:
+        for _ in range(2):
+            node = CalcJobNode(computer=aiida_localhost)
+            node.store()
+
+            code_info = CodeInfo()
+            code_info.code_uuid = code.uuid
+
+            calc_info = CalcInfo()
+            calc_info.uuid = node.uuid
+            calc_info.codes_info = [code_info]
+            calc_info.local_copy_list = [
+                (single_file.uuid, single_file.filename, './files/file_a'),
+                (single_file.uuid, single_file.filename, './files/file_b'),
+            ]
+
+            with LocalTransport() as transport:
+                execmanager.upload_calculation(node, transport, calc_info, fixture_sandbox)
+
+            workdir = pathlib.Path(node.get_remote_workdir())
+            assert node.list_object_names() == []
+            assert (workdir / 'files' / 'file_a').read_bytes() == b'content_a'
+            assert (workdir / 'files' / 'file_b').read_bytes() == b'content_a'
+    finally:
+        aiida_localhost.set_upload_cache_directory(None)
+        aiida_localhost.delete_property(aiida_localhost.PROPERTY_UPLOAD_CACHE_MODE)
+
+    assert (cache_directory / digest).read_bytes() == b'content_a'
+    assert not [path for path in cache_directory.iterdir() if path.name.endswith('.tmp')]
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.parametrize('cache_mode', ('copy', 'hardlink', 'symlink'))
+def test_upload_local_code_upload_cache(fixture_sandbox, aiida_localhost, tmp_path, cache_mode):
+    """Test that the files of a local code are uploaded through the upload cache when enabled.
+
+    The executable should be executable in the working directory and a code file that is overwritten by a file of the
+    sandbox folder should end up with the content of the latter, without modifying the object in the cache.
+    """
+    from aiida.common.datastructures import CalcInfo, CodeInfo
+    from aiida.common.hashing import chunked_file_hash
+    from aiida.orm import CalcJobNode, Code
+
+    cache_directory = tmp_path / 'cache'
+    code_directory = tmp_path / 'code'
+    code_directory.mkdir()
+    (code_directory / 'run.sh').write_text('#!/bin/bash\necho "run"\n')
+    (code_directory / 'defaults.txt').write_text('defaults')
+    (pathlib.Path(fixture_sandbox.abspath) / 'defaults.txt').write_text('overridden')
+
+    code = Code(
+        local_executable='run.sh',
+        files=[str(code_directory / 'run.sh'), str(code_directory / 'defaults.txt')],
+        input_plugin_name='arithmetic.add'
+    ).store()
+
+    with (code_directory / 'defaults.txt').open('rb') as handle:
+        digest = chunked_file_hash(handle)
+
+    node = CalcJobNode(computer=aiida_localhost)
+    node.store()
+
+    code_info = CodeInfo()
+    code_info.code_uuid = code.uuid
+
+    calc_info = CalcInfo()
+    calc_info.uuid = node.uuid
+    calc_info.codes_info = [code_info]
+
+    aiida_localhost.set_upload_cache_directory(str(cache_directory))
+    aiida_localhost.set_upload_cache_mode(cache_mode)
+
+    try:
+        with LocalTransport() as transport:
+            execmanager.upload_calculation(node, transport, calc_info, fixture_sandbox)
+    finally:
+        aiida_localhost.set_upload_cache_directory(None)
+        aiida_localhost.delete_property(aiida_localhost.PROPERTY_UPLOAD_CACHE_MODE)
+
+    workdir = pathlib.Path(node.get_remote_workdir())
+    assert (workdir / 'run.sh').read_text() == '#!/bin/bash\necho "run"\n'
+    assert os.access(workdir / 'run.sh', os.X_OK)
+    assert (workdir / 'defaults.txt').read_text() == 'overridden'
+    assert (cache_directory / digest).read_text() == 'defaults'
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_upload_archive(fixture_sandbox, aiida_localhost, aiida_local_code_factory, file_hierarchy):
+    """Test that ``upload_calculation`` uploads the sandbox folder through an archive when enabled for the computer.
+
+    Files in the ``provenance_exclude_list`` should be uploaded but should not end up in the repository of the node.
+    """
+    from aiida.common.datastructures import CalcInfo, CodeInfo
+    from aiida.orm import CalcJobNode
+
+    create_file_hierarchy(file_hierarchy, pathlib.Path(fixture_sandbox.abspath))
+
+    node = CalcJobNode(computer=aiida_localhost)
+    node.store()
+
+    code = aiida_local_code_factory('arithmetic.add', '/bin/bash').store()
+    code_info = CodeInfo()
+    code_info.code_uuid = code.uuid
+
+    calc_info = CalcInfo()
+    calc_info.uuid = node.uuid
+    calc_info.codes_info = [code_info]
+    calc_info.provenance_exclude_list = ['file_a.txt']
+
+    aiida_localhost.set_use_archive_upload(True)
+
+    try:
+        with LocalTransport() as transport:
+            execmanager.upload_calculation(node, transport, calc_info, fixture_sandbox)
+    finally:
+        aiida_localhost.delete_property(aiida_localhost.PROPERTY_USE_ARCHIVE_UPLOAD)
+
+    assert serialize_file_hierarchy(pathlib.Path(node.get_remote_workdir())) == file_hierarchy
+    assert sorted(node.list_object_names()) == ['path']
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_kill_calculations(aiida_localhost, monkeypatch):
+    """Test that only the jobs whose kill reported a failure are checked, and that exceptions are not swallowed."""
+    from aiida.common import exceptions
+    from aiida.orm import CalcJobNode
+    from aiida.schedulers.datastructures import JobInfo, JobState
+    from aiida.schedulers.plugins.direct import DirectScheduler
+
+    calculations = []
+    for job_id in ('1', '2', '3', '4'):
+        calculation = CalcJobNode(computer=aiida_localhost)
+        calculation.set_job_id(job_id)
+        calculations.append(calculation.store())
+
+    error = RuntimeError('kill command could not be parsed')
+    queried = []
+
+    def get_jobs(self, jobs=None, as_dict=False):  # pylint: disable=unused-argument
+        queried.extend(jobs)
+        job_info = JobInfo()
+        job_info.job_id = '4'
+        job_info.job_state = JobState.RUNNING
+        return {'4': job_info}
+
+    monkeypatch.setattr(DirectScheduler, 'kill_batch', lambda self, jobids: [True, False, error, False])
+    monkeypatch.setattr(DirectScheduler, 'get_jobs', get_jobs)
+
+    with LocalTransport() as transport:
+        results = execmanager.kill_calculations(calculations, transport)
+
+    assert queried == ['2', '4']
+    assert results[:3] == [True, True, error]
+    assert isinstance(results[3], exceptions.RemoteOperationError)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the `aiida.engine.daemon.metrics` module."""
+import asyncio
+import os
+import urllib.request
+
+import pytest
+
+from aiida.common import json
+from aiida.engine.daemon import metrics
+from aiida.engine.daemon.metrics import MetricsRegistry, RollingHistogram, get_worker_metrics
+
+
+def test_rolling_histogram():
+    """Test the summary of the rolling window and the totals of a `RollingHistogram`."""
+    histogram = RollingHistogram(buckets=(0.1, 1., float('inf')), window=100., slots=10)
+
+    for value in [0.05] * 8 + [0.5, 20.]:
+        histogram.observe(value, now=1000.)
+
+    summary = histogram.get_summary(now=1000.)
+    assert summary['count'] == 10
+    assert summary['mean'] == pytest.approx(2.09)
+    assert summary['p50'] == 0.1
+    assert summary['p95'] == 20.
+    assert summary['max'] == 20.
+
+    histogram.observe(0.5, now=1095.)
+    assert histogram.get_summary(now=1095.)['count'] == 11
+
+    # The values that are older than the window are discarded from the summary, but not from the totals
+    summary = histogram.get_summary(now=1105.)
+    assert summary['count'] == 1
+    assert summary['p50'] == summary['max'] == 0.5
+    assert histogram.get_totals() == ([(0.1, 8), (1., 10), (float('inf'), 11)], pytest.approx(21.4), 11)
+
+    assert histogram.get_summary(now=1200.)['count'] == 0
+
+
+def test_timed(monkeypatch):
+    """Test that `timed` records the duration of calls of both functions and coroutine functions."""
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, 'METRICS_REGISTRY', registry)
+
+    @metrics.timed('aiida_parser_seconds', parser='sync')
+    def function():
+        return 1
+
+    @metrics.timed('aiida_parser_seconds', parser='async')
+    async def coroutine():
+        await asyncio.sleep(0.01)
+        return 2
+
+    assert function() == 1
+    assert asyncio.get_event_loop().run_until_complete(coroutine()) == 2
+
+    summary = {metric['labels']['parser']: metric for metric in registry.get_summary()}
+    assert summary['sync']['count'] == summary['async']['count'] == 1
+    assert summary['async']['max'] >= 0.01
+
+
+def test_database_query_error(monkeypatch):
+    """Test that the start of a failed query is discarded and not taken for the start of the next query."""
+    from sqlalchemy import create_engine, event, exc
+
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, 'METRICS_REGISTRY', registry)
+
+    engine = create_engine('sqlite://')
+    event.listen(engine, 'before_cursor_execute', metrics._before_cursor_execute)  # pylint: disable=protected-access
+    event.listen(engine, 'after_cursor_execute', metrics._after_cursor_execute)  # pylint: disable=protected-access
+    event.listen(engine, 'handle_error', metrics._handle_error)  # pylint: disable=protected-access
+
+    with engine.connect() as connection:
+        with pytest.raises(exc.OperationalError):
+            connection.execute('SELECT * FROM missing')
+        assert not connection.info.get('aiida_query_start')
+
+        connection.execute('SELECT 1')
+        assert not connection.info['aiida_query_start']
+
+    [summary] = registry.get_summary()
+    assert summary['count'] == 1
+
+
+def test_render_prometheus():
+    """Test the Prometheus text format of the metrics."""
+    registry = MetricsRegistry()
+    registry.observe('aiida_calcjob_task_seconds', 0.2, task='upload')
+    registry.observe('aiida_calcjob_task_seconds', 2., task='submit')
+
+    lines = registry.render_prometheus(pid='1').splitlines()
+
+    assert lines.count('# TYPE aiida_calcjob_task_seconds histogram') == 1
+    assert 'aiida_calcjob_task_seconds_bucket{le="0.25",pid="1",task="upload"} 1' in lines
+    assert 'aiida_calcjob_task_seconds_bucket{le="+Inf",pid="1",task="submit"} 1' in lines
+    assert 'aiida_calcjob_task_seconds_count{pid="1",task="submit"} 1' in lines
+
+
+def test_metrics_server(monkeypatch):
+    """Test that the metrics are served over HTTP."""
+    registry = MetricsRegistry()
+    registry.observe('aiida_db_query_seconds', 0.001)
+    monkeypatch.setattr(metrics, 'METRICS_REGISTRY', registry)
+
+    url = metrics.start_metrics_server(19100)
+    assert url is not None
+
+    # A second server uses the next free port
+    assert metrics.start_metrics_server(19100) != url
+
+    with urllib.request.urlopen(url) as response:
+        body = response.read().decode('utf8')
+
+    assert f'aiida_db_query_seconds_count{{pid="{os.getpid()}"}} 1' in body.splitlines()
+
+
+def test_get_worker_metrics(tmp_path):
+    """Test that the reports of workers that are no longer running are removed."""
+    for pid in [os.getpid(), 2**22 + 1]:
+        with open(tmp_path / f'{pid}.json', 'wb') as handle:
+            json.dump({'pid': pid, 'timestamp': 0., 'url': None, 'metrics': []}, handle)
+
+    assert [report['pid'] for report in get_worker_metrics(str(tmp_path))] == [os.getpid()]
+    assert os.listdir(tmp_path) == [f'{os.getpid()}.json']
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the `aiida.engine.daemon.slots` module."""
+import asyncio
+
+from aiida.engine.daemon.slots import ProcessSlots, SlotRequest
+
+
+def run(coroutine):
+    """Run the coroutine in the event loop until it is complete."""
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+async def settle():
+    """Give the event loop the chance to run the tasks that are ready."""
+    await asyncio.sleep(0.01)
+
+
+async def start(slots, *requests):
+    """Request a slot for each request and return the tasks, after giving the event loop the chance to run them."""
+    tasks = [asyncio.ensure_future(slots.acquire(request)) for request in requests]
+    await settle()
+    return tasks
+
+
+def test_priority():
+    """Test that a released slot is allocated to the waiting request with the highest priority."""
+
+    async def test():
+        slots = ProcessSlots(num_slots=1)
+        first, low, high = SlotRequest(1), SlotRequest(2, priority=0), SlotRequest(3, priority=5)
+        tasks = await start(slots, first, low, high)
+
+        assert [task.done() for task in tasks] == [True, False, False]
+        assert slots.num_waiting == 2
+
+        slots.release(first)
+        await settle()
+        assert [task.done() for task in tasks] == [True, False, True]
+
+        slots.release(high)
+        await settle()
+        assert all(task.result() for task in tasks)
+
+    run(test())
+
+
+def test_fair_share():
+    """Test that among requests with the same priority, the user and then share group with fewest processes go first."""
+
+    async def test():
+        slots = ProcessSlots(num_slots=3)
+        running = [SlotRequest(1, user='a', share_group='x'), SlotRequest(2, user='a'), SlotRequest(3, user='b')]
+        waiting = [SlotRequest(4, user='a'), SlotRequest(5, user='a', share_group='x'), SlotRequest(6, user='b')]
+        await start(slots, *running)
+        tasks = await start(slots, *waiting)
+
+        # User `b` has fewer running processes than user `a`
+        slots.release(running[2])
+        await settle()
+        assert [task.done() for task in tasks] == [False, False, True]
+
+        # Both users have one running process, and the share group `x` of user `a` already has one
+        slots.release(running[1])
+        await settle()
+        assert [task.done() for task in tasks] == [True, False, True]
+
+        tasks[1].cancel()
+        await settle()
+
+    run(test())
+
+
+def test_reserved_slots():
+    """Test that workflows cannot occupy the reserved slots and are rejected if too many of them are waiting."""
+
+    async def test():
+        slots = ProcessSlots(num_slots=3, reserved_slots=2, max_waiting_workflows=1)
+        slots.REJECT_DELAY = 0.01
+        workflows = [SlotRequest(pid, workflow=True) for pid in range(3)]
+        tasks = await start(slots, *workflows)
+
+        assert [task.done() for task in tasks] == [True, False, False]
+
+        # The reserved slots are still available for processes that are not workflows
+        calculations = await start(slots, SlotRequest(3), SlotRequest(4))
+        assert all(task.result() for task in calculations)
+
+        # The last workflow is rejected, since one workflow is already waiting
+        await asyncio.sleep(0.05)
+        assert tasks[2].result() is False
+        assert not tasks[1].done()
+
+        slots.release(workflows[0])
+        await settle()
+        assert tasks[1].result() is True
+
+    run(test())
+
+
+def test_reject_backoff():
+    """Test that the delay before a workflow is rejected doubles with consecutive rejections until one gets a slot."""
+
+    async def test():
+        slots = ProcessSlots(num_slots=1, max_waiting_workflows=0)
+        slots.REJECT_DELAY = 0.01
+        slots.MAX_REJECT_DELAY = 0.03
+        first = SlotRequest(0, workflow=True)
+        await start(slots, first)
+
+        for expected in [0.01, 0.02, 0.03, 0.03]:
+            assert slots.reject_delay == expected
+            assert await slots.acquire(SlotRequest(1, workflow=True)) is False
+
+        slots.release(first)
+        assert await slots.acquire(SlotRequest(1, workflow=True)) is True
+        assert slots.reject_delay == 0.01
+
+    run(test())
+
+
+def test_cancelled():
+    """Test that a request that is cancelled while waiting no longer waits for a slot."""
+
+    async def test():
+        slots = ProcessSlots(num_slots=1)
+        first, second, third = SlotRequest(1), SlotRequest(2), SlotRequest(3)
+        tasks = await start(slots, first, second, third)
+
+        tasks[1].cancel()
+        await settle()
+        assert slots.num_waiting == 1
+
+        slots.release(first)
+        await settle()
+        assert tasks[2].result() is True
+        assert slots.num_running == 1
+
+    run(test())
@@ -9,11 +9,14 @@
 ###########################################################################
 """Tests for the classes in `aiida.engine.processes.calcjobs.manager`."""
 
+import os
 import time
 import asyncio
+from unittest import mock
 
-from aiida.orm import AuthInfo, User
+from aiida.orm import AuthInfo, Computer, User
 from aiida.backends.testbase import AiidaTestCase
+from aiida.engine.daemon import execmanager
 from aiida.engine.processes.calcjobs.manager import JobManager, JobsList
 from aiida.engine.transports import TransportQueue
 
@@ -75,3 +78,127 @@ class TestJobsList(AiidaTestCase):
         last_updated = time.time()
         jobs_list = JobsList(self.auth_info, self.transport_queue, last_updated=last_updated)
         self.assertEqual(jobs_list.last_updated, last_updated)
+
+    def test_job_status_cache(self):
+        """Test that the status of the jobs is retrieved through the job status cache that is shared between lists."""
+        import tempfile
+        from aiida.engine.processes.calcjobs.status_cache import JobStatusCache
+
+        queries = []
+
+        async def query_scheduler(jobs, previous, last_full_update):  # pylint: disable=unused-argument
+            queries.append(jobs)
+            return {}, None
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            cache = JobStatusCache(os.path.join(dirpath, 'job-status.sqlite'))
+            jobs_lists = [JobsList(self.auth_info, self.transport_queue, job_status_cache=cache) for _ in range(2)]
+
+            for jobs_list in jobs_lists:
+                jobs_list._job_update_requests = {'1': asyncio.Future()}  # pylint: disable=protected-access
+                with mock.patch.object(jobs_list, '_query_scheduler', query_scheduler):
+                    self.loop.run_until_complete(jobs_list._get_jobs_from_scheduler())  # pylint: disable=protected-access
+
+        self.assertEqual(queries, [['1']])
+        self.assertEqual(jobs_lists[0].last_updated, jobs_lists[1].last_updated)
+
+    def test_job_status_cache_full_update(self):
+        """Test that the time of the last full query of the scheduler is shared between lists through the cache."""
+        import contextlib
+        import tempfile
+        from aiida.engine.processes.calcjobs.status_cache import JobStatusCache
+        from aiida.schedulers.datastructures import JobInfo, JobState, JobStateInfo
+
+        job_info = JobInfo()
+        job_info.job_id = '1'
+        job_info.job_state = JobState.QUEUED
+
+        scheduler = mock.Mock()
+        scheduler.get_feature.side_effect = lambda feature: feature == 'can_query_delta'
+        scheduler.get_jobs.return_value = {'1': JobStateInfo.from_job_info(job_info)}
+
+        @contextlib.contextmanager
+        def request_transport(authinfo):  # pylint: disable=unused-argument
+            future = asyncio.Future()
+            future.set_result(None)
+            yield future
+
+        with tempfile.TemporaryDirectory() as dirpath:
+            cache = JobStatusCache(os.path.join(dirpath, 'job-status.sqlite'))
+            jobs_lists = [JobsList(self.auth_info, self.transport_queue, job_status_cache=cache) for _ in range(2)]
+
+            with mock.patch.object(self.transport_queue, 'request_transport', request_transport), \
+                mock.patch.object(Computer, 'get_scheduler', return_value=scheduler), \
+                mock.patch.object(Computer, 'get_minimum_job_poll_interval', return_value=0):
+                for jobs_list in jobs_lists:
+                    jobs_list._job_update_requests = {'1': asyncio.Future()}  # pylint: disable=protected-access
+                    self.loop.run_until_complete(jobs_list._get_jobs_from_scheduler())  # pylint: disable=protected-access
+
+        # The second list uses a delta query, since the first list queried all jobs
+        self.assertEqual([call[1]['delta'] for call in scheduler.get_jobs.call_args_list], [False, True])
+
+    def test_merge_jobs_delta(self):
+        """Test that queued jobs that are missing from a delta query are kept and the other missing jobs are dropped."""
+        from aiida.schedulers.datastructures import JobInfo, JobState
+
+        def get_job_info(job_id, job_state):
+            job_info = JobInfo()
+            job_info.job_id = job_id
+            job_info.job_state = job_state
+            return job_info
+
+        previous = {
+            '1': get_job_info('1', JobState.QUEUED),
+            '2': get_job_info('2', JobState.QUEUED_HELD),
+            '3': get_job_info('3', JobState.RUNNING),
+            '4': get_job_info('4', JobState.QUEUED),
+        }
+        delta = {'4': get_job_info('4', JobState.RUNNING)}
+
+        merged = JobsList._merge_jobs_delta(previous, delta)  # pylint: disable=protected-access
+        self.assertEqual(sorted(merged), ['1', '2', '4'])
+        self.assertEqual(merged['4'].job_state, JobState.RUNNING)
+
+    def test_update_job_info_changed_state(self):
+        """Test that update requests are only resolved once the state of their job has changed."""
+        from aiida.schedulers.datastructures import JobInfo, JobState, JobStateInfo
+
+        job_states = [JobState.QUEUED, JobState.QUEUED, JobState.RUNNING]
+
+        async def get_jobs_from_scheduler():
+            job_info = JobInfo()
+            job_info.job_id = '1'
+            job_info.job_state = job_states.pop(0)
+            return {'1': JobStateInfo.from_job_info(job_info)}
+
+        request = asyncio.Future()
+        self.jobs_list._job_update_requests = {'1': request}  # pylint: disable=protected-access
+        resolved = []
+
+        with mock.patch.object(self.jobs_list, '_get_jobs_from_scheduler', get_jobs_from_scheduler):
+            for _ in range(3):
+                self.loop.run_until_complete(self.jobs_list._update_job_info())  # pylint: disable=protected-access
+                resolved.append(request.result().job_state if request.done() else None)
+
+                if request.done():
+                    request = asyncio.Future()
+                    self.jobs_list._job_update_requests['1'] = request  # pylint: disable=protected-access
+
+        self.assertEqual(resolved, [JobState.QUEUED, None, JobState.RUNNING])
+
+    def test_request_job_submission(self):
+        """Test that the submissions requested before the transport is available are executed as a single batch."""
+        batches = []
+
+        def submit_calculations(calculations, transport):  # pylint: disable=unused-argument
+            batches.append(calculations)
+            return [f'job_{node}' if node != 'failing' else ValueError(node) for node in calculations]
+
+        with mock.patch.object(execmanager, 'submit_calculations', submit_calculations):
+            with self.jobs_list.request_job_submission('node_a') as request_a:
+                with self.jobs_list.request_job_submission('failing') as request_b:
+                    self.loop.run_until_complete(asyncio.wait([request_a, request_b]))
+
+        self.assertEqual(batches, [['node_a', 'failing']])
+        self.assertEqual(request_a.result(), 'job_node_a')
+        self.assertIsInstance(request_b.exception(), ValueError)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=redefined-outer-name
+"""Tests for the `aiida.engine.processes.calcjobs.status_cache` module."""
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from aiida.engine.processes.calcjobs.status_cache import JobStatusCache
+from aiida.schedulers.datastructures import JobInfo, JobState, JobStateInfo
+
+
+class MockScheduler:
+    """Mock of the query of the scheduler, that records the queried job ids."""
+
+    def __init__(self):
+        self.queries = []
+        self.parsed = []
+        self.full_updates = []
+
+    async def query(self, jobs, previous=None, last_full_update=None):  # pylint: disable=unused-argument
+        """Return a `JobStateInfo` in the running state for all jobs except those whose id starts with `done`.
+
+        The time of the last full update that is passed is recorded and returned if set, otherwise the current time.
+        """
+        self.queries.append(jobs)
+        self.full_updates.append(last_full_update)
+        response = {}
+        for job_id in jobs:
+            if not job_id.startswith('done'):
+                raw = f'{job_id} R'
+                response[job_id] = JobStateInfo(
+                    job_id, JobState.RUNNING, parse=lambda raw=raw: self.parse(raw), raw=raw
+                )
+        return response, last_full_update if last_full_update is not None else time.time()
+
+    def parse(self, raw):
+        """Return the `JobInfo` of a job from its line in the output of the scheduler."""
+        self.parsed.append(raw)
+        job_info = JobInfo()
+        job_info.job_id, _ = raw.split()
+        job_info.job_state = JobState.RUNNING
+        return job_info
+
+
+@pytest.fixture
+def filepath(tmp_path):
+    """Return the path to the database of a job status cache."""
+    return str(tmp_path / 'job-status.sqlite')
+
+
+def get_jobs(cache, scheduler, job_ids, minimum_interval=60., authinfo_id=1):
+    """Call `JobStatusCache.get_jobs` and return the job status response."""
+    coroutine = cache.get_jobs(authinfo_id, job_ids, minimum_interval, scheduler.query, scheduler.parse)
+    _, response = asyncio.get_event_loop().run_until_complete(coroutine)
+    return response
+
+
+def test_shared_status(filepath):
+    """Test that the status is only queried once per interval for the jobs registered by all caches."""
+    scheduler = MockScheduler()
+    worker_one = JobStatusCache(filepath)
+    worker_two = JobStatusCache(filepath)
+
+    worker_two._register_requests(1, ['2'])  # pylint: disable=protected-access
+    response = get_jobs(worker_one, scheduler, ['1'])
+    assert scheduler.queries == [['1', '2']]
+    assert response['1'].job_state == JobState.RUNNING
+
+    # The second worker registered its job before the query, so it uses the stored status
+    response = get_jobs(worker_two, scheduler, ['2'])
+    assert scheduler.queries == [['1', '2']]
+    assert response['2'].job_state == JobState.RUNNING
+
+    # Each authinfo has its own status
+    get_jobs(worker_two, scheduler, ['2'], authinfo_id=2)
+    assert scheduler.queries == [['1', '2'], ['2']]
+
+
+def test_unregistered_job(filepath, monkeypatch):
+    """Test that a job that was not registered at the time of the last query waits for the next query."""
+    monkeypatch.setattr(JobStatusCache, '_RETRY_INTERVAL', 0.01)
+    scheduler = MockScheduler()
+    cache = JobStatusCache(filepath)
+
+    get_jobs(cache, scheduler, ['1'], minimum_interval=0.2)
+    response = get_jobs(cache, scheduler, ['3'], minimum_interval=0.2)
+    assert scheduler.queries == [['1'], ['1', '3']]
+    assert '3' in response
+
+
+def test_finished_jobs_unregistered(filepath):
+    """Test that jobs that are no longer with the scheduler are no longer queried."""
+    scheduler = MockScheduler()
+    cache = JobStatusCache(filepath)
+
+    response = get_jobs(cache, scheduler, ['1', 'done'], minimum_interval=0)
+    assert 'done' not in response
+
+    get_jobs(cache, scheduler, ['1'], minimum_interval=0)
+    assert scheduler.queries == [['1', 'done'], ['1']]
+
+
+def test_shared_full_update(filepath):
+    """Test that the time of the last full update returned by a query is passed to the next query of any cache."""
+    scheduler = MockScheduler()
+    worker_one = JobStatusCache(filepath)
+    worker_two = JobStatusCache(filepath)
+
+    get_jobs(worker_one, scheduler, ['1'], minimum_interval=0)
+    get_jobs(worker_two, scheduler, ['1'], minimum_interval=0)
+    assert scheduler.full_updates[0] is None
+    assert scheduler.full_updates[1] is not None
+
+
+def test_missing_full_update_column(filepath):
+    """Test that the column of the time of the last full update is added to a database created without it."""
+    connection = sqlite3.connect(filepath)
+    connection.execute(
+        'CREATE TABLE status '
+        '(authinfo_id INTEGER PRIMARY KEY, last_updated REAL, polling_until REAL, jobs TEXT, response TEXT)'
+    )
+    connection.close()
+
+    scheduler = MockScheduler()
+    cache = JobStatusCache(filepath)
+    get_jobs(cache, scheduler, ['1'], minimum_interval=0)
+    get_jobs(cache, scheduler, ['1'], minimum_interval=0)
+    assert scheduler.full_updates[1] is not None
+
+
+def test_lazy_job_info(filepath):
+    """Test that only the raw output of the scheduler is stored and that the `JobInfo` is parsed when requested."""
+    scheduler = MockScheduler()
+    worker_one = JobStatusCache(filepath)
+    worker_two = JobStatusCache(filepath)
+
+    get_jobs(worker_one, scheduler, ['1'])
+    response = get_jobs(worker_two, scheduler, ['1'])
+    assert len(scheduler.queries) == 1
+    assert response['1'].job_state == JobState.RUNNING
+    assert response['1'].raw == '1 R'
+    assert not scheduler.parsed
+
+    assert response['1'].get_job_info().job_id == '1'
+    assert scheduler.parsed == ['1 R']
+
+
+def test_full_job_info(filepath):
+    """Test that the full `JobInfo` is stored for scheduler plugins that do not set the raw output of a job."""
+    scheduler = MockScheduler()
+    worker_one = JobStatusCache(filepath)
+    worker_two = JobStatusCache(filepath)
+
+    async def query(jobs, previous, last_full_update):  # pylint: disable=unused-argument
+        job_info = JobInfo()
+        job_info.job_id = '1'
+        job_info.job_state = JobState.QUEUED
+        job_info.title = 'job'
+        return {'1': JobStateInfo.from_job_info(job_info)}, None
+
+    asyncio.get_event_loop().run_until_complete(worker_one.get_jobs(1, ['1'], 60., query, scheduler.parse))
+    response = get_jobs(worker_two, scheduler, ['1'])
+    assert not scheduler.queries
+    assert response['1'].job_state == JobState.QUEUED
+    assert response['1'].get_job_info().title == 'job'
+    assert not scheduler.parsed
+
+
+def test_query_failure(filepath):
+    """Test that the claim to query the scheduler is released if the query fails."""
+    scheduler = MockScheduler()
+    cache = JobStatusCache(filepath)
+
+    async def query(jobs, previous, last_full_update):  # pylint: disable=unused-argument
+        raise RuntimeError(f'failed to query {jobs}')
+
+    with pytest.raises(RuntimeError):
+        asyncio.get_event_loop().run_until_complete(cache.get_jobs(1, ['1'], 60., query, scheduler.parse))
+
+    get_jobs(cache, scheduler, ['1'])
+    assert scheduler.queries == [['1']]
+
+
+def test_locked_database(filepath):
+    """Test that waiting for a lock on the database held by another process does not block the event loop."""
+    scheduler = MockScheduler()
+    cache = JobStatusCache(filepath)
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        ticker = asyncio.ensure_future(tick())
+        try:
+            return await cache.get_jobs(1, ['1'], 60., scheduler.query, scheduler.parse)
+        finally:
+            ticker.cancel()
+
+    with cache._transaction():  # pylint: disable=protected-access
+        loop = asyncio.get_event_loop()
+        task = asyncio.ensure_future(main())
+        loop.run_until_complete(asyncio.sleep(0.2))
+        # The event loop kept running while the cache waited for the lock
+        assert not task.done()
+        assert len(ticks) > 5
+
+    _, response = loop.run_until_complete(task)
+    assert '1' in response
@@ -15,8 +15,9 @@ import pytest
 
 from aiida import orm
 from aiida.backends.testbase import AiidaTestCase
-from aiida.engine import calcfunction, workfunction
-from aiida.engine.utils import exponential_backoff_retry, is_process_function, \
+from aiida.common.exceptions import NotExistent
+from aiida.engine import calcfunction, workfunction, ProcessState
+from aiida.engine.utils import exponential_backoff_retry, is_process_function, is_process_terminated, \
         InterruptableFuture, interruptable_task
 
 ITERATION = 0
@@ -89,6 +90,22 @@ class TestUtils(AiidaTestCase):
         self.assertEqual(is_process_function(calc_function), True)
         self.assertEqual(is_process_function(work_function), True)
 
+    def test_is_process_terminated(self):
+        """Test the `is_process_terminated` utility."""
+        loop = asyncio.get_event_loop()
+
+        node = orm.CalculationNode()
+        node.set_process_state(ProcessState.RUNNING)
+        node.store()
+        self.assertEqual(loop.run_until_complete(is_process_terminated(node.pk)), False)
+
+        node.set_process_state(ProcessState.FINISHED)
+        self.assertEqual(loop.run_until_complete(is_process_terminated(node.pk)), True)
+
+        data = orm.Data().store()
+        with self.assertRaises(NotExistent):
+            loop.run_until_complete(is_process_terminated(data.pk))
+
     def test_is_process_scoped(self):
         pass
 
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=redefined-outer-name
+"""Tests for the materialized provenance closure table in :mod:`aiida.manage.database.closure`."""
+import pytest
+
+from aiida import orm
+from aiida.common.links import LinkType
+from aiida.manage.database.closure import (
+    PROVENANCE_CLOSURE_TABLE, SQL_DROP, build_provenance_closure, drop_provenance_closure, has_provenance_closure,
+    reset_provenance_closure_cache
+)
+from aiida.tools import delete_nodes
+
+
+def create_calculation(inputs, outputs):
+    """Create a stored calculation with the given inputs and outputs and return it."""
+    calculation = orm.CalculationNode()
+    for index, node in enumerate(inputs):
+        calculation.add_incoming(node, link_type=LinkType.INPUT_CALC, link_label=f'input_{index}')
+    calculation.store()
+
+    for index, node in enumerate(outputs):
+        node.add_incoming(calculation, link_type=LinkType.CREATE, link_label=f'output_{index}')
+        node.store()
+
+    return calculation
+
+
+@pytest.fixture
+def backend(clear_database_before_test, manager):
+    """Return the backend and make sure that the closure table is dropped after the test."""
+    backend = manager.get_backend()
+    yield backend
+    drop_provenance_closure(backend)
+
+
+@pytest.fixture
+def graph():
+    """Create a provenance graph with two paths of different length between the first and the last data node.
+
+    The graph is ``data_a -> calc_a -> data_b -> calc_b -> data_c`` with an additional ``data_a -> calc_b`` link.
+    """
+    data_a = orm.Data().store()
+    data_b = orm.Data()
+    data_c = orm.Data()
+    calc_a = create_calculation([data_a], [data_b])
+    calc_b = create_calculation([data_a, data_b], [data_c])
+
+    return {'data_a': data_a, 'data_b': data_b, 'data_c': data_c, 'calc_a': calc_a, 'calc_b': calc_b}
+
+
+def get_descendants(node):
+    """Return the descendants of the given node as a sorted list of tuples of their pk and the shortest depth.
+
+    The query uses the closure table, if it exists, since it returns a single row for each pair of nodes. In that case,
+    the rows of the table itself are checked to be the same.
+    """
+    from sqlalchemy.sql import text
+
+    builder = orm.QueryBuilder().append(orm.Node, filters={'id': node.pk}, tag='node')
+    builder.append(orm.Node, with_ancestors='node', project='id', edge_project='depth', distinct_paths=False)
+    descendants = sorted(tuple(row) for row in builder.all())
+
+    backend = node.backend
+    if has_provenance_closure(backend):
+        query = text(f'SELECT descendant_id, depth FROM {PROVENANCE_CLOSURE_TABLE} WHERE ancestor_id = :pk')
+        assert sorted(tuple(row) for row in backend.get_session().execute(query, {'pk': node.pk})) == descendants
+
+    return descendants
+
+
+def test_build_and_drop(backend, graph):
+    """Test building and dropping the closure table."""
+    assert not has_provenance_closure(backend)
+    assert build_provenance_closure(backend) == 10
+    assert has_provenance_closure(backend)
+
+    # Building it again should simply replace the existing table
+    assert build_provenance_closure(backend) == 10
+
+    drop_provenance_closure(backend)
+    assert not has_provenance_closure(backend)
+
+
+def test_has_provenance_closure_cache(backend):
+    """Test that whether the closure table exists is cached until the cache is reset."""
+    from sqlalchemy.sql import text
+
+    build_provenance_closure(backend)
+    assert has_provenance_closure(backend)
+
+    # Dropping the table behind the back of the module, as another process would, is only seen after a reset
+    session = backend.get_session()
+    session.execute(text(SQL_DROP))
+    session.commit()
+    assert has_provenance_closure(backend)
+
+    reset_provenance_closure_cache()
+    assert not has_provenance_closure(backend)
+
+
+def test_querybuilder(backend, graph):
+    """Test that the results of the `QueryBuilder` are the same with and without the closure table."""
+    data_a, data_c = graph['data_a'], graph['data_c']
+
+    def get_results():
+        """Return the results of a number of queries of ancestors and descendants."""
+        results = []
+
+        for kwargs in [{}, {'distinct_paths': False}, {'distinct_paths': False, 'max_depth': 1}]:
+            builder = orm.QueryBuilder().append(orm.Node, filters={'id': data_a.pk}, tag='node')
+            builder.append(orm.Node, with_ancestors='node', project='id', edge_project='depth', **kwargs)
+            results.append(sorted(tuple(row) for row in builder.all()))
+
+            builder = orm.QueryBuilder().append(orm.Node, filters={'id': data_c.pk}, tag='node')
+            builder.append(orm.Node, with_descendants='node', project='id', edge_filters={'depth': {'>': 1}}, **kwargs)
+            results.append(sorted(builder.all(flat=True)))
+
+        builder = orm.QueryBuilder().append(orm.Node, filters={'id': data_a.pk}, tag='node')
+        builder.append(orm.Node, filters={'id': data_c.pk}, with_ancestors='node', edge_project='path')
+        results.append(sorted(builder.all(flat=True)))
+
+        return results
+
+    expected = get_results()
+
+    # The default query returns a row for each of the two paths to `calc_b` and `data_c`, which the table does not have
+    assert len(expected[0]) == 6
+    assert len(expected[2]) == 4
+
+    build_provenance_closure(backend)
+    assert get_results() == expected
+
+
+def test_insert_link(backend, graph):
+    """Test that the closure table is updated when new links are stored."""
+    data_a, data_b, data_c = graph['data_a'], graph['data_b'], graph['data_c']
+    calc_a, calc_b = graph['calc_a'], graph['calc_b']
+
+    build_provenance_closure(backend)
+
+    data_d = orm.Data()
+    calc_c = create_calculation([data_c], [data_d])
+
+    expected = [(calc_b.pk, 0), (data_c.pk, 1), (calc_c.pk, 2), (data_d.pk, 3)]
+    assert get_descendants(data_b) == sorted(expected)
+    assert get_descendants(data_a) == sorted(expected + [(calc_a.pk, 0), (data_b.pk, 1)])
+
+
+def test_delete_nodes(backend, graph):
+    """Test that the closure table is updated when nodes are deleted."""
+    data_a, data_b, data_c = graph['data_a'], graph['data_b'], graph['data_c']
+    calc_a, calc_b = graph['calc_a'], graph['calc_b']
+
+    build_provenance_closure(backend)
+
+    # Deleting `calc_a` but keeping its output `data_b` disconnects `data_a` from `data_b`
+    delete_nodes([calc_a.pk], dry_run=False, create_forward=False)
+    assert has_provenance_closure(backend)
+    assert get_descendants(data_a) == sorted([(calc_b.pk, 0), (data_c.pk, 1)])
+    assert get_descendants(data_b) == sorted([(calc_b.pk, 0), (data_c.pk, 1)])
+
+    # Deleting `data_c` also deletes its creator `calc_b`, which does not affect any other pair
+    delete_nodes([data_c.pk], dry_run=False)
+    assert get_descendants(data_a) == []
+    assert get_descendants(data_b) == []
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=redefined-outer-name
+"""Tests for the database executor in :mod:`aiida.manage.database.executor`."""
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import inspect
+
+from aiida import orm
+from aiida.manage.database.executor import DatabaseExecutor
+
+
+@pytest.fixture
+def executor(clear_database_before_test, manager):
+    """Return a database executor with two threads."""
+    executor = DatabaseExecutor(manager.get_backend(), max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_run(executor, manager):
+    """Test that the function is called in a thread of the pool, which uses a session of its own."""
+    loop = asyncio.get_event_loop()
+
+    def function(value):
+        session = manager.get_backend().get_session()
+        return value, session.execute('SELECT 1').scalar(), session, threading.current_thread()
+
+    value, result, session, thread = loop.run_until_complete(executor.run(function, 'value'))
+
+    assert value == 'value'
+    assert result == 1
+    assert session is not manager.get_backend().get_session()
+    assert thread is not threading.current_thread()
+
+
+def test_run_exception(executor):
+    """Test that an exception raised by the function is raised by `run`."""
+    loop = asyncio.get_event_loop()
+
+    def function():
+        raise ValueError('invalid')
+
+    with pytest.raises(ValueError, match='invalid'):
+        loop.run_until_complete(executor.run(function))
+
+
+def test_attach(executor):
+    """Test that the database model instances loaded in a thread of the pool can be attached to this session."""
+    loop = asyncio.get_event_loop()
+    node = orm.Data().store()
+
+    def function():
+        return orm.QueryBuilder().append(orm.Data, filters={'id': node.pk}).get_query().one()
+
+    # The session of the thread is closed after the call, so the loaded instance is detached
+    dbmodel = loop.run_until_complete(executor.run(function))
+    assert inspect(dbmodel).detached
+
+    # Since the instance of the node is already in the session of this thread, that instance is returned
+    assert executor.attach(dbmodel) is node.backend_entity.dbmodel
+    assert executor.attach(node.pk) == node.pk
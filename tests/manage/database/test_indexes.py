@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=redefined-outer-name
+"""Tests for the indexes on attributes and extras in :mod:`aiida.manage.database.indexes`."""
+import pytest
+from sqlalchemy import event, text
+
+from aiida import orm
+from aiida.common import exceptions
+from aiida.manage.database.indexes import (
+    ENGINE_ATTRIBUTE_INDEXES, create_attribute_index, drop_attribute_index, get_attribute_index_name,
+    get_attribute_indexes, parse_projection, suggest_attribute_indexes
+)
+
+
+@pytest.fixture
+def backend(clear_database_before_test, manager):
+    """Return the backend and make sure that the indexes created by the test are dropped afterwards."""
+    backend = manager.get_backend()
+    yield backend
+    for index in get_attribute_indexes(backend):
+        if index.projection not in ENGINE_ATTRIBUTE_INDEXES:
+            drop_attribute_index(backend, index.projection)
+
+
+def get_query_plan(builder):
+    """Return the query plan of the query of the builder, with sequential scans disabled.
+
+    :param builder: the `QueryBuilder` instance
+    :return: the lines of the query plan as returned by `EXPLAIN`
+    """
+
+    def explain(_connection, _cursor, statement, parameters, _context, _executemany):
+        return f'EXPLAIN {statement}', parameters
+
+    query = builder.get_query()
+    session = query.session
+    engine = session.get_bind()
+
+    session.execute(text('SET LOCAL enable_seqscan = off;'))
+    event.listen(engine, 'before_cursor_execute', explain, retval=True)
+
+    try:
+        return [row[0] for row in session.execute(query.statement)]
+    finally:
+        event.remove(engine, 'before_cursor_execute', explain)
+        session.rollback()
+
+
+@pytest.mark.parametrize(
+    'projection, specification', (
+        ('attributes.process_state', {
+            'in': ['finished', 'excepted', 'killed']
+        }),
+        ('attributes.exit_status', 0),
+        ('attributes.exit_status', {
+            '>': 0
+        }),
+        ('attributes.sealed', True),
+        ('attributes.process_label', 'ArithmeticAddCalculation'),
+    )
+)
+@pytest.mark.usefixtures('backend')
+def test_engine_indexes(projection, specification):
+    """Test that the filters on the attributes used by the engine use the indexes created by the migrations."""
+    builder = orm.QueryBuilder().append(orm.Node, filters={projection: specification}, project='id')
+
+    assert f'Index Scan using {get_attribute_index_name(projection)}' in '\n'.join(get_query_plan(builder))
+
+
+def test_get_attribute_indexes(backend):
+    """Test that the indexes on the attributes used by the engine are listed."""
+    indexes = {index.projection: index for index in get_attribute_indexes(backend)}
+
+    for projection in ENGINE_ATTRIBUTE_INDEXES:
+        assert indexes[projection].name == get_attribute_index_name(projection)
+        assert indexes[projection].valid
+
+
+@pytest.mark.parametrize('concurrently', (True, False))
+def test_create_drop_attribute_index(backend, concurrently):
+    """Test creating and dropping an index on an extra."""
+    node = orm.Data()
+    node.set_extra('tag', 'value')
+    node.store()
+
+    builder = orm.QueryBuilder().append(orm.Node, filters={'extras.tag': 'value'}, project='id')
+    assert builder.all(flat=True) == [node.pk]
+    assert 'Seq Scan' in '\n'.join(get_query_plan(builder))
+
+    name = create_attribute_index(backend, 'extras.tag', concurrently=concurrently)
+    assert name == 'ix_db_dbnode_extras_tag'
+    assert 'extras.tag' in [index.projection for index in get_attribute_indexes(backend)]
+    assert f'Index Scan using {name}' in '\n'.join(get_query_plan(builder))
+    assert builder.all(flat=True) == [node.pk]
+
+    # Creating an existing index does nothing
+    assert create_attribute_index(backend, 'extras.tag', concurrently=concurrently) == name
+
+    drop_attribute_index(backend, 'extras.tag')
+    assert 'extras.tag' not in [index.projection for index in get_attribute_indexes(backend)]
+
+    with pytest.raises(exceptions.NotExistent):
+        drop_attribute_index(backend, 'extras.tag')
+
+
+def test_drop_engine_index(backend):
+    """Test that the indexes on the attributes used by the engine cannot be dropped."""
+    with pytest.raises(ValueError, match='used by the engine'):
+        drop_attribute_index(backend, 'attributes.process_state')
+
+
+@pytest.mark.parametrize('projection', ('label', 'attributes', 'attributes.', 'attributes.a b', "extras.a'b"))
+def test_parse_projection_invalid(projection):
+    """Test that projections of other columns and keys with special characters are rejected."""
+    with pytest.raises(ValueError):
+        parse_projection(projection)
+
+
+def test_get_attribute_index_name():
+    """Test that the names of indexes are valid and unique identifiers."""
+    assert get_attribute_index_name('attributes.nested.key') == 'ix_db_dbnode_attributes_nested_key'
+
+    names = {get_attribute_index_name(projection) for projection in ('extras.a-b', 'extras.a_b', 'extras.A_b')}
+    assert len(names) == 3
+    assert 'ix_db_dbnode_extras_a_b' in names
+
+    name = get_attribute_index_name(f"attributes.{'key' * 30}")
+    assert len(name) == 63
+    assert name != get_attribute_index_name(f"attributes.{'key' * 31}")
+
+
+def test_suggest_attribute_indexes(backend):
+    """Test that the attributes and extras filtered on by a query without index are suggested."""
+    builder = orm.QueryBuilder()
+    builder.append(orm.CalculationNode, tag='calculation', filters={'attributes.exit_status': 0})
+    builder.append(
+        orm.Dict,
+        with_incoming='calculation',
+        edge_filters={'label': 'output'},
+        filters={
+            'or': [{
+                'attributes.energy': {
+                    '<': -1.0
+                }
+            }, {
+                'extras.tag': {
+                    'and': [{
+                        '==': 'a'
+                    }]
+                }
+            }],
+            'attributes.kinds': {
+                'has_key': 'H'
+            },
+            'attributes.cell': {
+                '~==': 1
+            },
+            'extras.list': {
+                'in': [[1], [2]]
+            },
+            'label': 'label',
+        }
+    )
+    assert suggest_attribute_indexes(builder) == ['attributes.energy', 'extras.tag']
+
+    create_attribute_index(backend, 'extras.tag', concurrently=False)
+    assert suggest_attribute_indexes(builder) == ['attributes.energy']
@@ -9,15 +9,19 @@
 ###########################################################################
 # pylint: disable=too-many-public-methods
 """Tests for the Node ORM class."""
+import asyncio
 import io
 import os
+import sys
 import tempfile
+import types
 
 import pytest
+from plumpy import ProcessState
 
 from aiida.backends.testbase import AiidaTestCase
 from aiida.common import exceptions, LinkType
-from aiida.orm import Data, Log, Node, User, CalculationNode, WorkflowNode, load_node
+from aiida.orm import Data, Log, Node, QueryBuilder, User, CalculationNode, WorkflowNode, load_node
 from aiida.orm.utils.links import LinkTriple
 
 
@@ -47,6 +51,32 @@ class TestNode(AiidaTestCase):
         with self.assertRaises(exceptions.ModificationNotAllowed):
             node.user = self.user
 
+    def test_store_async(self):
+        """Test that `store_async` stores the node with its attributes, hash and cached incoming links."""
+        loop = asyncio.get_event_loop()
+        data = Data().store()
+
+        node = CalculationNode()
+        node.label = 'label'
+        node.set_attribute('key', 'value')
+        node.add_incoming(data, link_type=LinkType.INPUT_CALC, link_label='input')
+
+        self.assertIs(loop.run_until_complete(node.store_async()), node)
+        self.assertTrue(node.is_stored)
+        self.assertEqual(node.user.pk, self.user.pk)
+        self.assertEqual(node.get_hash(), node.get_extra('_aiida_hash'))
+        self.assertEqual(node.get_incoming().all_link_labels(), ['input'])
+
+        loaded = load_node(node.pk)
+        self.assertEqual(loaded.label, 'label')
+        self.assertEqual(loaded.get_attribute('key'), 'value')
+        self.assertEqual(loaded.ctime, node.ctime)
+
+        # The stored node can be used like a node stored with `store`
+        node.label = 'relabel'
+        self.assertEqual(load_node(node.pk).label, 'relabel')
+        self.assertIs(loop.run_until_complete(node.store_async()), node)
+
 
 class TestNodeAttributesExtras(AiidaTestCase):
     """Test for node attributes and extras."""
@@ -845,6 +875,117 @@ def test_store_from_cache():
     assert data.get_hash() == clone.get_hash()
 
 
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_hash_column():
+    """Test that the hash is stored in the indexed ``hash`` column, which is used to look up identical nodes."""
+
+    def get_hash_column(node):
+        return QueryBuilder().append(Node, filters={'id': node.pk}, project='hash').one()[0]
+
+    def create_calculation():
+        calculation = CalculationNode(process_type='aiida.calculations:arithmetic.add')
+        calculation.set_attribute('key', 'value')
+        calculation.set_process_state(ProcessState.FINISHED)
+        calculation.set_exit_status(0)
+        return calculation.store()
+
+    node = create_calculation()
+
+    node_hash = node.get_hash()
+    assert node.get_extra('_aiida_hash') == node_hash
+    assert get_hash_column(node) == node_hash
+
+    identical = create_calculation()
+    assert identical._get_same_node().uuid in [node.uuid, identical.uuid]  # pylint: disable=protected-access
+    assert {entry.uuid for entry in identical.get_all_same_nodes()} == {node.uuid, identical.uuid}
+
+    node.clear_hash()
+    assert node.get_extra('_aiida_hash') is None
+    assert get_hash_column(node) is None
+    assert [entry.uuid for entry in identical.get_all_same_nodes()] == [identical.uuid]
+
+    node.rehash()
+    assert get_hash_column(node) == node_hash
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_iter_all_same_nodes_invalid_cache():
+    """Test that identical nodes are still found after an invalid cache source logs a warning to the database."""
+
+    def create_calculation(process_type):
+        calculation = CalculationNode(process_type=process_type)
+        calculation.set_attribute('key', 'value')
+        calculation.set_process_state(ProcessState.FINISHED)
+        calculation.set_exit_status(0)
+        return calculation.store()
+
+    node = create_calculation('aiida.calculations:arithmetic.add')
+
+    # The process class of this node cannot be loaded, so `is_valid_cache` logs a warning and returns False
+    invalid = create_calculation('aiida.calculations:non.existent')
+    invalid._set_hash(node.get_hash())  # pylint: disable=protected-access
+
+    identical = create_calculation('aiida.calculations:arithmetic.add')
+    assert {entry.uuid for entry in identical.get_all_same_nodes()} == {node.uuid, identical.uuid}
+    assert Log.objects.get_logs_for(invalid)
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_process_input_hashes():
+    """Test that the hash of a process node reuses the stored hash of its inputs if its version is valid."""
+    data = Data()
+    data.set_attribute('key', 'value')
+    data.store()
+    data_hash = data.get_hash()
+    assert data.get_extra('_aiida_hash_version') == data._get_hash_version()  # pylint: disable=protected-access
+
+    process = CalculationNode()
+    process.add_incoming(data, link_type=LinkType.INPUT_CALC, link_label='data')
+    assert process._get_input_hashes() == {'data': data_hash}  # pylint: disable=protected-access
+
+    # The stored hash is used instead of being recomputed
+    data.set_extra('_aiida_hash', 'stored')
+    assert process._get_input_hashes() == {'data': 'stored'}  # pylint: disable=protected-access
+
+    # A stored hash with a different version is recomputed
+    data.set_extra('_aiida_hash_version', '0.0.0:blake2b-0')
+    assert process._get_input_hashes() == {'data': data_hash}  # pylint: disable=protected-access
+
+    data.clear_hash()
+    assert data.get_extra('_aiida_hash_version') is None
+    assert process._get_input_hashes() == {'data': data_hash}  # pylint: disable=protected-access
+
+
+class CustomData(Data):
+    """Data class defined in the test module, which is not registered as an entry point."""
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+@pytest.mark.parametrize('module, versioned', ((__name__, True), ('__main__', False), ('unversioned.data', False)))
+def test_hash_version_custom_class(monkeypatch, module, versioned):
+    """Test that nodes can be stored if the package of their class has no version, but their hash is not reused."""
+    from aiida.plugins import entry_point
+
+    monkeypatch.setattr(entry_point, 'is_registered_entry_point', lambda *args, **kwargs: True)
+    monkeypatch.setitem(sys.modules, 'unversioned', types.ModuleType('unversioned'))
+    monkeypatch.setattr(CustomData, '__module__', module)
+
+    data = CustomData()
+    data.set_attribute('key', 'value')
+    data.store()
+    data_hash = data.get_hash()
+    hash_version = data.get_extra('_aiida_hash_version')
+    assert data.get_extra('_aiida_hash') == data_hash
+    assert (hash_version is not None) is versioned
+    assert hash_version == CustomData._get_hash_version()  # pylint: disable=protected-access
+
+    if not versioned:
+        process = CalculationNode()
+        process.add_incoming(data, link_type=LinkType.INPUT_CALC, link_label='data')
+        data.set_extra('_aiida_hash', 'stored')
+        assert process._get_input_hashes() == {'data': data_hash}  # pylint: disable=protected-access
+
+
 @pytest.mark.usefixtures('clear_database_before_test')
 def test_open_wrapper():
     """Test the wrapper around the return value of ``Node.open``.
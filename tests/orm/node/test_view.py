@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+# pylint: disable=redefined-outer-name
+"""Tests for the :class:`aiida.orm.nodes.view.NodeView` class."""
+import pytest
+
+from aiida import orm
+
+
+@pytest.fixture
+def node(clear_database_before_test):
+    """Return a stored `Dict` node with an extra."""
+    node = orm.Dict(dict={'energy': -1.5, 'kinds': ['H', 'O']})
+    node.label = 'water'
+    node.set_extra('tag', 'relaxed')
+    return node.store()
+
+
+@pytest.mark.parametrize('stream', (False, True))
+def test_iterall(node, stream):
+    """Test that nodes are returned as views with the values of the node by `iterall` with `proxy=True`."""
+    builder = orm.QueryBuilder().append(orm.Dict, project=['*', 'id'])
+    [(view, pk)] = list(builder.iterall(proxy=True, stream=stream))
+
+    assert isinstance(view, orm.NodeView)
+    assert pk == view.pk == node.pk
+    assert view.uuid == node.uuid
+    assert view.node_type == node.node_type
+    assert view.process_type is None
+    assert view.label == 'water'
+    assert view.description == ''
+    assert view.ctime == node.ctime
+    assert view.mtime == node.mtime
+    assert view.attributes == node.attributes
+    assert view.extras == node.extras
+    assert view.get_attribute('energy') == -1.5
+    assert view.get_extra('tag') == 'relaxed'
+
+
+def test_iterall_stream_detached(node):
+    """Test that the streamed database model instances are not merged into the session with `proxy=True`."""
+    from unittest import mock
+
+    session = node.backend.get_session()
+    builder = orm.QueryBuilder().append(orm.Dict)
+
+    with mock.patch.object(session, 'merge', wraps=session.merge) as merge:
+        [[view]] = list(builder.iterall(proxy=True, stream=True))
+
+    assert view.pk == node.pk
+    merge.assert_not_called()
+
+
+def test_iterdict(node):
+    """Test that nodes are returned as views by `iterdict` with `proxy=True`."""
+    builder = orm.QueryBuilder().append(orm.Dict, tag='dict', project='*')
+    builder.append(orm.User, with_node='dict', tag='user', project='*')
+    [result] = list(builder.iterdict(proxy=True))
+
+    assert result['dict']['*'] == next(builder.iterall(proxy=True))[0]
+    assert result['dict']['*'].uuid == node.uuid
+    assert isinstance(result['user']['*'], orm.User)
+
+
+def test_get_attribute(node):
+    """Test that missing values raise or return the default and mutable values are copies."""
+    [[view]] = orm.QueryBuilder().append(orm.Dict).iterall(proxy=True)
+
+    with pytest.raises(AttributeError):
+        view.get_attribute('missing')
+
+    with pytest.raises(AttributeError):
+        view.get_extra('missing')
+
+    assert view.get_attribute('missing', None) is None
+    assert view.get_extra('missing', 'default') == 'default'
+
+    view.get_attribute('kinds').append('C')
+    assert view.get_attribute('kinds') == ['H', 'O']
+    assert view.get_node().get_attribute('kinds') == ['H', 'O']
+    assert view.get_node().pk == node.pk
+
+
+def test_immutable(node):
+    """Test that a view cannot be modified."""
+    [[view]] = orm.QueryBuilder().append(orm.Dict).iterall(proxy=True)
+
+    with pytest.raises(AttributeError):
+        view.label = 'ice'
+
+    with pytest.raises(AttributeError):
+        view._label = 'ice'  # pylint: disable=protected-access
+
+    with pytest.raises(AttributeError):
+        del view.label
+
+    with pytest.raises(TypeError):
+        view.attributes['energy'] = 0.
+
+    with pytest.raises(AttributeError):
+        view.__dict__  # pylint: disable=pointless-statement
+
+    assert view.label == node.label == 'water'
@@ -9,13 +9,17 @@
 ###########################################################################
 # pylint: disable=invalid-name,missing-docstring,too-many-lines
 """Tests for the QueryBuilder."""
+import asyncio
 import warnings
+
 import pytest
 
 from aiida import orm
 from aiida.backends.testbase import AiidaTestCase
+from aiida.common.exceptions import InputValidationError, MultipleObjectsError, NotExistent
 from aiida.common.links import LinkType
 from aiida.manage import configuration
+from aiida.orm.utils.querycache import disable_query_cache, get_query_cache
 
 
 class TestQueryBuilder(AiidaTestCase):
@@ -675,6 +679,113 @@ class TestQueryBuilder(AiidaTestCase):
         assert len(result) == 20
         assert result == list(chain.from_iterable(zip(pks, uuids)))
 
+    @staticmethod
+    def test_to_arrays():
+        """Test the `QueryBuilder.to_arrays()` method returns one array of the correct type per projection."""
+        nodes = [orm.Int(value).store() for value in range(5)]
+        nodes[0].set_extra('flag', True)
+
+        builder = orm.QueryBuilder().append(
+            orm.Int,
+            tag='integer',
+            filters={
+                'id': {
+                    'in': [node.pk for node in nodes]
+                }
+            },
+            project=['id', 'uuid', {
+                'attributes.value': {
+                    'cast': 'i'
+                }
+            }, {
+                'extras.flag': {
+                    'cast': 'b'
+                }
+            }]
+        ).order_by({'integer': 'id'})
+        arrays = builder.to_arrays(batch_size=2)['integer']
+
+        assert arrays['id'].dtype == 'int64'
+        assert arrays['id'].tolist() == [node.pk for node in nodes]
+        assert arrays['uuid'].tolist() == [node.uuid for node in nodes]
+        assert arrays['attributes.value'].dtype == 'int64'
+        assert arrays['attributes.value'].tolist() == list(range(5))
+        assert arrays['extras.flag'].dtype == object
+        assert arrays['extras.flag'].tolist() == [True, None, None, None, None]
+
+        # The results can also be returned one batch at a time
+        batches = [batch['integer'] for batch in builder.iterarrays(batch_size=2)]
+        assert [batch['id'].tolist() for batch in batches] == [[node.pk for node in nodes[i:i + 2]] for i in (0, 2, 4)]
+        assert all(batch['attributes.value'].dtype == 'int64' for batch in batches)
+
+        # An empty result gives empty arrays and entities cannot be projected
+        builder = orm.QueryBuilder().append(orm.Int, tag='integer', filters={'id': -1}, project='id')
+        assert builder.to_arrays()['integer']['id'].size == 0
+        assert builder.to_arrays(batch_size=2)['integer']['id'].size == 0
+
+        with pytest.raises(InputValidationError):
+            orm.QueryBuilder().append(orm.Int).to_arrays()
+
+        with pytest.raises(InputValidationError):
+            next(orm.QueryBuilder().append(orm.Int).iterarrays())
+
+    @staticmethod
+    def test_group_by():
+        """Test the aggregation of projections per group with `group_by` and the filtering of groups with `having`."""
+        for process_label, wallclock in [('a', 1.), ('a', 2.), ('a', 4.), ('b', 8.)]:
+            node = orm.CalculationNode()
+            node.set_attribute('process_label', process_label)
+            node.set_attribute('wallclock', wallclock)
+            node.store()
+
+        filters = {'attributes': {'has_key': 'wallclock'}}
+        label = {'attributes.process_label': {'cast': 't'}}
+
+        builder = orm.QueryBuilder().append(
+            orm.CalculationNode,
+            tag='calc',
+            filters=filters,
+            project=[label, {
+                'id': {
+                    'func': 'count'
+                }
+            }, {
+                'attributes.wallclock': {
+                    'cast': 'f',
+                    'func': 'sum'
+                }
+            }]
+        )
+        builder.group_by({'calc': label})
+        builder.order_by({'calc': {'attributes.process_label': {'cast': 't'}}})
+
+        assert builder.all() == [['a', 3, 7.], ['b', 1, 8.]]
+
+        builder = orm.QueryBuilder().append(
+            orm.CalculationNode,
+            tag='calc',
+            filters=filters,
+            project=['attributes.process_label', {
+                'attributes.wallclock': {
+                    'cast': 'f',
+                    'func': 'avg'
+                }
+            }]
+        )
+        builder.group_by({'calc': 'attributes.process_label'})
+        builder.having({'calc': {'id': {'func': 'count', '>': 1}}})
+        assert builder.all() == [['a', pytest.approx(7. / 3)]]
+
+        # The grouping is part of the queryhelp
+        assert orm.QueryBuilder(**builder.queryhelp).all() == builder.all()
+
+        with pytest.raises(InputValidationError):
+            orm.QueryBuilder().append(orm.CalculationNode, tag='calc').group_by({'calc': {'id': {'order': 'asc'}}})
+
+        with pytest.raises(InputValidationError):
+            builder = orm.QueryBuilder().append(orm.CalculationNode, tag='calc', project={'id': {'func': 'count'}})
+            builder.having({'calc': {'id': {'func': 'median', '>': 1}}}).all()
+
 
 class TestMultipleProjections(AiidaTestCase):
     """Unit tests for the QueryBuilder ORM class."""
@@ -869,6 +980,36 @@ class TestAttributes(AiidaTestCase):
             res = [str(_) for _, in qb.all()]
             self.assertEqual(set(res), set((n_arr.uuid,)))
 
+    def test_attribute_value_comparison(self):
+        """Test the filters that compare the JSONB values directly, including their negation and missing keys."""
+        key = 'value_test_attr_comparison'
+        n_int, n_str, n_bool, n_none, n_missing = [orm.Data() for _ in range(5)]
+        n_int.set_attribute(key, 2)
+        n_str.set_attribute(key, 'b')
+        n_bool.set_attribute(key, False)
+        n_none.set_attribute(key, None)
+
+        for node in (n_int, n_str, n_bool, n_none, n_missing):
+            node.set_attribute('test_case', key)
+            node.store()
+
+        def get_pks(operator, value):
+            filters = {'attributes.test_case': key, f'attributes.{key}': {operator: value}}
+            return set(orm.QueryBuilder().append(orm.Data, filters=filters, project='id').all(flat=True))
+
+        all_pks = {node.pk for node in (n_int, n_str, n_bool, n_none, n_missing)}
+
+        self.assertEqual(get_pks('==', 2.0), {n_int.pk})
+        self.assertEqual(get_pks('~==', 2), all_pks - {n_int.pk})
+        self.assertEqual(get_pks('==', False), {n_bool.pk})
+        self.assertEqual(get_pks('in', ['a', 'b']), {n_str.pk})
+        self.assertEqual(get_pks('!in', ['a', 'b']), all_pks - {n_str.pk})
+        self.assertEqual(get_pks('>=', 1), {n_int.pk})
+        self.assertEqual(get_pks('~>=', 1), all_pks - {n_int.pk})
+        self.assertEqual(get_pks('<', 'c'), {n_str.pk})
+        self.assertEqual(get_pks('>', 'a'), {n_str.pk})
+        self.assertEqual(get_pks('<=', True), {n_bool.pk})
+
 
 class QueryBuilderLimitOffsetsTest(AiidaTestCase):
 
@@ -1294,6 +1435,59 @@ class QueryBuilderPath(AiidaTestCase):
         # qb.add_filter('edge', {'depth': 5})
         # self.assertTrue(set(next(zip(*qb.all()))), set([5]))
 
+    def test_query_path_traversal(self):
+        """Test the `max_depth`, `distinct_paths` and `link_types` options of the recursive relationships."""
+        data_a = orm.Data().store()
+        data_b = orm.Data()
+        data_c = orm.Data()
+        calc_a = orm.CalculationNode()
+        calc_b = orm.CalculationNode()
+
+        # There are two paths from `data_a` to `calc_b` and to `data_c`, of different lengths
+        calc_a.add_incoming(data_a, link_type=LinkType.INPUT_CALC, link_label='input')
+        calc_a.store()
+        data_b.add_incoming(calc_a, link_type=LinkType.CREATE, link_label='output')
+        data_b.store()
+        calc_b.add_incoming(data_a, link_type=LinkType.INPUT_CALC, link_label='input_a')
+        calc_b.add_incoming(data_b, link_type=LinkType.INPUT_CALC, link_label='input_b')
+        calc_b.store()
+        data_c.add_incoming(calc_b, link_type=LinkType.CREATE, link_label='output')
+        data_c.store()
+
+        def get_descendants(**kwargs):
+            builder = orm.QueryBuilder().append(orm.Node, filters={'id': data_a.pk}, tag='node')
+            builder.append(orm.Node, with_ancestors='node', project='id', edge_project='depth', **kwargs)
+            descendants = sorted(tuple(row) for row in builder.all())
+            self.assertEqual(sorted(tuple(row) for row in orm.QueryBuilder(**builder.queryhelp).all()), descendants)
+            return descendants
+
+        all_paths = [(calc_a.pk, 0), (data_b.pk, 1), (calc_b.pk, 0), (calc_b.pk, 2), (data_c.pk, 1), (data_c.pk, 3)]
+        shortest_paths = [(calc_a.pk, 0), (data_b.pk, 1), (calc_b.pk, 0), (data_c.pk, 1)]
+
+        self.assertEqual(get_descendants(), sorted(all_paths))
+        self.assertEqual(get_descendants(max_depth=1), sorted(shortest_paths))
+        self.assertEqual(get_descendants(distinct_paths=False), sorted(shortest_paths))
+        self.assertEqual(get_descendants(distinct_paths=False, max_depth=0), sorted([(calc_a.pk, 0), (calc_b.pk, 0)]))
+        self.assertEqual(get_descendants(link_types=[LinkType.INPUT_CALC]), sorted([(calc_a.pk, 0), (calc_b.pk, 0)]))
+
+        builder = orm.QueryBuilder().append(orm.Node, filters={'id': data_c.pk}, tag='node')
+        builder.append(orm.Node, with_descendants='node', project='id', max_depth=1, distinct_paths=False)
+        self.assertEqual(sorted(builder.all(flat=True)), sorted([calc_b.pk, data_a.pk, data_b.pk]))
+
+        with self.assertRaises(InputValidationError):
+            orm.QueryBuilder().append(orm.Node, tag='node').append(orm.Node, with_ancestors='node', max_depth=-1)
+
+        with self.assertRaises(InputValidationError):
+            orm.QueryBuilder().append(orm.Node, tag='node').append(orm.Node, with_ancestors='node', link_types=['a'])
+
+        with self.assertRaises(InputValidationError):
+            orm.QueryBuilder().append(orm.Node, tag='node').append(orm.Node, with_incoming='node', max_depth=1)
+
+        builder = orm.QueryBuilder().append(orm.Node, tag='node')
+        builder.append(orm.Node, with_ancestors='node', distinct_paths=False, edge_project='path')
+        with self.assertRaises(InputValidationError):
+            builder.all()
+
 
 class TestConsistency(AiidaTestCase):
 
@@ -1314,6 +1508,30 @@ class TestConsistency(AiidaTestCase):
         self.assertEqual(idx, 99)  # pylint: disable=undefined-loop-variable
         self.assertTrue(len(orm.QueryBuilder().append(orm.Node, project=['id', 'label']).all(batch_size=10)) > 99)
 
+    def test_stream(self):
+        """Test that the results of a streamed iteration can be modified and stored while iterating."""
+        from sqlalchemy import inspect
+
+        session = self.backend.get_session()
+        pks = {orm.Int(value).store().pk for value in range(25)}
+
+        builder = orm.QueryBuilder().append(orm.Int, tag='node')
+        for node, in builder.iterall(batch_size=10, stream=True):
+            self.assertIs(inspect(node.backend_entity.dbmodel).session, session)
+            node.set_extra('double', node.value * 2)
+
+        builder = orm.QueryBuilder().append(orm.Int, project=['id', 'extras.double', 'attributes.value'])
+        results = list(builder.iterall(batch_size=10, stream=True))
+        self.assertEqual({pk for pk, _, _ in results}, pks)
+        self.assertTrue(all(double == value * 2 for _, double, value in results))
+
+        builder = orm.QueryBuilder().append(orm.Int, project=['*', 'id'], tag='node')
+        for result in builder.iterdict(batch_size=10, stream=True):
+            self.assertEqual(result['node']['*'].pk, result['node']['id'])
+            result['node']['*'].delete_extra('double')
+
+        self.assertEqual(orm.QueryBuilder().append(orm.Int, filters={'extras': {'has_key': 'double'}}).count(), 0)
+
     def test_len_results(self):
         """
         Test whether the len of results matches the count returned.
@@ -1453,3 +1671,161 @@ class TestDoubleStar(AiidaTestCase):
         # data are correct
         res = list(qb.dict()[0].values())[0]
         self.assertDictEqual(res, expected_dict)
+
+
+class TestQueryCache(AiidaTestCase):
+    """Test the cache of the queries built by the `QueryBuilder`, see `aiida.orm.utils.querycache`."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = get_query_cache()
+        self.cache.clear()
+
+    @staticmethod
+    def get_key(filters):
+        return orm.QueryBuilder().append(orm.Data, filters=filters)._get_query_key()  # pylint: disable=protected-access
+
+    def test_query_key(self):
+        """Test that only the values of the filters that become bind parameters are left out of the key."""
+        key, values = self.get_key({'id': 1, 'label': {'like': 'a%'}, 'attributes.x': {'in': [1, 2]}})
+        self.assertEqual(values, ('data.%', 1, 'a%', 1, 2))
+        self.assertEqual(self.get_key({'id': 2, 'label': {'like': 'b%'}, 'attributes.x': {'in': [3, 4]}})[0], key)
+
+        # The type of the values and the length of lists are part of the key
+        self.assertNotEqual(self.get_key({'id': 1.0, 'label': {'like': 'a%'}, 'attributes.x': {'in': [1, 2]}})[0], key)
+        self.assertNotEqual(self.get_key({'id': 1, 'label': {'like': 'a%'}, 'attributes.x': {'in': [1]}})[0], key)
+
+        # Other values are part of the key
+        self.assertEqual(self.get_key({'attributes.x': {'of_length': 2}})[1], ('data.%',))
+        self.assertEqual(self.get_key({'attributes.x': True})[1], ('data.%',))
+        self.assertNotEqual(self.get_key({'attributes.x': True})[0], self.get_key({'attributes.x': False})[0])
+
+        # Values that are not builtin types cannot be part of a key
+        self.assertIsNone(self.get_key({'id': {'in': {1, 2}}}))
+
+        # The cache is shared by all profiles, so the profile is part of the key
+        self.assertTrue(key.startswith(f'[{configuration.get_profile().name!r}, '))
+
+    def test_cached_query(self):
+        """Test that a query of the same shape is taken from the cache and returns the results for its own values."""
+        nodes = [orm.Int(value).store() for value in range(4)]
+
+        def get_builder(node):
+            filters = {'id': node.pk, 'attributes.value': {'>=': node.value}}
+            return orm.QueryBuilder().append(orm.Int, filters=filters, project=['id', 'attributes.value'])
+
+        # The shape is only cached the second time it is encountered, so the last two queries are taken from the cache
+        for node in nodes:
+            self.assertEqual(get_builder(node).all(), [[node.pk, node.value]])
+        self.assertEqual(self.cache.hits, 2)
+
+        builder = get_builder(nodes[3])
+        self.assertEqual(builder.count(), 1)
+        self.assertEqual(builder.first(), [nodes[3].pk, nodes[3].value])
+        self.assertEqual(builder.one(), [nodes[3].pk, nodes[3].value])
+        self.assertEqual(builder.dict(), [{'Int_1': {'id': nodes[3].pk, 'attributes.value': nodes[3].value}}])
+        self.assertEqual(list(builder.iterall(batch_size=1)), [[nodes[3].pk, nodes[3].value]])
+
+        # Changing the filters of a builder invalidates its query
+        builder.add_filter(orm.Int, {'id': nodes[2].pk})
+        self.assertEqual(builder.all(), [])
+
+        with disable_query_cache():
+            hits = self.cache.hits
+            self.assertEqual(get_builder(nodes[0]).all(), [[nodes[0].pk, nodes[0].value]])
+            self.assertEqual(self.cache.hits, hits)
+
+    def test_probed_query_unmodified(self):
+        """Test that the query of the builder that is probed is not modified, since it is not the one that is cached."""
+        from aiida.orm.utils.querycache import get_bind_parameters
+
+        node = orm.Data().store()
+
+        for _ in range(2):
+            builder = orm.QueryBuilder().append(orm.Data, filters={'id': node.pk}, project='id')
+            self.assertEqual(builder.all(flat=True), [node.pk])
+
+        self.assertTrue(all(parameter.unique for parameter in get_bind_parameters(builder.get_query())))
+
+        hits = self.cache.hits
+        cached = orm.QueryBuilder().append(orm.Data, filters={'id': node.pk}, project='id')
+        self.assertEqual(cached.all(flat=True), [node.pk])
+        self.assertEqual(self.cache.hits, hits + 1)
+
+    def test_cached_query_joins(self):
+        """Test a cached query with joins, whose filter values also end up in the recursive part of the query."""
+        data = orm.Data().store()
+        calculation = orm.CalculationNode()
+        calculation.add_incoming(data, link_type=LinkType.INPUT_CALC, link_label='input')
+        calculation.store()
+
+        for _ in range(3):
+            for node, expected in [(data, [calculation.pk]), (calculation, [])]:
+                builder = orm.QueryBuilder().append(orm.Node, filters={'id': node.pk}, tag='node')
+                builder.append(orm.Node, with_ancestors='node', project='id')
+                self.assertEqual(builder.all(flat=True), expected)
+
+                builder = orm.QueryBuilder().append(orm.Node, filters={'id': node.pk}, tag='node')
+                builder.append(orm.Node, with_incoming='node', edge_filters={'label': 'input'}, project='id')
+                self.assertEqual(builder.all(flat=True), expected)
+
+        # Each of the two shapes is seen once, probed once and then taken from the cache four times
+        self.assertEqual(self.cache.hits, 8)
+
+    def test_get_alias(self):
+        """Test that a builder whose aliases were handed out does not take its query from the cache."""
+        node = orm.Data().store()
+
+        for _ in range(2):
+            orm.QueryBuilder().append(orm.Data, filters={'id': node.pk}, tag='data', project='id').all()
+
+        builder = orm.QueryBuilder().append(orm.Data, filters={'id': node.pk}, tag='data', project='id')
+        alias = builder.get_alias('data')
+        builder.inject_query(builder.get_query().filter(alias.id == node.pk))
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(builder.all(flat=True), [node.pk])
+
+
+class TestAsync(AiidaTestCase):
+    """Test the asynchronous execution of queries."""
+
+    def setUp(self):
+        super().setUp()
+        self.clean_db()
+        self.insert_data()
+        self.loop = asyncio.get_event_loop()
+        self.nodes = [orm.Int(value).store() for value in range(3)]
+
+    def test_all_async(self):
+        """Test that `all_async` returns the same results as `all`, with entities that are usable in this thread."""
+        builder = orm.QueryBuilder().append(orm.Int, project=['*', 'id'], tag='int').order_by({'int': 'id'})
+        results = self.loop.run_until_complete(builder.all_async())
+        self.assertEqual(results, builder.all())
+        self.assertEqual([node.value for node, _ in results], [0, 1, 2])
+
+        builder = orm.QueryBuilder().append(orm.Int, project='id', tag='int').order_by({'int': 'id'})
+        self.assertEqual(self.loop.run_until_complete(builder.all_async(flat=True)), [node.pk for node in self.nodes])
+
+    def test_dict_async(self):
+        """Test that `dict_async` returns the same results as `dict`."""
+        builder = orm.QueryBuilder().append(orm.Int, project=['id', 'attributes.value'], tag='int')
+        builder.order_by({'int': 'id'})
+        self.assertEqual(self.loop.run_until_complete(builder.dict_async()), builder.dict())
+
+    def test_count_first_one_async(self):
+        """Test `count_async`, `first_async` and `one_async`."""
+        builder = orm.QueryBuilder().append(orm.Int, tag='int').order_by({'int': 'id'})
+        self.assertEqual(self.loop.run_until_complete(builder.count_async()), 3)
+        self.assertEqual(self.loop.run_until_complete(builder.first_async()), [self.nodes[0]])
+
+        with self.assertRaises(MultipleObjectsError):
+            self.loop.run_until_complete(builder.one_async())
+
+        builder = orm.QueryBuilder().append(orm.Int, filters={'id': self.nodes[1].pk}, project='id')
+        self.assertEqual(self.loop.run_until_complete(builder.one_async()), [self.nodes[1].pk])
+
+        builder = orm.QueryBuilder().append(orm.Int, filters={'id': -1})
+        self.assertIsNone(self.loop.run_until_complete(builder.first_async()))
+
+        with self.assertRaises(NotExistent):
+            self.loop.run_until_complete(builder.one_async())
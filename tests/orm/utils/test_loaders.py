@@ -9,10 +9,10 @@
 ###########################################################################
 """Module to test orm utilities to load nodes, codes etc."""
 from aiida.backends.testbase import AiidaTestCase
-from aiida.common.exceptions import NotExistent
-from aiida.orm import Node, Group, Data
-from aiida.orm.utils import load_entity, load_code, load_computer, load_group, load_node
-from aiida.orm.utils.loaders import NodeEntityLoader
+from aiida.common.exceptions import MultipleObjectsError, NotExistent
+from aiida.orm import Code, Node, Group, Data
+from aiida.orm.utils import load_entity, load_code, load_computer, load_group, load_node, load_nodes
+from aiida.orm.utils.loaders import CodeEntityLoader, NodeEntityLoader, get_identity_map
 
 
 class TestOrmUtils(AiidaTestCase):
@@ -211,3 +211,57 @@ class TestOrmUtils(AiidaTestCase):
 
         with self.assertRaises(NotExistent):
             load_group('non-existent-uuid')
+
+    def test_load_nodes(self):
+        """Test the functionality of load_nodes."""
+        node_a = Data()
+        node_a.label = 'node_a'
+        node_a.store()
+        node_b = Data().store()
+
+        identifiers = [node_b.uuid[:10], node_a.pk, 'node_a!', node_b.uuid.upper(), str(node_b.pk)]
+        loaded_nodes = load_nodes(identifiers)
+        self.assertEqual([loaded.uuid for loaded in loaded_nodes],
+                         [node_b.uuid, node_a.uuid, node_a.uuid, node_b.uuid, node_b.uuid])
+        self.assertIs(loaded_nodes[0], loaded_nodes[3])
+
+        # Nodes that are still in use are taken from the identity map
+        self.assertIs(load_nodes(pks=[node_a.pk])[0], loaded_nodes[1])
+        self.assertIs(get_identity_map()[(Node, node_b.pk)], loaded_nodes[0])
+
+        self.assertEqual([loaded.uuid for loaded in load_nodes(uuids=[node_a.uuid[:8]])], [node_a.uuid])
+        self.assertEqual([loaded.uuid for loaded in load_nodes(labels=['node_a'])], [node_a.uuid])
+        self.assertEqual(load_nodes([]), [])
+
+        with self.assertRaises(ValueError):
+            load_nodes()
+
+        with self.assertRaises(TypeError):
+            load_nodes(pks=[str(node_a.pk)])
+
+        with self.assertRaises(NotExistent):
+            load_nodes([node_a.pk], sub_classes=(Code,))
+
+    def test_load_entities_errors(self):
+        """Test that all identifiers that do not match a single entity are reported."""
+        for label in ('duplicate', 'duplicate', 'unique'):
+            node = Data()
+            node.label = label
+            node.store()
+
+        with self.assertRaisesRegex(NotExistent, r'LABEL<missing>, ID<-1>'):
+            NodeEntityLoader.load_entities(['missing!', 'unique!', -1])
+
+        with self.assertRaisesRegex(MultipleObjectsError, r'found with LABEL<duplicate>$'):
+            NodeEntityLoader.load_entities(['missing!', 'duplicate!'])
+
+    def test_load_entities_separate_query(self):
+        """Test that identifiers that cannot be combined in a single query are resolved separately."""
+        code = Code()
+        code.label = 'compy_bulk'
+        code.set_remote_computer_exec((self.computer, '/x.x'))
+        code.store()
+
+        loaded_codes = CodeEntityLoader.load_entities([code.full_label, code.pk, code.label])
+        self.assertEqual([loaded.uuid for loaded in loaded_codes], [code.uuid] * 3)
+        self.assertTrue(loaded_codes[0] is loaded_codes[1] is loaded_codes[2])
@@ -151,3 +151,28 @@ def test_serialization():
     assert job_info2.job_state == to_serialize['job_state'][0]
     # Check that fields are properly re-serialized with the correct type
     assert job_info2.submission_time == to_serialize['submission_time'][0]
+
+
+def test_job_state_info():
+    """Test that `JobStateInfo` only parses the full `JobInfo` once, when it is requested."""
+    from aiida.schedulers.datastructures import JobInfo, JobState, JobStateInfo
+
+    calls = []
+
+    def parse():
+        calls.append(None)
+        return JobInfo({'job_id': '1', 'job_state': JobState.RUNNING, 'title': 'some title'})
+
+    job_state_info = JobStateInfo('1', JobState.RUNNING, parse=parse)
+    assert calls == []
+    assert job_state_info.get_job_info().title == 'some title'
+    assert job_state_info.get_job_info().title == 'some title'
+    assert len(calls) == 1
+
+    job_info = JobInfo({'job_id': '2', 'job_state': JobState.QUEUED, 'job_substate': 'Q'})
+    job_state_info = JobStateInfo.from_job_info(job_info)
+    assert (job_state_info.job_id, job_state_info.job_state, job_state_info.job_substate) == ('2', JobState.QUEUED, 'Q')
+    assert job_state_info.get_job_info() is job_info
+
+    with pytest.raises(ValueError):
+        JobStateInfo('3', JobState.QUEUED)
@@ -86,3 +86,33 @@ class TestParserGetJobList(unittest.TestCase):
 
         job_ids = [job.job_id for job in result]
         self.assertIn('11383', job_ids)
+
+
+def test_submit_from_script_batch(tmp_path):
+    """Test that `submit_from_script_batch` returns the job id or the exception of each submission."""
+    from aiida.transports.plugins.local import LocalTransport
+
+    script = tmp_path / 'submit.sh'
+    script.write_text('exit 0\n')
+
+    scheduler = DirectScheduler()
+
+    with LocalTransport() as transport:
+        scheduler.set_transport(transport)
+        results = scheduler.submit_from_script_batch([(str(tmp_path), 'submit.sh'),
+                                                      (str(tmp_path / 'missing'), 'a.sh')])
+
+    assert len(results) == 2
+    assert results[0].isdigit()
+    assert isinstance(results[1], SchedulerError)
+
+
+def test_submit_from_script_batch_unsupported(monkeypatch):
+    """Test that a scheduler without the `can_batch_commands` feature submits and kills through the public methods."""
+    scheduler = DirectScheduler()
+    monkeypatch.setattr(scheduler, '_features', {'can_query_by_user': True})
+    monkeypatch.setattr(scheduler, 'submit_from_script', lambda directory, script: f'{directory}/{script}')
+    monkeypatch.setattr(scheduler, 'kill', lambda jobid: jobid == '1')
+
+    assert scheduler.submit_from_script_batch([('dir', 'a.sh'), ('dir', 'b.sh')]) == ['dir/a.sh', 'dir/b.sh']
+    assert scheduler.kill_batch(['1', '2']) == [True, False]
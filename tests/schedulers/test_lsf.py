@@ -113,6 +113,17 @@ class TestParserBjobs(unittest.TestCase):
         # Important to enable again logs!
         logging.disable(logging.NOTSET)
 
+    def test_parse_joblist_states(self):
+        """Test that `_parse_joblist_states` returns the same states as `_parse_joblist_output`."""
+        scheduler = LsfScheduler()
+
+        job_list = scheduler._parse_joblist_output(0, BJOBS_STDOUT_TO_TEST, '')  # pylint: disable=protected-access
+        state_list = scheduler._parse_joblist_states(0, BJOBS_STDOUT_TO_TEST, '')  # pylint: disable=protected-access
+
+        self.assertEqual([(job.job_id, job.job_state) for job in state_list],
+                         [(job.job_id, job.job_state) for job in job_list])
+        self.assertEqual([job.get_job_info() for job in state_list], job_list)
+
 
 class TestSubmitScript(unittest.TestCase):
     """Tests for the submit script."""
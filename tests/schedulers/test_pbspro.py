@@ -809,6 +809,17 @@ class TestParserQstat(unittest.TestCase):
                 self.assertTrue(j.num_machines == num_machines)
                 self.assertTrue(j.num_cpus == num_cpus)
 
+    def test_parse_joblist_states(self):
+        """Test that `_parse_joblist_states` returns the same states as `_parse_joblist_output`."""
+        scheduler = PbsproScheduler()
+
+        job_list = scheduler._parse_joblist_output(0, text_qstat_f_to_test, '')  # pylint: disable=protected-access
+        state_list = scheduler._parse_joblist_states(0, text_qstat_f_to_test, '')  # pylint: disable=protected-access
+
+        self.assertEqual([(job.job_id, job.job_state, job.job_substate) for job in state_list],
+                         [(job.job_id, job.job_state, job.job_substate) for job in job_list])
+        self.assertEqual([job.get_job_info() for job in state_list], job_list)
+
     def test_parse_with_unexpected_newlines(self):
         """
         Test whether _parse_joblist can parse the qstat -f output
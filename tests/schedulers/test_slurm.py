@@ -133,6 +133,18 @@ class TestParserSqueue(unittest.TestCase):
         #
         #                self.assertTrue( j.num_machines==num_machines )
         #                self.assertTrue( j.num_mpiprocs==num_mpiprocs )
+    def test_parse_joblist_states(self):
+        """Test that `_parse_joblist_states` returns the same states as `_parse_joblist_output` and parses lazily."""
+        scheduler = SlurmScheduler()
+
+        job_list = scheduler._parse_joblist_output(0, TEXT_SQUEUE_TO_TEST, '')  # pylint: disable=protected-access
+        state_list = scheduler._parse_joblist_states(0, TEXT_SQUEUE_TO_TEST, '')  # pylint: disable=protected-access
+
+        assert [(job.job_id, job.job_state) for job in state_list] == [(job.job_id, job.job_state) for job in job_list]
+        assert all(job._job_info is None for job in state_list)  # pylint: disable=protected-access
+        assert [job.get_job_info() for job in state_list] == job_list
+        assert [scheduler.parse_job_info(job.raw) for job in state_list] == job_list
+
     def test_parse_failed_squeue_output(self):
         """
         Test that _parse_joblist_output reacts as expected to failures.
@@ -385,6 +397,16 @@ class TestJoblistCommand:
         assert '123,456' in command
         assert '456,456' not in command
 
+    def test_joblist_delta(self):
+        """Test that the delta command only includes the jobs that are not pending."""
+        scheduler = SlurmScheduler()
+
+        command = scheduler._get_joblist_delta_command(jobs=['123', '456'])  # pylint: disable=protected-access
+        assert command.startswith(scheduler._get_joblist_command(jobs=['123', '456']))  # pylint: disable=protected-access
+        states = command.split('--states=')[1].split(',')
+        assert 'R' in states
+        assert 'PD' not in states
+
 
 def test_parse_out_of_memory():
     """Test that for job that failed due to OOM `parse_output` return the `ERROR_SCHEDULER_OUT_OF_MEMORY` code."""
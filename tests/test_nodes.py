@@ -458,7 +458,7 @@ class TestNodeBasic(AiidaTestCase):
         b.store()
         # and I finally add a extras
         b.set_extra('meta', 'textofext')
-        b_expected_extras = {'meta': 'textofext', '_aiida_hash': AnyValue()}
+        b_expected_extras = {'meta': 'textofext', '_aiida_hash': AnyValue(), '_aiida_hash_version': AnyValue()}
 
         # Now I check that the attributes of the original node have not changed
         self.assertEqual(a.attributes, attrs_to_set)
@@ -797,7 +797,7 @@ class TestNodeBasic(AiidaTestCase):
         for k, v in extras_to_set.items():
             a.set_extra(k, v)
 
-        all_extras = dict(_aiida_hash=AnyValue(), **extras_to_set)
+        all_extras = dict(_aiida_hash=AnyValue(), _aiida_hash_version=AnyValue(), **extras_to_set)
 
         self.assertEqual(set(list(a.attributes.keys())), set(attrs_to_set.keys()))
         self.assertEqual(set(list(a.extras.keys())), set(all_extras.keys()))
@@ -823,7 +823,7 @@ class TestNodeBasic(AiidaTestCase):
             'further': 267,
         }
 
-        all_extras = dict(_aiida_hash=AnyValue(), **extras_to_set)
+        all_extras = dict(_aiida_hash=AnyValue(), _aiida_hash_version=AnyValue(), **extras_to_set)
 
         for k, v in extras_to_set.items():
             a.set_extra(k, v)
@@ -861,7 +861,7 @@ class TestNodeBasic(AiidaTestCase):
                 'h': 'j'
             }, [9, 8, 7]],
         }
-        all_extras = dict(_aiida_hash=AnyValue(), **extras_to_set)
+        all_extras = dict(_aiida_hash=AnyValue(), _aiida_hash_version=AnyValue(), **extras_to_set)
 
         # I redefine the keys with more complicated data, and
         # changing the data type too
@@ -100,3 +100,40 @@ class TestCalculations(AiidaTestCase):
 
         for uuid, value in uuids_values:
             self.assertEqual(orm.load_node(uuid).value, value)
+
+    @with_temp_dir
+    def test_caching_after_import(self, temp_dir):
+        """Test that imported calculations are only used as cache sources once they have been rehashed."""
+        from aiida.common.links import LinkType
+        from aiida.engine import ProcessState
+        from aiida.tools.rehash import rehash_nodes
+
+        def create_calculation(inputs):
+            calculation = orm.CalcFunctionNode(process_type='aiida.calculations:arithmetic.add')
+            for label, node in inputs.items():
+                calculation.add_incoming(node, LinkType.INPUT_CALC, label)
+            calculation.set_process_state(ProcessState.FINISHED)
+            calculation.set_exit_status(0)
+            return calculation
+
+        node = create_calculation({'x': orm.Int(1).store(), 'y': orm.Int(2).store()}).store()
+        node.seal()
+        uuid = node.uuid
+
+        filename = os.path.join(temp_dir, 'export.aiida')
+        export([node], filename=filename, silent=True)
+        self.clean_db()
+        self.insert_data()
+        import_data(filename, silent=True)
+
+        # The hashes are not imported, so the imported calculation is not a cache source
+        node = orm.load_node(uuid)
+        self.assertIsNone(node.backend_entity.hash)
+        calculation = create_calculation({'x': orm.Int(1).store(), 'y': orm.Int(2).store()})
+        self.assertIsNone(calculation._get_same_node())  # pylint: disable=protected-access
+
+        for _ in rehash_nodes(pks=[node.pk], max_workers=1):
+            pass
+
+        self.assertEqual(node.backend_entity.hash, node.get_hash())
+        self.assertEqual(calculation._get_same_node().uuid, uuid)  # pylint: disable=protected-access
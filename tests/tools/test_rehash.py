@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida-core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for :mod:`aiida.tools.rehash`."""
+import pytest
+
+from aiida import orm
+from aiida.tools.rehash import count_nodes_to_rehash, rehash_nodes
+
+
+def get_stored_hash(node):
+    """Return the hash stored in the ``hash`` column and the extras of the given node."""
+    builder = orm.QueryBuilder().append(
+        orm.Node, filters={'id': node.pk}, project=['hash', 'extras._aiida_hash', 'extras._aiida_hash_version']
+    )
+    return builder.one()
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_rehash_nodes():
+    """Test that `rehash_nodes` stores the hashes of all matching nodes, in batches ordered by pk."""
+    nodes = [orm.Int(value).store() for value in range(5)]
+    unmatched = orm.CalculationNode().store()
+
+    for node in nodes + [unmatched]:
+        node.clear_hash()
+
+    assert count_nodes_to_rehash(orm.Int) == 5
+
+    batches = list(rehash_nodes(orm.Int, batch_size=2, max_workers=1))
+    assert batches == [(2, nodes[1].pk), (2, nodes[3].pk), (1, nodes[4].pk)]
+
+    for node in nodes:
+        hash_version = node._get_hash_version()  # pylint: disable=protected-access
+        assert get_stored_hash(node) == [node.get_hash(), node.get_hash(), hash_version]
+
+    assert get_stored_hash(unmatched) == [None, None, None]
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_rehash_nodes_filters():
+    """Test the filters of `rehash_nodes`, in particular the ``start_pk`` that is used to resume."""
+    nodes = [orm.Int(value).store() for value in range(4)]
+
+    for node in nodes:
+        node.clear_hash()
+
+    filters = {'pks': [node.pk for node in nodes[:3]], 'start_pk': nodes[0].pk}
+    assert count_nodes_to_rehash(**filters) == 2
+    assert list(rehash_nodes(**filters, max_workers=1)) == [(2, nodes[2].pk)]
+    assert [get_stored_hash(node)[0] is not None for node in nodes] == [False, True, True, False]
+
+    ctime = nodes[2].ctime
+    assert count_nodes_to_rehash(ctime_after=ctime) == 1
+    assert count_nodes_to_rehash(ctime_before=ctime) == 2
+
+
+@pytest.mark.usefixtures('clear_database_before_test')
+def test_rehash_nodes_pks_generator():
+    """Test that the ``pks`` can be a generator, even though they are used in the query of every batch."""
+    nodes = [orm.Int(value).store() for value in range(5)]
+
+    for node in nodes:
+        node.clear_hash()
+
+    pks = (node.pk for node in nodes)
+    batches = list(rehash_nodes(pks=pks, batch_size=2, max_workers=1))
+    assert batches == [(2, nodes[1].pk), (2, nodes[3].pk), (1, nodes[4].pk)]
+    assert all(get_stored_hash(node)[0] is not None for node in nodes)
@@ -1365,3 +1365,46 @@ class TestExecuteCommandWait(unittest.TestCase):
         with custom_transport as transport:
             with self.assertRaises(ValueError):
                 transport.exec_command_wait('cat', stdin=1)
+
+    @run_for_all_plugins
+    def test_exec_command_batch(self, custom_transport):
+        """Test the execution of a batch of commands in a single shell session."""
+        with custom_transport as transport:
+            location = transport.normalize('/tmp')
+            transport.chdir(location)
+
+            commands = [
+                'echo out; echo err >&2', 'cd /; exit 3', 'pwd # comment', 'printf "no newline"', 'cat', '# comment', ''
+            ]
+            results = transport.exec_command_batch(commands)
+
+            self.assertEqual(len(results), len(commands))
+            self.assertEqual(results[0][0], 0)
+            self.assertEqual(results[0][1], 'out\n')
+            self.assertTrue(results[0][2].endswith('err\n'))
+            self.assertEqual(results[1], (3, '', ''))
+            # The change of directory of the previous command does not affect the following ones
+            self.assertEqual(results[2], (0, f'{location}\n', ''))
+            self.assertEqual(results[3], (0, 'no newline', ''))
+            # The standard input of the commands is empty
+            self.assertEqual(results[4], (0, '', ''))
+            # Commands that are only a comment or empty do nothing, rather than failing the whole batch
+            self.assertEqual(results[5:], [(0, '', ''), (0, '', '')])
+
+            self.assertEqual(transport.exec_command_batch([]), [])
+
+    @run_for_all_plugins
+    def test_exec_command_stream_stderr(self, custom_transport):
+        """Test that streaming the output of a command that writes a lot to its standard error does not block."""
+        command = 'head -c 1048576 /dev/zero >&2; echo out; echo err >&2; exit {}'
+
+        with custom_transport as transport:
+            with transport.exec_command_stream(command.format(0)) as (_, stdout):
+                self.assertEqual(stdout.read(), b'out\n')
+
+            with self.assertRaises(IOError) as exception:
+                with transport.exec_command_stream(command.format(2)) as (_, stdout):
+                    stdout.read()
+
+            self.assertIn('exit status 2', str(exception.exception))
+            self.assertTrue(str(exception.exception).endswith('err\n'))